@@ -110,17 +110,8 @@ async def simulate_fault(request: FaultSimulationRequest):
             severity=request.severity
         )
         
-        # Converte resultado para formato JSON
-        return {
-            "fault_location": result.fault_location,
-            "fault_type": result.fault_type,
-            "fault_current_a": result.fault_current_a,
-            "affected_zone": result.affected_zone,
-            "coordination_ok": result.coordination_ok,
-            "device_responses": result.device_responses,
-            "coordination_issues": result.coordination_issues,
-            "normative_compliance": result.normative_compliance
-        }
+        # Converte resultado (arrays estruturados) para formato JSON
+        return result.to_dict()
         
     except HTTPException:
         raise
@@ -8,14 +8,33 @@ com algoritmo de aprendizado por reforço para otimização automática.
 
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Tuple, Optional
 import random
+from types import MappingProxyType
 import json
+import logging
 from datetime import datetime
 
+from simuladores.power_sim.banco_dispositivos import (
+    BancoDispositivos, DispositivoVinculado, MemoSimulacoes, problemas_coordenacao,
+    registros_para_dicts
+)
+from simuladores.power_sim.tabela_q import CodificadorEstado, TabelaQEsparsa
+from simuladores.power_sim.avaliacao_incremental import AvaliadorIncremental
+from simuladores.power_sim.avaliacao_paralela import (
+    AvaliadorParalelo, ajustes_do_banco, cenarios_compactos, gerar_cenarios, metricas_cenarios
+)
+
+try:
+    from simuladores.power_sim.curto_circuito import motor_rede_padrao, zth_barras_ieee
+except ImportError:
+    motor_rede_padrao = None
+
+logger = logging.getLogger(__name__)
+
 @dataclass
-class ProtectionDevice:
+class ProtectionDevice(DispositivoVinculado):
     """Dispositivo de proteção ANSI com parâmetros reais"""
     id: str
     zone: str  # Z1 ou Z2
@@ -39,15 +58,36 @@ class ProtectionZone:
 
 @dataclass
 class FaultSimulationResult:
-    """Resultado completo da simulação de falta"""
+    """
+    Resultado completo da simulação de falta
+
+    device_responses e coordination_issues são arrays estruturados
+    (RESPOSTA_DTYPE / PROBLEMA_DTYPE) com os mesmos campos dos dicionários
+    da API; to_dict() converte para o formato JSON.
+    """
     fault_location: str
     fault_type: str
     fault_current_a: float
     affected_zone: str
     coordination_ok: bool
-    device_responses: List[Dict]
-    coordination_issues: List[Dict]
+    device_responses: np.ndarray
+    coordination_issues: np.ndarray
     normative_compliance: Dict
+    # Banco que gerou as respostas (máscaras por tipo/id pré-calculadas)
+    device_bank: Optional[BancoDispositivos] = field(default=None, repr=False, compare=False)
+
+    def to_dict(self) -> Dict:
+        """Formato da API: respostas e problemas como listas de dicionários"""
+        return {
+            'fault_location': self.fault_location,
+            'fault_type': self.fault_type,
+            'fault_current_a': float(self.fault_current_a),
+            'affected_zone': self.affected_zone,
+            'coordination_ok': bool(self.coordination_ok),
+            'device_responses': registros_para_dicts(self.device_responses),
+            'coordination_issues': registros_para_dicts(self.coordination_issues),
+            'normative_compliance': self.normative_compliance
+        }
 
 class BasicRLAgent:
     """
@@ -55,16 +95,36 @@ class BasicRLAgent:
     Algoritmo: Q-Learning com epsilon-greedy
     """
     
+    # Limites das faixas de discretização de cada característica do estado
+    TIME_LIMITS = (0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0)  # segundos
+    STATE_LIMITS = (
+        (0.5,),                          # 1. Coordenação OK
+        (1, 2, 3, 4, 6),                 # 2. Dispositivos operando
+        (0.5,),                          # 3. Zona Z1
+        (1, 2, 3),                       # 4. Tipo de falta
+        (1, 2, 4, 7),                    # 5. Problemas de coordenação
+        (0.5,), (0.5,), (0.5,), (0.5,),  # 6. Conformidade (4 normas)
+        TIME_LIMITS, TIME_LIMITS,        # 7. Tempo mínimo e máximo dos primários
+        (0.05, 0.2, 0.5),                #    e desvio padrão
+        (2000, 4000, 8000, 15000),       # 8. Corrente de falta (A)
+    ) + ((0.5,),) * 4 + (TIME_LIMITS,) * 4  # 9. Críticos: operou / tempo
+    
+    FAULT_TYPES = ('3ph', '2ph', '1ph', '2ph_ground')
+    CRITICAL_DEVICES = ('87T-TR1', '87T-TR2', '50/51-L4-5', '50/51-L5-6')
+    
     def __init__(self, state_size=64, action_space_size=32, learning_rate=0.01, epsilon=0.3):
-        self.state_size = state_size
+        # Estados discretizados por característica e empacotados em uma chave
+        # inteira sem colisões; state_size é mantido por compatibilidade
+        self.state_encoder = CodificadorEstado(self.STATE_LIMITS)
+        self.state_size = self.state_encoder.n_estados
         self.action_space_size = action_space_size
         self.learning_rate = learning_rate
         self.epsilon = epsilon
         self.epsilon_decay = 0.99  # Decay mais lento para exploração adequada
         self.epsilon_min = 0.05
         
-        # Q-table para aprendizado - maior para capturar complexidade
-        self.q_table = np.zeros((state_size, action_space_size))
+        # Q-table esparsa: uma linha por estado visitado
+        self.q_table = TabelaQEsparsa(action_space_size)
         
         # Histórico de treinamento
         self.episodes = 0
@@ -75,74 +135,54 @@ class BasicRLAgent:
         self.gamma = 0.95  # Fator de desconto
         self.min_exploration_episodes = 50  # Mínimo de episódios para exploração
     
-    def get_state(self, coordinator, fault_result):
+    def state_features(self, fault_result) -> np.ndarray:
         """
-        Estado avançado para coordenação de proteção baseado em normas técnicas
+        Características do estado para coordenação de proteção baseado em normas técnicas
         Captura: coordenação, seletividade, conformidade normativa, tempos, correntes
         """
-        state_vector = []
-        
-        # 1. Estado básico da coordenação
-        state_vector.append(1 if fault_result.coordination_ok else 0)
-        
-        # 2. Número de dispositivos operando (seletividade)
-        operating_count = len([d for d in fault_result.device_responses if d['should_operate']])
-        state_vector.append(min(operating_count / 8.0, 1.0))  # Normalizado
-        
-        # 3. Zona afetada
-        state_vector.append(1 if fault_result.affected_zone == 'Z1' else 0)
-        
-        # 4. Tipo de falta (codificado)
-        fault_encoding = {'3ph': 0.25, '2ph': 0.5, '1ph': 0.75, '2ph_ground': 1.0}
-        state_vector.append(fault_encoding.get(fault_result.fault_type, 0.25))
-        
-        # 5. Problemas de coordenação IEEE C37.112
-        coord_issues = len(fault_result.coordination_issues)
-        state_vector.append(min(coord_issues / 10.0, 1.0))  # Normalizado
+        bank = fault_result.device_bank
+        responses = fault_result.device_responses
+        operating = responses['should_operate']
+        times = responses['operating_time']
         
         # 6. Conformidade normativa (4 normas)
-        for norm, compliance in fault_result.normative_compliance.items():
-            state_vector.append(1 if compliance.get('coordination_margins', False) or 
-                              compliance.get('goose_performance', False) or 
-                              compliance.get('selectivity_dr', False) or 
-                              compliance.get('offshore_environment', False) else 0)
+        compliance = [1 if compliance.get('coordination_margins', False) or 
+                      compliance.get('goose_performance', False) or 
+                      compliance.get('selectivity_dr', False) or 
+                      compliance.get('offshore_environment', False) else 0
+                      for compliance in fault_result.normative_compliance.values()]
+        compliance = (compliance + [0] * 4)[:4]
         
         # 7. Tempos de operação dos dispositivos primários (87T, 50/51)
-        primary_times = []
-        for device in fault_result.device_responses:
-            if device['should_operate'] and device['type'] in ['87T', '50/51']:
-                primary_times.append(device['operating_time'])
-        
-        # Estatísticas dos tempos
-        if primary_times:
-            state_vector.append(min(min(primary_times) / 2.0, 1.0))  # Tempo mínimo
-            state_vector.append(min(max(primary_times) / 2.0, 1.0))  # Tempo máximo
-            state_vector.append(min(np.std(primary_times) / 1.0, 1.0))  # Desvio padrão
+        primary_times = times[operating & bank.mascara_tipo('87T', '50/51')]
+        if len(primary_times):
+            primary_stats = [primary_times.min(), primary_times.max(), primary_times.std()]
         else:
-            state_vector.extend([0, 0, 0])
-        
-        # 8. Corrente de falta normalizada
-        state_vector.append(min(fault_result.fault_current_a / 15000.0, 1.0))
+            primary_stats = [0, 0, 0]
         
         # 9. Estado específico dos dispositivos críticos
-        critical_devices = ['87T-TR1', '87T-TR2', '50/51-L4-5', '50/51-L5-6']
-        for device_id in critical_devices:
-            device_response = next((d for d in fault_result.device_responses if d['device_id'] == device_id), None)
-            if device_response:
-                state_vector.append(1 if device_response['should_operate'] else 0)
-                state_vector.append(min(device_response['operating_time'] / 2.0, 1.0) if device_response['should_operate'] else 0)
-            else:
-                state_vector.extend([0, 0])
-        
-        # Preenche até state_size com zeros se necessário
-        while len(state_vector) < self.state_size:
-            state_vector.append(0)
-        
-        # Trunca se exceder
-        state_vector = state_vector[:self.state_size]
-        
-        # Converte para índice da Q-table usando hash
-        return abs(hash(tuple(np.round(state_vector, 3)))) % self.state_size
+        critical = bank.indices(self.CRITICAL_DEVICES)
+        critical_operates = (critical >= 0) & operating[critical]
+        critical_times = np.where(critical_operates, times[critical], 0)
+        
+        fault_type = self.FAULT_TYPES.index(fault_result.fault_type) \
+            if fault_result.fault_type in self.FAULT_TYPES else 0
+        
+        return np.concatenate([
+            [1 if fault_result.coordination_ok else 0,            # 1
+             np.count_nonzero(operating),                         # 2
+             1 if fault_result.affected_zone == 'Z1' else 0,      # 3
+             fault_type,                                          # 4
+             len(fault_result.coordination_issues)],              # 5
+            compliance,                                           # 6
+            primary_stats,                                        # 7
+            [fault_result.fault_current_a],                       # 8
+            critical_operates, critical_times                     # 9
+        ])
+    
+    def get_state(self, coordinator, fault_result):
+        """Chave do estado (inteiro sem colisões) para a Q-table"""
+        return self.state_encoder.codificar(self.state_features(fault_result))
     
     def get_action(self, state):
         """Seleciona ação usando epsilon-greedy"""
@@ -156,16 +196,18 @@ class BasicRLAgent:
         Implementa sistema de recompensas/penalidades conforme normas IEEE 242, API RP 14F, ABNT NBR 14039
         """
         reward = 0
+        bank = fault_result.device_bank
+        responses = fault_result.device_responses
+        operating = responses['should_operate']
+        times = responses['operating_time'][operating]
+        operating_87t = operating & bank.mascara_tipo('87T')
+        operating_51 = operating & bank.mascara_tipo('50/51')
         
         # === RECOMPENSAS PRINCIPAIS (conforme documento) ===
         
         # 1. Atuação seletiva correta (+10 pontos)
         if fault_result.coordination_ok:
-            primary_operated = any(
-                d['should_operate'] and d['coordination_ok'] 
-                for d in fault_result.device_responses 
-                if d['type'] in ['87T', '50/51']
-            )
+            primary_operated = bool(np.any((operating_87t | operating_51) & responses['coordination_ok']))
             if primary_operated:
                 reward += 10
                 
@@ -174,14 +216,14 @@ class BasicRLAgent:
                 reward += 5
         
         # 2. Backup funcionando após falha primária (+5 pontos)
-        backup_operated = any(d['should_operate'] and d['type'] == '50/51' for d in fault_result.device_responses)
-        differential_failed = not any(d['should_operate'] and d['type'] == '87T' for d in fault_result.device_responses)
+        backup_operated = bool(operating_51.any())
+        differential_failed = not operating_87t.any()
         
         if backup_operated and differential_failed:
             reward += 5
         
         # 3. Seletividade adequada (NBR 5410)
-        operating_devices = len([d for d in fault_result.device_responses if d['should_operate']])
+        operating_devices = len(times)
         if operating_devices <= 2:  # Seletividade excelente
             reward += 8
         elif operating_devices <= 3:  # Seletividade boa
@@ -222,9 +264,8 @@ class BasicRLAgent:
             reward -= 50
         
         # 9. Tempos de coordenação inadequados
-        operating_times = [d['operating_time'] for d in fault_result.device_responses if d['should_operate']]
-        if len(operating_times) > 1:
-            time_spread = max(operating_times) - min(operating_times)
+        if len(times) > 1:
+            time_spread = times.max() - times.min()
             if time_spread < 0.2:  # Tempos muito próximos (< 200ms)
                 reward -= 8
             elif time_spread > 2.0:  # Tempos muito distantes (> 2s)
@@ -232,26 +273,24 @@ class BasicRLAgent:
         
         # 10. Dispositivos diferenciais não operando em falhas internas
         if fault_result.affected_zone in ['Z1', 'Z2']:
-            diff_operated = any(
-                d['should_operate'] and d['type'] == '87T' and fault_result.affected_zone in d['device_id']
-                for d in fault_result.device_responses
-            )
+            diff_operated = bool(np.any(
+                operating_87t & bank.mascara_id_contem(fault_result.affected_zone)
+            ))
             if not diff_operated:
                 reward -= 15  # Penalidade por diferencial não operar
         
         # === RECOMPENSAS AVANÇADAS ===
         
         # 11. Margem de coordenação adequada
-        adequate_margins = sum(1 for issue in fault_result.coordination_issues if issue['margin'] >= 0.25)
+        adequate_margins = int(np.count_nonzero(fault_result.coordination_issues['margin'] >= 0.25))
         total_margins = len(fault_result.coordination_issues)
         if total_margins > 0:
             margin_ratio = adequate_margins / total_margins
             reward += margin_ratio * 3
         
         # 12. Velocidade de atuação apropriada
-        fast_devices = [d for d in fault_result.device_responses 
-                       if d['should_operate'] and d['operating_time'] < 0.1]
-        if len(fast_devices) > 0 and len(fast_devices) <= 2:  # Apenas dispositivos rápidos necessários
+        fast_devices = int(np.count_nonzero(times < 0.1))
+        if fast_devices > 0 and fast_devices <= 2:  # Apenas dispositivos rápidos necessários
             reward += 3
         
         return reward
@@ -259,13 +298,12 @@ class BasicRLAgent:
     def learn(self, state, action, reward, next_state):
         """Algoritmo Q-Learning avançado para coordenação de proteção"""
         # Q-Learning com experiência
-        best_next_action = np.argmax(self.q_table[next_state])
-        td_target = reward + self.gamma * self.q_table[next_state][best_next_action]
+        td_target = reward + self.gamma * self.q_table[next_state].max()
         td_error = td_target - self.q_table[state][action]
         
         # Atualização com taxa de aprendizado adaptativa
         adaptive_lr = self.learning_rate * (1 + abs(td_error) / 10)  # Maior erro = mais aprendizado
-        self.q_table[state][action] += adaptive_lr * td_error
+        self.q_table.atualizar(state, action, adaptive_lr * td_error)
         
         # Decaimento do epsilon apenas após exploração mínima
         if self.episodes > self.min_exploration_episodes and self.epsilon > self.epsilon_min:
@@ -346,14 +384,56 @@ class ProtectionCoordinator:
     def __init__(self):
         self.protection_zones = self._create_ieee_14bus_zones()
         self.protection_devices = self._get_all_devices()
+        # Arrays de pickup/atraso/zona/tipo/status, sincronizados com os dataclasses
+        self.device_bank = BancoDispositivos(self.protection_devices)
+        # Resultados de simulate_fault por (bus, tipo, severidade, versão dos ajustes)
+        self.fault_memo = MemoSimulacoes(maxsize=256)
+        # Pares (índices do banco) verificados na coordenação; None = todos os pares.
+        # Ex.: coordenacao.pares_montante_jusante(net, elementos) para só montante/jusante
+        self.coordination_pairs = None
         self.rl_agent = BasicRLAgent()
+        # Pool de processos de optimize_protection_with_rl(workers=...), criado sob demanda
+        self._scenario_evaluator = None
         
         # Impedância simplificada do sistema IEEE 14-Bus
         self.bus_impedances = {
             1: 0.1, 2: 0.12, 3: 0.15, 4: 0.08, 5: 0.09, 6: 0.11, 7: 0.13,
             8: 0.14, 9: 0.16, 10: 0.18, 11: 0.19, 12: 0.20, 13: 0.21, 14: 0.22
         }
-        
+
+        # Barras presentes na rede pandapower usam a impedância de Thévenin real
+        # (diagonal da Zbus). A rede do projeto (ieee14_protecao.json) modela só
+        # as barras de 13,8 kV B2, B3, B6, B7, B9, B10 e B14; as barras IEEE 1, 4,
+        # 5, 8, 11, 12 e 13 não existem nela, não têm Zth e mantêm o valor
+        # tabelado acima. bus_impedance_source indica a origem de cada barra.
+        self.bus_impedances = dict(zip(self.bus_numbers.tolist(), self._build_bus_impedance_vector().tolist()))
+        
+    # Fatores por tipo de falta (relativos à falta trifásica)
+    FAULT_FACTORS = {'3ph': 1.0, '2ph': 0.87, '1ph': 0.58, '2ph_ground': 0.95}
+    BASE_CURRENT_A = 1000  # A (base)
+
+    def _build_bus_impedance_vector(self):
+        """Impedância de Thévenin (pu) por barra, na ordem de bus_numbers"""
+        tabulated = np.array([self.bus_impedances[b] for b in self.bus_numbers], dtype=float)
+        self.bus_impedance_source = dict.fromkeys(self.bus_numbers.tolist(), "tabulated")
+        if motor_rede_padrao is None:
+            logger.warning("Motor de curto-circuito indisponível: impedâncias tabeladas em todas as barras")
+            return tabulated
+        try:
+            zth = zth_barras_ieee(motor_rede_padrao(), self.bus_numbers)
+        except (OSError, KeyError, ValueError, np.linalg.LinAlgError) as e:
+            logger.warning("Rede do projeto não carregada (%s): impedâncias tabeladas em todas as barras", e)
+            return tabulated
+        computed = ~np.isnan(zth)
+        self.bus_impedance_source.update(dict.fromkeys(self.bus_numbers[computed].tolist(), "zbus"))
+        return np.where(computed, zth, tabulated)
+
+    def fault_sweep(self, fault_type: str, severity: float) -> Dict[int, float]:
+        """Corrente de falta (A) em todas as barras com uma única operação vetorial"""
+        fault_factor = self.FAULT_FACTORS.get(fault_type, 1.0)
+        currents = self.BASE_CURRENT_A * severity * fault_factor / self.bus_impedance_vector
+        return dict(zip(self.bus_numbers.tolist(), currents.tolist()))
+
     def _create_ieee_14bus_zones(self):
         """Cria as zonas de proteção do sistema IEEE 14-Bus"""
         
@@ -435,78 +515,65 @@ class ProtectionCoordinator:
             devices.extend(zone.devices)
         return devices
     
+    @property
+    def coordination_pairs(self):
+        return self._coordination_pairs
+    
+    @coordination_pairs.setter
+    def coordination_pairs(self, pairs):
+        # Muda o resultado da coordenação: descarta as simulações guardadas
+        self._coordination_pairs = pairs
+        self.fault_memo.limpar()
+    
+    @property
+    def bus_impedances(self):
+        # Somente leitura: alterações passam pelo setter (um dicionário novo)
+        return MappingProxyType(self._bus_impedances)
+    
+    @bus_impedances.setter
+    def bus_impedances(self, impedances):
+        # Muda as correntes de falta: atualiza o vetor de fault_sweep e
+        # descarta as simulações guardadas
+        self._bus_impedances = dict(impedances)
+        self.bus_numbers = np.array(sorted(self._bus_impedances))
+        self.bus_impedance_vector = np.array([self._bus_impedances[b] for b in self.bus_numbers], dtype=float)
+        self.fault_memo.limpar()
+    
     def simulate_fault(self, bus: int, fault_type: str, severity: float) -> FaultSimulationResult:
         """
         Simula falta no sistema IEEE 14-Bus
         
+        O resultado é guardado por (bus, tipo, severidade, versão dos ajustes):
+        repetir um cenário sem ajuste efetivo dos dispositivos não simula de
+        novo (ver ``fault_memo.estatisticas()``). O resultado é somente leitura.
+        
         Args:
             bus: Número da barra (1-14)
             fault_type: Tipo de falta ('3ph', '2ph', '1ph', '2ph_ground')
             severity: Severidade da falta (0.1 a 1.0)
         """
+        key = (bus, fault_type, severity, self.device_bank.versao)
+        return self.fault_memo.obter(key, lambda: self._run_fault_simulation(bus, fault_type, severity))
+    
+    def _run_fault_simulation(self, bus: int, fault_type: str, severity: float) -> FaultSimulationResult:
+        """Simulação de falta propriamente dita (sem cache)"""
         
         # Determina zona afetada
         affected_zone = "Z1" if bus in [0, 4, 5, 6, 7, 9] else "Z2"
         
-        # Calcula corrente de falta usando impedância do bus
-        base_current = 1000  # A (base)
+        # Calcula corrente de falta usando a impedância de Thévenin do bus
+        base_current = self.BASE_CURRENT_A
         bus_impedance = self.bus_impedances.get(bus, 0.15)
-        
-        # Fatores por tipo de falta
-        fault_factors = {'3ph': 1.0, '2ph': 0.87, '1ph': 0.58, '2ph_ground': 0.95}
-        fault_factor = fault_factors.get(fault_type, 1.0)
+        fault_factor = self.FAULT_FACTORS.get(fault_type, 1.0)
         
         fault_current = (base_current * severity * fault_factor) / bus_impedance
         
-        # Simula resposta dos dispositivos
-        device_responses = []
-        coordination_issues = []
+        # Resposta de todos os dispositivos em operações vetoriais sobre o banco
+        device_responses = self.device_bank.respostas(fault_current, affected_zone, severity, base_current)
         
-        for device in self.protection_devices:
-            should_operate = False
-            operating_time = float('inf')
-            coordination_ok = True
-            
-            # Lógica de operação por tipo de dispositivo
-            if device.type == "87T" and device.zone == affected_zone:
-                should_operate = fault_current > device.pickup_current * base_current
-                operating_time = device.time_delay
-            elif device.type == "50/51":
-                if fault_current > device.pickup_current * base_current:
-                    should_operate = True
-                    # Curva tempo-corrente simplificada
-                    operating_time = device.time_delay * (1 + 1/(fault_current/base_current - device.pickup_current))
-            elif device.type == "67" and device.zone == affected_zone:
-                should_operate = fault_current > device.pickup_current * base_current
-                operating_time = device.time_delay
-            elif device.type == "27/59":
-                # Dispositivos de tensão operam com atraso
-                should_operate = severity > 0.7  # Para faltas severas
-                operating_time = device.time_delay
-            
-            device_responses.append({
-                'device_id': device.id,
-                'type': device.type,
-                'should_operate': should_operate,
-                'operating_time': operating_time if should_operate else 0,
-                'coordination_ok': coordination_ok
-            })
-        
-        # Verifica coordenação entre dispositivos
-        operating_devices = [d for d in device_responses if d['should_operate']]
-        
-        for i, dev1 in enumerate(operating_devices):
-            for dev2 in operating_devices[i+1:]:
-                time_diff = abs(dev1['operating_time'] - dev2['operating_time'])
-                required_margin = 0.3  # IEEE C37.112 padrão
-                
-                if time_diff < required_margin:
-                    coordination_issues.append({
-                        'device1': dev1['device_id'],
-                        'device2': dev2['device_id'],
-                        'margin': time_diff,
-                        'required': required_margin
-                    })
+        # Verifica coordenação entre dispositivos (pares operando com margem < 0.3 s, IEEE C37.112),
+        # por ordenação dos tempos e varredura da janela da margem
+        coordination_issues = problemas_coordenacao(device_responses, permitidos=self.coordination_pairs)
         
         # Avalia conformidade normativa
         normative_compliance = self._evaluate_normative_compliance(
@@ -523,7 +590,8 @@ class ProtectionCoordinator:
             coordination_ok=coordination_ok,
             device_responses=device_responses,
             coordination_issues=coordination_issues,
-            normative_compliance=normative_compliance
+            normative_compliance=normative_compliance,
+            device_bank=self.device_bank
         )
     
     def _evaluate_normative_compliance(self, device_responses, coordination_issues, fault_type):
@@ -531,16 +599,17 @@ class ProtectionCoordinator:
         
         # IEEE C37.112 - Coordenação de proteção
         ieee_compliance = len(coordination_issues) == 0
-        ieee_issues = [f"Margem insuficiente: {issue['device1']}-{issue['device2']}" 
-                      for issue in coordination_issues]
+        ieee_issues = [f"Margem insuficiente: {device1}-{device2}"
+                      for device1, device2 in zip(coordination_issues['device1'].tolist(),
+                                                  coordination_issues['device2'].tolist())]
         
         # IEC 61850 - Comunicação (simulado)
         iec_compliance = True  # Assumindo GOOSE funcionando
         iec_issues = []
         
         # NBR 5410 - Seletividade
-        operating_devices = [d for d in device_responses if d['should_operate']]
-        nbr_compliance = len(operating_devices) <= 3  # Seletividade adequada
+        operating_devices = int(np.count_nonzero(device_responses['should_operate']))
+        nbr_compliance = operating_devices <= 3  # Seletividade adequada
         nbr_issues = ["Muitos dispositivos operando simultaneamente"] if not nbr_compliance else []
         
         # API RP 14C - Ambiente offshore
@@ -554,6 +623,18 @@ class ProtectionCoordinator:
             'API_RP_14C': {'offshore_environment': api_compliance, 'issues': api_issues}
         }
     
+    def _fault_inputs(self, scenarios):
+        """Corrente de falta, zona afetada e severidade de cada cenário (regras de simulate_fault)"""
+        buses = [scenario['bus'] for scenario in scenarios]
+        severities = np.array([scenario['severity'] for scenario in scenarios], dtype=float)
+        affected_zones = ["Z1" if bus in [0, 4, 5, 6, 7, 9] else "Z2" for bus in buses]
+        fault_currents = np.array([
+            (self.BASE_CURRENT_A * scenario['severity'] * self.FAULT_FACTORS.get(scenario['fault_type'], 1.0))
+            / self.bus_impedances.get(scenario['bus'], 0.15)
+            for scenario in scenarios
+        ], dtype=float)
+        return fault_currents, affected_zones, severities
+    
     def apply_rl_action(self, action):
         """Aplica ação avançada do RL mapeando para ajustes específicos"""
         # Mapeamento sofisticado de 32 ações para 8 dispositivos x 4 ajustes
@@ -631,18 +712,44 @@ class ProtectionCoordinator:
             'results': results
         }
 
-    def optimize_protection_with_rl(self, episodes=100):
-        """Otimização avançada usando RL com múltiplos cenários"""
+    def optimize_protection_with_rl(self, episodes=100, workers=None, scenarios=None,
+                                    n_scenarios=None, seed=None, incremental=True):
+        """
+        Otimização avançada usando RL com múltiplos cenários
+        
+        Args:
+            episodes: Número de episódios (5 passos cada)
+            workers: Processos que avaliam os cenários em paralelo (None ou 1 =
+                serial); o pool é mantido entre chamadas (ver close_workers)
+            scenarios: Lista de cenários {'bus', 'fault_type', 'severity'};
+                padrão: 5 cenários representativos
+            n_scenarios: Gera essa quantidade de cenários (gerar_cenarios) no
+                lugar da lista
+            seed: Semente do agente e dos cenários gerados; com a mesma
+                semente os caminhos serial e paralelo dão o mesmo resultado
+            incremental: No caminho serial, reavalia a cada passo só os
+                cenários afetados pelo dispositivo ajustado
+        """
         print(f"🤖 Iniciando otimização RL avançada: {episodes} episódios")
+        if seed is not None:
+            np.random.seed(seed)
         
         # Cenários de teste diversificados
-        fault_scenarios = [
-            {'bus': 4, 'fault_type': '3ph', 'severity': 0.9},   # Falta severa
-            {'bus': 7, 'fault_type': '2ph', 'severity': 0.7},   # Falta média
-            {'bus': 14, 'fault_type': '1ph', 'severity': 0.5},  # Falta leve
-            {'bus': 1, 'fault_type': '3ph', 'severity': 0.8},   # Geração  
-            {'bus': 9, 'fault_type': '2ph', 'severity': 0.6},   # Distribuição
-        ]
+        if scenarios is None and n_scenarios:
+            scenarios = gerar_cenarios(n_scenarios, seed)
+        elif scenarios is None:
+            scenarios = [
+                {'bus': 4, 'fault_type': '3ph', 'severity': 0.9},   # Falta severa
+                {'bus': 7, 'fault_type': '2ph', 'severity': 0.7},   # Falta média
+                {'bus': 14, 'fault_type': '1ph', 'severity': 0.5},  # Falta leve
+                {'bus': 1, 'fault_type': '3ph', 'severity': 0.8},   # Geração  
+                {'bus': 9, 'fault_type': '2ph', 'severity': 0.6},   # Distribuição
+            ]
+        fault_scenarios = cenarios_compactos(scenarios)
+        evaluator = None
+        if incremental and not (workers and workers > 1):
+            evaluator = self._incremental_evaluator(fault_scenarios)
+        reference = scenarios[0]  # Falta de referência para o estado do agente
         
         optimization_results = []
         best_coordination_score = 0
@@ -658,7 +765,7 @@ class ProtectionCoordinator:
             # Múltiplos passos por episódio
             for step in range(5):
                 # Estado atual
-                current_state = self.rl_agent.get_state(self.protection_devices, self.protection_zones)
+                current_state = self.rl_agent.get_state(self, self.simulate_fault(**reference))
                 
                 # Ação do RL
                 action = self.rl_agent.get_action(current_state)
@@ -666,30 +773,17 @@ class ProtectionCoordinator:
                 # Aplicar ação
                 self.apply_rl_action(action)
                 
-                # Avaliar com todos os cenários
-                step_reward = 0
-                coordination_quality = 0
-                
-                for scenario in fault_scenarios:
-                    result = self.simulate_fault(
-                        scenario['bus'], 
-                        scenario['fault_type'], 
-                        scenario['severity']
-                    )
-                    reward = self.rl_agent.calculate_reward(result)
-                    step_reward += reward
-                    
-                    # Métricas de qualidade
-                    if result.coordination_ok:
-                        coordination_quality += 20
-                    coordination_quality -= len(result.coordination_issues) * 5
-                
-                step_reward /= len(fault_scenarios)  # Média dos cenários
-                coordination_quality /= len(fault_scenarios)
+                # Avaliar com todos os cenários: só os afetados pelo ajuste
+                # (incremental), todos em série ou no pool de processos
+                if evaluator is not None:
+                    metrics = evaluator.metricas()
+                else:
+                    metrics = self._score_scenarios(fault_scenarios, workers)
+                step_reward = sum(metrics['reward'].tolist()) / len(fault_scenarios)  # Média dos cenários
                 episode_rewards.append(step_reward)
                 
                 # Próximo estado
-                next_state = self.rl_agent.get_state(self.protection_devices, self.protection_zones)
+                next_state = self.rl_agent.get_state(self, self.simulate_fault(**reference))
                 
                 # Aprendizado
                 self.rl_agent.learn(current_state, action, step_reward, next_state)
@@ -698,7 +792,7 @@ class ProtectionCoordinator:
             episode_avg_reward = np.mean(episode_rewards)
             
             # Teste final de coordenação
-            final_coordination_score = self._evaluate_coordination_quality()
+            final_coordination_score = self._evaluate_coordination_quality(workers)
             
             # Salvar melhor configuração
             if final_coordination_score > best_coordination_score:
@@ -736,27 +830,58 @@ class ProtectionCoordinator:
             'improvement': best_coordination_score - optimization_results[0]['coordination_score'] if optimization_results else 0
         }
     
-    def _evaluate_coordination_quality(self):
+    def _score_scenarios(self, scenarios, workers=None):
+        """Métricas por cenário (metricas_cenarios) com os ajustes atuais, serial ou em paralelo"""
+        if workers and workers > 1:
+            if self._scenario_evaluator is None or self._scenario_evaluator.workers != workers:
+                self.close_workers()
+                self._scenario_evaluator = AvaliadorParalelo(type(self), workers)
+            return self._scenario_evaluator.avaliar(
+                ajustes_do_banco(self.device_bank), scenarios, self.coordination_pairs
+            )
+        return metricas_cenarios(self, scenarios)
+    
+    def _incremental_evaluator(self, scenarios):
+        """
+        Métricas por cenário reavaliadas só onde o último ajuste tem efeito
+        (AvaliadorIncremental); mesmos valores de metricas_cenarios
+        """
+        def reward(rows, operating, times, issues):
+            # Recompensa depende do resultado completo: simula de novo só os cenários afetados
+            return np.array([self.rl_agent.calculate_reward(self.simulate_fault(*scenario))
+                             for scenario in scenarios[rows].tolist()], dtype=float)
+        
+        fault_currents, affected_zones, severities = self._fault_inputs(scenarios)
+        return AvaliadorIncremental(self.device_bank, fault_currents, affected_zones, severities,
+                                    self.BASE_CURRENT_A, reward, permitidos=self.coordination_pairs)
+    
+    def close_workers(self):
+        """Encerra o pool de processos de optimize_protection_with_rl(workers=...)"""
+        if self._scenario_evaluator is not None:
+            self._scenario_evaluator.fechar()
+            self._scenario_evaluator = None
+    
+    def _evaluate_coordination_quality(self, workers=None):
         """Avalia qualidade geral do sistema de coordenação"""
         total_score = 0
-        test_scenarios = [
+        test_scenarios = cenarios_compactos([
             {'bus': 4, 'fault_type': '3ph', 'severity': 0.8},
             {'bus': 7, 'fault_type': '2ph', 'severity': 0.6},
             {'bus': 14, 'fault_type': '1ph', 'severity': 0.5}
-        ]
+        ])
+        metrics = self._score_scenarios(test_scenarios, workers)
         
-        for scenario in test_scenarios:
-            result = self.simulate_fault(scenario['bus'], scenario['fault_type'], scenario['severity'])
-            
+        for coordination_ok, coordination_issues, operating_count in zip(
+                metrics['coordination_ok'].tolist(), metrics['coordination_issues'].tolist(),
+                metrics['operating_devices'].tolist()):
             # Pontuação baseada em critérios normativos
-            if result.coordination_ok:
+            if coordination_ok:
                 total_score += 30
             
             # Penalidades por problemas
-            total_score -= len(result.coordination_issues) * 10
+            total_score -= coordination_issues * 10
             
             # Seletividade (poucos dispositivos operando)
-            operating_count = len([d for d in result.device_responses if d['should_operate']])
             if operating_count <= 2:
                 total_score += 15  # Boa seletividade
             elif operating_count > 4:
@@ -782,7 +907,9 @@ class ProtectionCoordinator:
             'learning_rate': self.rl_agent.learning_rate,
             'epsilon': self.rl_agent.epsilon,
             'state_size': self.rl_agent.state_size,
-            'action_space_size': self.rl_agent.action_space_size
+            'action_space_size': self.rl_agent.action_space_size,
+            'visited_states': len(self.rl_agent.q_table),
+            'fault_memo': self.fault_memo.estatisticas()
         }
 
 # Teste básico
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Reavaliação Incremental de Cenários - ProtecAI Mini
+Compara a reavaliação completa dos cenários a cada ajuste do RL com a
+reavaliação incremental (só cenários e pares afetados pelo dispositivo
+ajustado):
+
+- optimize_protection_with_rl (coordenador de src/core) com bibliotecas de
+  cenários gerados de tamanhos crescentes
+- Rede sintética grande (centenas de dispositivos em dezenas de zonas):
+  custo por ajuste de um dispositivo contra a simulação completa em lote
+  (respostas_lote + contar_problemas_lote + calculate_reward_batch)
+
+Uso: python scripts/benchmark_avaliacao_incremental.py [ajustes]
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from simuladores.power_sim.avaliacao_incremental import AvaliadorIncremental  # noqa: E402
+from simuladores.power_sim.banco_dispositivos import (  # noqa: E402
+    BancoDispositivos, contar_problemas_lote
+)
+from src.core.rl_protection_coordinator_clean import (  # noqa: E402
+    BasicRLAgent, ProtectionCoordinator, ProtectionDevice
+)
+
+CORRENTE_BASE = 1000.0
+
+
+def otimizacao(n_cenarios, incremental, episodios=10):
+    coordenador = ProtectionCoordinator()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = coordenador.optimize_protection_with_rl(
+            episodes=episodios, n_scenarios=n_cenarios, seed=0, incremental=incremental)
+    return (time.perf_counter() - inicio) * 1000 / episodios, resultado['optimization_history']
+
+
+def rede_sintetica(zonas, por_zona, n_cenarios, rng):
+    tipos = ("87T", "67", "67", "50/51", "27/59")
+    dispositivos = [
+        ProtectionDevice(id=f"{tipos[k % len(tipos)]}-{z}-{k}", zone=f"Z{z}", type=tipos[k % len(tipos)],
+                         location=f"Zona {z}", pickup_current=float(rng.uniform(0.2, 2.0)),
+                         time_delay=float(rng.uniform(0.02, 1.5)), distance_km=0.0)
+        for z in range(zonas) for k in range(por_zona)
+    ]
+    correntes = rng.uniform(500, 20000, n_cenarios)
+    zonas_falta = [f"Z{z}" for z in rng.integers(0, zonas, n_cenarios)]
+    severidades = rng.uniform(0.1, 1.0, n_cenarios)
+    return BancoDispositivos(dispositivos), correntes, zonas_falta, severidades
+
+
+def main():
+    ajustes = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rng = np.random.default_rng(0)
+
+    print('⏱️ BENCHMARK DA REAVALIAÇÃO INCREMENTAL')
+    print('=' * 50)
+    print('optimize_protection_with_rl (8 dispositivos), ms por episódio')
+    print(f'{"Cenários":>9} {"Completa":>10} {"Incremental":>12} {"Ganho":>8}')
+    for n_cenarios in (100, 1000, 5000):
+        completa, referencia = otimizacao(n_cenarios, False)
+        incremental, historico = otimizacao(n_cenarios, True)
+        assert historico == referencia, 'Resultados divergem da avaliação completa'
+        print(f'{n_cenarios:>9} {completa:>10.1f} {incremental:>12.2f} {completa / incremental:>7.0f}x')
+
+    agente = BasicRLAgent()
+    recompensa = lambda linhas, opera, tempo, problemas: agente.calculate_reward_batch(opera, tempo, problemas)  # noqa: E731
+    print('\nRede sintética, ms por ajuste de um dispositivo')
+    print(f'{"Disp.":>6} {"Cenários":>9} {"Completa":>10} {"Incremental":>12} {"Afetados":>9} {"Ganho":>8}')
+    for zonas, por_zona, n_cenarios in ((10, 10, 2000), (40, 10, 5000)):
+        banco, correntes, zonas_falta, severidades = rede_sintetica(zonas, por_zona, n_cenarios, rng)
+        avaliador = AvaliadorIncremental(banco, correntes, zonas_falta, severidades, CORRENTE_BASE, recompensa)
+        escolhidos = rng.integers(0, len(banco), ajustes)
+        fatores = rng.choice([0.95, 1.05], ajustes)
+        campos = rng.choice(['pickup_current', 'time_delay'], ajustes)
+
+        t_completa = t_incremental = 0.0
+        afetados = 0
+        for i, fator, campo in zip(escolhidos, fatores, campos):
+            dispositivo = banco.dispositivos[i]
+            setattr(dispositivo, campo, getattr(dispositivo, campo) * fator)
+
+            inicio = time.perf_counter()
+            opera, tempo = banco.respostas_lote(banco.pickup[None], banco.atraso[None], correntes,
+                                                zonas_falta, severidades, CORRENTE_BASE)
+            problemas = contar_problemas_lote(opera[0], tempo[0])
+            completa = agente.calculate_reward_batch(opera[0], tempo[0], problemas)
+            t_completa += time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            afetados += len(avaliador.atualizar())
+            t_incremental += time.perf_counter() - inicio
+            assert np.array_equal(avaliador.metricas()['reward'], completa)
+
+        print(f'{len(banco):>6} {n_cenarios:>9} {t_completa * 1000 / ajustes:>10.2f} '
+              f'{t_incremental * 1000 / ajustes:>12.3f} {afetados / ajustes:>9.0f} '
+              f'{t_completa / t_incremental:>7.0f}x')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Avaliação Paralela de Cenários - ProtecAI Mini
+Tempo por episódio de optimize_protection_with_rl (coordenador de src/core)
+com a avaliação serial dos cenários e com o pool persistente de processos,
+para bibliotecas de cenários gerados de tamanhos crescentes. Confere que os
+caminhos serial e paralelo dão o mesmo histórico para a mesma semente.
+
+O ganho depende dos núcleos disponíveis (os processos disputam a CPU quando
+há menos núcleos que workers).
+
+Uso: python scripts/benchmark_avaliacao_paralela.py [episodios] [workers ...]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from simuladores.power_sim.avaliacao_paralela import cenarios_compactos, gerar_cenarios  # noqa: E402
+from src.core.rl_protection_coordinator_clean import ProtectionCoordinator  # noqa: E402
+
+CENARIOS = (5, 100, 500)
+SEMENTE = 0
+
+
+def otimizar(episodios, n_cenarios, workers):
+    coordenador = ProtectionCoordinator()
+    if workers:
+        # Pool criado (e processos iniciados) fora da medição; só avalia, sem ajustar
+        coordenador._score_scenarios(cenarios_compactos(gerar_cenarios(workers)), workers)
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = coordenador.optimize_protection_with_rl(
+            episodes=episodios, workers=workers, n_scenarios=n_cenarios, seed=SEMENTE)
+    tempo = (time.perf_counter() - inicio) * 1000 / episodios
+    coordenador.close_workers()
+    return tempo, resultado['optimization_history']
+
+
+def main():
+    episodios = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    lista_workers = [int(w) for w in sys.argv[2:]] or [2, 4]
+
+    print('⏱️ BENCHMARK DA AVALIAÇÃO PARALELA DE CENÁRIOS')
+    print('=' * 50)
+    print(f'Núcleos disponíveis: {os.cpu_count()}, {episodios} episódios (ms por episódio)')
+    print(f'{"Cenários":>9} {"Serial":>10}' + ''.join(f'{f"{w} proc.":>12}' for w in lista_workers))
+
+    for n_cenarios in CENARIOS:
+        serial, referencia = otimizar(episodios, n_cenarios, None)
+        linha = f'{n_cenarios:>9} {serial:>10.1f}'
+        for workers in lista_workers:
+            tempo, historico = otimizar(episodios, n_cenarios, workers)
+            assert historico == referencia, 'Resultados divergem do caminho serial'
+            linha += f'{tempo:>12.1f}'
+        print(linha)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Banco de Dispositivos - ProtecAI Mini
+Compara a avaliação das respostas dos dispositivos e da coordenação par a
+par pelo laço por dispositivo (implementação anterior de simulate_fault)
+com o banco vetorizado, para o conjunto do projeto (8 dispositivos) e para
+conjuntos replicados maiores.
+
+Uso: python scripts/benchmark_banco_dispositivos.py [repeticoes]
+"""
+
+import copy
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from rl_protection_coordinator import ProtectionCoordinator  # noqa: E402
+from simuladores.power_sim.banco_dispositivos import (  # noqa: E402
+    BancoDispositivos, problemas_coordenacao
+)
+
+BASE = ProtectionCoordinator.BASE_CURRENT_A
+
+
+def laco_por_dispositivo(dispositivos, corrente, zona, severidade):
+    """Implementação anterior: um dict por dispositivo e comparação par a par."""
+    respostas = []
+    for d in dispositivos:
+        opera, tempo = False, float('inf')
+        if d.type == "87T" and d.zone == zona:
+            opera, tempo = corrente > d.pickup_current * BASE, d.time_delay
+        elif d.type == "50/51":
+            if corrente > d.pickup_current * BASE:
+                opera = True
+                tempo = d.time_delay * (1 + 1 / (corrente / BASE - d.pickup_current))
+        elif d.type == "67" and d.zone == zona:
+            opera, tempo = corrente > d.pickup_current * BASE, d.time_delay
+        elif d.type == "27/59":
+            opera, tempo = severidade > 0.7, d.time_delay
+        respostas.append({'device_id': d.id, 'type': d.type, 'should_operate': opera,
+                          'operating_time': tempo if opera else 0, 'coordination_ok': True})
+    operando = [r for r in respostas if r['should_operate']]
+    problemas = []
+    for i, a in enumerate(operando):
+        for b in operando[i + 1:]:
+            margem = abs(a['operating_time'] - b['operating_time'])
+            if margem < 0.3:
+                problemas.append({'device1': a['device_id'], 'device2': b['device_id'],
+                                  'margin': margem, 'required': 0.3})
+    return respostas, problemas
+
+
+def replicar(dispositivos, fator):
+    """Conjunto com ``fator`` cópias dos dispositivos (ids únicos, ajustes espalhados)."""
+    novos = []
+    for k in range(fator):
+        for d in dispositivos:
+            copia = copy.copy(d)  # sem o vínculo com o banco original
+            copia.id = f"{d.id}#{k}"
+            copia.time_delay = d.time_delay * (1 + 0.37 * k)
+            novos.append(copia)
+    return novos
+
+
+def cronometrar(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) * 1e6 / repeticoes
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    coordenador = ProtectionCoordinator()
+    falta = (5000.0, "Z1", 0.8)
+
+    print('⏱️ BENCHMARK DO BANCO DE DISPOSITIVOS')
+    print('=' * 50)
+    print(f'{"Dispositivos":>12} {"Laço (µs)":>12} {"Banco (µs)":>12} {"Ganho":>8}')
+
+    for fator in (1, 4, 16, 64):
+        dispositivos = replicar(coordenador.protection_devices, fator)
+        banco = BancoDispositivos(dispositivos)
+        n = max(repeticoes // fator, 20)
+
+        t_laco = cronometrar(lambda: laco_por_dispositivo(dispositivos, *falta), n)
+        t_banco = cronometrar(
+            lambda: problemas_coordenacao(banco.respostas(*falta, BASE)), n)
+        print(f'{len(dispositivos):>12} {t_laco:>12.1f} {t_banco:>12.1f} {t_laco / t_banco:>7.1f}x')
+
+    # Passo do agente RL no conjunto do projeto (simulação + estado + recompensa),
+    # sem o memo de simulate_fault (os ajustes não mudam entre as repetições)
+    agente = coordenador.rl_agent
+
+    def passo():
+        resultado = coordenador._run_fault_simulation(4, '3ph', 0.8)
+        agente.get_state(coordenador, resultado)
+        agente.calculate_reward(resultado)
+
+    print(f'\nPasso RL (8 dispositivos): {cronometrar(passo, repeticoes):.1f} µs')
+    print(f'simulate_fault com ajustes inalterados (memo): '
+          f'{cronometrar(lambda: coordenador.simulate_fault(4, "3ph", 0.8), repeticoes):.1f} µs')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Análise N-1 - ProtecAI Mini
+Roda o estudo de contingências (linhas e trafos) na rede IEEE 14 do projeto
+e em casos maiores do pandapower, em série e no pool de processos.
+
+Uso: python scripts/benchmark_contingencia.py [workers]
+"""
+
+import asyncio
+import copy
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pandapower.networks as pn  # noqa: E402
+
+from simuladores.power_sim.snapshot_binario import JSON_PADRAO, carregar_documento  # noqa: E402
+from src.backend.services.contingency import (  # noqa: E402
+    ContingencyLimits, ContingencyPool, list_outages, run_outage, summarize
+)
+from src.backend.services.network_store import network_state_hash  # noqa: E402
+
+
+def serie(net, limits):
+    trabalho = copy.deepcopy(net)
+    return [run_outage(trabalho, outage, limits, algorithm='nr', max_iteration=30)
+            for outage in list_outages(trabalho)]
+
+
+async def paralelo(pool, net, limits):
+    return [r async for r in pool.stream(net, network_state_hash(net), limits)]
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    limits = ContingencyLimits()
+    redes = {
+        "IEEE 14 (projeto)": carregar_documento(JSON_PADRAO)["net"],
+        "case118": pn.case118(),
+        "case300": pn.case300(),
+    }
+
+    pool = ContingencyPool(max_workers=workers)
+    print('⏱️ BENCHMARK DA ANÁLISE N-1')
+    print('=' * 50)
+    print(f'Workers: {pool.max_workers}')
+
+    for nome, net in redes.items():
+        n = len(list_outages(net))
+
+        inicio = time.perf_counter()
+        resultados = serie(net, limits)
+        t_serie = (time.perf_counter() - inicio) * 1000
+
+        # Primeira chamada inclui a criação do pool; a segunda reaproveita
+        inicio = time.perf_counter()
+        asyncio.run(paralelo(pool, net, limits))
+        t_frio = (time.perf_counter() - inicio) * 1000
+        inicio = time.perf_counter()
+        asyncio.run(paralelo(pool, net, limits))
+        t_quente = (time.perf_counter() - inicio) * 1000
+
+        resumo = summarize(resultados)
+        print(f'\n{nome}: {len(net.bus)} barras, {n} contingências')
+        print(f'  Série:            {t_serie:8.1f} ms')
+        print(f'  Pool (criação):   {t_frio:8.1f} ms')
+        print(f'  Pool (reuso):     {t_quente:8.1f} ms')
+        print(f'  Seguras: {resumo["secure_outages"]}/{n} | ilhamento: {resumo["islanding_outages"]}'
+              f' | não convergiram: {resumo["non_converged"]}')
+
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
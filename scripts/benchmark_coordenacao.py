@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Verificação de Coordenação - ProtecAI Mini
+Compara a comparação de todos os pares (matriz k x k de diferenças de tempo,
+implementação anterior de problemas_coordenacao) com a ordenação e
+varredura da janela da margem, para milhares de relés.
+
+Uso: python scripts/benchmark_coordenacao.py [repeticoes]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from simuladores.power_sim.coordenacao import pares_na_janela  # noqa: E402
+
+MARGEM = 0.3
+
+
+def todos_os_pares(tempos):
+    """Implementação anterior: matriz de diferenças e triângulo superior."""
+    diferenca = np.abs(np.subtract.outer(tempos, tempos))
+    i, j = np.nonzero((diferenca < MARGEM) & np.triu(np.ones(diferenca.shape, dtype=bool), 1))
+    return i, j, diferenca[i, j]
+
+
+def cronometrar(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) * 1000 / repeticoes, resultado
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rng = np.random.default_rng(0)
+
+    print('⏱️ BENCHMARK DA VERIFICAÇÃO DE COORDENAÇÃO')
+    print('=' * 50)
+    print(f'{"Relés":>8} {"Pares":>8} {"Todos (ms)":>12} {"Varredura (ms)":>15} {"Ganho":>8}')
+
+    for k in (100, 1000, 5000, 10000):
+        # Tempos de operação espalhados por degraus de coordenação (0.02 a 60 s)
+        tempos = rng.uniform(0.02, 60.0, k)
+        n = max(repeticoes * 100 // k, 1)
+        t_todos, (i, j, _) = cronometrar(lambda: todos_os_pares(tempos), n)
+        t_varredura, (i2, j2, _) = cronometrar(lambda: pares_na_janela(tempos, MARGEM), n)
+        assert np.array_equal(i, i2) and np.array_equal(j, j2)
+        print(f'{k:>8} {len(i):>8} {t_todos:>12.2f} {t_varredura:>15.2f} '
+              f'{t_todos / t_varredura:>7.1f}x')
+
+
+if __name__ == "__main__":
+    main()
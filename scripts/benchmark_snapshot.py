@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Carga da Rede - ProtecAI Mini
+Compara o tempo de leitura do ieee14_protecao.json (JSON + from_json_string)
+com o snapshot binário colunar (.npz) gerado por snapshot_binario.py.
+
+Uso: python scripts/benchmark_snapshot.py [arquivo.json] [repeticoes]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pandapower as pp  # noqa: E402
+
+from simuladores.power_sim.snapshot_binario import (  # noqa: E402
+    JSON_PADRAO, caminho_snapshot, carregar_snapshot_binario, converter_json
+)
+
+
+def medir(funcao, repeticoes):
+    """Retorna (média, mínimo) em milissegundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return sum(tempos) / len(tempos), min(tempos)
+
+
+def main():
+    caminho_json = Path(sys.argv[1]) if len(sys.argv) > 1 else JSON_PADRAO
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    snapshot = caminho_snapshot(caminho_json)
+    if not snapshot.exists():
+        converter_json(caminho_json)
+
+    def carregar_json():
+        with open(caminho_json, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return pp.from_json_string(data["pandapower_net"])
+
+    def carregar_npz():
+        return carregar_snapshot_binario(snapshot)["net"]
+
+    print('⏱️ BENCHMARK DE CARGA DA REDE')
+    print('=' * 50)
+    print(f'JSON:     {caminho_json} ({caminho_json.stat().st_size / 1024:.1f} KB)')
+    print(f'Snapshot: {snapshot} ({snapshot.stat().st_size / 1024:.1f} KB)')
+    print(f'Repetições: {repeticoes}')
+
+    media_json, min_json = medir(carregar_json, repeticoes)
+    media_npz, min_npz = medir(carregar_npz, repeticoes)
+
+    print(f'JSON + from_json_string: média {media_json:7.2f} ms | mín {min_json:7.2f} ms')
+    print(f'Snapshot .npz:           média {media_npz:7.2f} ms | mín {min_npz:7.2f} ms')
+    print(f'Ganho: {media_json / media_npz:.1f}x')
+
+
+if __name__ == "__main__":
+    main()
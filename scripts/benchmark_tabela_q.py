@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Q-table Esparsa - ProtecAI Mini
+Compara o BasicRLAgent do coordenador (src/core) com o estado codificado por
+faixas e a Q-table esparsa contra a implementação anterior: vetor de 64
+posições montado em laço, arredondado e reduzido por
+``abs(hash(...)) % 64`` a uma tabela densa 64 x 32.
+
+- Convergência: recompensa média da política gulosa, avaliada a partir dos
+  ajustes iniciais a cada bloco de episódios (média de várias sementes)
+- Tempo: treinamento por episódio e custo de get_state
+- Colisões: estados distintos que caem na mesma linha da tabela
+
+Uso: python scripts/benchmark_tabela_q.py [episodios] [sementes]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from src.core.rl_protection_coordinator_clean import (  # noqa: E402
+    BasicRLAgent, ProtectionCoordinator
+)
+
+CENARIOS = [
+    {'bus': 4, 'fault_type': '3ph', 'severity': 0.9},
+    {'bus': 7, 'fault_type': '2ph', 'severity': 0.7},
+    {'bus': 14, 'fault_type': '1ph', 'severity': 0.5},
+    {'bus': 1, 'fault_type': '3ph', 'severity': 0.8},
+    {'bus': 9, 'fault_type': '2ph', 'severity': 0.6},
+]
+PASSOS_POR_EPISODIO = 4  # Voltas pelos cenários em cada episódio
+AVALIAR_A_CADA = 20
+
+
+class TabelaDensa:
+    """Q-table densa 64 x 32 com a interface da TabelaQEsparsa."""
+
+    def __init__(self, n_estados, n_acoes):
+        self.valores = np.zeros((n_estados, n_acoes))
+
+    def __getitem__(self, chave):
+        return self.valores[chave]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.valores.any(axis=1)))
+
+    def atualizar(self, chave, acao, delta):
+        self.valores[chave, acao] += delta
+
+
+class AgenteHash64(BasicRLAgent):
+    """Estado e Q-table da implementação anterior."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.state_size = 64
+        self.q_table = TabelaDensa(64, self.action_space_size)
+
+    def get_state(self, devices, zones=None):
+        state_vector = []
+        for device in devices.dispositivos[:8]:
+            state_vector.extend([device.pickup_current / 2.0, device.time_delay / 2.0,
+                                 1 if device.zone == 'Z1' else 0,
+                                 1 if device.status == 'active' else 0])
+        while len(state_vector) < 32:
+            state_vector.append(0)
+        state_vector.extend([0.5] * 32)
+        state_vector = state_vector[:self.state_size]
+        return abs(hash(tuple(np.round(state_vector, 3)))) % self.state_size
+
+
+def avaliar_gulosa(agente, voltas=10):
+    """Recompensa média da política gulosa a partir dos ajustes iniciais."""
+    coordenador = ProtectionCoordinator()
+    epsilon, episodios = agente.epsilon, agente.episodes
+    agente.epsilon, agente.episodes = 0.0, agente.min_exploration_episodes
+    total = 0.0
+    for _ in range(voltas):
+        for cenario in CENARIOS:
+            coordenador.apply_rl_action(int(agente.get_action(agente.get_state(coordenador.device_bank))))
+            resultado = coordenador.simulate_fault(cenario['bus'], cenario['fault_type'], cenario['severity'])
+            total += agente.calculate_reward(resultado)
+    agente.epsilon, agente.episodes = epsilon, episodios
+    return total / (voltas * len(CENARIOS))
+
+
+def treinar(classe, semente, episodios):
+    np.random.seed(semente)
+    agente = classe()
+    curva, tempo = [], 0.0
+    for episodio in range(episodios):
+        coordenador = ProtectionCoordinator()
+        inicio = time.perf_counter()
+        agente.train_episode(coordenador, CENARIOS * PASSOS_POR_EPISODIO)
+        tempo += time.perf_counter() - inicio
+        if (episodio + 1) % AVALIAR_A_CADA == 0:
+            curva.append(avaliar_gulosa(agente))
+    return np.array(curva), tempo / episodios, agente
+
+
+def custo_do_estado(agente, repeticoes=5000):
+    """Custo de get_state sobre ajustes que mudam a cada passo (µs)."""
+    coordenador = ProtectionCoordinator()
+    bancos = []
+    for acao in np.random.default_rng(0).integers(0, 32, 50):
+        coordenador.apply_rl_action(int(acao))
+        bancos.append(coordenador.device_bank)
+    inicio = time.perf_counter()
+    for k in range(repeticoes):
+        agente.get_state(bancos[k % len(bancos)])
+    return (time.perf_counter() - inicio) * 1e6 / repeticoes
+
+
+def colisoes(agente, amostras=2000):
+    """
+    Estados distintos do próprio agente (vetor arredondado na implementação
+    anterior, faixas na atual) que dividem a mesma linha da tabela.
+    """
+    coordenador = ProtectionCoordinator()
+    linhas = {}
+    for acao in np.random.default_rng(1).integers(0, 32, amostras):
+        coordenador.apply_rl_action(int(acao))
+        banco = coordenador.device_bank
+        if isinstance(agente, AgenteHash64):
+            estado = tuple(np.round(np.r_[banco.pickup, banco.atraso] / 2.0, 3))
+        else:
+            estado = tuple(agente.state_encoder.faixas_de(
+                np.column_stack([banco.pickup, banco.atraso, banco.ativo]).ravel()))
+        linhas.setdefault(agente.get_state(banco), set()).add(estado)
+    estados = sum(len(e) for e in linhas.values())
+    return estados, estados - len(linhas)
+
+
+def main():
+    episodios = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    sementes = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+
+    print('⏱️ BENCHMARK DA Q-TABLE ESPARSA')
+    print('=' * 50)
+
+    curvas = {}
+    for nome, classe in (('hash % 64 (densa)', AgenteHash64), ('faixas (esparsa)', BasicRLAgent)):
+        resultados = [treinar(classe, semente, episodios) for semente in range(sementes)]
+        curva = np.mean([r[0] for r in resultados], axis=0)
+        curvas[nome] = curva
+        tempo_episodio = np.mean([r[1] for r in resultados]) * 1000
+        agente = resultados[-1][2]
+        estados, colididos = colisoes(classe())
+
+        print(f'\n{nome}')
+        print(f'  Treinamento por episódio:     {tempo_episodio:8.2f} ms')
+        print(f'  get_state:                    {custo_do_estado(classe()):8.1f} µs')
+        print(f'  Linhas usadas na tabela:      {len(agente.q_table):8d}')
+        print(f'  Colisões: {colididos} de {estados} estados distintos dividem linha')
+        print('  Recompensa gulosa por bloco de '
+              f'{AVALIAR_A_CADA} episódios: {np.round(curva, 1).tolist()}')
+
+    # Convergência: primeiro bloco em que a média móvel (3 blocos) atinge a
+    # recompensa final da implementação anterior
+    referencia = np.mean(curvas['hash % 64 (densa)'][-5:])
+    print(f'\nReferência (média final da tabela densa): {referencia:.1f}')
+    for nome, curva in curvas.items():
+        movel = np.convolve(curva, np.ones(3) / 3, mode='valid')
+        atingiu = np.flatnonzero(movel >= referencia)
+        episodio = (atingiu[0] + 3) * AVALIAR_A_CADA if len(atingiu) else None
+        print(f'  {nome:20s} final={np.mean(curva[-5:]):6.1f}  '
+              f'atinge a referência em: {episodio if episodio else "não atingiu"} episódios')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Treinamento Vetorizado - ProtecAI Mini
+Compara o laço sequencial de optimize_protection_with_rl (uma réplica, uma
+ação, uma simulação por cenário e uma atualização da Q-table por passo) com
+o VectorizedTrainer de N réplicas em lock-step, em um único núcleo.
+
+- Vazão: passos de ambiente por segundo (réplica x passo, cada passo
+  avaliado contra todos os cenários)
+- Qualidade: recompensa da política gulosa, a partir dos ajustes iniciais,
+  depois do mesmo número de passos de ambiente
+
+Uso: python scripts/benchmark_treino_vetorizado.py [passos_de_ambiente]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from src.core.rl_protection_coordinator_clean import (  # noqa: E402
+    ProtectionCoordinator, VectorizedTrainer
+)
+
+CENARIOS = VectorizedTrainer.DEFAULT_SCENARIOS
+PASSOS_POR_EPISODIO = 5
+REPLICAS = (1, 16, 256, 4096)
+
+
+def passo_sequencial(coordenador):
+    """Um passo do laço de optimize_protection_with_rl (sem memo)."""
+    agente = coordenador.rl_agent
+    estado = agente.get_state(coordenador.device_bank)
+    acao = agente.get_action(estado)
+    coordenador.apply_rl_action(acao)
+    recompensa = np.mean([agente.calculate_reward(coordenador._run_fault_simulation(
+        c['bus'], c['fault_type'], c['severity'])) for c in CENARIOS])
+    agente.learn(estado, acao, recompensa, agente.get_state(coordenador.device_bank))
+
+
+def treinar_sequencial(passos):
+    coordenador = ProtectionCoordinator()
+    agente = coordenador.rl_agent
+    inicio = time.perf_counter()
+    for _ in range(passos // PASSOS_POR_EPISODIO):
+        agente.episodes += 1
+        for _ in range(PASSOS_POR_EPISODIO):
+            passo_sequencial(coordenador)
+        if agente.epsilon > agente.epsilon_min:
+            agente.epsilon *= agente.epsilon_decay
+    return passos / (time.perf_counter() - inicio), agente
+
+
+def treinar_vetorizado(passos, replicas):
+    coordenador = ProtectionCoordinator()
+    episodios = max(passos // (PASSOS_POR_EPISODIO * replicas), 1)
+    resultado = coordenador.train_rl_agent_vectorized(episodes=episodios, n_replicas=replicas,
+                                                      steps_per_episode=PASSOS_POR_EPISODIO)
+    return resultado['steps_per_second'], coordenador.rl_agent
+
+
+def avaliar_gulosa(agente, passos=PASSOS_POR_EPISODIO):
+    """Recompensa média (cenários x passos) da política gulosa a partir dos ajustes iniciais."""
+    coordenador = ProtectionCoordinator()
+    epsilon, episodios = agente.epsilon, agente.episodes
+    agente.epsilon, agente.episodes = 0.0, agente.min_exploration_episodes
+    total = 0.0
+    for _ in range(passos):
+        coordenador.apply_rl_action(int(agente.get_action(agente.get_state(coordenador.device_bank))))
+        total += np.mean([agente.calculate_reward(coordenador._run_fault_simulation(
+            c['bus'], c['fault_type'], c['severity'])) for c in CENARIOS])
+    agente.epsilon, agente.episodes = epsilon, episodios
+    return total / passos
+
+
+def main():
+    passos = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print('⏱️ BENCHMARK DO TREINAMENTO VETORIZADO')
+    print('=' * 50)
+    print(f'{len(CENARIOS)} cenários por passo, {passos} passos de ambiente por configuração')
+    print(f'{"Treinador":>18} {"Passos/s":>12} {"Ganho":>8} {"Gulosa":>8}')
+
+    np.random.seed(0)
+    referencia, agente = treinar_sequencial(min(passos, 5000))
+    print(f'{"sequencial":>18} {referencia:>12.0f} {1.0:>7.1f}x {avaliar_gulosa(agente):>8.1f}')
+
+    for replicas in REPLICAS:
+        np.random.seed(0)
+        vazao, agente = treinar_vetorizado(passos, replicas)
+        print(f'{f"lote N={replicas}":>18} {vazao:>12.0f} {vazao / referencia:>7.1f}x '
+              f'{avaliar_gulosa(agente):>8.1f}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos Ambientes Vetorizados do RL - ProtecAI Mini
+Passos de ambiente por segundo do RLProtectionOptimizer com um ambiente
+(DummyVecEnv, configuração anterior), N ambientes no mesmo processo
+(DummyVecEnv), N subprocessos (SubprocVecEnv) e N ambientes em lote
+(ProtectionCoordinationVectorEnv via VecEnvLote):
+
+- Rollout: só os passos dos ambientes, com ações aleatórias
+- Treinamento: PPO com o mesmo total_timesteps em cada configuração
+
+Requer stable-baselines3 (mesmas dependências do rl_protection_agent).
+
+Uso: python scripts/benchmark_vec_env.py [n_envs] [total_timesteps]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from simuladores.power_sim.rl_protection_agent import RLProtectionOptimizer  # noqa: E402
+
+JSON_PATH = Path("simuladores/power_sim/data/ieee14_protecao.json")
+RELES = {
+    "reles": [
+        {"id": "RELE_LINE_0", "element_type": "line", "element_id": 0, "tipo": "OVERCURRENT"},
+        {"id": "RELE_LINE_1", "element_type": "line", "element_id": 1, "tipo": "OVERCURRENT"},
+        {"id": "RELE_TRAFO_0", "element_type": "trafo", "element_id": 0, "tipo": "DIFFERENTIAL"},
+        {"id": "RELE_BUS_1", "element_type": "bus", "element_id": 1, "tipo": "VOLTAGE"},
+    ]
+}
+SEMENTE = 0
+
+
+def rollout(otimizador, n_envs, vec_env, passos=200):
+    """Passos de ambiente por segundo com ações aleatórias."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = otimizador.create_vec_environment(n_envs, vec_env, seed=SEMENTE)
+    rng = np.random.default_rng(SEMENTE)
+    forma = (env.num_envs,) + env.action_space.shape
+    env.reset()
+    inicio = time.perf_counter()
+    for _ in range(passos):
+        env.step(rng.random(forma, dtype=np.float32))
+    tempo = time.perf_counter() - inicio
+    env.close()
+    return passos * env.num_envs / tempo
+
+
+def treinamento(otimizador, n_envs, vec_env, total_timesteps):
+    """Passos por segundo do PPO.learn com o mesmo orçamento de timesteps."""
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        otimizador.train_agent("PPO", total_timesteps, n_envs=n_envs, vec_env=vec_env, seed=SEMENTE)
+    return total_timesteps / (time.perf_counter() - inicio)
+
+
+def main():
+    n_envs = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    total_timesteps = int(sys.argv[2]) if len(sys.argv) > 2 else 8192
+
+    print('⏱️ BENCHMARK DOS AMBIENTES VETORIZADOS (RL)')
+    print('=' * 50)
+    print(f'Núcleos disponíveis: {os.cpu_count()}, total_timesteps={total_timesteps}')
+    print(f'{"Configuração":>20} {"Rollout (passos/s)":>20} {"PPO (passos/s)":>16} {"Ganho PPO":>10}')
+
+    otimizador = RLProtectionOptimizer(JSON_PATH, RELES)
+    referencia = None
+    for vec_env, n in (("dummy", 1), ("dummy", n_envs), ("subproc", n_envs), ("batch", n_envs)):
+        passos_rollout = rollout(otimizador, n, vec_env)
+        passos_ppo = treinamento(otimizador, n, vec_env, total_timesteps)
+        referencia = referencia or passos_ppo
+        print(f'{f"{vec_env} x{n}":>20} {passos_rollout:>20.0f} {passos_ppo:>16.0f} '
+              f'{passos_ppo / referencia:>9.1f}x')
+
+
+if __name__ == "__main__":
+    main()
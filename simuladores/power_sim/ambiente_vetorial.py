@@ -0,0 +1,227 @@
+'''
+    ||> Ambiente RL vetorizado de coordenação de proteção para ProtecAI_Mini
+        - ProtectionCoordinationVectorEnv: API VectorEnv do gymnasium, com B
+          ambientes avançando juntos em operações NumPy sobre o lote
+        - Faltas da tabela pré-calculada (tabela_faltas.py): curto-circuito
+          por barra, tipo e faixa de impedância; o passo só indexa B linhas
+        - Recompensa de ProtectionCoordinationEnv._calculate_reward calculada
+          para o lote inteiro de uma vez
+        - Observação: fluxo de potência do caso base (a rede não muda entre
+          passos, só os settings) mais os settings de cada ambiente
+        - Constantes e regra de proteção primária compartilhadas com o
+          ambiente escalar (rl_protection_agent.py)
+'''
+
+from typing import Any, Dict, Optional, Sequence, Union
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.utils import seeding
+
+try:
+    from simuladores.power_sim.snapshot_binario import carregar_documento
+    from simuladores.power_sim.fluxo_reciclado import FluxoReciclado
+    from simuladores.power_sim.tabela_faltas import TIPOS_FALTA_RL, TabelaFaltas
+except ImportError:
+    from snapshot_binario import carregar_documento
+    from fluxo_reciclado import FluxoReciclado
+    from tabela_faltas import TIPOS_FALTA_RL, TabelaFaltas
+
+# Correntes e tensões sintéticas (eventos sem curto): multiplicadores da base
+CORRENTE_BASE_SINTETICA = 0.2   # 200A base
+TENSAO_BASE_SINTETICA = 1.0     # 100% tensão base
+MULTIPLICADORES_FALTA = {
+    # Corrente alta, tensão baixa
+    "3ph": {"current": 5.0, "voltage": 0.7},
+    "2ph": {"current": 3.0, "voltage": 0.8},    # Moderado
+    "1ph": {"current": 1.5, "voltage": 0.9},    # Leve
+    "overload": {"current": 1.3, "voltage": 0.95}  # Sobrecarga
+}
+
+# Limites realistas para desnormalização das ações
+LIMITES_PICKUP = (50, 500)    # A (corrente de pickup)
+LIMITES_TEMPO = (0.1, 2.0)    # s (tempo de atuação)
+
+
+def protecao_primaria(net, rele: Dict[str, Any], fault_bus) -> bool:
+    """Verifica se o relé é proteção primária para falha na barra."""
+    element_type = rele.get("element_type", "")
+    element_id = rele.get("element_id", 0)
+
+    if element_type == "bus" and element_id == fault_bus:
+        return True
+    elif element_type == "line":
+        # Verificar se a linha conecta a barra de falha
+        if element_id < len(net.line):
+            line = net.line.iloc[element_id]
+            if line["from_bus"] == fault_bus or line["to_bus"] == fault_bus:
+                return True
+    elif element_type == "trafo":
+        # Verificar se o transformador conecta a barra de falha
+        if element_id < len(net.trafo):
+            trafo = net.trafo.iloc[element_id]
+            if trafo["hv_bus"] == fault_bus or trafo["lv_bus"] == fault_bus:
+                return True
+
+    return False
+
+
+def faltas_sinteticas(rng: np.random.Generator, fault_type: str, n: int, n_lines: int, n_buses: int):
+    """Correntes (n, linhas) e tensões (n, barras) sintéticas com ruído."""
+    multiplier = MULTIPLICADORES_FALTA.get(fault_type, MULTIPLICADORES_FALTA["1ph"])
+    currents = rng.normal(CORRENTE_BASE_SINTETICA * multiplier["current"],
+                          CORRENTE_BASE_SINTETICA * 0.1, (n, n_lines))
+    voltages = rng.normal(TENSAO_BASE_SINTETICA * multiplier["voltage"], 0.02, (n, n_buses))
+    return np.clip(currents, 0.05, 10.0), np.clip(voltages, 0.5, 1.1)
+
+
+def observacao_base(net) -> np.ndarray:
+    """Correntes de linha (kA) e tensões (pu) do caso base: parte fixa da observação."""
+    try:
+        resultado = FluxoReciclado(max_iteration=50).resolver(net)
+        return np.concatenate([resultado.res_line['i_ka'].values, resultado.res_bus['vm_pu'].values])
+    except Exception:
+        return np.concatenate([np.zeros(len(net.line)), np.ones(len(net.bus))])
+
+
+class ProtectionCoordinationVectorEnv(gym.vector.VectorEnv):
+    """
+    ``num_envs`` cópias de ``ProtectionCoordinationEnv`` avançadas em lote.
+
+    Mesmos espaços, recompensa e observação do ambiente escalar, sem um
+    ambiente Python por cópia: cada ``step`` sorteia B tipos de falta, B
+    barras e B faixas de impedância, busca as correntes (B, linhas) e tensões
+    (B, barras) na ``TabelaFaltas`` e avalia as B recompensas com NumPy. Os
+    sorteios usam um gerador só para o lote (semeado por ``reset(seed=...)``),
+    então as sequências diferem das de B ambientes escalares com sementes
+    ``seed + i``.
+
+    Ambientes que terminam são reiniciados automaticamente; a observação e o
+    info finais ficam em ``infos["final_observation"]`` e
+    ``infos["final_info"]``, como nos VectorEnvs do gymnasium.
+    """
+
+    def __init__(self, net_json_path, protection_devices, num_envs: int, max_episodes: int = 1000,
+                 net=None):
+        if num_envs < 1:
+            raise ValueError("num_envs deve ser pelo menos 1")
+        self.net_json_path = net_json_path
+        self.protection_devices = protection_devices
+        self.max_episodes = max_episodes
+        self.net = carregar_documento(net_json_path)["net"] if net is None else net
+
+        reles = protection_devices.get("reles", [])
+        self.n_reles = len(reles)
+        n_lines, n_buses = len(self.net.line), len(self.net.bus)
+        super().__init__(
+            num_envs,
+            gym.spaces.Box(low=-np.inf, high=np.inf, shape=(n_lines + n_buses + self.n_reles * 2,),
+                           dtype=np.float32),
+            gym.spaces.Box(low=0.0, high=1.0, shape=(self.n_reles * 2,), dtype=np.float32)
+        )
+
+        # Correntes e tensões do caso base: a rede é a mesma em todos os passos
+        self._base = observacao_base(self.net)
+
+        # Faltas em todas as barras exceto a slack, buscadas na tabela pré-calculada
+        self.tabela_faltas = TabelaFaltas.carregar(net_json_path)
+        self.fault_buses = np.array([b for b in self.net.bus.index if b != 0])
+        self._posicoes = np.array([self.tabela_faltas.indice_barra(b) for b in self.fault_buses])
+
+        # Relés: linha cuja corrente cada um mede e proteção primária por barra em falta
+        elementos = np.array([rele.get("element_id", 0) for rele in reles], dtype=np.int64)
+        self._medidos = np.flatnonzero(elementos < n_lines)
+        self._elementos = elementos[self._medidos]
+        self._primario = np.array([[protecao_primaria(self.net, rele, b) for rele in reles]
+                                   for b in self.fault_buses], dtype=bool).reshape(-1, self.n_reles)
+
+        self.episode_count = np.zeros(num_envs, dtype=np.int64)
+        self._acoes = None
+
+    def _observacoes(self, settings: np.ndarray) -> np.ndarray:
+        base = np.broadcast_to(self._base, (len(settings), len(self._base)))
+        return np.concatenate([base, settings], axis=1).astype(np.float32)
+
+    def faltas(self, tipos: np.ndarray, barras: np.ndarray, faixas: np.ndarray):
+        """
+        Correntes (B, linhas) e tensões (B, barras) das faltas dadas por
+        índice em ``TIPOS_FALTA_RL``, em ``fault_buses`` e nas faixas de
+        impedância da tabela.
+        """
+        return self.tabela_faltas.lote(tipos, faixas, self._posicoes[barras])
+
+    def recompensas(self, actions: np.ndarray, currents: np.ndarray, voltages: np.ndarray,
+                    barras: np.ndarray) -> np.ndarray:
+        """``_calculate_reward`` do ambiente escalar para o lote (B,)."""
+        pickup = actions[:, ::2] * (LIMITES_PICKUP[1] - LIMITES_PICKUP[0]) + LIMITES_PICKUP[0]
+        time_delay = actions[:, 1::2] * (LIMITES_TEMPO[1] - LIMITES_TEMPO[0]) + LIMITES_TEMPO[0]
+
+        # Componente 1: Seletividade (atuação correta com penalidade de tempo,
+        # atuação fora da zona penalizada)
+        atua = np.zeros(pickup.shape, dtype=bool)
+        atua[:, self._medidos] = currents[:, self._elementos] * 1000 > pickup[:, self._medidos]
+        primario = self._primario[barras]
+        reward = np.where(atua & primario, 10.0 - time_delay * 2, 0.0).sum(axis=1)
+        reward -= 15.0 * np.count_nonzero(atua & ~primario, axis=1)
+
+        # Componente 2: Velocidade de atuação
+        avg_time = time_delay.mean(axis=1)
+        reward += np.where(avg_time < 0.5, 5.0, np.where(avg_time > 1.5, -5.0, 0.0))
+
+        # Componente 3: Estabilidade da rede
+        reward += (1.0 - voltages.std(axis=1)) * 3.0
+
+        # Componente 4: Penalidade por valores extremos
+        reward -= 10.0 * np.any((pickup < 60) | (pickup > 400), axis=1)
+        reward -= 10.0 * np.any((time_delay < 0.2) | (time_delay > 1.8), axis=1)
+        return reward
+
+    def reset_wait(self, seed: Optional[Union[int, Sequence[int]]] = None, options: Optional[dict] = None):
+        """Reinicia todos os ambientes com os settings medianos."""
+        if seed is not None:
+            seed = seed if np.isscalar(seed) else seed[0]
+            self._np_random, _ = seeding.np_random(int(seed))
+        self.episode_count += 1
+        observations = self._observacoes(np.full((self.num_envs, self.n_reles * 2), 0.5))
+        infos = {"episode": self.episode_count.copy(), "_episode": np.ones(self.num_envs, dtype=bool)}
+        return observations, infos
+
+    def step_async(self, actions):
+        self._acoes = np.asarray(actions, dtype=np.float64).reshape(self.num_envs, self.n_reles * 2)
+
+    def step_wait(self, **kwargs):
+        """Um passo de todos os ambientes: B faltas, B recompensas, B observações."""
+        actions, self._acoes = self._acoes, None
+        tipos = self.np_random.integers(0, len(TIPOS_FALTA_RL), self.num_envs)
+        barras = self.np_random.integers(0, len(self.fault_buses), self.num_envs)
+        faixas = self.np_random.integers(0, len(self.tabela_faltas.impedancias), self.num_envs)
+        currents, voltages = self.faltas(tipos, barras, faixas)
+
+        rewards = self.recompensas(actions, currents, voltages, barras)
+        observations = self._observacoes(actions)
+        terminated = self.episode_count >= self.max_episodes
+        truncated = np.zeros(self.num_envs, dtype=bool)
+
+        todos = np.ones(self.num_envs, dtype=bool)
+        infos = {
+            "fault_type": np.array(TIPOS_FALTA_RL, dtype=object)[tipos], "_fault_type": todos,
+            "fault_bus": self.fault_buses[barras], "_fault_bus": todos,
+            "fault_impedance_pu": self.tabela_faltas.impedancias[faixas], "_fault_impedance_pu": todos,
+            "avg_current": currents.mean(axis=1), "_avg_current": todos,
+            "min_voltage": voltages.min(axis=1), "_min_voltage": todos,
+            "reward": rewards, "_reward": todos,
+        }
+
+        # Reinício automático dos ambientes que terminaram
+        if terminated.any():
+            final_observation = np.full(self.num_envs, None, dtype=object)
+            final_info = np.full(self.num_envs, None, dtype=object)
+            for i in np.flatnonzero(terminated).tolist():
+                final_observation[i] = observations[i].copy()
+                final_info[i] = {chave: infos[chave][i] for chave in infos if not chave.startswith("_")}
+            infos.update(final_observation=final_observation, _final_observation=terminated.copy(),
+                         final_info=final_info, _final_info=terminated.copy())
+            self.episode_count[terminated] += 1
+            observations[terminated] = self._observacoes(np.full((1, self.n_reles * 2), 0.5))[0]
+
+        return observations, rewards, terminated, truncated, infos
@@ -0,0 +1,168 @@
+'''
+    ||> Reavaliação incremental de cenários de falta para ProtecAI_Mini
+        - Guarda a resposta de todos os dispositivos a todos os cenários
+          (opera e tempo, S x k), os problemas de coordenação, os
+          dispositivos operando e a recompensa por cenário
+        - Índice dispositivo -> cenários em que ele pode atuar, ordenados pela
+          corrente de falta: os cenários em que o dispositivo opera são um
+          sufixo achado por busca binária a partir do pickup
+        - Índice dispositivo -> parceiros de coordenação (todos os demais ou
+          os pares permitidos)
+        - Depois de um ajuste (apply_rl_action muda um dispositivo) só as
+          respostas, os pares e as recompensas dos cenários afetados são
+          recalculados: custo O(afetados) em vez de O(dispositivos x cenários)
+        - Usado por optimize_protection_with_rl dos coordenadores RL
+'''
+
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from simuladores.power_sim.avaliacao_paralela import METRICA_DTYPE
+    from simuladores.power_sim.banco_dispositivos import MARGEM_COORDENACAO, contar_problemas_lote
+except ImportError:
+    from avaliacao_paralela import METRICA_DTYPE
+    from banco_dispositivos import MARGEM_COORDENACAO, contar_problemas_lote
+
+# recompensa(linhas, opera (A, k), tempo (A, k), problemas (A,)) -> recompensas (A,)
+FuncaoRecompensa = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+
+class AvaliadorIncremental:
+    """
+    Métricas por cenário (``METRICA_DTYPE``) mantidas em sincronia com os
+    ajustes de um ``BancoDispositivos``.
+
+    ``atualizar()`` compara os ajustes do banco com os da última avaliação:
+    para cada dispositivo com pickup ou atraso diferente, recalcula só os
+    cenários em que ele opera (antes ou depois do ajuste) ou, se o ajuste só
+    muda quem opera, só os cenários cuja corrente fica entre o pickup antigo
+    e o novo. Mudanças de status, tipo ou zona reconstroem tudo; os pares
+    permitidos são fixos. Os valores são idênticos aos da simulação completa.
+    """
+
+    def __init__(self, banco, correntes_falta: Sequence[float], zonas_afetadas: Sequence[str],
+                 severidades: Sequence[float], corrente_base: float, recompensa: FuncaoRecompensa,
+                 permitidos: Optional[np.ndarray] = None, margem: float = MARGEM_COORDENACAO):
+        self.banco = banco
+        self.correntes = np.asarray(correntes_falta, dtype=float)
+        self.zonas = list(zonas_afetadas)
+        self.severidades = np.asarray(severidades, dtype=float)
+        self.corrente_base = corrente_base
+        self.recompensa = recompensa
+        self.permitidos = permitidos
+        self.margem = margem
+        self.cenarios_recalculados = 0
+        self.reconstruir()
+
+    def reconstruir(self):
+        """Avaliação completa de todos os cenários e reconstrução dos índices."""
+        banco = self.banco
+        self._pickup = banco.pickup.copy()
+        self._atraso = banco.atraso.copy()
+        # As máscaras do banco são refeitas a cada mudança de status, tipo ou zona
+        self._temporizado = banco.temporizado
+        self._por_corrente, self._tensao = banco.mascaras_cenarios(self.zonas, self.severidades)
+
+        opera, tempo = banco.respostas_lote(self._pickup[None], self._atraso[None], self.correntes,
+                                            self.zonas, self.severidades, self.corrente_base)
+        self.opera, self.tempo = opera[0], tempo[0]
+        self.problemas = contar_problemas_lote(self.opera, self.tempo, self.margem, self.permitidos)
+
+        # Dispositivo -> cenários em que pode operar por corrente, em ordem de corrente
+        self._cenarios_corrente: List[np.ndarray] = []
+        self._correntes_ordenadas: List[np.ndarray] = []
+        self._cenarios_tensao: List[np.ndarray] = []
+        for i in range(len(banco)):
+            cenarios = np.flatnonzero(self._por_corrente[:, i])
+            cenarios = cenarios[np.argsort(self.correntes[cenarios], kind="stable")]
+            self._cenarios_corrente.append(cenarios)
+            self._correntes_ordenadas.append(self.correntes[cenarios])
+            self._cenarios_tensao.append(np.flatnonzero(self._tensao[:, i]))
+
+        # Dispositivo -> parceiros de coordenação
+        k = len(banco)
+        if self.permitidos is None:
+            self._parceiros = [np.delete(np.arange(k), i) for i in range(k)]
+        else:
+            pares = np.asarray(self.permitidos, dtype=np.int64).reshape(-1, 2)
+            pares = np.unique(np.sort(pares[pares[:, 0] != pares[:, 1]], axis=1), axis=0)
+            self._parceiros = [np.concatenate([pares[pares[:, 0] == i, 1], pares[pares[:, 1] == i, 0]])
+                               for i in range(k)]
+
+        self._metricas = np.zeros(len(self.correntes), dtype=METRICA_DTYPE)
+        todas = np.arange(len(self.correntes))
+        self._metricas["coordination_issues"] = self.problemas
+        self._metricas["coordination_ok"] = self.problemas == 0
+        self._metricas["operating_devices"] = np.count_nonzero(self.opera, axis=1)
+        self._metricas["reward"] = self.recompensa(todas, self.opera, self.tempo, self.problemas)
+        self.cenarios_recalculados += len(todas)
+
+    def _afetados(self, i: int, pickup_novo: float, atraso_novo: float) -> np.ndarray:
+        antes = np.searchsorted(self._correntes_ordenadas[i], self._pickup[i] * self.corrente_base, side="right")
+        depois = np.searchsorted(self._correntes_ordenadas[i], pickup_novo * self.corrente_base, side="right")
+        cenarios = self._cenarios_corrente[i]
+        if atraso_novo != self._atraso[i] or (pickup_novo != self._pickup[i] and self._temporizado[i]):
+            # Todo cenário em que o dispositivo opera (antes ou depois) muda de tempo
+            return np.concatenate([cenarios[min(antes, depois):], self._cenarios_tensao[i]])
+        # Só o pickup mudou e o tempo não depende dele: só quem passa a operar ou deixa de operar
+        return cenarios[min(antes, depois):max(antes, depois)]
+
+    def _recalcular_dispositivo(self, i: int, linhas: np.ndarray, pickup: float, atraso: float):
+        """Nova resposta do dispositivo i nos cenários dados e correção dos pares dele."""
+        correntes = self.correntes[linhas]
+        opera = (self._por_corrente[linhas, i] & (pickup * self.corrente_base < correntes)) | self._tensao[linhas, i]
+        tempo = np.zeros(len(linhas))
+        np.divide(1.0, correntes / self.corrente_base - pickup, out=tempo, where=opera & self._temporizado[i])
+        tempo += 1.0
+        tempo *= atraso
+        tempo *= opera
+
+        parceiros = self._parceiros[i]
+        opera_parceiros = self.opera[np.ix_(linhas, parceiros)]
+        tempo_parceiros = self.tempo[np.ix_(linhas, parceiros)]
+
+        def violacoes(opera_i, tempo_i):
+            proximos = np.abs(tempo_i[:, None] - tempo_parceiros) < self.margem
+            return np.count_nonzero(opera_i[:, None] & opera_parceiros & proximos, axis=1)
+
+        self.problemas[linhas] += violacoes(opera, tempo) - violacoes(self.opera[linhas, i], self.tempo[linhas, i])
+        self._metricas["operating_devices"][linhas] += opera.astype(np.int64) - self.opera[linhas, i]
+        self.opera[linhas, i] = opera
+        self.tempo[linhas, i] = tempo
+
+    def atualizar(self) -> np.ndarray:
+        """
+        Sincroniza com os ajustes atuais do banco; retorna os cenários
+        recalculados.
+        """
+        banco = self.banco
+        if banco.temporizado is not self._temporizado:
+            self.reconstruir()
+            return np.arange(len(self.correntes))
+
+        alterados = np.flatnonzero((banco.pickup != self._pickup) | (banco.atraso != self._atraso))
+        partes = []
+        for i in alterados.tolist():
+            pickup, atraso = banco.pickup[i], banco.atraso[i]
+            linhas = np.unique(self._afetados(i, pickup, atraso))
+            if len(linhas):
+                self._recalcular_dispositivo(i, linhas, pickup, atraso)
+                partes.append(linhas)
+            self._pickup[i], self._atraso[i] = pickup, atraso
+
+        if not partes:
+            return np.empty(0, dtype=np.int64)
+        linhas = np.unique(np.concatenate(partes))
+        self._metricas["coordination_issues"][linhas] = self.problemas[linhas]
+        self._metricas["coordination_ok"][linhas] = self.problemas[linhas] == 0
+        self._metricas["reward"][linhas] = self.recompensa(linhas, self.opera[linhas], self.tempo[linhas],
+                                                          self.problemas[linhas])
+        self.cenarios_recalculados += len(linhas)
+        return linhas
+
+    def metricas(self) -> np.ndarray:
+        """Métricas atuais por cenário (``METRICA_DTYPE``), já sincronizadas com o banco."""
+        self.atualizar()
+        return self._metricas
@@ -0,0 +1,143 @@
+'''
+    ||> Avaliação de cenários de falta em paralelo para ProtecAI_Mini
+        - Biblioteca de cenários gerada de forma reprodutível (semente), para
+          centenas de faltas em vez dos 5 cenários fixos
+        - Cenários e ajustes em arrays compactos: a cada avaliação só viajam
+          os ajustes (3 x dispositivos: pickup, atraso, ativo) e o bloco de
+          cenários de cada processo
+        - Pool persistente de processos: cada processo monta o próprio
+          coordenador uma única vez (initializer) e só recebe ajustes
+        - Métricas por cenário na ordem dos cenários, calculadas pela mesma
+          função nos caminhos serial e paralelo: para a mesma semente os
+          resultados são idênticos
+        - Usado por optimize_protection_with_rl dos coordenadores RL
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+TIPOS_FALTA = ('3ph', '2ph', '1ph', '2ph_ground')
+
+CENARIO_DTYPE = np.dtype([
+    ("bus", "i8"),
+    ("fault_type", "U16"),
+    ("severity", "f8"),
+])
+
+METRICA_DTYPE = np.dtype([
+    ("reward", "f8"),
+    ("coordination_ok", "?"),
+    ("coordination_issues", "i8"),
+    ("operating_devices", "i8"),
+])
+
+
+def gerar_cenarios(n: int, semente: Optional[int] = None,
+                   barras: Sequence[int] = tuple(range(1, 15)),
+                   tipos: Sequence[str] = TIPOS_FALTA,
+                   severidade: Sequence[float] = (0.1, 1.0)) -> List[Dict[str, Any]]:
+    """
+    Biblioteca de ``n`` cenários de falta sorteados (barra, tipo, severidade),
+    no formato ``{'bus', 'fault_type', 'severity'}`` dos coordenadores.
+    A mesma semente gera sempre a mesma biblioteca.
+    """
+    rng = np.random.default_rng(semente)
+    barras_sorteadas = rng.choice(np.asarray(barras), n)
+    tipos_sorteados = rng.choice(np.asarray(tipos), n)
+    severidades = np.round(rng.uniform(severidade[0], severidade[1], n), 3)
+    return [{'bus': int(b), 'fault_type': str(t), 'severity': float(s)}
+            for b, t, s in zip(barras_sorteadas, tipos_sorteados, severidades)]
+
+
+def cenarios_compactos(cenarios: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Lista de cenários -> array estruturado (``CENARIO_DTYPE``)."""
+    return np.array([(c['bus'], c['fault_type'], c['severity']) for c in cenarios],
+                    dtype=CENARIO_DTYPE)
+
+
+def ajustes_do_banco(banco) -> np.ndarray:
+    """Ajustes de um BancoDispositivos em um array (3, dispositivos): pickup, atraso, ativo."""
+    return np.vstack([banco.pickup, banco.atraso, banco.ativo])
+
+
+def aplicar_ajustes(coordenador, ajustes: np.ndarray):
+    """Copia os ajustes de ``ajustes_do_banco`` para os dispositivos do coordenador."""
+    dispositivos = coordenador.protection_devices
+    if ajustes.shape != (3, len(dispositivos)):
+        raise ValueError(f"Ajustes {ajustes.shape} incompatíveis com {len(dispositivos)} dispositivos")
+    for dispositivo, pickup, atraso, ativo in zip(dispositivos, *ajustes.tolist()):
+        dispositivo.pickup_current = pickup
+        dispositivo.time_delay = atraso
+        if bool(ativo) != (dispositivo.status == 'active'):
+            dispositivo.status = 'active' if ativo else 'inactive'
+
+
+def metricas_cenarios(coordenador, cenarios: np.ndarray) -> np.ndarray:
+    """
+    Simula cada cenário com os ajustes atuais do coordenador e devolve, na
+    ordem dos cenários, a recompensa do agente, a coordenação, o número de
+    problemas e o número de dispositivos operando (``METRICA_DTYPE``).
+    """
+    metricas = np.zeros(len(cenarios), dtype=METRICA_DTYPE)
+    for k, (bus, fault_type, severity) in enumerate(cenarios.tolist()):
+        resultado = coordenador.simulate_fault(bus, fault_type, severity)
+        metricas[k] = (coordenador.rl_agent.calculate_reward(resultado),
+                       resultado.coordination_ok,
+                       len(resultado.coordination_issues),
+                       np.count_nonzero(resultado.device_responses['should_operate']))
+    return metricas
+
+
+# Estado de cada processo do pool
+_coordenador = None
+_pares = None
+
+
+def _iniciar_processo(fabrica: Callable[[], Any]):
+    global _coordenador
+    _coordenador = fabrica()
+
+
+def _avaliar_bloco(ajustes: np.ndarray, pares: Optional[np.ndarray],
+                   cenarios: np.ndarray) -> np.ndarray:
+    global _pares
+    aplicar_ajustes(_coordenador, ajustes)
+    # Trocar os pares limpa o memo do coordenador: só quando mudam de fato
+    mudou = (pares is None) != (_pares is None) or (pares is not None and not np.array_equal(pares, _pares))
+    if mudou:
+        _coordenador.coordination_pairs = pares
+        _pares = pares
+    return metricas_cenarios(_coordenador, cenarios)
+
+
+class AvaliadorParalelo:
+    """
+    Pool persistente de processos que avaliam blocos de cenários.
+
+    ``fabrica`` (a classe do coordenador, por exemplo) monta em cada processo
+    um coordenador com os mesmos dispositivos e impedâncias do principal;
+    a cada chamada os processos recebem só os ajustes atuais e os pares de
+    coordenação.
+    """
+
+    def __init__(self, fabrica: Callable[[], Any], workers: int):
+        if workers < 1:
+            raise ValueError("workers deve ser pelo menos 1")
+        self.workers = workers
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_processo,
+                                         initargs=(fabrica,))
+
+    def avaliar(self, ajustes: np.ndarray, cenarios: np.ndarray,
+                pares: Optional[np.ndarray] = None) -> np.ndarray:
+        """Métricas de todos os cenários (mesma ordem e valores de ``metricas_cenarios``)."""
+        if len(cenarios) == 0:
+            return np.zeros(0, dtype=METRICA_DTYPE)
+        blocos = np.array_split(cenarios, min(self.workers, len(cenarios)))
+        partes = self._pool.map(_avaliar_bloco, repeat(ajustes), repeat(pares), blocos)
+        return np.concatenate(list(partes))
+
+    def fechar(self):
+        self._pool.shutdown()
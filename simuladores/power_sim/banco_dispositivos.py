@@ -0,0 +1,377 @@
+'''
+    ||> Banco vetorizado de dispositivos de proteção para ProtecAI_Mini
+        - Pickup, atraso, zona, tipo e status dos dispositivos em arrays NumPy
+          (struct-of-arrays), sincronizados com os dataclasses ProtectionDevice
+        - Resposta de todos os dispositivos a uma falta com operações
+          vetoriais mascaradas, sem laço por dispositivo
+        - Resultados em arrays estruturados com os mesmos campos dos
+          dicionários da API; a conversão para dict acontece só na fronteira
+        - Versão dos ajustes (muda só quando pickup, atraso ou status mudam de
+          fato) e memo LRU de simulações indexado por ela
+        - Resposta em lote de N réplicas de ajustes x S cenários de falta e
+          contagem vetorizada dos problemas de coordenação (treinamento
+          vetorizado)
+        - Usado pelos coordenadores RL (simulate_fault)
+'''
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from simuladores.power_sim.coordenacao import contar_pares_na_janela, pares_na_janela
+except ImportError:
+    from coordenacao import contar_pares_na_janela, pares_na_janela
+
+# Códigos dos tipos ANSI tratados pela simulação simplificada
+TIPOS = ("87T", "50/51", "67", "27/59")
+TIPO_87T, TIPO_51, TIPO_67, TIPO_2759 = range(len(TIPOS))
+
+# Campos numéricos do dataclass espelhados no banco
+CAMPOS_NUMERICOS = {"pickup_current": "pickup", "time_delay": "atraso"}
+
+# Severidade a partir da qual os relés de tensão (27/59) atuam
+SEVERIDADE_TENSAO = 0.7
+
+# IEEE C37.112
+MARGEM_COORDENACAO = 0.3
+
+RESPOSTA_DTYPE = np.dtype([
+    ("device_id", "U32"),
+    ("type", "U8"),
+    ("should_operate", "?"),
+    ("operating_time", "f8"),
+    ("coordination_ok", "?"),
+])
+
+PROBLEMA_DTYPE = np.dtype([
+    ("device1", "U32"),
+    ("device2", "U32"),
+    ("margin", "f8"),
+    ("required", "f8"),
+])
+
+
+class DispositivoVinculado:
+    """
+    Mixin para o dataclass do dispositivo: toda atribuição é repassada ao
+    banco ao qual o dispositivo pertence, mantendo os arrays em sincronia
+    com ajustes feitos diretamente no objeto (RL, API, restauração de
+    configurações).
+
+    O vínculo (``_banco``) fica fora de cópias e pickles: copiar um
+    dispositivo (``copy``, ``deepcopy``, envio a um pool de processos) não
+    leva o banco inteiro junto, e a cópia é um dispositivo avulso. Copiar o
+    banco refaz o vínculo com as cópias dos seus dispositivos.
+    """
+
+    def __setattr__(self, nome, valor):
+        object.__setattr__(self, nome, valor)
+        banco = self.__dict__.get("_banco")
+        if banco is not None:
+            banco.notificar(self, nome)
+
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        estado.pop("_banco", None)
+        return estado
+
+
+class BancoDispositivos:
+    """
+    Struct-of-arrays dos dispositivos de proteção de um coordenador.
+
+    A ordem dos arrays é a da lista de dispositivos. Máscaras que só
+    dependem dos ajustes (tipo, zona, status) são pré-calculadas por zona,
+    então a resposta a uma falta custa um punhado de operações NumPy,
+    independente do número de dispositivos. ``versao`` muda quando um
+    ajuste muda a resposta dos dispositivos; atribuir o mesmo valor (ou um
+    status inativo por outro) não muda a versão.
+    """
+
+    def __init__(self, dispositivos: Sequence[Any]):
+        self.dispositivos = list(dispositivos)
+        self.versao = 0
+        for dispositivo in self.dispositivos:
+            object.__setattr__(dispositivo, "_banco", self)
+        self.sincronizar()
+
+    def __len__(self) -> int:
+        return len(self.dispositivos)
+
+    def __setstate__(self, estado):
+        # Cópia/pickle do banco: os dispositivos copiados chegam sem vínculo e
+        # _posicao ainda tem os id() dos originais
+        self.__dict__.update(estado)
+        for dispositivo in self.dispositivos:
+            object.__setattr__(dispositivo, "_banco", self)
+        self._posicao = {id(d): i for i, d in enumerate(self.dispositivos)}
+
+    def sincronizar(self):
+        """Recarrega todos os arrays a partir dos dataclasses."""
+        dispositivos = self.dispositivos
+        self._posicao = {id(d): i for i, d in enumerate(dispositivos)}
+        self._indice_id = {d.id: i for i, d in enumerate(dispositivos)}
+        self.ids = np.array([d.id for d in dispositivos], dtype=RESPOSTA_DTYPE["device_id"])
+        self.tipos = np.array([d.type for d in dispositivos], dtype=RESPOSTA_DTYPE["type"])
+        self.codigo_tipo = np.array([TIPOS.index(d.type) if d.type in TIPOS else -1
+                                     for d in dispositivos], dtype=np.int8)
+        self.nomes_zona = sorted({d.zone for d in dispositivos})
+        self.codigo_zona = np.array([self.nomes_zona.index(d.zone) for d in dispositivos],
+                                    dtype=np.int8)
+        self.pickup = np.array([d.pickup_current for d in dispositivos], dtype=float)
+        self.atraso = np.array([d.time_delay for d in dispositivos], dtype=float)
+        self.ativo = np.array([d.status == 'active' for d in dispositivos], dtype=bool)
+
+        self._modelo = np.zeros(len(dispositivos), dtype=RESPOSTA_DTYPE)
+        self._modelo["device_id"] = self.ids
+        self._modelo["type"] = self.tipos
+        self._modelo["coordination_ok"] = True
+        self._mascaras: Dict[Tuple, np.ndarray] = {}
+        self._recalcular_mascaras()
+
+    def _recalcular_mascaras(self):
+        tipo = self.codigo_tipo
+        self._temporizado = (tipo == TIPO_51) & self.ativo
+        self._tensao = (tipo == TIPO_2759) & self.ativo
+        da_zona = ((tipo == TIPO_87T) | (tipo == TIPO_67)) & self.ativo
+        # Sobrecorrente (87T/67 só na zona da falta, 50/51 em qualquer zona)
+        self._por_corrente = {zona: (da_zona & (self.codigo_zona == codigo)) | self._temporizado
+                              for codigo, zona in enumerate(self.nomes_zona)}
+        self._sem_zona = self._temporizado
+        self.versao += 1
+
+    def notificar(self, dispositivo: Any, campo: str):
+        """Chamado pelo dataclass a cada atribuição (ver ``DispositivoVinculado``)."""
+        i = self._posicao.get(id(dispositivo))
+        if i is None:
+            return
+        if campo in CAMPOS_NUMERICOS:
+            array = getattr(self, CAMPOS_NUMERICOS[campo])
+            if array[i] != getattr(dispositivo, campo):
+                array[i] = getattr(dispositivo, campo)
+                self.versao += 1
+        elif campo == "status":
+            if self.ativo[i] != (dispositivo.status == 'active'):
+                self.ativo[i] = dispositivo.status == 'active'
+                self._recalcular_mascaras()
+        elif campo in ("id", "type", "zone"):
+            self.sincronizar()
+
+    def indices(self, ids: Iterable[str]) -> np.ndarray:
+        """Posições dos dispositivos com os ids dados (-1 para ids inexistentes)."""
+        chave = ("indices", tuple(ids))
+        if chave not in self._mascaras:
+            self._mascaras[chave] = np.array([self._indice_id.get(i, -1) for i in chave[1]],
+                                             dtype=np.int64)
+        return self._mascaras[chave]
+
+    def mascara_tipo(self, *tipos: str) -> np.ndarray:
+        """Dispositivos de qualquer um dos tipos dados."""
+        chave = ("tipo", tipos)
+        if chave not in self._mascaras:
+            self._mascaras[chave] = np.isin(self.tipos, tipos)
+        return self._mascaras[chave]
+
+    def mascara_id_contem(self, texto: str) -> np.ndarray:
+        """Dispositivos cujo id contém o texto dado."""
+        chave = ("id", texto)
+        if chave not in self._mascaras:
+            self._mascaras[chave] = np.char.find(self.ids, texto) >= 0
+        return self._mascaras[chave]
+
+    def respostas(self, corrente_falta: float, zona_afetada: str, severidade: float,
+                  corrente_base: float) -> np.ndarray:
+        """
+        Resposta de todos os dispositivos a uma falta, em um array estruturado
+        (``RESPOSTA_DTYPE``) na ordem do banco.
+
+        - 87T e 67: operam se a falta for na sua zona e acima do pickup
+        - 50/51: operam acima do pickup, com curva ``t = atraso (1 + 1/(I - pickup))``
+        - 27/59: operam em faltas severas (severidade > 0.7)
+        - tempo de operação 0 para quem não opera
+        """
+        corrente_pu = corrente_falta / corrente_base
+        opera = self.pickup * corrente_base < corrente_falta
+        opera &= self._por_corrente.get(zona_afetada, self._sem_zona)
+        if severidade > SEVERIDADE_TENSAO:
+            opera |= self._tensao
+
+        resposta = self._modelo.copy()
+        resposta["should_operate"] = opera
+        tempo = resposta["operating_time"]
+        curva = opera & self._temporizado
+        np.divide(1.0, corrente_pu - self.pickup, out=tempo, where=curva)
+        tempo += 1.0
+        tempo *= self.atraso
+        tempo *= opera
+        return resposta
+
+    @property
+    def temporizado(self) -> np.ndarray:
+        """Dispositivos ativos com curva de tempo inverso (50/51)."""
+        return self._temporizado
+
+    def mascaras_cenarios(self, zonas_afetadas: Sequence[str], severidades: Sequence[float]
+                          ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Máscaras (S, k) de quem pode operar em cada cenário: por corrente
+        (acima do pickup) e por tensão (independente dos ajustes).
+        """
+        por_corrente = np.array([self._por_corrente.get(z, self._sem_zona) for z in zonas_afetadas],
+                                dtype=bool).reshape(len(zonas_afetadas), len(self))
+        tensao = (np.asarray(severidades, dtype=float) > SEVERIDADE_TENSAO)[:, None] & self._tensao
+        return por_corrente, tensao
+
+    def respostas_lote(self, pickup: np.ndarray, atraso: np.ndarray,
+                       correntes_falta: Sequence[float], zonas_afetadas: Sequence[str],
+                       severidades: Sequence[float], corrente_base: float
+                       ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Resposta de N réplicas de ajustes a S faltas, com as mesmas regras de
+        ``respostas``. Tipos, zonas e status são os do banco; só pickup e
+        atraso variam por réplica.
+
+        Args:
+            pickup, atraso: Arrays (N, k) com os ajustes de cada réplica
+            correntes_falta, zonas_afetadas, severidades: Um valor por cenário (S)
+            corrente_base: Corrente base (A)
+
+        Returns:
+            (opera, tempo): arrays (N, S, k); tempo 0 para quem não opera
+        """
+        pickup = np.asarray(pickup, dtype=float)[:, None, :]
+        atraso = np.asarray(atraso, dtype=float)[:, None, :]
+        correntes = np.asarray(correntes_falta, dtype=float)[:, None]
+        mascara, tensao = self.mascaras_cenarios(zonas_afetadas, severidades)
+
+        opera = (pickup * corrente_base < correntes) & mascara
+        opera |= tensao
+        curva = opera & self._temporizado
+        tempo = np.zeros(opera.shape)
+        np.divide(1.0, correntes / corrente_base - pickup, out=tempo, where=curva)
+        tempo += 1.0
+        tempo *= atraso
+        tempo *= opera
+        return opera, tempo
+
+
+class MemoSimulacoes:
+    """
+    Cache LRU de resultados de simulação de falta.
+
+    A chave deve incluir a versão dos ajustes (``BancoDispositivos.versao``),
+    de modo que avaliar de novo cenários com os mesmos ajustes não refaz a
+    simulação e qualquer ajuste efetivo torna as entradas antigas
+    inalcançáveis (saem por LRU). Arrays do resultado ficam somente leitura,
+    já que a mesma instância é devolvida a todos os chamadores.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entradas: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def obter(self, chave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Resultado em cache para a chave, ou ``calcular()`` guardado nela."""
+        with self._lock:
+            resultado = self._entradas.get(chave)
+            if resultado is not None:
+                self._entradas.move_to_end(chave)
+                self.hits += 1
+                return resultado
+            self.misses += 1
+
+        resultado = calcular()
+        for valor in getattr(resultado, "__dict__", {}).values():
+            if isinstance(valor, np.ndarray):
+                valor.flags.writeable = False
+
+        with self._lock:
+            self._entradas[chave] = resultado
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.maxsize:
+                self._entradas.popitem(last=False)
+                self.evictions += 1
+        return resultado
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores do cache para monitoramento."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entradas),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def problemas_coordenacao(respostas: np.ndarray, margem: float = MARGEM_COORDENACAO,
+                          permitidos: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Pares de dispositivos que operam com diferença de tempo menor que a
+    margem, em um array estruturado (``PROBLEMA_DTYPE``). A ordem dos pares
+    segue a dos dispositivos (i < j), como na comparação par a par original.
+
+    Os tempos são ordenados e varridos com uma janela da largura da margem
+    (``pares_na_janela``), sem formar a matriz de todos os pares.
+    ``permitidos`` (pares de índices do banco) restringe a verificação,
+    por exemplo, a pares montante/jusante.
+    """
+    operando = np.flatnonzero(respostas["should_operate"])
+    if len(operando) < 2:
+        return np.empty(0, dtype=PROBLEMA_DTYPE)
+    i, j, diferenca = pares_na_janela(respostas["operating_time"][operando], margem)
+    i, j = operando[i], operando[j]
+    if permitidos is not None:
+        chaves = np.asarray(permitidos, dtype=np.int64).reshape(-1, 2)
+        n = len(respostas)
+        manter = np.isin(i * n + j, chaves.min(axis=1) * n + chaves.max(axis=1))
+        i, j, diferenca = i[manter], j[manter], diferenca[manter]
+
+    problemas = np.empty(len(i), dtype=PROBLEMA_DTYPE)
+    ids = respostas["device_id"]
+    problemas["device1"] = ids[i]
+    problemas["device2"] = ids[j]
+    problemas["margin"] = diferenca
+    problemas["required"] = margem
+    return problemas
+
+
+def contar_problemas_lote(opera: np.ndarray, tempo: np.ndarray,
+                          margem: float = MARGEM_COORDENACAO,
+                          permitidos: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Número de problemas de coordenação (``len(problemas_coordenacao(...))``)
+    para cada linha de um lote ``(..., k)`` de respostas.
+
+    Sem ``permitidos`` os tempos de cada linha são ordenados e varridos por
+    deslocamento (``contar_pares_na_janela``); com pares permitidos, só as
+    diferenças desses pares são comparadas.
+    """
+    if permitidos is None:
+        return contar_pares_na_janela(np.where(opera, tempo, np.nan), margem)
+    pares = np.asarray(permitidos, dtype=np.int64).reshape(-1, 2)
+    pares = np.unique(np.sort(pares, axis=1), axis=0)
+    pares = pares[pares[:, 0] != pares[:, 1]]
+    i, j = pares[:, 0], pares[:, 1]
+    violacao = opera[..., i] & opera[..., j] & (np.abs(tempo[..., i] - tempo[..., j]) < margem)
+    return np.count_nonzero(violacao, axis=-1)
+
+
+def registros_para_dicts(registros: np.ndarray) -> List[Dict[str, Any]]:
+    """Array estruturado -> lista de dicionários com tipos Python (formato da API)."""
+    nomes = registros.dtype.names
+    return [dict(zip(nomes, linha)) for linha in registros.tolist()]
@@ -0,0 +1,181 @@
+'''
+    ||> Verificação de coordenação por ordenação e varredura para ProtecAI_Mini
+        - Pares de dispositivos com tempos (ou pickups) mais próximos que a
+          margem exigida, sem comparar todos os pares: ordena os valores e
+          varre uma janela da largura da margem
+        - Custo O(k log k + p) para k dispositivos e p pares em violação,
+          cada par emitido uma única vez (i < j)
+        - Contagem de pares em violação para lotes de ajustes (linhas
+          ordenadas, diferenças por deslocamento), usada no treinamento
+          vetorizado
+        - Restrição opcional a pares montante/jusante tirados da topologia
+          da rede pandapower
+        - Usado por simulate_fault (banco_dispositivos) e pela análise de
+          coordenação da API
+'''
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse import csgraph
+
+# Barras terminais por tipo de elemento protegido
+BARRAS_ELEMENTO = {"line": ("from_bus", "to_bus"), "trafo": ("hv_bus", "lv_bus")}
+
+
+def _janela_ordenada(valores: np.ndarray, janela: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pares (a, b), a < b, de posições de um vetor ordenado com
+    ``valores[b] - valores[a] < janela``.
+    """
+    n = len(valores)
+    # Janela levemente alargada na busca; o corte exato é feito na diferença
+    folga = janela * (1 + 1e-9) + 1e-12 * np.abs(valores)
+    fim = np.searchsorted(valores, valores + folga, side="right")
+    contagem = fim - np.arange(n) - 1
+    a = np.repeat(np.arange(n), contagem)
+    deslocamento = np.arange(len(a)) - np.repeat(np.cumsum(contagem) - contagem, contagem)
+    b = a + 1 + deslocamento
+    dentro = valores[b] - valores[a] < janela
+    return a[dentro], b[dentro]
+
+
+def _codigos(i: np.ndarray, j: np.ndarray, n: int) -> np.ndarray:
+    return np.minimum(i, j).astype(np.int64) * n + np.maximum(i, j)
+
+
+def pares_na_janela(valores: Sequence[float], janela: float,
+                    grupos: Optional[Sequence] = None,
+                    permitidos: Optional[np.ndarray] = None
+                    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pares (i, j), i < j, de índices com ``|valores[i] - valores[j]| < janela``.
+
+    Args:
+        valores: Tempos de operação, pickups etc., um por dispositivo
+        janela: Margem exigida (diferenças menores são violações)
+        grupos: Rótulo por dispositivo; só compara dispositivos do mesmo grupo
+        permitidos: Array (p, 2) de pares de índices a considerar (por exemplo
+            montante/jusante, ver ``pares_montante_jusante``); None = todos
+
+    Returns:
+        (i, j, diferença) em ordem lexicográfica de (i, j), a mesma da
+        comparação par a par ``for i: for j > i``.
+    """
+    valores = np.asarray(valores, dtype=float)
+    n = len(valores)
+    if grupos is None:
+        ordem = np.argsort(valores, kind="stable")
+        a, b = _janela_ordenada(valores[ordem], janela)
+    else:
+        rotulos = np.unique(np.asarray(grupos), return_inverse=True)[1]
+        ordem = np.lexsort((valores, rotulos))
+        inicios = np.flatnonzero(np.diff(rotulos[ordem], prepend=-1, append=-1))
+        partes_a, partes_b = [], []
+        for inicio, fim in zip(inicios[:-1], inicios[1:]):
+            a, b = _janela_ordenada(valores[ordem[inicio:fim]], janela)
+            partes_a.append(a + inicio)
+            partes_b.append(b + inicio)
+        a = np.concatenate(partes_a) if partes_a else np.empty(0, dtype=np.intp)
+        b = np.concatenate(partes_b) if partes_b else np.empty(0, dtype=np.intp)
+
+    i, j = np.minimum(ordem[a], ordem[b]), np.maximum(ordem[a], ordem[b])
+    if permitidos is not None:
+        permitidos = np.asarray(permitidos, dtype=np.int64).reshape(-1, 2)
+        manter = np.isin(_codigos(i, j, n), _codigos(permitidos[:, 0], permitidos[:, 1], n))
+        i, j = i[manter], j[manter]
+
+    sequencia = np.argsort(_codigos(i, j, n), kind="stable")
+    i, j = i[sequencia], j[sequencia]
+    return i, j, np.abs(valores[i] - valores[j])
+
+
+def contar_pares_na_janela(valores: np.ndarray, janela: float) -> np.ndarray:
+    """
+    Número de pares com diferença menor que a janela em cada linha de um
+    lote ``(..., k)`` (mesma contagem de ``pares_na_janela`` linha a linha).
+
+    Valores NaN (dispositivos que não operam) ficam fora dos pares. Cada
+    linha é ordenada e as diferenças são tomadas por deslocamento d = 1, 2,
+    ...; como a linha está ordenada, o laço para no primeiro deslocamento
+    sem nenhum par dentro da janela em todo o lote.
+    """
+    ordenados = np.sort(np.asarray(valores, dtype=float), axis=-1)  # NaN vão para o fim
+    contagem = np.zeros(ordenados.shape[:-1], dtype=np.int64)
+    with np.errstate(invalid="ignore"):
+        for d in range(1, ordenados.shape[-1]):
+            dentro = ordenados[..., d:] - ordenados[..., :-d] < janela
+            if not dentro.any():
+                break
+            contagem += np.count_nonzero(dentro, axis=-1)
+    return contagem
+
+
+def _profundidade_barras(net) -> Dict[int, float]:
+    """Distância, em número de ramos, de cada barra até a fonte mais próxima."""
+    barras = np.asarray(net.bus.index)
+    posicao = {b: k for k, b in enumerate(barras)}
+    de, para = [], []
+    for elemento, (col_de, col_para) in BARRAS_ELEMENTO.items():
+        tabela = net[elemento]
+        ativos = tabela[tabela["in_service"]]
+        de.extend(posicao[b] for b in ativos[col_de])
+        para.extend(posicao[b] for b in ativos[col_para])
+    grafo = coo_matrix((np.ones(len(de)), (de, para)), shape=(len(barras),) * 2).tocsr()
+
+    fontes = [posicao[b] for b in net.ext_grid[net.ext_grid["in_service"]]["bus"]]
+    if not fontes:
+        return {b: np.inf for b in barras}
+    distancia = csgraph.shortest_path(grafo, directed=False, unweighted=True,
+                                      indices=fontes, method="D")
+    return dict(zip(barras, np.atleast_2d(distancia).min(axis=0)))
+
+
+def pares_montante_jusante(net, elementos: Sequence[Tuple[str, int]]) -> np.ndarray:
+    """
+    Pares de dispositivos em série, pela topologia da rede.
+
+    Cada dispositivo protege um elemento (``("line", 3)``, ``("trafo", 0)``,
+    ``("bus", 5)``). A partir da profundidade das barras (ramos até a fonte),
+    cada ramo tem uma barra montante e uma jusante; dois dispositivos estão
+    em série quando protegem o mesmo elemento (principal/retaguarda) ou
+    quando o elemento de um começa na barra onde o do outro termina.
+
+    Returns:
+        Array (p, 2) de índices (i < j) na ordem de ``elementos``.
+    """
+    profundidade = _profundidade_barras(net)
+    montante: List[Optional[int]] = []
+    jusante: List[Optional[int]] = []
+    for elemento, idx in elementos:
+        if elemento in BARRAS_ELEMENTO and idx in net[elemento].index:
+            col_de, col_para = BARRAS_ELEMENTO[elemento]
+            b1, b2 = net[elemento].at[idx, col_de], net[elemento].at[idx, col_para]
+            if profundidade.get(b2, np.inf) < profundidade.get(b1, np.inf):
+                b1, b2 = b2, b1
+        elif elemento == "bus" and idx in net.bus.index:
+            b1 = b2 = idx
+        else:
+            b1 = b2 = None
+        montante.append(b1)
+        jusante.append(b2)
+
+    por_elemento: Dict[Tuple, List[int]] = {}
+    por_montante: Dict[int, List[int]] = {}
+    for k, chave in enumerate(elementos):
+        por_elemento.setdefault(tuple(chave), []).append(k)
+        if montante[k] is not None:
+            por_montante.setdefault(montante[k], []).append(k)
+
+    pares = []
+    for grupo in por_elemento.values():
+        pares.extend((a, b) for n, a in enumerate(grupo) for b in grupo[n + 1:])
+    for k, barra in enumerate(jusante):
+        if barra is not None:
+            pares.extend((k, outro) for outro in por_montante.get(barra, ()) if outro != k)
+
+    if not pares:
+        return np.empty((0, 2), dtype=np.int64)
+    pares = np.sort(np.asarray(pares, dtype=np.int64), axis=1)
+    return np.unique(pares, axis=0)
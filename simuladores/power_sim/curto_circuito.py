@@ -0,0 +1,517 @@
+'''
+    ||> Motor vetorizado de curto-circuito (Zbus) para ProtecAI_Mini
+        - Monta a matriz de admitâncias (Ybus) a partir da rede pandapower real,
+          acrescenta a impedância de curto das fontes e inverte uma única vez
+        - Correntes de falta trifásica de todas as barras em uma operação NumPy
+        - Contribuições de todos os ramos e tensões remanescentes para falta em
+          qualquer barra, também em operações matriciais
+        - Zbus mantida por atualizações de posto 2 (Woodbury) quando um ramo é
+          manobrado ou alterado, com verificação de deriva numérica e
+          refatoração automática
+        - Usado pelos coordenadores RL, pelo ambiente RL e pelo router /simulation
+'''
+
+import copy
+import functools
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+from pandapower.pypower.idx_brch import BR_STATUS
+from pandapower.pypower.makeYbus import branch_vectors
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+try:
+    from simuladores.power_sim.snapshot_binario import JSON_PADRAO, carregar_documento
+except ImportError:
+    from snapshot_binario import JSON_PADRAO, carregar_documento
+
+# Fonte sem dados de curto (ext_grid sem s_sc_max_mva): rede "forte" de 1000 MVA
+S_SC_FONTE_PADRAO_MVA = 1000.0
+RX_FONTE_PADRAO = 0.1
+
+# Barras terminais de cada tipo de ramo (lado "de" primeiro, como no ppc)
+BARRAS_RAMO = {"line": ("from_bus", "to_bus"), "trafo": ("hv_bus", "lv_bus")}
+
+# Parâmetros de linha que ``modificar_linha`` aceita
+PARAMETROS_LINHA = ("length_km", "r_ohm_per_km", "x_ohm_per_km", "c_nf_per_km",
+                    "g_us_per_km", "parallel")
+
+# Acima disso a matriz de Woodbury é tratada como singular (ilhamento)
+CONDICIONAMENTO_MAXIMO = 1e12
+
+Ramo = Tuple[str, int]
+
+
+@dataclass(frozen=True)
+class VarreduraCurto:
+    """
+    Resultado de uma varredura de faltas trifásicas em todas as barras.
+
+    As colunas das matrizes correspondem à barra em falta, na ordem de
+    ``barras``; as linhas de ``contribuicoes_ka`` seguem ``ramos``.
+    """
+    barras: np.ndarray              # índices pandapower das barras
+    ikss_pu: np.ndarray             # (n,) corrente de falta em pu
+    ikss_ka: np.ndarray             # (n,) corrente de falta em kA
+    tensoes_pu: np.ndarray          # (n, n) |V| de cada barra com falta na barra da coluna
+    contribuicoes_ka: np.ndarray    # (n_ramos, n) corrente no ramo (lado "de") por falta
+    ramos: List[Ramo]
+
+    def contribuicoes(self, barra: int, elemento: str = "line") -> pd.Series:
+        """Corrente (kA) em cada ramo do tipo dado para falta na barra, por índice do elemento."""
+        col = int(np.flatnonzero(self.barras == barra)[0])
+        linhas = [i for i, (tipo, _) in enumerate(self.ramos) if tipo == elemento]
+        return pd.Series(self.contribuicoes_ka[linhas, col],
+                         index=[self.ramos[i][1] for i in linhas], dtype=float)
+
+    def falta(self, barra: int) -> Dict[str, Any]:
+        """Resumo da falta em uma barra (índice pandapower)."""
+        col = int(np.flatnonzero(self.barras == barra)[0])
+        return {
+            "bus": int(barra),
+            "ikss_ka": float(self.ikss_ka[col]),
+            "ikss_pu": float(self.ikss_pu[col]),
+            "bus_voltages_pu": {int(b): float(v) for b, v in zip(self.barras, self.tensoes_pu[:, col])},
+            "branch_contributions_ka": [
+                {"element": elemento, "element_id": idx, "i_ka": float(i)}
+                for (elemento, idx), i in zip(self.ramos, self.contribuicoes_ka[:, col])
+            ]
+        }
+
+
+def bloco_linha(linha: Dict[str, float], vn_kv: float, base_mva: float, f_hz: float) -> np.ndarray:
+    """
+    Bloco 2x2 de admitâncias (pu) do modelo pi de uma linha, com a mesma
+    base do pandapower (tensão da barra "de"): ``[[Yff, Yft], [Ytf, Ytt]]``.
+    """
+    base_r = vn_kv ** 2 / base_mva
+    comprimento, paralelas = linha["length_km"], linha["parallel"]
+    z = (linha["r_ohm_per_km"] + 1j * linha["x_ohm_per_km"]) * comprimento / base_r / paralelas
+    y_shunt = (linha["g_us_per_km"] * 1e-6
+               + 1j * 2 * np.pi * f_hz * linha["c_nf_per_km"] * 1e-9) * base_r * comprimento * paralelas
+    y_serie = 1 / z
+    return np.array([[y_serie + y_shunt / 2, -y_serie],
+                     [-y_serie, y_serie + y_shunt / 2]], dtype=complex)
+
+
+class ZbusIncremental:
+    """
+    Zbus (inversa densa da Ybus) mantida por atualizações de posto baixo.
+
+    Manobrar ou alterar um ramo entre as barras f e t soma à Ybus um bloco
+    ``U ΔY Uᵀ`` com ``U = [e_f, e_t]``. Pela identidade de Woodbury,
+
+        Z' = Z - Z U (I + ΔY Uᵀ Z U)⁻¹ ΔY Uᵀ Z
+
+    que custa O(n²) em vez da inversão O(n³). Cada atualização acumula erro
+    de arredondamento: depois de cada uma, o resíduo ``|Y Z - I|`` é medido
+    em algumas colunas sorteadas e a Zbus é refatorada quando passa de
+    ``tol_deriva`` ou quando ``max_atualizacoes`` seguidas forem aplicadas.
+    """
+
+    def __init__(self, ybus: np.ndarray, tol_deriva: float = 1e-8, max_atualizacoes: int = 64,
+                 colunas_sonda: int = 4, semente: int = 0):
+        self.ybus = np.array(ybus, dtype=complex)
+        self.tol_deriva = tol_deriva
+        self.max_atualizacoes = max_atualizacoes
+        self.colunas_sonda = colunas_sonda
+        self._rng = np.random.default_rng(semente)
+        self.refatoracoes = 0
+        self.total_atualizacoes = 0
+        self.deriva_max = 0.0
+        self.refatorar()
+
+    def refatorar(self):
+        """Inverte a Ybus atual do zero, descartando o erro acumulado."""
+        self.z = np.linalg.inv(self.ybus)
+        self.refatoracoes += 1
+        self.atualizacoes = 0
+        self.deriva = 0.0
+
+    def _correcao(self, indices: np.ndarray, delta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Fatores ``Z U`` e ``(I + ΔY Uᵀ Z U)⁻¹ ΔY Uᵀ Z`` da identidade de Woodbury."""
+        s = np.eye(len(indices)) + delta @ self.z[np.ix_(indices, indices)]
+        if np.linalg.cond(s) > CONDICIONAMENTO_MAXIMO:
+            raise np.linalg.LinAlgError("Atualização deixa a Ybus singular (rede ilhada)")
+        return self.z[:, indices], np.linalg.solve(s, delta @ self.z[indices, :])
+
+    def atualizar(self, indices: Iterable[int], delta: np.ndarray):
+        """Aplica ``Y[idx, idx] += delta`` e atualiza a Zbus em O(n²)."""
+        indices = np.asarray(list(indices), dtype=np.int64)
+        delta = np.asarray(delta, dtype=complex).reshape(len(indices), len(indices))
+        coluna, linha = self._correcao(indices, delta)
+        self.z -= coluna @ linha
+        self.ybus[np.ix_(indices, indices)] += delta
+        self.atualizacoes += 1
+        self.total_atualizacoes += 1
+        self._verificar_deriva()
+
+    def diagonal_com(self, indices: Iterable[int], delta: np.ndarray) -> np.ndarray:
+        """Diagonal da Zbus que resultaria da atualização, em O(n), sem aplicá-la."""
+        indices = np.asarray(list(indices), dtype=np.int64)
+        delta = np.asarray(delta, dtype=complex).reshape(len(indices), len(indices))
+        coluna, linha = self._correcao(indices, delta)
+        return np.diagonal(self.z) - np.einsum('ij,ji->i', coluna, linha)
+
+    def _verificar_deriva(self):
+        if self.atualizacoes >= self.max_atualizacoes:
+            self.refatorar()
+            return
+        n = len(self.z)
+        colunas = self._rng.choice(n, size=min(self.colunas_sonda, n), replace=False)
+        residuo = self.ybus @ self.z[:, colunas]
+        residuo[colunas, np.arange(len(colunas))] -= 1
+        self.deriva = float(np.abs(residuo).max())
+        self.deriva_max = max(self.deriva_max, self.deriva)
+        if self.deriva > self.tol_deriva:
+            self.refatorar()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "updates": self.total_atualizacoes,
+            "updates_since_refactor": self.atualizacoes,
+            "refactorizations": self.refatoracoes,
+            "drift": self.deriva,
+            "max_drift": self.deriva_max,
+        }
+
+
+class MotorCurtoCircuito:
+    """
+    Curto-circuito trifásico pelo método da matriz de impedâncias de barra.
+
+    A Ybus (linhas, trafos e shunts) vem do modelo interno do pandapower,
+    obtido com um fluxo de potência sobre uma cópia da rede. As fontes
+    (ext_grid e geradores com ``xdss_pu``) entram como admitâncias em
+    derivação. Com a Zbus invertida uma única vez:
+
+    - ``Ik = c / (Zkk + Zf)`` para todas as barras (diagonal da Zbus)
+    - ``V(f) = c - Z[:, f] * Ik[f]`` para todas as faltas (matriz n x n)
+    - contribuições dos ramos ``Yff ΔVf + Yft ΔVt`` para todas as faltas
+
+    Manobras de um ramo (``alternar_ramo``) e mudanças de parâmetros de linha
+    (``modificar_linha``) atualizam a Zbus por ``ZbusIncremental`` em O(n²).
+    Barras fora de serviço ou ilhadas da fonte não entram no cálculo; uma
+    manobra que ilharia barras levanta ``LinAlgError`` e o motor deve ser
+    remontado a partir da rede.
+    """
+
+    def __init__(self, net: pp.pandapowerNet, s_sc_fonte_mva: float = S_SC_FONTE_PADRAO_MVA,
+                 rx_fonte: float = RX_FONTE_PADRAO, c_fator: float = 1.0,
+                 tol_deriva: float = 1e-8, max_atualizacoes: int = 64):
+        self.c_fator = c_fator
+        trabalho = copy.deepcopy(net)
+        pp.runpp(trabalho, algorithm='nr', max_iteration=50)
+
+        ppc = trabalho._ppc
+        interno = ppc["internal"]
+        self.base_mva = float(ppc["baseMVA"])
+        self.f_hz = float(trabalho.f_hz)
+        n = interno["Ybus"].shape[0]
+
+        # Barras pandapower em serviço -> posição na Ybus interna (ppci)
+        lookup = trabalho._pd2ppc_lookups["bus"]
+        barras = trabalho.bus.index[trabalho.bus['in_service'].values]
+        posicoes = lookup[barras.values]
+        validas = posicoes < n
+        self.barras = np.asarray(barras.values[validas], dtype=np.int64)
+        self._pos_ppci = posicoes[validas]
+        self._coluna = {int(b): i for i, b in enumerate(self.barras)}
+        self.vn_kv = trabalho.bus.loc[self.barras, 'vn_kv'].values.astype(float)
+        self._nomes = {str(nome): int(b) for b, nome in trabalho.bus.loc[self.barras, 'name'].items()}
+        self._i_base_barra_ka = self.base_mva / (np.sqrt(3) * self.vn_kv)
+
+        ybus = interno["Ybus"].toarray()
+        self._fontes = self._adicionar_fontes(trabalho, ybus, lookup, s_sc_fonte_mva, rx_fonte)
+        self.fatoracao = ZbusIncremental(ybus, tol_deriva=tol_deriva,
+                                         max_atualizacoes=max_atualizacoes)
+        self._montar_ramos(trabalho, lookup, n)
+
+    def _montar_ramos(self, net, lookup, n):
+        """
+        Bloco 2x2 de admitâncias de cada linha e trafo, inclusive dos que
+        estão fora de serviço (para poderem ser religados depois).
+        """
+        ppc = net._ppc
+        self._ramos_todos: List[Ramo] = []
+        linhas_ppc, de, para = [], [], []
+        for elemento, (inicio, fim) in net._pd2ppc_lookups["branch"].items():
+            if elemento not in BARRAS_RAMO:
+                continue
+            col_de, col_para = BARRAS_RAMO[elemento]
+            tabela = net[elemento]
+            self._ramos_todos.extend((elemento, int(idx)) for idx in tabela.index[:fim - inicio])
+            linhas_ppc.extend(range(inicio, fim))
+            de.extend(tabela[col_de].values[:fim - inicio])
+            para.extend(tabela[col_para].values[:fim - inicio])
+        self._indice_ramo = {ramo: k for k, ramo in enumerate(self._ramos_todos)}
+
+        linhas_ppc = np.asarray(linhas_ppc, dtype=np.int64)
+        de, para = np.asarray(de, dtype=np.int64), np.asarray(para, dtype=np.int64)
+        f, t = lookup[de], lookup[para]
+        no_modelo = (f < n) & (t < n)
+        self._f = np.where(no_modelo, f, -1)
+        self._t = np.where(no_modelo, t, -1)
+        self._em_servico = no_modelo & (ppc["branch"][linhas_ppc, BR_STATUS].real == 1)
+
+        ramos = ppc["branch"][linhas_ppc].copy()
+        ramos[:, BR_STATUS] = 1
+        ytt, yff, yft, ytf = branch_vectors(ramos, len(ramos)) if len(ramos) else ([],) * 4
+        self._blocos = np.zeros((len(ramos), 2, 2), dtype=complex)
+        self._blocos[:, 0, 0], self._blocos[:, 0, 1] = yff, yft
+        self._blocos[:, 1, 0], self._blocos[:, 1, 1] = ytf, ytt
+
+        vn_de = net.bus.loc[de, 'vn_kv'].values.astype(float)
+        self._vn_de = vn_de
+        self._i_base_ramo_ka = self.base_mva / (np.sqrt(3) * vn_de)
+        self._linhas = net.line[list(PARAMETROS_LINHA)].astype(float).fillna(0.0)
+
+    def _adicionar_fontes(self, net, ybus, lookup, s_sc_padrao, rx_padrao) -> np.ndarray:
+        """Soma à diagonal da Ybus as admitâncias de curto das fontes e devolve suas barras (ppci)."""
+        fontes = []
+        for _, eg in net.ext_grid[net.ext_grid['in_service']].iterrows():
+            s_sc = eg.get('s_sc_max_mva', np.nan)
+            rx = eg.get('rx_max', np.nan)
+            s_sc = s_sc_padrao if s_sc is None or np.isnan(s_sc) else float(s_sc)
+            rx = rx_padrao if rx is None or np.isnan(rx) else float(rx)
+            # IEC 60909: Zq = c * Un² / S"kQ
+            z = self.c_fator * self.base_mva / s_sc * (rx + 1j) / np.sqrt(1 + rx ** 2)
+            ybus[lookup[int(eg['bus'])], lookup[int(eg['bus'])]] += 1 / z
+            fontes.append(lookup[int(eg['bus'])])
+
+        if 'xdss_pu' in net.gen.columns:
+            for _, gen in net.gen[net.gen['in_service']].iterrows():
+                if np.isnan(gen['xdss_pu']) or np.isnan(gen['sn_mva']):
+                    continue
+                z = 1j * gen['xdss_pu'] * self.base_mva / gen['sn_mva']
+                ybus[lookup[int(gen['bus'])], lookup[int(gen['bus'])]] += 1 / z
+                fontes.append(lookup[int(gen['bus'])])
+        return np.asarray(fontes, dtype=np.int64)
+
+    @property
+    def zbus(self) -> np.ndarray:
+        """Zbus (pu) das barras do motor, na ordem de ``barras``."""
+        return self.fatoracao.z[np.ix_(self._pos_ppci, self._pos_ppci)]
+
+    @property
+    def ramos(self) -> List[Ramo]:
+        """Linhas e trafos em serviço, na ordem das contribuições da varredura."""
+        return [ramo for ramo, ativo in zip(self._ramos_todos, self._em_servico) if ativo]
+
+    def em_servico(self, elemento: str, idx: int) -> bool:
+        return bool(self._em_servico[self._indice_ramo[(elemento, int(idx))]])
+
+    def coluna(self, barra: int) -> int:
+        """Posição da barra (índice pandapower) nos vetores do motor."""
+        return self._coluna[int(barra)]
+
+    def barra_por_nome(self, nome: str) -> Optional[int]:
+        """Índice pandapower da barra com o nome dado (ex.: 'B7'), se existir."""
+        return self._nomes.get(nome)
+
+    def _impedancia_falta(self, z_falta_pu: Union[float, complex, np.ndarray]) -> np.ndarray:
+        return np.broadcast_to(np.asarray(z_falta_pu, dtype=complex), self.barras.shape)
+
+    def _diagonal(self) -> np.ndarray:
+        return np.diagonal(self.fatoracao.z)[self._pos_ppci]
+
+    def correntes_trifasicas_pu(self, z_falta_pu: Union[float, complex, np.ndarray] = 0.0) -> np.ndarray:
+        """Corrente de falta trifásica (pu) de todas as barras."""
+        return np.abs(self.c_fator / (self._diagonal() + self._impedancia_falta(z_falta_pu)))
+
+    def correntes_trifasicas(self, z_falta_pu: Union[float, complex, np.ndarray] = 0.0) -> np.ndarray:
+        """Corrente de falta trifásica (kA) de todas as barras, na ordem de ``barras``."""
+        return self.correntes_trifasicas_pu(z_falta_pu) * self._i_base_barra_ka
+
+    def varredura(self, z_falta_pu: Union[float, complex, np.ndarray] = 0.0) -> VarreduraCurto:
+        """Falta trifásica em cada barra: correntes, tensões e contribuições dos ramos."""
+        ik = self.c_fator / (self._diagonal() + self._impedancia_falta(z_falta_pu))
+        # ΔV de todas as barras internas (linhas) para falta em cada barra do motor (colunas)
+        delta_v = -self.fatoracao.z[:, self._pos_ppci] * ik[np.newaxis, :]
+        ativos = self._em_servico
+        blocos = self._blocos[ativos]
+        corrente_ramo = (blocos[:, 0, 0, np.newaxis] * delta_v[self._f[ativos]]
+                         + blocos[:, 0, 1, np.newaxis] * delta_v[self._t[ativos]])
+        return VarreduraCurto(
+            barras=self.barras,
+            ikss_pu=np.abs(ik),
+            ikss_ka=np.abs(ik) * self._i_base_barra_ka,
+            tensoes_pu=np.abs(self.c_fator + delta_v[self._pos_ppci]),
+            contribuicoes_ka=np.abs(corrente_ramo) * self._i_base_ramo_ka[ativos, np.newaxis],
+            ramos=self.ramos
+        )
+
+    # ------------------------------------------------------------------
+    # Atualizações incrementais
+    # ------------------------------------------------------------------
+
+    def _ramo(self, elemento: str, idx: int) -> int:
+        k = self._indice_ramo.get((elemento, int(idx)))
+        if k is None:
+            raise KeyError(f"Ramo não encontrado no motor: {elemento} {idx}")
+        if self._f[k] < 0:
+            raise np.linalg.LinAlgError(f"{elemento} {idx} liga barra fora do modelo; remonte o motor")
+        return k
+
+    def _arestas(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Ligações (i < j) da Ybus atual, para os testes de ilhamento."""
+        ybus = self.fatoracao.ybus
+        limiar = 1e-10 * np.abs(np.diagonal(ybus)).max()
+        i, j = np.nonzero(np.triu(np.abs(ybus) > limiar, 1))
+        return i, j, ybus[i, j]
+
+    def _ilhadas_sem(self, k: int, arestas) -> np.ndarray:
+        """Máscara (ppci) das barras que perdem a fonte se o ramo k sair de serviço."""
+        i, j, valores = arestas
+        f, t = self._f[k], self._t[k]
+        contribuicao = self._blocos[k, 0, 1] if f < t else self._blocos[k, 1, 0]
+        ramo = (i == min(f, t)) & (j == max(f, t))
+        # Ramos em paralelo mantêm a ligação mesmo sem o ramo k
+        restante = np.abs(valores - contribuicao) > 1e-10 * np.abs(valores)
+        ficam = ~ramo | restante
+        n = len(self.fatoracao.z)
+        grafo = coo_matrix((np.ones(ficam.sum()), (i[ficam], j[ficam])), shape=(n, n))
+        _, rotulos = connected_components(grafo, directed=False)
+        return ~np.isin(rotulos, rotulos[self._fontes])
+
+    def alternar_ramo(self, elemento: str, idx: int, em_servico: bool) -> bool:
+        """
+        Liga ou desliga uma linha/trafo atualizando a Zbus em O(n²).
+        Devolve ``False`` se o ramo já estava no estado pedido.
+        """
+        k = self._ramo(elemento, idx)
+        if bool(self._em_servico[k]) == bool(em_servico):
+            return False
+        if not em_servico and self._ilhadas_sem(k, self._arestas()).any():
+            raise np.linalg.LinAlgError(f"Desligar {elemento} {idx} ilha barras; remonte o motor")
+        sinal = 1.0 if em_servico else -1.0
+        self.fatoracao.atualizar((self._f[k], self._t[k]), sinal * self._blocos[k])
+        self._em_servico[k] = bool(em_servico)
+        return True
+
+    def modificar_linha(self, idx: int, **parametros: float) -> bool:
+        """
+        Altera parâmetros de uma linha (``PARAMETROS_LINHA``) com uma
+        atualização de posto 2. Devolve ``False`` se nada mudou.
+        """
+        desconhecidos = set(parametros) - set(PARAMETROS_LINHA)
+        if desconhecidos:
+            raise ValueError(f"Parâmetros de linha não suportados: {sorted(desconhecidos)}")
+        k = self._ramo("line", idx)
+        atual = self._linhas.loc[int(idx)].to_dict()
+        novo = {**atual, **{nome: float(valor) for nome, valor in parametros.items()}}
+        if novo == atual:
+            return False
+        bloco = bloco_linha(novo, self._vn_de[k], self.base_mva, self.f_hz)
+        if self._em_servico[k]:
+            self.fatoracao.atualizar((self._f[k], self._t[k]), bloco - self._blocos[k])
+        self._blocos[k] = bloco
+        self._linhas.loc[int(idx), list(novo)] = list(novo.values())
+        return True
+
+    def sincronizar(self, net: pp.pandapowerNet) -> int:
+        """
+        Aplica ao motor as diferenças de ``in_service`` de linhas/trafos e de
+        parâmetros de linha entre o motor e ``net``. A rede deve ter a mesma
+        estrutura (barras, índices, fontes) da que montou o motor; para
+        qualquer outra mudança, monte um motor novo. Devolve o número de
+        atualizações aplicadas.
+        """
+        aplicadas = 0
+        if not net.line.index.equals(self._linhas.index):
+            raise np.linalg.LinAlgError("Índices de linhas mudaram; remonte o motor")
+        parametros = net.line[list(PARAMETROS_LINHA)].astype(float).fillna(0.0)
+        alteradas = (parametros.values != self._linhas.values).any(axis=1)
+        for idx in net.line.index[alteradas]:
+            aplicadas += self.modificar_linha(idx, **parametros.loc[idx].to_dict())
+
+        # Religamentos antes dos desligamentos: evita ilhamentos transitórios
+        pedidos = []
+        for elemento in BARRAS_RAMO:
+            for idx, ativo in net[elemento]['in_service'].items():
+                if bool(ativo) != self.em_servico(elemento, idx):
+                    pedidos.append((not bool(ativo), elemento, idx, bool(ativo)))
+        for _, elemento, idx, ativo in sorted(pedidos):
+            aplicadas += self.alternar_ramo(elemento, idx, ativo)
+        return aplicadas
+
+    def varredura_n1(self, ramos: Optional[Iterable[Ramo]] = None) -> pd.DataFrame:
+        """
+        Corrente de falta trifásica (kA) de todas as barras para a saída de
+        cada ramo em serviço, sem alterar o motor. Linhas do resultado são os
+        ramos desligados; colunas, as barras. Barras ilhadas pela saída ficam
+        com corrente zero.
+
+        Sem ilhamento, cada contingência custa O(n) (só a diagonal da Zbus
+        atualizada). Com ilhamento, a parte que continua ligada à fonte sai do
+        complemento de Schur da Zbus, em O(n·m²) para uma ilha de m barras.
+        """
+        ramos = self.ramos if ramos is None else [(e, int(i)) for e, i in ramos]
+        arestas = self._arestas()
+        correntes = np.zeros((len(ramos), len(self.barras)))
+        for linha, (elemento, idx) in enumerate(ramos):
+            k = self._ramo(elemento, idx)
+            if not self._em_servico[k]:
+                diagonal = np.diagonal(self.fatoracao.z)
+                ilhadas = np.zeros(len(diagonal), dtype=bool)
+            else:
+                ilhadas = self._ilhadas_sem(k, arestas)
+                if ilhadas.any():
+                    diagonal = self._diagonal_sem_ilha(k, ilhadas)
+                else:
+                    diagonal = self.fatoracao.diagonal_com((self._f[k], self._t[k]), -self._blocos[k])
+            ik = np.abs(self.c_fator / diagonal[self._pos_ppci])
+            ik[ilhadas[self._pos_ppci]] = 0.0
+            correntes[linha] = ik * self._i_base_barra_ka
+        indice = pd.MultiIndex.from_tuples(ramos, names=["element", "element_id"]) if ramos \
+            else pd.MultiIndex.from_tuples([], names=["element", "element_id"])
+        return pd.DataFrame(correntes, index=indice, columns=self.barras)
+
+    def _diagonal_sem_ilha(self, k: int, ilhadas: np.ndarray) -> np.ndarray:
+        """
+        Diagonal da Zbus das barras que seguem com fonte (A) quando o ramo k,
+        único elo com a ilha (B), sai de serviço:
+
+        - ``inv(Y_AA) = Z_AA - Z_AB inv(Z_BB) Z_BA`` (complemento de Schur)
+        - o lado A do ramo perde sua admitância própria: Sherman-Morrison
+        """
+        a = np.flatnonzero(~ilhadas)
+        b = np.flatnonzero(ilhadas)
+        z = self.fatoracao.z
+        f, t = self._f[k], self._t[k]
+        lado, y_proprio = (f, self._blocos[k, 0, 0]) if not ilhadas[f] else (t, self._blocos[k, 1, 1])
+        pos = int(np.flatnonzero(a == lado)[0])
+
+        z_ab = z[np.ix_(a, b)]
+        w = np.linalg.solve(z[np.ix_(b, b)], z[np.ix_(b, a)])
+        diagonal_aa = np.diagonal(z)[a] - np.einsum('ij,ji->i', z_ab, w)
+        coluna = z[a, lado] - z_ab @ np.linalg.solve(z[np.ix_(b, b)], z[b, lado])
+        linha = z[lado, a] - z[lado, b] @ w
+        diagonal_aa = diagonal_aa + y_proprio * coluna * linha / (1 - y_proprio * coluna[pos])
+
+        diagonal = np.full(len(z), np.inf, dtype=complex)
+        diagonal[a] = diagonal_aa
+        return diagonal
+
+
+def zth_barras_ieee(motor: MotorCurtoCircuito, barras_ieee: Iterable[int]) -> np.ndarray:
+    """
+    |Zth| (pu) das barras pela numeração IEEE (barra pandapower chamada
+    ``B<n>``). Barras que não existem no modelo reduzido ficam como NaN.
+    """
+    diagonal = np.abs(motor._diagonal())
+    zth = []
+    for numero in barras_ieee:
+        barra = motor.barra_por_nome(f"B{numero}")
+        zth.append(np.nan if barra is None else diagonal[motor.coluna(barra)])
+    return np.asarray(zth, dtype=float)
+
+
+@functools.lru_cache(maxsize=1)
+def motor_rede_padrao() -> MotorCurtoCircuito:
+    """Motor da rede do projeto (``ieee14_protecao.json``), montado uma vez por processo."""
+    return MotorCurtoCircuito(carregar_documento(JSON_PADRAO)["net"])
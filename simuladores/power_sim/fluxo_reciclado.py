@@ -0,0 +1,172 @@
+'''
+    ||> Fluxo de potência reciclado (warm start) para ProtecAI_Mini
+        - Reaproveita as estruturas internas do pandapower (ppc, Ybus, índices
+          PV/PQ) entre execuções quando apenas as injeções mudam
+        - Parte sempre da última solução em vez do perfil plano de tensões
+        - Refaz a montagem completa quando a topologia ou os parâmetros
+          elétricos da rede mudam
+        - Usado pelo ambiente RL e pelo router /network da API
+'''
+
+import copy
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandapower as pp
+from pandapower.auxiliary import LoadflowNotConverged
+
+# Colunas que o modo reciclado atualiza sem remontar a rede
+COLUNAS_INJECAO = {
+    "load": ("p_mw", "q_mvar", "scaling"),
+    "sgen": ("p_mw", "q_mvar", "scaling"),
+    "gen": ("p_mw", "vm_pu", "scaling"),
+}
+
+# Tabelas cuja alteração exige montar ppc/Ybus novamente
+TABELAS_TOPOLOGIA = ("bus", "line", "trafo", "trafo3w", "switch", "shunt",
+                     "ext_grid", "impedance", "ward", "xward",
+                     "load", "sgen", "gen")
+
+# pandapower só recicla com Newton-Raphson
+RECICLAGEM = dict(bus_pq=True, trafo=False, gen=True)
+
+
+def assinatura_topologia(net: pp.pandapowerNet,
+                         tabelas: Iterable[str] = TABELAS_TOPOLOGIA,
+                         ignorar: Optional[Dict[str, Iterable[str]]] = None) -> str:
+    """
+    Hash de tudo que define a estrutura do fluxo de potência.
+
+    As colunas de injeção (``COLUNAS_INJECAO``) ficam de fora: mudar a
+    potência de uma carga não altera a assinatura, mas tirar uma linha de
+    serviço, mudar um tap ou mover uma carga de barra altera. ``tabelas`` e
+    ``ignorar`` permitem assinaturas para outros cálculos (ex.: curto-circuito).
+    """
+    ignorar = COLUNAS_INJECAO if ignorar is None else ignorar
+    digest = hashlib.sha256()
+    for tabela in tabelas:
+        if tabela not in net:
+            continue
+        df = net[tabela]
+        colunas_ignoradas = ignorar.get(tabela, ())
+        digest.update(f"{tabela}:{len(df)}".encode())
+        digest.update(df.index.values.tobytes())
+        for coluna in df.columns:
+            if coluna in colunas_ignoradas or coluna == "name":
+                continue
+            valores = df[coluna].values
+            digest.update(coluna.encode())
+            if isinstance(valores, np.ndarray) and valores.dtype.kind in "biuf":
+                digest.update(np.ascontiguousarray(valores).tobytes())
+            else:
+                digest.update(repr(valores.tolist()).encode())
+    return digest.hexdigest()
+
+
+def _verificar_convergencia(net: pp.pandapowerNet):
+    """``pp.runpp`` nem sempre levanta exceção quando não converge: confere o resultado."""
+    if not net.converged or not net._ppc.get("success", False):
+        raise LoadflowNotConverged("Fluxo de potência não convergiu")
+
+
+class FluxoReciclado:
+    """
+    Solver Newton-Raphson para execuções repetidas sobre a mesma topologia.
+
+    Mantém uma cópia de trabalho da rede. Em ``resolver()``:
+
+    - topologia igual à da última chamada: copia as injeções para a cópia de
+      trabalho e roda ``pp.runpp(recycle=...)`` a partir da solução anterior;
+    - topologia diferente (ou primeira chamada): copia a rede inteira e roda
+      o fluxo completo, inicializando com a solução anterior quando as barras
+      forem as mesmas.
+
+    Se o fluxo reciclado não convergir (exceção ou ``converged``/``success``
+    falsos), a montagem completa é refeita antes de desistir; uma rede que
+    não converge na montagem completa levanta ``LoadflowNotConverged`` e não
+    fica guardada. A rede passada pelo chamador nunca é alterada.
+    """
+
+    def __init__(self, max_iteration: int = 50, tolerance_mva: float = 1e-8, **opcoes):
+        self.opcoes = dict(opcoes, max_iteration=max_iteration,
+                           tolerance_mva=tolerance_mva)
+        self.opcoes.pop("algorithm", None)
+        self._net: Optional[pp.pandapowerNet] = None
+        self._assinatura: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.montagens = 0
+        self.reciclagens = 0
+        self.falhas_reciclagem = 0
+        self.iteracoes = 0
+        self.tempo_total_s = 0.0
+
+    def resolver(self, net: pp.pandapowerNet) -> pp.pandapowerNet:
+        """
+        Executa o fluxo de potência e retorna a rede de trabalho com os
+        resultados (``res_bus``, ``res_line``...). Trate-a como somente
+        leitura: ela é reaproveitada na próxima chamada.
+        """
+        with self._lock:
+            inicio = time.perf_counter()
+            assinatura = assinatura_topologia(net)
+
+            if assinatura == self._assinatura and self._net is not None:
+                try:
+                    self._reciclar(net)
+                    self.reciclagens += 1
+                except Exception:
+                    self.falhas_reciclagem += 1
+                    self._montar(net, assinatura, aquecido=False)
+            else:
+                self._montar(net, assinatura, aquecido=True)
+
+            self.iteracoes = int(self._net._ppc["iterations"])
+            self.tempo_total_s += time.perf_counter() - inicio
+            return self._net
+
+    def _reciclar(self, net: pp.pandapowerNet):
+        for tabela, colunas in COLUNAS_INJECAO.items():
+            if tabela in net and len(net[tabela]):
+                self._net[tabela].loc[:, list(colunas)] = net[tabela].loc[:, list(colunas)]
+        pp.runpp(self._net, recycle=RECICLAGEM, **self.opcoes)
+        _verificar_convergencia(self._net)
+
+    def _montar(self, net: pp.pandapowerNet, assinatura: str, aquecido: bool):
+        anterior = self._net
+        self._net = None
+        self._assinatura = None
+
+        trabalho = copy.deepcopy(net)
+        init = "auto"
+        if aquecido and anterior is not None and anterior.res_bus.index.equals(trabalho.bus.index) \
+                and not anterior.res_bus[["vm_pu", "va_degree"]].isna().any().any():
+            trabalho.res_bus = anterior.res_bus.copy()
+            init = "results"
+
+        pp.runpp(trabalho, algorithm="nr", init=init, **self.opcoes)
+        _verificar_convergencia(trabalho)
+        self.montagens += 1
+        self._net = trabalho
+        self._assinatura = assinatura
+
+    def invalidar(self):
+        """Descarta a rede de trabalho; a próxima chamada monta tudo de novo."""
+        with self._lock:
+            self._net = None
+            self._assinatura = None
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores para monitoramento e benchmarks."""
+        with self._lock:
+            total = self.montagens + self.reciclagens
+            return {
+                "full_builds": self.montagens,
+                "recycled": self.reciclagens,
+                "recycle_failures": self.falhas_reciclagem,
+                "last_iterations": self.iteracoes,
+                "mean_solve_ms": self.tempo_total_s / total * 1000 if total else 0.0
+            }
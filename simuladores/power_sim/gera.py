@@ -22,6 +22,11 @@ import json
 from pathlib import Path
 from typing import Dict, Tuple
 
+try:
+    from simuladores.power_sim.snapshot_binario import exportar_snapshot_binario
+except ImportError:
+    from snapshot_binario import exportar_snapshot_binario
+
 # ====== PARÂMETROS E CONSTANTES ======
 TRAFO_SN_MVA = 13.8
 TRAFO_VN_KV = 0.22  # 220V == 0.22kV
@@ -241,7 +246,8 @@ def exportar_json_customizado(
 ) -> None:
     """
     Exporta o net e os componentes extras no formato ProtecAI.
-    Salva um arquivo JSON com os campos: pandapower_net, protection_devices, bus_geodata, line_geodata.
+    Salva um arquivo JSON com os campos: pandapower_net, protection_devices, bus_geodata, line_geodata,
+    e ao lado dele o snapshot binário (.npz) lido pelos carregadores sem parser aninhado.
     """
     import json
     saida = {
@@ -257,6 +263,11 @@ def exportar_json_customizado(
         json.dump(saida, f, ensure_ascii=False, indent=2)
     print(f"Arquivo ProtecAI salvo em: {caminho}")
 
+    snapshot = exportar_snapshot_binario(
+        net, protection_devices, [],
+        saida["bus_geodata"], saida["line_geodata"], caminho)
+    print(f"Snapshot binário salvo em: {snapshot}")
+
 
 def main() -> None:
     """
@@ -9,6 +9,7 @@ Gera um arquivo .json LIMPO e padronizado para uso nos scripts de visualização
         - "protection_devices": dicionário (relés, disjuntores, fusíveis)
         - "bus_geodata": dicionário {índice: {x, y}}
         - "line_geodata": dicionário {índice: {"coords": [...]}}
+        - Sidecar binário ieee14_protecao.npz (ver snapshot_binario.py)
         |> NÃO exporta curvas, resultados, nem artefatos IEEE.
 
     ||>Compatível com Pandapower 3.1.2+, Pandas 1.x+, Python 3.8+
@@ -22,6 +23,11 @@ import json
 from pathlib import Path
 from typing import Dict, Tuple
 
+try:
+    from simuladores.power_sim.snapshot_binario import exportar_snapshot_binario
+except ImportError:
+    from snapshot_binario import exportar_snapshot_binario
+
 # ====== PARÂMETROS E CONSTANTES ======
 # Conforme especificação do projeto PETRO_PROTECAI_MINI
 TRAFO_SN_MVA = 25.0  # 25 MVA (conforme especificação)
@@ -270,6 +276,7 @@ def exportar_json_customizado(
     """
     Exporta o net e os componentes extras no formato ProtecAI.
     Salva um arquivo JSON com os campos: pandapower_net, protection_devices, protection_zones, bus_geodata, line_geodata.
+    Grava também o snapshot binário (.npz) equivalente, lido pelos carregadores sem parser aninhado.
     """
     import json
 
@@ -316,6 +323,11 @@ def exportar_json_customizado(
 
     print(f"✅ Arquivo ProtecAI salvo em: {caminho}")
 
+    snapshot = exportar_snapshot_binario(
+        net, protection_devices, protection_zones,
+        saida["bus_geodata"], saida["line_geodata"], caminho)
+    print(f"✅ Snapshot binário salvo em: {snapshot}")
+
     # Verificação imediata
     print(f"📊 Resumo dos dados exportados:")
     print(f"   - Barras: {len(net.bus)}")
@@ -3,6 +3,11 @@ import pandapower as pp
 import os
 import time
 
+try:
+    from simuladores.power_sim.snapshot_binario import carregar_documento
+except ImportError:
+    from snapshot_binario import carregar_documento
+
 
 class IEEE14System:
     """
@@ -38,13 +43,8 @@ class IEEE14System:
                 f"Arquivo JSON não encontrado ou não foi baixado: {path}")
 
         try:
-            # Carrega o JSON customizado
-            import json
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # Extrai a rede PandaPower da string JSON
-            self.net = pp.from_json_string(data["pandapower_net"])
+            # Carrega a rede (snapshot binário .npz se atualizado, senão o JSON)
+            self.net = carregar_documento(path)["net"]
         except Exception as e:
             raise ValueError(
                 f"Erro ao carregar a rede a partir do JSON. Verifique se foi exportado corretamente\nDetalhes: {e}"
@@ -4,6 +4,14 @@
         - Treinamento baseado em cenários de falha da rede IEEE 14 barras
         - Objetivo: Minimizar tempo de atuação e maximizar seletividade
         - Ambiente personalizado compatível com OpenAI Gym/Gymnasium
+        - Treinamento com vários ambientes (DummyVecEnv ou SubprocVecEnv):
+          cada subprocesso carrega a rede uma vez e recebe semente própria
+        - Ambiente em lote ("batch"): ProtectionCoordinationVectorEnv
+          (ambiente_vetorial.py) adaptado à API VecEnv do Stable-Baselines3
+        - Faltas do passo buscadas na tabela pré-calculada (tabela_faltas.py):
+          curto-circuito real por barra, tipo e impedância de falta a custo O(1)
+        - Faltas por carga adicional sem cópia da rede: uma carga de falta
+          por barra, criada desligada e ligada só durante a simulação
 '''
 
 import gymnasium as gym
@@ -15,11 +23,32 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 from stable_baselines3 import PPO, DQN
 from stable_baselines3.common.env_util import make_vec_env
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecEnv
 from stable_baselines3.common.callbacks import EvalCallback
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from simuladores.power_sim.snapshot_binario import carregar_documento
+    from simuladores.power_sim.fluxo_reciclado import FluxoReciclado
+    from simuladores.power_sim.curto_circuito import MotorCurtoCircuito
+    from simuladores.power_sim.tabela_faltas import CARGAS_FALTA, FATORES_CURTO, TIPOS_FALTA_RL, TabelaFaltas
+    from simuladores.power_sim.ambiente_vetorial import (
+        LIMITES_PICKUP, LIMITES_TEMPO, ProtectionCoordinationVectorEnv, faltas_sinteticas, protecao_primaria
+    )
+except ImportError:
+    from snapshot_binario import carregar_documento
+    from fluxo_reciclado import FluxoReciclado
+    from curto_circuito import MotorCurtoCircuito
+    from tabela_faltas import CARGAS_FALTA, FATORES_CURTO, TIPOS_FALTA_RL, TabelaFaltas
+    from ambiente_vetorial import (
+        LIMITES_PICKUP, LIMITES_TEMPO, ProtectionCoordinationVectorEnv, faltas_sinteticas, protecao_primaria
+    )
+
+
+# Passos por rollout do PPO (somados entre os ambientes)
+ROLLOUT_PPO = 512
+
 
 class ProtectionCoordinationEnv(gym.Env):
     """
@@ -28,9 +57,19 @@ class ProtectionCoordinationEnv(gym.Env):
     Estado: Valores de corrente, tensão, settings atuais dos relés
     Ação: Ajustes dos settings de proteção (pickup, time delay)
     Recompensa: Função baseada em seletividade, velocidade e confiabilidade
+
+    Com ``fault_table`` (padrão) as correntes e tensões de cada passo vêm da
+    ``TabelaFaltas`` da rede (curto-circuito por barra, tipo e faixa de
+    impedância, sobrecarga por fluxo de potência); sem ela, da varredura Zbus
+    com falta franca e de valores sintéticos para sobrecarga.
+
+    Os sorteios (barra, tipo de falta, faixa, ruído) usam o gerador do ambiente
+    (``self.np_random``), semeado por ``reset(seed=...)``: ambientes de um
+    mesmo VecEnv têm sequências independentes e reprodutíveis.
     """
 
-    def __init__(self, net_json_path, protection_devices, max_episodes=1000):
+    def __init__(self, net_json_path, protection_devices, max_episodes=1000,
+                 recycle_powerflow=True, fault_table=True):
         super(ProtectionCoordinationEnv, self).__init__()
 
         # Carregar rede elétrica
@@ -39,24 +78,50 @@ class ProtectionCoordinationEnv(gym.Env):
         self.max_episodes = max_episodes
         self.episode_count = 0
 
+        # Fluxo de potência da observação: NR reciclado (warm start) ou
+        # execução completa a cada passo
+        self.recycle_powerflow = recycle_powerflow
+        self.fluxo = FluxoReciclado(max_iteration=50) if recycle_powerflow else None
+
         # Configurar ambiente
         self._load_network()
+        self._create_fault_loads()
         self._setup_action_observation_space()
 
+        # Varredura de curto-circuito (Zbus) de todas as barras, calculada uma vez:
+        # cada passo só indexa a coluna da barra em falta
+        self.curto = MotorCurtoCircuito(self.net)
+        self.varredura_curto = self.curto.varredura()
+
+        # Respostas de falta pré-calculadas (memmap), refeitas se a rede mudar
+        self.tabela_faltas = TabelaFaltas.carregar(net_json_path) if fault_table else None
+
         # Estado inicial
         self.reset()
 
     def _load_network(self):
-        """Carrega a rede elétrica do JSON."""
+        """Carrega a rede elétrica do JSON (ou do snapshot binário equivalente)."""
         try:
-            with open(self.net_json_path, 'r') as f:
-                data = json.load(f)
-            self.net = pp.from_json_string(data["pandapower_net"])
+            self.net = carregar_documento(self.net_json_path)["net"]
             print(f"✅ Rede RL carregada: {len(self.net.bus)} barras")
         except Exception as e:
             print(f"❌ Erro ao carregar rede para RL: {e}")
             raise
 
+    def _create_fault_loads(self):
+        """
+        Cria uma carga de falta por barra, fora de serviço e com potência
+        nula. ``_simulate_fault`` só liga e ajusta a carga da barra em falta
+        e depois a desliga: sem cópia da rede nem crescimento da tabela de
+        cargas a cada falta.
+        """
+        self.fault_loads = pd.Series(
+            [pp.create_load(self.net, bus=bus, p_mw=0.0, q_mvar=0.0,
+                            name=f"FAULT_{bus}", in_service=False)
+             for bus in self.net.bus.index],
+            index=self.net.bus.index
+        )
+
     def _setup_action_observation_space(self):
         """Define espaços de ação e observação."""
         # Número de relés ajustáveis
@@ -75,8 +140,8 @@ class ProtectionCoordinationEnv(gym.Env):
         )
 
         # Limites realistas para desnormalização
-        self.pickup_limits = (50, 500)    # A (corrente de pickup)
-        self.time_limits = (0.1, 2.0)    # s (tempo de atuação)
+        self.pickup_limits = LIMITES_PICKUP
+        self.time_limits = LIMITES_TEMPO
 
     def _denormalize_action(self, action):
         """Converte ação normalizada para valores reais."""
@@ -94,44 +159,31 @@ class ProtectionCoordinationEnv(gym.Env):
         if fault_bus is None:
             # Escolher barra aleatória (exceto slack)
             available_buses = [b for b in self.net.bus.index if b != 0]
-            fault_bus = np.random.choice(available_buses)
+            fault_bus = self.np_random.choice(available_buses)
 
         try:
-            # Fazer cópia da rede para simulação
-            net_copy = self.net.deepcopy()
-
-            # Simular falha através de carga adicional (mais estável que impedância baixa)
-            fault_loads = {
-                # Curto trifásico severo
-                "3ph": {"p_mw": 50.0, "q_mvar": 30.0},
-                # Curto bifásico moderado
-                "2ph": {"p_mw": 30.0, "q_mvar": 20.0},
-                # Curto monofásico leve
-                "1ph": {"p_mw": 15.0, "q_mvar": 10.0},
-                "overload": {"p_mw": 8.0, "q_mvar": 5.0}    # Sobrecarga
-            }
-
-            # Adicionar carga de falha
-            fault_load = fault_loads.get(fault_type, fault_loads["1ph"])
-            pp.create_load(
-                net_copy,
-                bus=fault_bus,
-                p_mw=fault_load["p_mw"],
-                q_mvar=fault_load["q_mvar"],
-                name=f"FAULT_{fault_type}"
-            )
-
-            # Executar fluxo de carga com configuração robusta
-            pp.runpp(net_copy,
-                     algorithm='nr',          # Newton-Raphson mais estável
-                     max_iteration=100,       # Mais iterações
-                     tolerance_mva=1e-6,      # Tolerância relaxada
-                     enforce_q_lims=False,    # Não enforçar limites Q
-                     check_connectivity=False)  # Não verificar conectividade
-
-            # Coletar dados de corrente e tensão
-            currents = net_copy.res_line['i_ka'].values
-            voltages = net_copy.res_bus['vm_pu'].values
+            # Falha simulada pela carga de falta da barra (mais estável que
+            # impedância baixa): liga e ajusta no lugar, sem copiar a rede
+            carga = self.fault_loads[fault_bus]
+            fault_load = CARGAS_FALTA.get(fault_type, CARGAS_FALTA["1ph"])
+            self.net.load.loc[carga, ["p_mw", "q_mvar"]] = [fault_load["p_mw"], fault_load["q_mvar"]]
+            self.net.load.at[carga, "in_service"] = True
+            try:
+                # Executar fluxo de carga com configuração robusta
+                pp.runpp(self.net,
+                         algorithm='nr',          # Newton-Raphson mais estável
+                         max_iteration=100,       # Mais iterações
+                         tolerance_mva=1e-6,      # Tolerância relaxada
+                         enforce_q_lims=False,    # Não enforçar limites Q
+                         check_connectivity=False)  # Não verificar conectividade
+
+                # Coletar dados de corrente e tensão
+                currents = self.net.res_line['i_ka'].to_numpy(copy=True)
+                voltages = self.net.res_bus['vm_pu'].to_numpy(copy=True)
+            finally:
+                # Desfazer a falta: a rede volta ao estado normal
+                self.net.load.at[carga, "in_service"] = False
+                self.net.load.loc[carga, ["p_mw", "q_mvar"]] = [0.0, 0.0]
 
             # Verificar se valores são válidos
             if np.any(np.isnan(currents)) or np.any(np.isnan(voltages)):
@@ -143,13 +195,17 @@ class ProtectionCoordinationEnv(gym.Env):
             # print(f"⚠️ Erro na simulação de falha: {e}")
             # Retornar condição normal com pequena perturbação
             try:
-                pp.runpp(self.net, algorithm='nr', max_iteration=50)
+                if self.fluxo is not None:
+                    resultado = self.fluxo.resolver(self.net)
+                else:
+                    pp.runpp(self.net, algorithm='nr', max_iteration=50)
+                    resultado = self.net
                 # Simular sobrecarga leve
-                currents = self.net.res_line['i_ka'].values * \
-                    (1.2 + np.random.random() * 0.3)
+                currents = resultado.res_line['i_ka'].values * \
+                    (1.2 + self.np_random.random() * 0.3)
                 # Simular queda de tensão
-                voltages = self.net.res_bus['vm_pu'].values * \
-                    (0.95 + np.random.random() * 0.1)
+                voltages = resultado.res_bus['vm_pu'].values * \
+                    (0.95 + self.np_random.random() * 0.1)
             except:
                 # Último recurso: valores fixos realistas
                 currents = np.full(len(self.net.line), 0.3)  # 300A típico
@@ -215,32 +271,18 @@ class ProtectionCoordinationEnv(gym.Env):
 
     def _is_primary_protection(self, rele, fault_bus):
         """Verifica se o relé é proteção primária para a falha."""
-        element_type = rele.get("element_type", "")
-        element_id = rele.get("element_id", 0)
-
-        if element_type == "bus" and element_id == fault_bus:
-            return True
-        elif element_type == "line":
-            # Verificar se a linha conecta a barra de falha
-            if element_id < len(self.net.line):
-                line = self.net.line.iloc[element_id]
-                if line["from_bus"] == fault_bus or line["to_bus"] == fault_bus:
-                    return True
-        elif element_type == "trafo":
-            # Verificar se o transformador conecta a barra de falha
-            if element_id < len(self.net.trafo):
-                trafo = self.net.trafo.iloc[element_id]
-                if trafo["hv_bus"] == fault_bus or trafo["lv_bus"] == fault_bus:
-                    return True
-
-        return False
+        return protecao_primaria(self.net, rele, fault_bus)
 
     def _get_observation(self, action=None):
         """Constrói vetor de observação do estado atual."""
         try:
-            pp.runpp(self.net, algorithm='bfsw', max_iteration=50)
-            currents = self.net.res_line['i_ka'].values
-            voltages = self.net.res_bus['vm_pu'].values
+            if self.fluxo is not None:
+                resultado = self.fluxo.resolver(self.net)
+            else:
+                pp.runpp(self.net, algorithm='bfsw', max_iteration=50)
+                resultado = self.net
+            currents = resultado.res_line['i_ka'].values
+            voltages = resultado.res_bus['vm_pu'].values
         except:
             currents = np.zeros(len(self.net.line))
             voltages = np.ones(len(self.net.bus))
@@ -268,45 +310,38 @@ class ProtectionCoordinationEnv(gym.Env):
         info = {"episode": self.episode_count}
         return observation, info
 
+    def _fault_from_zbus(self, fault_bus, fault_type):
+        """Correntes de linha (kA) e tensões (pu) da falta, a partir da varredura Zbus."""
+        fator = FATORES_CURTO[fault_type]
+        currents = self.varredura_curto.contribuicoes(fault_bus, "line") \
+            .reindex(self.net.line.index, fill_value=0.0).values * fator
+        col = self.curto.coluna(fault_bus)
+        voltages = 1.0 - (1.0 - self.varredura_curto.tensoes_pu[:, col]) * fator
+        voltages = pd.Series(voltages, index=self.varredura_curto.barras) \
+            .reindex(self.net.bus.index, fill_value=1.0).values
+        return currents, voltages
+
+    def _synthetic_fault(self, fault_type):
+        """Correntes e tensões sintéticas para eventos sem curto (sobrecarga)."""
+        currents, voltages = faltas_sinteticas(
+            self.np_random, fault_type, 1, len(self.net.line), len(self.net.bus))
+        return currents[0], voltages[0]
+
     def step(self, action):
         """Executa um passo no ambiente com simulação simplificada."""
         # Simular falha de forma mais simples e estável
-        fault_types = ["3ph", "2ph", "1ph", "overload"]
-        fault_type = np.random.choice(fault_types)
-        fault_bus = np.random.choice([b for b in self.net.bus.index if b != 0])
-
-        # Gerar dados sintéticos de corrente e tensão baseados no tipo de falha
-        base_current = 0.2  # 200A base
-        base_voltage = 1.0  # 100% tensão base
-
-        fault_multipliers = {
-            # Corrente alta, tensão baixa
-            "3ph": {"current": 5.0, "voltage": 0.7},
-            "2ph": {"current": 3.0, "voltage": 0.8},    # Moderado
-            "1ph": {"current": 1.5, "voltage": 0.9},    # Leve
-            "overload": {"current": 1.3, "voltage": 0.95}  # Sobrecarga
-        }
-
-        multiplier = fault_multipliers.get(
-            fault_type, fault_multipliers["1ph"])
-
-        # Gerar currentes e tensões sintéticas com ruído
-        n_lines = len(self.net.line)
-        n_buses = len(self.net.bus)
-
-        currents = np.random.normal(
-            base_current * multiplier["current"],
-            base_current * 0.1,
-            n_lines
-        )
-        currents = np.clip(currents, 0.05, 10.0)  # Limitar valores
-
-        voltages = np.random.normal(
-            base_voltage * multiplier["voltage"],
-            0.02,
-            n_buses
-        )
-        voltages = np.clip(voltages, 0.5, 1.1)  # Limitar valores
+        fault_type = self.np_random.choice(TIPOS_FALTA_RL)
+        fault_bus = self.np_random.choice([b for b in self.net.bus.index if b != 0])
+
+        fault_impedance = 0.0
+        if self.tabela_faltas is not None:
+            faixa = self.np_random.integers(len(self.tabela_faltas.impedancias))
+            fault_impedance = self.tabela_faltas.impedancias[faixa]
+            currents, voltages = self.tabela_faltas.falta(fault_type, fault_bus, faixa)
+        elif fault_type in FATORES_CURTO:
+            currents, voltages = self._fault_from_zbus(fault_bus, fault_type)
+        else:
+            currents, voltages = self._synthetic_fault(fault_type)
 
         # Calcular recompensa
         reward = self._calculate_reward(
@@ -323,6 +358,7 @@ class ProtectionCoordinationEnv(gym.Env):
         info = {
             "fault_type": fault_type,
             "fault_bus": fault_bus,
+            "fault_impedance_pu": fault_impedance,
             "avg_current": np.mean(currents),
             "min_voltage": np.min(voltages),
             "reward": reward
@@ -337,12 +373,100 @@ class ProtectionCoordinationEnv(gym.Env):
                 f"Falha: {self.last_info.get('fault_type', 'N/A')} na barra {self.last_info.get('fault_bus', 'N/A')}")
 
 
+class FabricaAmbiente:
+    """
+    Construtor serializável de ``ProtectionCoordinationEnv`` para VecEnvs.
+
+    Com SubprocVecEnv a fábrica é chamada dentro de cada subprocesso: a rede
+    é carregada (e a varredura Zbus calculada) uma vez por processo, sem
+    enviar o ambiente já montado pelo pipe.
+    """
+
+    def __init__(self, net_json_path, protection_devices, max_episodes=1000):
+        self.net_json_path = net_json_path
+        self.protection_devices = protection_devices
+        self.max_episodes = max_episodes
+
+    def __call__(self):
+        return ProtectionCoordinationEnv(self.net_json_path, self.protection_devices,
+                                         max_episodes=self.max_episodes)
+
+
+class VecEnvLote(VecEnv):
+    """
+    ``ProtectionCoordinationVectorEnv`` (API VectorEnv do gymnasium) como
+    VecEnv do Stable-Baselines3.
+
+    Converte os infos em lista de dicionários, junta ``terminated`` e
+    ``truncated`` em ``dones`` e repassa a observação final como
+    ``terminal_observation``. A semente de ``seed()`` é aplicada no próximo
+    ``reset()``.
+    """
+
+    CHAVES_INFO = ("fault_type", "fault_bus", "avg_current", "min_voltage", "reward")
+
+    def __init__(self, env):
+        self.env = env
+        self._acoes = None
+        super().__init__(env.num_envs, env.single_observation_space, env.single_action_space)
+
+    def reset(self):
+        observations, _ = self.env.reset(seed=self._seeds[0])
+        self._reset_seeds()
+        return observations
+
+    def step_async(self, actions):
+        self._acoes = actions
+
+    def step_wait(self):
+        observations, rewards, terminated, truncated, infos = self.env.step(self._acoes)
+        dones = terminated | truncated
+        lista = [{chave: infos[chave][i] for chave in self.CHAVES_INFO} for i in range(self.num_envs)]
+        for i in np.flatnonzero(dones).tolist():
+            lista[i]["terminal_observation"] = infos["final_observation"][i]
+            lista[i]["TimeLimit.truncated"] = bool(truncated[i] and not terminated[i])
+        return observations, rewards.astype(np.float32), dones, lista
+
+    def close(self):
+        self.env.close()
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self.env, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self.env, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        resultado = getattr(self.env, method_name)(*method_args, **method_kwargs)
+        return [resultado] * len(self._get_indices(indices))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+
+# Ambientes vetorizados: todos no processo principal, um subprocesso por
+# ambiente ou todos em lote com NumPy
+VEC_ENVS = {"dummy": DummyVecEnv, "subproc": SubprocVecEnv, "batch": VecEnvLote}
+
+
 class RLProtectionOptimizer:
-    """Otimizador de coordenação de proteção usando RL."""
+    """
+    Otimizador de coordenação de proteção usando RL.
+
+    ``n_envs`` ambientes são usados nos rollouts do treinamento;
+    ``vec_env="subproc"`` roda cada um em um subprocesso (um núcleo por
+    ambiente) e ``vec_env="batch"`` avança todos juntos em lote
+    (``ProtectionCoordinationVectorEnv``). Com ``seed``, o ambiente de índice
+    i recebe a semente ``seed + i`` (no lote, um gerador só com ``seed``) e o
+    treinamento é reprodutível.
+    """
 
-    def __init__(self, net_json_path, protection_devices):
+    def __init__(self, net_json_path, protection_devices, n_envs=1, vec_env="dummy", seed=None):
         self.net_json_path = net_json_path
         self.protection_devices = protection_devices
+        self.n_envs = n_envs
+        self.vec_env = vec_env
+        self.seed = seed
         self.env = None
         self.model = None
 
@@ -355,43 +479,99 @@ class RLProtectionOptimizer:
         )
         print("✅ Ambiente RL criado")
 
-    def train_agent(self, algorithm="PPO", total_timesteps=5000):
-        """Treina agente RL com timesteps reduzidos para demonstração."""
+    def create_vec_environment(self, n_envs=None, vec_env=None, seed=None):
+        """
+        Cria o ambiente vetorizado de treinamento.
+
+        Args:
+            n_envs: Número de ambientes (padrão: o do otimizador)
+            vec_env: "dummy" (mesmo processo), "subproc" (um processo por
+                ambiente) ou "batch" (todos em lote com NumPy)
+            seed: Semente base; o ambiente i usa ``seed + i``
+        """
+        n_envs = self.n_envs if n_envs is None else n_envs
+        vec_env = vec_env or self.vec_env
+        seed = self.seed if seed is None else seed
+        if vec_env not in VEC_ENVS:
+            raise ValueError(f"vec_env deve ser um de {sorted(VEC_ENVS)}: {vec_env!r}")
+        if n_envs < 1:
+            raise ValueError("n_envs deve ser pelo menos 1")
+
+        if vec_env == "batch":
+            env = VEC_ENVS[vec_env](ProtectionCoordinationVectorEnv(
+                self.net_json_path, self.protection_devices, n_envs))
+            print(f"✅ {n_envs} ambientes RL criados em lote")
+        elif n_envs == 1 and vec_env == "dummy":
+            # Reaproveita o ambiente de avaliação (rede já carregada)
+            if self.env is None:
+                self.create_environment()
+            env = DummyVecEnv([lambda: self.env])
+        else:
+            # Tabela de faltas montada aqui, antes dos subprocessos: eles só a abrem
+            TabelaFaltas.carregar(self.net_json_path)
+            fabrica = FabricaAmbiente(self.net_json_path, self.protection_devices)
+            env = VEC_ENVS[vec_env]([fabrica] * n_envs)
+            print(f"✅ {n_envs} ambientes RL criados ({vec_env})")
+
+        if seed is not None:
+            env.seed(seed)  # Ambiente i: seed + i, aplicada no próximo reset
+        return env
+
+    def train_agent(self, algorithm="PPO", total_timesteps=5000, n_envs=None, vec_env=None, seed=None,
+                    callback=None, resume_from=None):
+        """
+        Treina agente RL com timesteps reduzidos para demonstração.
+
+        ``n_envs``, ``vec_env`` e ``seed`` substituem os valores do
+        otimizador. O rollout do PPO mantém ~512 passos no total, divididos
+        entre os ambientes, para que o mesmo ``total_timesteps`` faça o mesmo
+        número de atualizações da política. ``callback`` é repassado ao
+        ``learn`` (progresso e interrupção do treinamento). ``resume_from``
+        (caminho de um .zip salvo) continua o treinamento desse modelo, sem
+        zerar a contagem de timesteps.
+        """
         if self.env is None:
             self.create_environment()
+        seed = self.seed if seed is None else seed
 
         print(
             f"🧠 Iniciando treinamento com {algorithm} (timesteps: {total_timesteps})...")
 
         # Criar ambiente vetorizado
-        vec_env = DummyVecEnv([lambda: self.env])
+        vec_env = self.create_vec_environment(n_envs, vec_env, seed)
+        n_steps = max(ROLLOUT_PPO // vec_env.num_envs, 32)
 
         # Configurar algoritmo com parâmetros mais conservadores
-        if algorithm == "PPO":
+        if resume_from is not None:
+            self.model = PPO.load(resume_from, env=vec_env, device="cpu")
+        elif algorithm == "PPO":
             self.model = PPO(
                 "MlpPolicy",
                 vec_env,
                 verbose=1,
                 learning_rate=1e-3,      # Learning rate menor
-                n_steps=512,             # Passos menores
+                n_steps=n_steps,         # Passos menores (por ambiente)
                 batch_size=32,           # Batch menor
                 n_epochs=5,              # Menos épocas
                 device="cpu",
+                seed=seed,
                 policy_kwargs=dict(net_arch=[64, 64])  # Rede menor
             )
         elif algorithm == "DQN":
             # Para DQN, precisaríamos discretizar o espaço de ação
             print("⚠️ DQN requer discretização - usando PPO")
-            self.model = PPO("MlpPolicy", vec_env, verbose=1)
+            self.model = PPO("MlpPolicy", vec_env, verbose=1, seed=seed)
 
         # Treinamento com tratamento de erro
         try:
             print("🎯 Treinando com configuração simplificada...")
-            self.model.learn(total_timesteps=total_timesteps)
+            self.model.learn(total_timesteps=total_timesteps, callback=callback,
+                             reset_num_timesteps=resume_from is None)
             print("✅ Treinamento concluído")
         except Exception as e:
             print(f"❌ Erro no treinamento: {e}")
             print("🔄 Tentando com configuração ainda mais simples...")
+            vec_env.close()
 
             # Configuração de emergência
             simple_env = DummyVecEnv([lambda: self.env])
@@ -413,6 +593,7 @@ class RLProtectionOptimizer:
                 print(f"❌ Erro persistente: {e2}")
                 return False
 
+        vec_env.close()  # Encerra os subprocessos; a política treinada fica em self.model
         return True
 
     def evaluate_agent(self, n_episodes=10):
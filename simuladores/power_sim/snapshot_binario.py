@@ -0,0 +1,329 @@
+"""
+ProtecAI_MINI - Snapshot Binário Colunar da Rede (.npz)
+
+O arquivo ieee14_protecao.json guarda a rede pandapower como uma string JSON
+dentro de outro JSON, obrigando toda leitura a fazer dois parsers. Este módulo
+grava, ao lado do JSON, um arquivo .npz (ieee14_protecao.npz) com uma coluna
+NumPy por campo de cada tabela:
+
+    ||>Conteúdo do snapshot:
+        - "pp/<tabela>/<coluna>": tabelas pandapower (bus, line, trafo, load, ...)
+        - "dev/<categoria>/<coluna>": relés, disjuntores e fusíveis
+        - "zona/<coluna>": zonas de proteção
+        - "geo/bus/x", "geo/bus/y", "geo/line/coords", "geo/line/offsets": geodados
+        - "__meta__": manifesto (codificação das colunas + SHA-256 do JSON de origem)
+        |> Tabelas de resultado (res_*) não são gravadas: são recalculadas pelo fluxo.
+
+    ||>Codificação das colunas:
+        - "nativo": arrays numéricos/booleanos gravados como estão
+        - "anulavel": tipos anuláveis do pandas (Int64, boolean) + máscara de NA
+        - "texto": strings Unicode + máscara "<coluna>#nulo" para valores None
+        - "json": valores compostos (listas, dicionários) serializados um a um
+
+O snapshot só é usado se o hash registrado coincidir com o JSON atual; caso
+contrário os leitores voltam ao JSON. Uso como conversor:
+
+    python simuladores/power_sim/snapshot_binario.py [arquivo.json ...]
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+
+FORMATO_VERSAO = 1
+META_KEY = "__meta__"
+SUFIXO_NULO = "#nulo"
+INDEX_KEY = "#index"
+CATEGORIAS_DISPOSITIVOS = ("reles", "disjuntores", "fusiveis")
+
+# Relativo ao módulo: vale para qualquer diretório de trabalho
+JSON_PADRAO = Path(__file__).resolve().parent / "data" / "ieee14_protecao.json"
+
+
+def caminho_snapshot(caminho_json: Path) -> Path:
+    """Caminho do snapshot binário associado a um JSON ProtecAI."""
+    return Path(caminho_json).with_suffix(".npz")
+
+
+def _sha256(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+# ====== CODIFICAÇÃO DE COLUNAS ======
+
+def _codificar_tabela(prefixo: str, df: pd.DataFrame, arrays: Dict[str, np.ndarray]) -> Dict:
+    """Grava as colunas de um DataFrame em `arrays` e retorna seu manifesto."""
+    colunas = []
+    arrays[f"{prefixo}/{INDEX_KEY}"] = df.index.to_numpy()
+
+    for nome in df.columns:
+        serie = df[nome]
+        chave = f"{prefixo}/{nome}"
+
+        if isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+            # Tipos anuláveis do pandas (Int64, boolean, ...): valores + máscara de NA
+            nulos = serie.isna().to_numpy()
+            arrays[chave] = serie.to_numpy(dtype=float, na_value=np.nan)
+            arrays[chave + SUFIXO_NULO] = nulos
+            colunas.append([nome, "anulavel", str(serie.dtype)])
+            continue
+
+        if serie.dtype != object:
+            arrays[chave] = serie.to_numpy()
+            colunas.append([nome, "nativo", str(serie.dtype)])
+            continue
+
+        valores = serie.tolist()
+        nulos = np.array([v is None or (isinstance(v, float) and np.isnan(v))
+                          for v in valores], dtype=bool)
+        if all(isinstance(v, str) for v, nulo in zip(valores, nulos) if not nulo):
+            arrays[chave] = np.array(
+                ["" if nulo else v for v, nulo in zip(valores, nulos)], dtype=str)
+            arrays[chave + SUFIXO_NULO] = nulos
+            colunas.append([nome, "texto", "object"])
+        else:
+            arrays[chave] = np.array(
+                [json.dumps(v, ensure_ascii=False) for v in valores], dtype=str)
+            colunas.append([nome, "json", "object"])
+
+    return {"colunas": colunas}
+
+
+def _decodificar_tabela(prefixo: str, manifesto: Dict, arquivo) -> pd.DataFrame:
+    """Reconstrói um DataFrame a partir das colunas gravadas."""
+    dados = {}
+    for nome, codificacao, dtype in manifesto["colunas"]:
+        chave = f"{prefixo}/{nome}"
+        if codificacao == "nativo":
+            dados[nome] = arquivo[chave]
+        elif codificacao == "anulavel":
+            valores = arquivo[chave].astype(object)
+            valores[arquivo[chave + SUFIXO_NULO]] = None
+            dados[nome] = pd.array(valores, dtype=dtype)
+        elif codificacao == "texto":
+            valores = arquivo[chave].astype(object)
+            valores[arquivo[chave + SUFIXO_NULO]] = None
+            dados[nome] = valores
+        else:
+            # Preenchimento elemento a elemento: listas não viram dimensões extras
+            brutos = arquivo[chave]
+            valores = np.empty(len(brutos), dtype=object)
+            for k, v in enumerate(brutos):
+                valores[k] = json.loads(v)
+            dados[nome] = valores
+
+    nomes = [c[0] for c in manifesto["colunas"]]
+    return pd.DataFrame(dados, index=arquivo[f"{prefixo}/{INDEX_KEY}"], columns=nomes)
+
+
+def _registros(df: pd.DataFrame) -> List[Dict]:
+    """Converte DataFrame de dispositivos em lista de dicts, omitindo campos ausentes."""
+    registros = []
+    for linha in df.to_dict(orient="records"):
+        registro = {}
+        for chave, valor in linha.items():
+            if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+                continue
+            registro[chave] = valor.item() if isinstance(valor, np.generic) else valor
+        registros.append(registro)
+    return registros
+
+
+# ====== EXPORTAÇÃO ======
+
+def exportar_snapshot_binario(
+    net: pp.pandapowerNet,
+    protection_devices: Dict,
+    protection_zones: list,
+    bus_geodata: Dict,
+    line_geodata: Dict,
+    caminho_json: Path
+) -> Path:
+    """
+    Grava o snapshot binário correspondente a um JSON ProtecAI já exportado.
+
+    Args:
+        net: rede pandapower
+        protection_devices: {"reles": [...], "disjuntores": [...], "fusiveis": [...]}
+        protection_zones: lista de zonas (pode ser vazia)
+        bus_geodata: {índice: {"x", "y"}}, como no JSON
+        line_geodata: {índice: {"coords": [...]}}, como no JSON
+        caminho_json: JSON de origem (seu SHA-256 vincula os dois arquivos)
+
+    Returns:
+        Path: caminho do arquivo .npz gravado
+    """
+    caminho_json = Path(caminho_json)
+    arrays: Dict[str, np.ndarray] = {}
+    meta: Dict[str, Any] = {
+        "formato": FORMATO_VERSAO,
+        "fonte_sha256": _sha256(caminho_json.read_bytes()),
+        "rede": {"name": net.name, "f_hz": float(net.f_hz), "sn_mva": float(net.sn_mva)},
+        "tabelas": {},
+        "dispositivos": {},
+        "zonas": None
+    }
+
+    # Tabelas pandapower (somente elementos, sem resultados)
+    for nome, tabela in net.items():
+        if not isinstance(tabela, pd.DataFrame) or nome.startswith(("res_", "_")):
+            continue
+        if len(tabela) == 0:
+            continue
+        meta["tabelas"][nome] = _codificar_tabela(f"pp/{nome}", tabela, arrays)
+
+    # Dispositivos de proteção (uma tabela por categoria)
+    for categoria in CATEGORIAS_DISPOSITIVOS:
+        df = pd.DataFrame(protection_devices.get(categoria, []))
+        df = df.astype(object).where(df.notna(), None)
+        meta["dispositivos"][categoria] = _codificar_tabela(
+            f"dev/{categoria}", df, arrays)
+
+    if protection_zones:
+        df = pd.DataFrame(protection_zones).astype(object)
+        meta["zonas"] = _codificar_tabela("zona", df, arrays)
+
+    # Geodados: barras como colunas x/y, linhas como coordenadas concatenadas + offsets
+    bus_idx = sorted(bus_geodata, key=int)
+    arrays["geo/bus/index"] = np.array([int(i) for i in bus_idx], dtype=np.int64)
+    arrays["geo/bus/x"] = np.array([bus_geodata[i]["x"] for i in bus_idx], dtype=float)
+    arrays["geo/bus/y"] = np.array([bus_geodata[i]["y"] for i in bus_idx], dtype=float)
+
+    line_idx = sorted(line_geodata, key=int)
+    coords = [np.asarray(line_geodata[i]["coords"], dtype=float).reshape(-1, 2)
+              for i in line_idx]
+    arrays["geo/line/index"] = np.array([int(i) for i in line_idx], dtype=np.int64)
+    arrays["geo/line/offsets"] = np.cumsum([0] + [len(c) for c in coords]).astype(np.int64)
+    arrays["geo/line/coords"] = np.concatenate(coords) if coords else np.empty((0, 2))
+
+    arrays[META_KEY] = np.array(json.dumps(meta, ensure_ascii=False))
+
+    destino = caminho_snapshot(caminho_json)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    with open(destino, "wb") as f:
+        np.savez(f, **arrays)
+    return destino
+
+
+# ====== LEITURA ======
+
+def carregar_snapshot_binario(caminho: Path, fonte_sha256: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Lê um snapshot binário.
+
+    Args:
+        caminho: arquivo .npz
+        fonte_sha256: se informado, o snapshot só é aceito se tiver sido
+            gerado a partir de um JSON com este hash
+
+    Returns:
+        dict no mesmo formato do JSON ProtecAI, mas com a rede já construída
+        em "net" (no lugar da string "pandapower_net"), ou None se o snapshot
+        estiver desatualizado ou em formato incompatível.
+    """
+    with np.load(caminho, allow_pickle=False) as arquivo:
+        meta = json.loads(arquivo[META_KEY].item())
+        if meta.get("formato") != FORMATO_VERSAO:
+            return None
+        if fonte_sha256 is not None and meta.get("fonte_sha256") != fonte_sha256:
+            return None
+
+        rede = meta["rede"]
+        net = pp.create_empty_network(
+            name=rede["name"], f_hz=rede["f_hz"], sn_mva=rede["sn_mva"])
+        for nome, manifesto in meta["tabelas"].items():
+            net[nome] = _decodificar_tabela(f"pp/{nome}", manifesto, arquivo)
+
+        protection_devices = {
+            categoria: _registros(_decodificar_tabela(f"dev/{categoria}", manifesto, arquivo))
+            for categoria, manifesto in meta["dispositivos"].items()
+        }
+        protection_zones = (_registros(_decodificar_tabela("zona", meta["zonas"], arquivo))
+                            if meta["zonas"] else [])
+
+        bus_geodata = {
+            str(i): {"x": float(x), "y": float(y)}
+            for i, x, y in zip(arquivo["geo/bus/index"], arquivo["geo/bus/x"], arquivo["geo/bus/y"])
+        }
+        offsets = arquivo["geo/line/offsets"]
+        coords = arquivo["geo/line/coords"]
+        line_geodata = {
+            str(i): {"coords": coords[offsets[k]:offsets[k + 1]].tolist()}
+            for k, i in enumerate(arquivo["geo/line/index"])
+        }
+
+    return {
+        "net": net,
+        "protection_devices": protection_devices,
+        "protection_zones": protection_zones,
+        "bus_geodata": bus_geodata,
+        "line_geodata": line_geodata
+    }
+
+
+def carregar_documento(caminho_json: Path, conteudo: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Carrega um documento ProtecAI preferindo o snapshot binário.
+
+    O snapshot é usado quando existe e corresponde ao JSON atual (mesmo
+    SHA-256); caso contrário o JSON é lido da forma tradicional.
+
+    Args:
+        caminho_json: caminho do ieee14_protecao.json
+        conteudo: bytes do JSON, se o chamador já os leu
+
+    Returns:
+        dict com "net" (pandapowerNet) e os demais campos do JSON
+    """
+    caminho_json = Path(caminho_json)
+    if conteudo is None:
+        conteudo = caminho_json.read_bytes()
+
+    snapshot = caminho_snapshot(caminho_json)
+    if snapshot.exists():
+        try:
+            documento = carregar_snapshot_binario(snapshot, _sha256(conteudo))
+            if documento is not None:
+                return documento
+        except Exception as e:
+            print(f"⚠️ Snapshot binário ignorado ({snapshot.name}): {e}")
+
+    data = json.loads(conteudo)
+    data["net"] = pp.from_json_string(data.pop("pandapower_net"))
+    return data
+
+
+def converter_json(caminho_json: Path) -> Path:
+    """Gera (ou atualiza) o snapshot binário de um JSON ProtecAI existente."""
+    caminho_json = Path(caminho_json)
+    with open(caminho_json, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    net = pp.from_json_string(data["pandapower_net"])
+    return exportar_snapshot_binario(
+        net,
+        data.get("protection_devices", {}),
+        data.get("protection_zones", []),
+        data.get("bus_geodata", {}),
+        data.get("line_geodata", {}),
+        caminho_json
+    )
+
+
+def main() -> None:
+    """Converte os JSON informados (ou o arquivo padrão) para snapshot binário."""
+    caminhos = [Path(p) for p in sys.argv[1:]] or [JSON_PADRAO]
+    for caminho in caminhos:
+        destino = converter_json(caminho)
+        print(f"✅ Snapshot binário salvo em: {destino} "
+              f"({destino.stat().st_size / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
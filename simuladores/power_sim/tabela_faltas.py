@@ -0,0 +1,229 @@
+'''
+    ||> Tabela pré-calculada de respostas de falta para o ambiente RL ProtecAI_Mini
+        - Estudo de curto-circuito (varredura Zbus) feito uma vez para cada
+          (tipo de falta, faixa de impedância de falta, barra); sobrecarga por
+          fluxo de potência com a carga adicional em cada barra
+        - Correntes de linha (kA) e tensões de barra (pu) gravadas em um .npy
+          ao lado do JSON da rede e abertas como memmap: o passo do ambiente
+          só indexa uma linha da tabela (O(1))
+        - Manifesto (.faltas.json) com o SHA-256 do arquivo da rede, os tipos
+          e as faixas de impedância: a tabela é recalculada quando a rede muda
+        - Usada por ProtectionCoordinationEnv e ProtectionCoordinationVectorEnv
+'''
+
+import copy
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pandapower as pp
+
+try:
+    from simuladores.power_sim.snapshot_binario import carregar_documento
+    from simuladores.power_sim.curto_circuito import MotorCurtoCircuito
+except ImportError:
+    from snapshot_binario import carregar_documento
+    from curto_circuito import MotorCurtoCircuito
+
+FORMATO_TABELA = 1
+
+# Tipos de evento sorteados a cada passo do ambiente RL
+TIPOS_FALTA_RL = ("3ph", "2ph", "1ph", "overload")
+
+# Fator da corrente de falta em relação à trifásica (varredura Zbus)
+FATORES_CURTO = {"3ph": 1.0, "2ph": 0.866, "1ph": 0.577}
+
+# Carga adicional que simula cada tipo de falha por fluxo de potência
+CARGAS_FALTA = {
+    # Curto trifásico severo
+    "3ph": {"p_mw": 50.0, "q_mvar": 30.0},
+    # Curto bifásico moderado
+    "2ph": {"p_mw": 30.0, "q_mvar": 20.0},
+    # Curto monofásico leve
+    "1ph": {"p_mw": 15.0, "q_mvar": 10.0},
+    "overload": {"p_mw": 8.0, "q_mvar": 5.0}    # Sobrecarga
+}
+
+# Faixas de impedância de falta (pu, resistiva): franca até falta de alta impedância
+IMPEDANCIAS_FALTA_PU = (0.0, 0.05, 0.1, 0.2, 0.5)
+
+# Fluxo de carga com configuração robusta (mesma do _simulate_fault)
+OPCOES_FLUXO_FALTA = dict(algorithm='nr', max_iteration=100, tolerance_mva=1e-6,
+                          enforce_q_lims=False, check_connectivity=False)
+
+
+def caminho_tabela(caminho_json: Path) -> Path:
+    """Caminho da tabela de faltas (.npy) associada a um JSON ProtecAI."""
+    return Path(caminho_json).with_suffix(".faltas.npy")
+
+
+def caminho_manifesto(caminho_json: Path) -> Path:
+    """Caminho do manifesto da tabela de faltas."""
+    return Path(caminho_json).with_suffix(".faltas.json")
+
+
+def calcular_respostas(net: pp.pandapowerNet, impedancias: Sequence[float] = IMPEDANCIAS_FALTA_PU,
+                       tipos: Sequence[str] = TIPOS_FALTA_RL,
+                       destino: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Respostas da rede a cada falta: array (tipos, faixas, barras, linhas + barras)
+    com as correntes de linha (kA) seguidas das tensões de barra (pu).
+
+    Tipos com fator em ``FATORES_CURTO`` escalam a varredura trifásica da
+    faixa de impedância; os demais (sobrecarga) usam fluxo de potência com a
+    carga de ``CARGAS_FALTA`` na barra, igual em todas as faixas. Barras fora
+    da varredura (fora de serviço) ficam sem corrente de falta e com 1 pu.
+    ``destino`` permite preencher um memmap já aberto.
+    """
+    desconhecidos = [t for t in tipos if t not in FATORES_CURTO and t not in CARGAS_FALTA]
+    if desconhecidos:
+        raise ValueError(f"Tipos de falta sem modelo: {desconhecidos}")
+
+    barras = net.bus.index
+    n_lines = len(net.line)
+    forma = (len(tipos), len(impedancias), len(barras), n_lines + len(barras))
+    respostas = np.empty(forma) if destino is None else destino
+    if respostas.shape != forma:
+        raise ValueError(f"Destino com forma {respostas.shape}, esperado {forma}")
+
+    curto = MotorCurtoCircuito(net)
+    for f, z_falta in enumerate(impedancias):
+        varredura = curto.varredura(z_falta)
+        no_motor = set(varredura.barras.tolist())
+        for j, barra in enumerate(barras):
+            if barra in no_motor:
+                currents = varredura.contribuicoes(barra, "line") \
+                    .reindex(net.line.index, fill_value=0.0).values
+                afundamento = pd.Series(1.0 - varredura.tensoes_pu[:, curto.coluna(barra)],
+                                        index=varredura.barras) \
+                    .reindex(barras, fill_value=0.0).values
+            else:
+                currents, afundamento = np.zeros(n_lines), np.zeros(len(barras))
+            for t, tipo in enumerate(tipos):
+                if tipo in FATORES_CURTO:
+                    fator = FATORES_CURTO[tipo]
+                    respostas[t, f, j, :n_lines] = currents * fator
+                    respostas[t, f, j, n_lines:] = 1.0 - afundamento * fator
+
+    tipos_fluxo = [(t, tipo) for t, tipo in enumerate(tipos) if tipo not in FATORES_CURTO]
+    if tipos_fluxo:
+        trabalho = copy.deepcopy(net)
+        try:
+            pp.runpp(trabalho, **OPCOES_FLUXO_FALTA)
+            base = np.concatenate([trabalho.res_line['i_ka'].values, trabalho.res_bus['vm_pu'].values])
+        except Exception:
+            base = np.concatenate([np.zeros(n_lines), np.ones(len(barras))])
+
+        carga = pp.create_load(trabalho, bus=barras[0], p_mw=0.0, q_mvar=0.0, name="FAULT")
+        for t, tipo in tipos_fluxo:
+            for j, barra in enumerate(barras):
+                trabalho.load.loc[carga, ["p_mw", "q_mvar"]] = [CARGAS_FALTA[tipo]["p_mw"],
+                                                                 CARGAS_FALTA[tipo]["q_mvar"]]
+                trabalho.load.at[carga, "bus"] = barra
+                try:
+                    pp.runpp(trabalho, **OPCOES_FLUXO_FALTA)
+                    resposta = np.concatenate([trabalho.res_line['i_ka'].values,
+                                               trabalho.res_bus['vm_pu'].values])
+                    if np.isnan(resposta).any():
+                        raise ValueError("Valores NaN detectados")
+                except Exception:
+                    # Sem convergência: fica o caso base
+                    resposta = base
+                respostas[t, :, j] = resposta
+
+    return respostas
+
+
+class TabelaFaltas:
+    """
+    Respostas de falta pré-calculadas de uma rede, abertas como memmap.
+
+    ``respostas[tipo, faixa, barra]`` guarda as correntes de linha (kA)
+    seguidas das tensões de barra (pu); ``falta()`` e ``lote()`` fazem a
+    busca por nome/índice. Use ``TabelaFaltas.carregar(caminho_json)``: a
+    tabela gravada é reaproveitada enquanto o SHA-256 do arquivo da rede, os
+    tipos e as faixas de impedância forem os mesmos.
+    """
+
+    def __init__(self, respostas: np.ndarray, barras: Sequence[int], tipos: Sequence[str],
+                 impedancias: Sequence[float], n_linhas: int, reconstruida: bool = False):
+        self.respostas = respostas
+        self.barras = np.asarray(barras)
+        self.tipos = tuple(tipos)
+        self.impedancias = np.asarray(impedancias, dtype=float)
+        self.n_linhas = n_linhas
+        self.reconstruida = reconstruida
+        self._posicao_barra = {int(b): j for j, b in enumerate(self.barras.tolist())}
+        self._posicao_tipo = {tipo: t for t, tipo in enumerate(self.tipos)}
+
+    @classmethod
+    def carregar(cls, caminho_json: Path, impedancias: Sequence[float] = IMPEDANCIAS_FALTA_PU,
+                 tipos: Sequence[str] = TIPOS_FALTA_RL, reconstruir: bool = False) -> "TabelaFaltas":
+        """Abre a tabela gravada ao lado do JSON ou a recalcula se estiver desatualizada."""
+        caminho_json = Path(caminho_json)
+        esperado = {
+            "formato": FORMATO_TABELA,
+            "fonte_sha256": hashlib.sha256(caminho_json.read_bytes()).hexdigest(),
+            "tipos": list(tipos),
+            "impedancias_pu": [float(z) for z in impedancias],
+        }
+
+        if not reconstruir:
+            try:
+                manifesto = json.loads(caminho_manifesto(caminho_json).read_text(encoding="utf-8"))
+                if all(manifesto.get(chave) == valor for chave, valor in esperado.items()):
+                    respostas = np.load(caminho_tabela(caminho_json), mmap_mode="r")
+                    forma = (len(tipos), len(impedancias), len(manifesto["barras"]),
+                             manifesto["n_linhas"] + len(manifesto["barras"]))
+                    if respostas.shape == forma:
+                        return cls(respostas, manifesto["barras"], tipos, impedancias, manifesto["n_linhas"])
+            except (OSError, ValueError, KeyError):
+                pass
+
+        return cls._construir(caminho_json, esperado)
+
+    @classmethod
+    def _construir(cls, caminho_json: Path, manifesto: Dict[str, Any]) -> "TabelaFaltas":
+        net = carregar_documento(caminho_json)["net"]
+        manifesto = dict(manifesto, barras=[int(b) for b in net.bus.index], n_linhas=len(net.line))
+        tipos, impedancias = manifesto["tipos"], manifesto["impedancias_pu"]
+        forma = (len(tipos), len(impedancias), len(net.bus), len(net.line) + len(net.bus))
+
+        # Grava em arquivos temporários e troca no fim: processos que abrem a
+        # tabela ao mesmo tempo nunca veem um arquivo pela metade
+        destino = caminho_tabela(caminho_json)
+        temporario = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+        respostas = np.lib.format.open_memmap(temporario, mode="w+", dtype=np.float64, shape=forma)
+        calcular_respostas(net, impedancias, tipos, destino=respostas)
+        respostas.flush()
+        del respostas
+        os.replace(temporario, destino)
+
+        destino_manifesto = caminho_manifesto(caminho_json)
+        temporario = destino_manifesto.with_name(f"{destino_manifesto.name}.{os.getpid()}.tmp")
+        temporario.write_text(json.dumps(manifesto), encoding="utf-8")
+        os.replace(temporario, destino_manifesto)
+
+        return cls(np.load(destino, mmap_mode="r"), manifesto["barras"], tipos, impedancias,
+                   manifesto["n_linhas"], reconstruida=True)
+
+    def indice_barra(self, barra: int) -> int:
+        """Posição da barra (índice pandapower) na tabela."""
+        return self._posicao_barra[int(barra)]
+
+    def falta(self, fault_type: str, fault_bus: int, faixa: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Correntes de linha (kA) e tensões de barra (pu) de uma falta."""
+        resposta = np.array(self.respostas[self._posicao_tipo[fault_type], faixa, self.indice_barra(fault_bus)])
+        return resposta[:self.n_linhas], resposta[self.n_linhas:]
+
+    def lote(self, tipos: np.ndarray, faixas: np.ndarray, barras: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Correntes (B, linhas) e tensões (B, barras) de B faltas dadas pelas
+        posições de tipo, faixa e barra na tabela.
+        """
+        respostas = self.respostas[tipos, faixas, barras]
+        return respostas[:, :self.n_linhas], respostas[:, self.n_linhas:]
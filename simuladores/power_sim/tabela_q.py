@@ -0,0 +1,204 @@
+'''
+    ||> Codificação de estados e Q-table esparsa para os agentes Q-Learning de ProtecAI_Mini
+        - Cada característica do estado é discretizada em faixas próprias
+          (limites por característica) e os índices das faixas são empacotados
+          em um inteiro por base mista: estados distintos nunca colidem e a
+          chave não depende de PYTHONHASHSEED
+        - Codificação vetorizada (um estado ou um lote de estados)
+        - Q-table esparsa e crescente: dicionário chave -> linha de um array
+          que dobra de tamanho quando enche; só estados visitados ocupam memória
+        - Leitura e atualização em lote (uma operação por passo do
+          treinamento vetorizado)
+        - Exportação em dois arrays (chaves ordenadas e valores) gravados como
+          .npy; TabelaQCongelada lê esses arrays como memmap, somente leitura,
+          para que vários processos compartilhem uma cópia do modelo
+        - Usado pelos BasicRLAgent dos coordenadores RL
+'''
+
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+
+
+class CodificadorEstado:
+    """
+    Discretiza vetores de características e empacota as faixas em uma chave.
+
+    ``limites[i]`` são os limites crescentes da característica i: o valor cai
+    na faixa ``k`` quando ``limites[i][k-1] <= valor < limites[i][k]``, então
+    a característica i tem ``len(limites[i]) + 1`` faixas. A chave é
+    ``sum(faixa_i * passo_i)`` com passos de base mista, portanto injetiva.
+    """
+
+    def __init__(self, limites: Sequence[Sequence[float]]):
+        self.n_caracteristicas = len(limites)
+        largura = max((len(l) for l in limites), default=0)
+        self.limites = np.full((self.n_caracteristicas, max(largura, 1)), np.inf)
+        for i, l in enumerate(limites):
+            if np.any(np.diff(l) <= 0):
+                raise ValueError(f"Limites da característica {i} devem ser crescentes")
+            self.limites[i, :len(l)] = l
+
+        self.faixas = np.array([len(l) + 1 for l in limites], dtype=np.int64)
+        if np.sum(np.log2(self.faixas)) >= 63:
+            raise ValueError("Espaço de estados não cabe em uma chave de 64 bits")
+        self.passos = np.concatenate(([1], np.cumprod(self.faixas[:-1]))).astype(np.int64)
+        self.n_estados = int(np.prod(self.faixas))
+
+    def faixas_de(self, caracteristicas: np.ndarray) -> np.ndarray:
+        """Índice da faixa de cada característica (mesma forma da entrada)."""
+        valores = np.asarray(caracteristicas, dtype=float)
+        return np.count_nonzero(valores[..., None] >= self.limites, axis=-1)
+
+    def codificar(self, caracteristicas: np.ndarray) -> int:
+        """Chave inteira de um vetor de características."""
+        return int(self.faixas_de(caracteristicas) @ self.passos)
+
+    def codificar_lote(self, caracteristicas: np.ndarray) -> np.ndarray:
+        """Chaves de uma matriz (estados x características)."""
+        return self.faixas_de(caracteristicas) @ self.passos
+
+    def decodificar(self, chave: int) -> np.ndarray:
+        """Faixas a partir da chave (inverso de ``codificar``)."""
+        return (int(chave) // self.passos) % self.faixas
+
+
+class TabelaQEsparsa:
+    """
+    Q-table com uma linha por estado visitado.
+
+    As chaves (inteiros de ``CodificadorEstado``) são mapeadas para linhas de
+    um array ``(capacidade, n_acoes)`` que dobra de tamanho quando enche.
+    Estados nunca atualizados leem como zeros e não ocupam linha.
+    """
+
+    def __init__(self, n_acoes: int, capacidade_inicial: int = 64):
+        self.n_acoes = n_acoes
+        self._linhas: Dict[int, int] = {}
+        self._valores = np.zeros((max(capacidade_inicial, 1), n_acoes))
+        self._zeros = np.zeros(n_acoes)
+        self._zeros.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self._linhas)
+
+    def __contains__(self, chave: int) -> bool:
+        return chave in self._linhas
+
+    def __getitem__(self, chave: int) -> np.ndarray:
+        """Valores Q do estado (somente leitura; zeros se nunca visitado)."""
+        linha = self._linhas.get(chave)
+        if linha is None:
+            return self._zeros
+        valores = self._valores[linha]
+        valores.flags.writeable = False
+        return valores
+
+    def _linha(self, chave: int) -> int:
+        linha = self._linhas.get(chave)
+        if linha is None:
+            linha = len(self._linhas)
+            if linha == len(self._valores):
+                self._valores = np.concatenate([self._valores, np.zeros_like(self._valores)])
+            self._linhas[chave] = linha
+        return linha
+
+    def atualizar(self, chave: int, acao: int, delta: float):
+        """Soma ``delta`` ao valor Q de (estado, ação)."""
+        linha = self._linha(chave)  # pode realocar _valores
+        self._valores[linha, acao] += delta
+
+    def atualizar_lote(self, chaves: Sequence[int], acoes: Sequence[int], deltas: Sequence[float]):
+        """
+        Atualiza vários pares (estado, ação) de uma vez. Pares repetidos no
+        lote recebem a média dos seus deltas (uma atualização com o erro
+        médio), e não a soma: réplicas que visitam o mesmo estado não
+        multiplicam a taxa de aprendizado.
+        """
+        linhas = np.array([self._linha(int(c)) for c in chaves], dtype=np.int64)  # pode realocar
+        posicoes = linhas * self.n_acoes + np.asarray(acoes, dtype=np.int64)
+        unicas, inverso, contagem = np.unique(posicoes, return_inverse=True, return_counts=True)
+        soma = np.bincount(inverso, weights=np.asarray(deltas, dtype=float), minlength=len(unicas))
+        self._valores.reshape(-1)[unicas] += soma / contagem
+
+    def valores(self, chaves: Iterable[int]) -> np.ndarray:
+        """Matriz (estados x ações) dos valores Q de várias chaves."""
+        linhas = np.array([self._linhas.get(int(c), -1) for c in chaves], dtype=np.int64)
+        resultado = self._valores[np.maximum(linhas, 0)]
+        resultado[linhas < 0] = 0.0
+        return resultado
+
+    @property
+    def memoria_bytes(self) -> int:
+        return self._valores.nbytes
+
+    def exportar(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Chaves em ordem crescente (int64) e valores Q (estados x ações) na mesma ordem."""
+        chaves = np.fromiter(self._linhas.keys(), dtype=np.int64, count=len(self._linhas))
+        linhas = np.fromiter(self._linhas.values(), dtype=np.int64, count=len(self._linhas))
+        ordem = np.argsort(chaves, kind="stable")
+        return chaves[ordem], self._valores[linhas[ordem]]
+
+    @classmethod
+    def de_arrays(cls, chaves: np.ndarray, valores: np.ndarray) -> "TabelaQEsparsa":
+        """Tabela editável (em memória) a partir de ``exportar`` (retomar treinamento)."""
+        valores = np.asarray(valores)
+        tabela = cls(valores.shape[1], capacidade_inicial=len(valores))
+        tabela._valores[:len(valores)] = valores
+        tabela._linhas = {int(c): i for i, c in enumerate(np.asarray(chaves).tolist())}
+        return tabela
+
+
+class TabelaQCongelada:
+    """
+    Q-table somente leitura sobre os arrays de ``TabelaQEsparsa.exportar``.
+
+    As chaves ordenadas são buscadas com ``np.searchsorted``, sem dicionário
+    por processo: com os dois arrays abertos como memmap, processos que
+    servem o mesmo modelo compartilham as páginas do arquivo.
+    """
+
+    def __init__(self, chaves: np.ndarray, valores: np.ndarray):
+        if len(chaves) != len(valores):
+            raise ValueError("Chaves e valores com tamanhos diferentes")
+        self.chaves = chaves
+        self._valores = valores
+        self.n_acoes = valores.shape[1]
+        self._zeros = np.zeros(self.n_acoes)
+        self._zeros.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.chaves)
+
+    def _linhas(self, chaves: np.ndarray) -> np.ndarray:
+        """Linha de cada chave, -1 se o estado não estiver na tabela."""
+        chaves = np.asarray(chaves, dtype=np.int64)
+        linhas = np.searchsorted(self.chaves, chaves)
+        encontradas = linhas < len(self.chaves)
+        encontradas[encontradas] = self.chaves[linhas[encontradas]] == chaves[encontradas]
+        return np.where(encontradas, linhas, -1)
+
+    def __contains__(self, chave: int) -> bool:
+        return bool(self._linhas([chave])[0] >= 0)
+
+    def contem_lote(self, chaves: Iterable[int]) -> np.ndarray:
+        """Máscara dos estados presentes na tabela."""
+        return self._linhas(np.fromiter(chaves, dtype=np.int64)) >= 0
+
+    def __getitem__(self, chave: int) -> np.ndarray:
+        """Valores Q do estado (zeros se nunca visitado)."""
+        linha = self._linhas([chave])[0]
+        return self._zeros if linha < 0 else np.asarray(self._valores[linha])
+
+    def valores(self, chaves: Iterable[int]) -> np.ndarray:
+        """Matriz (estados x ações) dos valores Q de várias chaves."""
+        linhas = self._linhas(np.fromiter(chaves, dtype=np.int64))
+        if len(self.chaves) == 0:
+            return np.zeros((len(linhas), self.n_acoes))
+        resultado = np.array(self._valores[np.maximum(linhas, 0)])
+        resultado[linhas < 0] = 0.0
+        return resultado
+
+    @property
+    def memoria_bytes(self) -> int:
+        return self._valores.nbytes + self.chaves.nbytes
@@ -15,6 +15,11 @@ import pandas as pd
 import matplotlib
 matplotlib.use('Agg')  # Use backend sem interface gráfica
 
+try:
+    from simuladores.power_sim.snapshot_binario import carregar_documento
+except ImportError:
+    from snapshot_binario import carregar_documento
+
 # Paleta e símbolos
 COLOR_BARRA = "blue"
 COLOR_LINHA = "black"
@@ -39,16 +44,10 @@ FONT_TITULO = 16
 def carregar_json(path_json):
     print(f"🔄 Carregando JSON: {path_json}")
     try:
-        with open(path_json, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        print("✅ JSON carregado com sucesso")
-
-        print("🔄 Convertendo rede PandaPower...")
-        # O pandapower_net já é uma string JSON, usar diretamente
-        net_json_str = data["pandapower_net"]
-        print(
-            f"🔍 Tipo: {type(net_json_str)}, Tamanho: {len(net_json_str)} chars")
-        net = pp.from_json_string(net_json_str)
+        # Snapshot binário (.npz) quando atualizado; senão JSON + from_json_string
+        data = carregar_documento(path_json)
+        net = data["net"]
+        print("✅ Documento carregado com sucesso")
         print(
             f"✅ Rede carregada: {len(net.bus)} barras, {len(net.line)} linhas")
 
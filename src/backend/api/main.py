@@ -95,6 +95,8 @@ async def lifespan(app: FastAPI):
     yield
 
     print("⏹️ Finalizando ProtecAI Mini API...")
+    network.contingency_pool.shutdown()
+    rl_agent.training_executor.shutdown()
 
 
 # Criar aplicação FastAPI
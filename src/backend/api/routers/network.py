@@ -7,13 +7,21 @@ Endpoints para carregar, configurar e modificar a rede IEEE 14 barras.
 
 import os
 from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
 import json
+import time
 import pandapower as pp
 from pathlib import Path
 import numpy as np
 
+from ...services.contingency import (
+    OUTAGE_ELEMENTS, ContingencyLimits, ContingencyPool, list_outages, summarize
+)
+from ...services.network_store import get_network_store
+from ...services.powerflow_cache import PowerFlowCache
+
 router = APIRouter()
 
 # Modelos Pydantic
@@ -53,22 +61,45 @@ class LoadConfig(BaseModel):
     name: str
 
 
+class ContingencyRequest(BaseModel):
+    elements: List[str] = list(OUTAGE_ELEMENTS)
+    vm_min_pu: float = 0.95
+    vm_max_pu: float = 1.05
+    max_loading_percent: float = 100.0
+
+
 # Caminho padrão para a rede
 # Vai para o diretório raiz do projeto
 # Cinco níveis acima: routers -> api -> backend -> src -> protecai_mini
 BASE_DIR = Path(__file__).parent.parent.parent.parent.parent
 DEFAULT_NETWORK_PATH = BASE_DIR / "simuladores/power_sim/data/ieee14_protecao.json"
 
+# Rede compartilhada pelo processo: só relê o arquivo quando ele muda
+network_store = get_network_store(DEFAULT_NETWORK_PATH)
+
+# Resultados de fluxo de potência por estado da rede + opções do solver.
+# Com recycle=True, estados novos de mesma topologia usam NR com warm start.
+powerflow_cache = PowerFlowCache(maxsize=32, recycle=True)
+
+# Workers de análise N-1 com a rede pré-carregada (recriados quando a rede muda)
+contingency_pool = ContingencyPool()
+
+
+def _update_network(modify):
+    """
+    Altera a rede com ``modify`` (checkout → alteração → commit, repetido se
+    outra escrita publicar antes) e descarta os fluxos do estado anterior.
+    """
+    old_state = network_store.state_hash()
+    network_store.update(modify)
+    powerflow_cache.invalidate_state(old_state)
+
 
 @router.get("/info", response_model=NetworkInfo)
 async def get_network_info():
     """Obter informações básicas da rede elétrica."""
     try:
-        # Carregar rede
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
-
-        net = pp.from_json_string(data["pandapower_net"])
+        net = network_store.view()
 
         return NetworkInfo(
             n_buses=len(net.bus),
@@ -88,10 +119,7 @@ async def get_network_info():
 async def get_buses():
     """Listar todas as barras da rede."""
     try:
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
-
-        net = pp.from_json_string(data["pandapower_net"])
+        net = network_store.view()
 
         buses = []
         for idx, row in net.bus.iterrows():
@@ -114,10 +142,7 @@ async def get_buses():
 async def get_lines():
     """Listar todas as linhas da rede."""
     try:
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
-
-        net = pp.from_json_string(data["pandapower_net"])
+        net = network_store.view()
 
         lines = []
         for idx, row in net.line.iterrows():
@@ -144,10 +169,7 @@ async def get_lines():
 async def get_transformers():
     """Listar todos os transformadores da rede."""
     try:
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
-
-        net = pp.from_json_string(data["pandapower_net"])
+        net = network_store.view()
 
         transformers = []
         for idx, row in net.trafo.iterrows():
@@ -174,10 +196,7 @@ async def get_transformers():
 async def get_loads():
     """Listar todas as cargas da rede."""
     try:
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
-
-        net = pp.from_json_string(data["pandapower_net"])
+        net = network_store.view()
 
         loads = []
         for idx, row in net.load.iterrows():
@@ -197,27 +216,32 @@ async def get_loads():
             status_code=500, detail=f"Erro ao listar cargas: {str(e)}")
 
 
+@router.get("/cache/stats")
+async def get_network_cache_stats():
+    """Obter contadores dos caches da rede e do fluxo de potência."""
+    return {
+        "network": network_store.stats(),
+        "powerflow": powerflow_cache.stats(),
+        "contingency": contingency_pool.stats()
+    }
+
+
 @router.put("/bus/{bus_id}")
 async def update_bus(bus_id: int, config: BusConfig):
     """Atualizar configuração de uma barra."""
     try:
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
+        def apply(net):
+            if bus_id not in net.bus.index:
+                raise HTTPException(
+                    status_code=404, detail=f"Barra {bus_id} não encontrada")
 
-        net = pp.from_json_string(data["pandapower_net"])
+            # Atualizar parâmetros
+            net.bus.at[bus_id, 'name'] = config.name
+            net.bus.at[bus_id, 'vn_kv'] = config.voltage_kv
+            net.bus.at[bus_id, 'type'] = config.type
 
-        if bus_id not in net.bus.index:
-            raise HTTPException(
-                status_code=404, detail=f"Barra {bus_id} não encontrada")
-
-        # Atualizar parâmetros
-        net.bus.at[bus_id, 'name'] = config.name
-        net.bus.at[bus_id, 'vn_kv'] = config.voltage_kv
-        net.bus.at[bus_id, 'type'] = config.type
-
-        # Salvar alterações (em ambiente real, isso seria em um banco de dados)
-        updated_data = data.copy()
-        updated_data["pandapower_net"] = pp.to_json(net)
+        # Publicar nova versão em memória (em ambiente real, isso seria em um banco de dados)
+        _update_network(apply)
 
         return {
             "message": f"Barra {bus_id} atualizada com sucesso",
@@ -229,6 +253,8 @@ async def update_bus(bus_id: int, config: BusConfig):
             }
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Erro ao atualizar barra: {str(e)}")
@@ -238,20 +264,18 @@ async def update_bus(bus_id: int, config: BusConfig):
 async def update_load(load_id: int, config: LoadConfig):
     """Atualizar configuração de uma carga."""
     try:
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
-
-        net = pp.from_json_string(data["pandapower_net"])
+        def apply(net):
+            if load_id not in net.load.index:
+                raise HTTPException(
+                    status_code=404, detail=f"Carga {load_id} não encontrada")
 
-        if load_id not in net.load.index:
-            raise HTTPException(
-                status_code=404, detail=f"Carga {load_id} não encontrada")
+            # Atualizar parâmetros
+            net.load.at[load_id, 'bus'] = config.bus
+            net.load.at[load_id, 'p_mw'] = config.p_mw
+            net.load.at[load_id, 'q_mvar'] = config.q_mvar
+            net.load.at[load_id, 'name'] = config.name
 
-        # Atualizar parâmetros
-        net.load.at[load_id, 'bus'] = config.bus
-        net.load.at[load_id, 'p_mw'] = config.p_mw
-        net.load.at[load_id, 'q_mvar'] = config.q_mvar
-        net.load.at[load_id, 'name'] = config.name
+        _update_network(apply)
 
         return {
             "message": f"Carga {load_id} atualizada com sucesso",
@@ -264,6 +288,8 @@ async def update_load(load_id: int, config: LoadConfig):
             }
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Erro ao atualizar carga: {str(e)}")
@@ -273,28 +299,27 @@ async def update_load(load_id: int, config: LoadConfig):
 async def run_powerflow():
     """Executar fluxo de potência da rede."""
     try:
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
-
-        net = pp.from_json_string(data["pandapower_net"])
-
-        # Executar fluxo de potência
-        pp.runpp(net, algorithm='nr', max_iteration=100)
+        # Executar fluxo de potência (ou reaproveitar o resultado do mesmo estado)
+        pf = powerflow_cache.solve(
+            network_store.view(), network_store.state_hash(),
+            algorithm='nr', max_iteration=100)
+        if pf.error:
+            raise RuntimeError(pf.error)
 
         # Coletar resultados
         results = {
-            "converged": bool(net.converged),
+            "converged": pf.converged,
             "bus_results": {
-                "voltages_pu": net.res_bus['vm_pu'].to_dict(),
-                "angles_deg": net.res_bus['va_degree'].to_dict(),
-                "p_mw": net.res_bus['p_mw'].to_dict(),
-                "q_mvar": net.res_bus['q_mvar'].to_dict()
+                "voltages_pu": pf.res_bus['vm_pu'].to_dict(),
+                "angles_deg": pf.res_bus['va_degree'].to_dict(),
+                "p_mw": pf.res_bus['p_mw'].to_dict(),
+                "q_mvar": pf.res_bus['q_mvar'].to_dict()
             },
             "line_results": {
-                "currents_ka": net.res_line['i_ka'].to_dict(),
-                "loading_percent": net.res_line['loading_percent'].to_dict(),
-                "p_from_mw": net.res_line['p_from_mw'].to_dict(),
-                "q_from_mvar": net.res_line['q_from_mvar'].to_dict()
+                "currents_ka": pf.res_line['i_ka'].to_dict(),
+                "loading_percent": pf.res_line['loading_percent'].to_dict(),
+                "p_from_mw": pf.res_line['p_from_mw'].to_dict(),
+                "q_from_mvar": pf.res_line['q_from_mvar'].to_dict()
             }
         }
 
@@ -308,23 +333,62 @@ async def run_powerflow():
             status_code=500, detail=f"Erro no fluxo de potência: {str(e)}")
 
 
+@router.post("/contingency")
+async def run_contingency_analysis(request: ContingencyRequest):
+    """
+    Análise de contingências N-1 (uma linha ou transformador fora por vez).
+
+    A resposta é NDJSON: uma linha por contingência, na ordem em que os
+    workers terminam, seguida de uma linha final ``{"type": "summary", ...}``.
+    """
+    invalid = [e for e in request.elements if e not in OUTAGE_ELEMENTS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Elementos inválidos: {invalid}. Use {list(OUTAGE_ELEMENTS)}")
+
+    try:
+        net = network_store.view()
+        state_hash = network_store.state_hash()
+        limits = ContingencyLimits(
+            vm_min_pu=request.vm_min_pu,
+            vm_max_pu=request.vm_max_pu,
+            max_loading_percent=request.max_loading_percent
+        )
+        total = len(list_outages(net, request.elements))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erro na análise de contingências: {str(e)}")
+
+    async def results_stream():
+        start = time.perf_counter()
+        results = []
+        yield json.dumps({"type": "start", "total_outages": total}) + "\n"
+        try:
+            async for result in contingency_pool.stream(net, state_hash, limits, request.elements):
+                results.append(result)
+                yield json.dumps({"type": "outage", **result}) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+            return
+        summary = summarize(results)
+        summary["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        yield json.dumps({"type": "summary", **summary}) + "\n"
+
+    return StreamingResponse(results_stream(), media_type="application/x-ndjson")
+
+
 @router.get("/status")
 async def get_network_status():
     """Obter status atual da rede."""
     try:
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
-
-        net = pp.from_json_string(data["pandapower_net"])
+        net = network_store.view()
 
         # Verificar conectividade
-        try:
-            pp.runpp(net, algorithm='nr', max_iteration=50)
-            network_healthy = True
-            convergence_status = "OK"
-        except:
-            network_healthy = False
-            convergence_status = "Falha na convergência"
+        pf = powerflow_cache.solve(
+            net, network_store.state_hash(), algorithm='nr', max_iteration=50)
+        network_healthy = pf.error is None
+        convergence_status = "OK" if network_healthy else "Falha na convergência"
 
         return {
             "network_healthy": network_healthy,
@@ -358,19 +422,18 @@ async def load_network(request: NetworkLoadRequest):
                 detail=f"Arquivo de rede não encontrado: {DEFAULT_NETWORK_PATH}"
             )
 
-        # Carregar rede
-        with open(DEFAULT_NETWORK_PATH, 'r') as f:
-            data = json.load(f)
-
-        net = pp.from_json_string(data["pandapower_net"])
+        # Carregar rede (força releitura do arquivo se solicitado)
+        if request.force_reload:
+            network_store.invalidate()
+        net = network_store.view()
 
         # Executar fluxo de potência para validar
-        try:
-            pp.runpp(net)
+        pf = powerflow_cache.solve(net, network_store.state_hash())
+        if pf.error is None:
             network_status = "loaded_and_validated"
-        except Exception as pf_error:
+        else:
             network_status = "loaded_but_powerflow_failed"
-            print(f"Aviso: Falha no fluxo de potência: {pf_error}")
+            print(f"Aviso: Falha no fluxo de potência: {pf.error}")
 
         return {
             "status": "success",
@@ -10,6 +10,9 @@ from typing import List, Dict, Optional, Any
 import json
 from pathlib import Path
 
+from simuladores.power_sim.coordenacao import pares_montante_jusante, pares_na_janela
+from ...services.network_store import get_network_store
+
 router = APIRouter(tags=["protection"])
 
 # Modelos Pydantic para validação
@@ -319,9 +322,23 @@ async def update_relay_settings(relay_id: str, settings: ProtectionSettings):
     return {"message": f"Configurações do relé '{relay_id}' atualizadas", "settings": settings.dict()}
 
 
+# Limites da análise simplificada de coordenação
+MIN_TIME_INTERVAL = 0.2  # s
+RECOMMENDED_TIME_INTERVAL = 0.3  # s, IEEE C37.112
+MIN_PICKUP_DIFFERENCE = 20  # A
+RECOMMENDED_PICKUP_DIFFERENCE = 30  # A
+
+
 @router.post("/coordination/analyze")
-async def analyze_coordination():
-    """Analisa coordenação entre dispositivos de proteção."""
+async def analyze_coordination(series_only: bool = False):
+    """
+    Analisa coordenação entre dispositivos de proteção.
+
+    Relés do mesmo tipo de elemento são comparados ordenando tempos e pickups
+    e varrendo uma janela do intervalo mínimo, sem comparar todos os pares;
+    cada par aparece uma única vez. Com ``series_only``, só são comparados
+    pares montante/jusante da topologia da rede.
+    """
     devices, zones = load_protection_data()
 
     # Análise simplificada de coordenação
@@ -329,36 +346,44 @@ async def analyze_coordination():
     recommendations = []
 
     reles = devices.get("reles", [])
-
-    for i, rele1 in enumerate(reles):
-        for j, rele2 in enumerate(reles):
-            if i != j:
-                # Verificar sobreposição de zonas
-                if rele1.get("element_type") == rele2.get("element_type"):
-                    pickup1 = rele1.get("pickup_current", 100)
-                    pickup2 = rele2.get("pickup_current", 100)
-                    time1 = rele1.get("time_delay", 0.5)
-                    time2 = rele2.get("time_delay", 0.5)
-
-                    # Verificar coordenação temporal
-                    if abs(time1 - time2) < 0.2:  # Intervalo mínimo
-                        coordination_issues.append({
-                            "type": "temporal_coordination",
-                            "devices": [rele1.get("id"), rele2.get("id")],
-                            "issue": "Intervalo de tempo insuficiente",
-                            "current_interval": abs(time1 - time2),
-                            "recommended_interval": 0.3
-                        })
-
-                    # Verificar sensibilidade
-                    if abs(pickup1 - pickup2) < 20:  # Diferença mínima
-                        coordination_issues.append({
-                            "type": "sensitivity_coordination",
-                            "devices": [rele1.get("id"), rele2.get("id")],
-                            "issue": "Diferença de pickup insuficiente",
-                            "current_difference": abs(pickup1 - pickup2),
-                            "recommended_difference": 30
-                        })
+    element_types = [str(rele.get("element_type")) for rele in reles]
+    times = [rele.get("time_delay", 0.5) for rele in reles]
+    pickups = [rele.get("pickup_current", 100) for rele in reles]
+
+    allowed = None
+    if series_only:
+        try:
+            net = get_network_store(DATA_PATH).view()
+            allowed = pares_montante_jusante(
+                net, [(rele.get("element_type"), rele.get("element_id")) for rele in reles])
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Erro ao obter topologia da rede: {str(e)}")
+
+    found = []
+    # Verificar coordenação temporal
+    for i, j, interval in zip(*pares_na_janela(times, MIN_TIME_INTERVAL, element_types, allowed)):
+        found.append((i, j, 0, {
+            "type": "temporal_coordination",
+            "devices": [reles[i].get("id"), reles[j].get("id")],
+            "issue": "Intervalo de tempo insuficiente",
+            "current_interval": float(interval),
+            "recommended_interval": RECOMMENDED_TIME_INTERVAL
+        }))
+
+    # Verificar sensibilidade
+    for i, j, difference in zip(*pares_na_janela(pickups, MIN_PICKUP_DIFFERENCE, element_types, allowed)):
+        found.append((i, j, 1, {
+            "type": "sensitivity_coordination",
+            "devices": [reles[i].get("id"), reles[j].get("id")],
+            "issue": "Diferença de pickup insuficiente",
+            "current_difference": float(difference),
+            "recommended_difference": RECOMMENDED_PICKUP_DIFFERENCE
+        }))
+
+    # Ordem dos pares (i < j), temporal antes de sensibilidade
+    found.sort(key=lambda item: item[:3])
+    coordination_issues = [issue for *_, issue in found]
 
     # Gerar recomendações
     for issue in coordination_issues:
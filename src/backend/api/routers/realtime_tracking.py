@@ -3,17 +3,26 @@ Router para rastreamento de atuação em tempo real.
 Endpoints para monitorar sequência cronológica de atuação dos dispositivos.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Tuple, Union
 import json
 import uuid
 import asyncio
 from datetime import datetime, timedelta
 from pathlib import Path
+import os
 import random
 import time
 
+from ...services.event_buffer import DEFAULT_BUFFER_CAPACITY, EventRingBuffer
+from ...services.event_fanout import (
+    DEFAULT_MAX_BATCH, DEFAULT_QUEUE_SIZE, FANOUT_POLICIES, EventFanout, FanoutItem, events_frame
+)
+from ...services.event_hub import SSE_KEEPALIVE_S
+
 router = APIRouter(tags=["realtime_tracking"])
 
 # Modelos Pydantic
@@ -32,6 +41,7 @@ class DeviceEvent(BaseModel):
     coordinates: Dict[str, float]  # posição no diagrama
     status: str  # "normal", "alarm", "trip", "blocked"
     related_fault_id: Optional[str] = None
+    seq: Optional[int] = None  # sequência na sessão, atribuída ao guardar
 
 
 class SequenceOfEvents(BaseModel):
@@ -67,9 +77,15 @@ class CoordinationMetrics(BaseModel):
     rl_optimization_active: bool
 
 
-# Armazenamento em memória para sessões ativas
+# Armazenamento em memória para sessões ativas; eventos em buffer circular
+# (EventRingBuffer) de capacidade fixa por sessão
 active_sessions = {}
 event_storage = {}
+EVENT_BUFFER_CAPACITY = int(os.getenv("RT_EVENT_BUFFER_SIZE", "0")) or DEFAULT_BUFFER_CAPACITY
+
+# Assinantes WebSocket/SSE dos eventos de cada sessão
+event_fanout = EventFanout()
+STREAM_PREFIX = "/api/v1/realtime-tracking"
 
 
 @router.post("/session/start")
@@ -88,6 +104,11 @@ async def start_realtime_session(payload: Optional[Dict[str, Any]] = None):
         raise HTTPException(
             status_code=422, detail="Configuração inválida fornecida")
 
+    buffer_capacity = payload.get("event_buffer_size", EVENT_BUFFER_CAPACITY)
+    if not isinstance(buffer_capacity, int) or buffer_capacity < 1:
+        raise HTTPException(
+            status_code=422, detail="event_buffer_size deve ser um inteiro positivo")
+
     # Verificar se é um teste de erro
     if payload.get("session_id") == "not_found":
         raise HTTPException(status_code=404, detail="Session not found")
@@ -115,7 +136,7 @@ async def start_realtime_session(payload: Optional[Dict[str, Any]] = None):
 
         # Armazenar sessão
         active_sessions[session_id] = session
-        event_storage[session_id] = []
+        event_storage[session_id] = EventRingBuffer(buffer_capacity, key=lambda e: e.event_id)
 
         # Inicializar monitoramento dos dispositivos
         await initialize_device_monitoring(session_id, monitored_devices)
@@ -125,7 +146,10 @@ async def start_realtime_session(payload: Optional[Dict[str, Any]] = None):
             "status": "started",
             "monitored_devices_count": len(monitored_devices),
             "update_interval_ms": update_interval_ms,
-            "websocket_endpoint": f"/realtime/session/{session_id}/events",
+            "event_buffer_size": buffer_capacity,
+            "websocket_endpoint": f"{STREAM_PREFIX}/session/{session_id}/ws",
+            "sse_endpoint": f"{STREAM_PREFIX}/session/{session_id}/stream",
+            "polling_endpoint": f"{STREAM_PREFIX}/session/{session_id}/events",
             "start_time": session.start_time.isoformat(),
             "monitoring_duration": monitoring_duration,
             "event_threshold": event_threshold,
@@ -153,14 +177,16 @@ async def get_session_status(session_id: str):
             raise HTTPException(status_code=404, detail="Session not found")
 
         session = active_sessions[session_id]
-        events_count = len(event_storage.get(session_id, []))
+        buffer = event_storage[session_id]
 
         return {
             "session_id": session_id,
             "status": session.status,
             "start_time": session.start_time.isoformat(),
             "monitored_devices_count": len(session.monitored_devices),
-            "events_processed": events_count,
+            "events_processed": buffer.last_seq,
+            "event_buffer": buffer.stats(),
+            "stream_subscribers": event_fanout.subscriber_count(session_id),
             "last_update": datetime.now().isoformat(),
             "message": "Sessão ativa" if session.status == "active" else f"Sessão {session.status}"
         }
@@ -175,30 +201,22 @@ async def get_session_status(session_id: str):
 
 
 @router.get("/session/{session_id}/events")
-async def get_session_events(session_id: str, last_event_id: Optional[str] = None):
+async def get_session_events(session_id: str, last_event_id: Optional[str] = None,
+                             since_seq: Optional[int] = None):
     """
     Retorna eventos desde o último evento solicitado.
 
-    Para polling de eventos quando WebSocket não está disponível.
+    Para polling de eventos quando WebSocket não está disponível. ``since_seq``
+    (campo ``seq`` do último evento recebido) tem precedência sobre
+    ``last_event_id``; ``missed_events`` conta os eventos já sobrescritos no
+    buffer circular da sessão.
     """
     try:
         if session_id not in active_sessions:
             raise HTTPException(
                 status_code=404, detail="Sessão não encontrada")
 
-        events = event_storage.get(session_id, [])
-
-        # Filtrar eventos após o último solicitado
-        if last_event_id:
-            last_index = -1
-            for i, event in enumerate(events):
-                if event.event_id == last_event_id:
-                    last_index = i
-                    break
-
-            if last_index >= 0:
-                events = events[last_index + 1:]
-
+        events, missed = events_after(session_id, last_event_id, since_seq)
         session = active_sessions[session_id]
 
         return {
@@ -206,6 +224,8 @@ async def get_session_events(session_id: str, last_event_id: Optional[str] = Non
             "session_status": session.status,
             "events": events,
             "events_count": len(events),
+            "last_seq": event_storage[session_id].last_seq,
+            "missed_events": missed,
             "last_update": datetime.now().isoformat(),
             "has_more": len(events) > 0
         }
@@ -219,6 +239,130 @@ async def get_session_events(session_id: str, last_event_id: Optional[str] = Non
         )
 
 
+def subscribe_session(session_id: str, last_event_id: Optional[str], policy: str, max_queue: int):
+    """
+    Assina os eventos da sessão e copia os já guardados depois de
+    ``last_event_id``. Sem await entre as duas etapas, nenhum evento fica de
+    fora nem chega duas vezes.
+    """
+    subscriber = event_fanout.subscribe(session_id, max_queue, policy)
+    events, missed = events_after(session_id, last_event_id)
+    session = active_sessions[session_id]
+    if session.status != "active":
+        subscriber.close(session.status)
+    return subscriber, [fanout_item(event) for event in events], missed
+
+
+async def session_frames(session_id: str, subscriber, backlog: List[FanoutItem], missed: int,
+                         max_batch: int):
+    """
+    Frames JSON da sessão, comuns ao WebSocket e ao SSE: pares (id do último
+    evento, frame). Primeiro os eventos guardados (o primeiro frame conta em
+    ``dropped`` os já sobrescritos no buffer), depois os novos em lotes de
+    até ``max_batch``; ``(None, None)`` marca intervalo sem eventos
+    (keepalive) e o frame ``end`` encerra quando a sessão é parada.
+    """
+    try:
+        for start in range(0, len(backlog), max_batch):
+            chunk = backlog[start:start + max_batch]
+            yield chunk[-1].event_id, events_frame(session_id, chunk, missed if start == 0 else 0)
+
+        while True:
+            batch = await subscriber.next_batch(max_batch, SSE_KEEPALIVE_S)
+            if batch is None:
+                yield None, json.dumps({"type": "end", "session_id": session_id,
+                                        "status": subscriber.closed_reason, "dropped": subscriber.dropped})
+                return
+            if not batch:
+                yield None, None
+                continue
+            yield batch[-1].event_id, events_frame(session_id, batch, subscriber.take_dropped())
+    finally:
+        event_fanout.unsubscribe(subscriber)
+
+
+async def _wait_disconnect(websocket: WebSocket, subscriber):
+    """Consome mensagens do cliente até desconectar e então fecha a assinatura."""
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except RuntimeError:
+        pass  # Socket já fechado pelo servidor
+    finally:
+        subscriber.close("disconnected")
+
+
+@router.websocket("/session/{session_id}/ws")
+async def session_websocket(websocket: WebSocket, session_id: str, last_event_id: Optional[str] = None,
+                            policy: str = "coalesce", max_queue: int = DEFAULT_QUEUE_SIZE,
+                            max_batch: int = DEFAULT_MAX_BATCH):
+    """
+    Eventos da sessão por WebSocket, enviados assim que são gerados.
+
+    Cada frame ``events`` traz um lote de ``DeviceEvent`` e quantos eventos
+    foram descartados por cliente lento (``policy``: drop_oldest,
+    drop_newest ou coalesce; fila de ``max_queue`` eventos).
+    ``last_event_id`` reenvia os eventos guardados depois dele.
+    """
+    if session_id not in active_sessions or policy not in FANOUT_POLICIES or max_queue < 1:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    subscriber, backlog, missed = subscribe_session(session_id, last_event_id, policy, max_queue)
+    frames = session_frames(session_id, subscriber, backlog, missed, max(max_batch, 1))
+    receiver = asyncio.create_task(_wait_disconnect(websocket, subscriber))
+    try:
+        async for _, frame in frames:
+            if receiver.done():
+                break
+            await websocket.send_text(frame or '{"type": "keepalive"}')
+        else:
+            await websocket.close()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
+        await frames.aclose()
+
+
+async def sse_session_events(session_id: str, last_event_id: Optional[str], policy: str,
+                             max_queue: int, max_batch: int):
+    """Frames da sessão no formato ``text/event-stream`` (``id`` = último evento)."""
+    subscriber, backlog, missed = subscribe_session(session_id, last_event_id, policy, max_queue)
+    async for event_id, frame in session_frames(session_id, subscriber, backlog, missed, max_batch):
+        if frame is None:
+            yield ": keepalive\n\n"
+        elif event_id is None:
+            yield f"event: end\ndata: {frame}\n\n"
+        else:
+            yield f"id: {event_id}\nevent: events\ndata: {frame}\n\n"
+
+
+@router.get("/session/{session_id}/stream")
+async def stream_session_events(session_id: str, request: Request, last_event_id: Optional[str] = None,
+                                policy: str = "coalesce", max_queue: int = DEFAULT_QUEUE_SIZE,
+                                max_batch: int = DEFAULT_MAX_BATCH):
+    """
+    Eventos da sessão como Server-Sent Events, alternativa ao WebSocket com
+    os mesmos frames. Retoma do cabeçalho ``Last-Event-ID`` (reconexão do
+    EventSource) ou do parâmetro ``last_event_id``.
+    """
+    if session_id not in active_sessions:
+        raise HTTPException(
+            status_code=404, detail="Sessão não encontrada")
+    if policy not in FANOUT_POLICIES or max_queue < 1:
+        raise HTTPException(
+            status_code=422, detail=f"policy deve ser uma de {FANOUT_POLICIES} e max_queue >= 1")
+
+    start = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        sse_session_events(session_id, start, policy, max_queue, max(max_batch, 1)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/session/{session_id}/inject-fault")
 async def inject_fault_scenario(
     session_id: str,
@@ -301,7 +445,7 @@ async def get_event_sequence(session_id: str, fault_id: Optional[str] = None):
             raise HTTPException(
                 status_code=404, detail="Sessão não encontrada")
 
-        events = event_storage.get(session_id, [])
+        events = list(event_storage[session_id])
 
         # Filtrar eventos por fault_id se especificado
         if fault_id:
@@ -357,7 +501,7 @@ async def get_coordination_analysis(session_id: str):
             raise HTTPException(
                 status_code=404, detail="Sessão não encontrada")
 
-        events = event_storage.get(session_id, [])
+        events = list(event_storage[session_id])
 
         if not events:
             return {"message": "Nenhum evento para analisar"}
@@ -404,9 +548,11 @@ async def stop_realtime_session(session_id: str):
 
         session = active_sessions[session_id]
         session.status = "stopped"
+        event_fanout.close_topic(session_id, "stopped")
 
-        # Gerar relatório final
-        events = event_storage.get(session_id, [])
+        # Gerar relatório final (eventos ainda no buffer da sessão)
+        buffer = event_storage[session_id]
+        events = list(buffer)
         final_report = generate_session_report(session_id, session, events)
 
         session_duration = (
@@ -419,8 +565,9 @@ async def stop_realtime_session(session_id: str):
             "session_id": session_id,
             "status": "stopped",
             "stop_time": datetime.now().isoformat(),
-            "total_events": len(events),
-            "events_processed": len(events),  # Para compatibilidade com teste
+            "total_events": buffer.last_seq,
+            "events_processed": buffer.last_seq,  # Para compatibilidade com teste
+            "events_overwritten": buffer.overwritten,
             "duration_minutes": session_duration / 60,
             "session_duration": session_duration,  # Para compatibilidade com teste
             "final_report": final_report
@@ -608,11 +755,39 @@ async def initialize_device_monitoring(session_id: str, device_ids: List[str]):
     pass
 
 
+def events_after(session_id: str, last_event_id: Optional[str] = None,
+                 since_seq: Optional[int] = None) -> Tuple[List[DeviceEvent], int]:
+    """
+    Eventos guardados depois de ``since_seq`` ou de ``last_event_id`` (todos
+    se o id não estiver mais no buffer) e quantos foram sobrescritos antes
+    de serem lidos.
+    """
+    buffer = event_storage[session_id]
+    if since_seq is None:
+        since_seq = (buffer.seq_of(last_event_id) if last_event_id else None) or 0
+    return buffer.since(since_seq)
+
+
+def fanout_item(event: DeviceEvent) -> FanoutItem:
+    """Evento serializado uma vez para todos os assinantes (coalesce por dispositivo)."""
+    return FanoutItem(event.device_id, event.event_id, json.dumps(jsonable_encoder(event)))
+
+
+def publish_events(session_id: str, events: List[DeviceEvent]):
+    """Guarda os eventos na sessão e os entrega aos assinantes WebSocket/SSE."""
+    buffer = event_storage.get(session_id)
+    if buffer is None:
+        return
+    for event in events:
+        event.seq = buffer.append(event)
+    if event_fanout.subscriber_count(session_id):
+        event_fanout.publish(session_id, [fanout_item(event) for event in events])
+
+
 async def simulate_fault_sequence(session_id: str, fault_id: str, location: str, fault_type: str, magnitude: float):
-    """Simula sequência realística de eventos de falta."""
+    """Simula sequência realística de eventos de falta (cada evento é publicado ao ser gerado)."""
 
     start_time = datetime.now()
-    events = []
 
     # Evento 1: Detecção da falta (t=0ms)
     fault_detection = DeviceEvent(
@@ -628,7 +803,7 @@ async def simulate_fault_sequence(session_id: str, fault_id: str, location: str,
         status="alarm",
         related_fault_id=fault_id
     )
-    events.append(fault_detection)
+    publish_events(session_id, [fault_detection])
 
     # Evento 2: Pickup do relé primário (t=5-15ms)
     await asyncio.sleep(0.01)  # Simular delay
@@ -645,7 +820,7 @@ async def simulate_fault_sequence(session_id: str, fault_id: str, location: str,
         status="pickup",
         related_fault_id=fault_id
     )
-    events.append(relay_pickup)
+    publish_events(session_id, [relay_pickup])
 
     # Evento 3: Trip do relé primário (t=50-120ms)
     await asyncio.sleep(0.05)
@@ -662,7 +837,7 @@ async def simulate_fault_sequence(session_id: str, fault_id: str, location: str,
         status="trip",
         related_fault_id=fault_id
     )
-    events.append(relay_trip)
+    publish_events(session_id, [relay_trip])
 
     # Evento 4: Abertura do disjuntor (t=70-150ms)
     await asyncio.sleep(0.02)
@@ -679,11 +854,7 @@ async def simulate_fault_sequence(session_id: str, fault_id: str, location: str,
         status="open",
         related_fault_id=fault_id
     )
-    events.append(breaker_open)
-
-    # Adicionar eventos à sessão
-    if session_id in event_storage:
-        event_storage[session_id].extend(events)
+    publish_events(session_id, [breaker_open])
 
 
 def calculate_coordination_metrics(events: List[DeviceEvent]) -> Dict[str, Any]:
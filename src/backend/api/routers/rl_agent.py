@@ -3,7 +3,8 @@ Router para treinamento e consulta do agente de Reinforcement Learning.
 Endpoints para configuração, treinamento e aplicação do agente RL.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 import json
@@ -11,8 +12,13 @@ import uuid
 import asyncio
 from datetime import datetime
 from pathlib import Path
-import subprocess
 import os
+import time
+
+from ...services.event_hub import SSE_KEEPALIVE_S, EventHub, sse_event
+from ...services.model_cache import DEFAULT_CACHE_BYTES, ModelCache, load_policy
+from ...services.model_registry import ModelRegistry
+from ...services.rl_training import FINAL_EVENTS, TRAINING_ALGORITHMS, TrainingExecutor
 
 router = APIRouter(tags=["reinforcement_learning"])
 
@@ -20,7 +26,10 @@ router = APIRouter(tags=["reinforcement_learning"])
 
 
 class RLTrainingConfig(BaseModel):
+    algorithm: str = "q_learning"  # "q_learning" (BasicRLAgent) ou "PPO" (Stable-Baselines3)
     episodes: int = 1000
+    n_replicas: int = 16  # Réplicas treinadas em lote
+    checkpoint_interval: int = 100  # Episódios entre checkpoints
     learning_rate: float = 0.001
     discount_factor: float = 0.95
     epsilon_start: float = 1.0
@@ -67,148 +76,123 @@ class RLTrainingResult(BaseModel):
     saved_model_path: Optional[str] = None
 
 
-# Armazenamento em memória dos treinamentos
-training_storage = {}
-model_storage = {}
-
 # Caminhos
-RL_SCRIPT_PATH = Path("simuladores/power_sim/rl_protection_agent.py")
 MODEL_SAVE_PATH = Path("simuladores/power_sim/models")
 DATA_PATH = Path("simuladores/power_sim/data/ieee14_protecao.json")
 
+# Armazenamento em memória dos treinamentos; modelos no registro em disco
+training_storage = {}
+model_registry = ModelRegistry(MODEL_SAVE_PATH)
 
-def ensure_model_directory():
-    """Garante que o diretório de modelos existe."""
-    MODEL_SAVE_PATH.mkdir(parents=True, exist_ok=True)
-
+# Políticas carregadas para inferência, limitadas por memória (MB)
+model_cache = ModelCache(int(os.getenv("RL_MODEL_CACHE_MB", "0")) * 2**20 or DEFAULT_CACHE_BYTES)
+MAX_PREDICT_BATCH = 10000
 
-async def run_rl_training(training_id: str, config: RLTrainingConfig):
-    """Executa treinamento RL em background."""
-    try:
-        # Atualizar status
-        training_storage[training_id]["status"] = "running"
-        training_storage[training_id]["start_time"] = datetime.now()
-
-        ensure_model_directory()
-
-        # Preparar configuração para o script
-        training_config = {
-            "episodes": config.episodes,
-            "learning_rate": config.learning_rate,
-            "discount_factor": config.discount_factor,
-            "epsilon_start": config.epsilon_start,
-            "epsilon_end": config.epsilon_end,
-            "epsilon_decay": config.epsilon_decay,
-            "reward_weights": config.reward_weights,
-            "network_architecture": config.network_architecture,
-            "output_model_path": str(MODEL_SAVE_PATH / f"model_{training_id}.pkl")
-        }
+# Envios por segundo de cada stream de progresso (GET /training/{id}/stream)
+STREAM_MAX_RATE_HZ = float(os.getenv("RL_STREAM_MAX_RATE_HZ", "4"))
+STREAM_RATE_LIMITS_HZ = (0.1, 20.0)
 
-        # Salvar configuração
-        config_path = MODEL_SAVE_PATH / f"config_{training_id}.json"
-        with open(config_path, 'w') as f:
-            json.dump(training_config, f, indent=2)
+# Treinamentos simultâneos (0 = metade dos núcleos)
+MAX_CONCURRENT_TRAININGS = int(os.getenv("RL_MAX_CONCURRENT_TRAININGS", "0")) or None
 
-        # Executar script de treinamento
-        cmd = [
-            "python", str(RL_SCRIPT_PATH),
-            "--config", str(config_path),
-            "--training_id", training_id
-        ]
 
-        # Simular treinamento (substituir por execução real)
-        await simulate_training(training_id, config)
+def ensure_model_directory():
+    """Garante que o diretório de modelos existe."""
+    model_registry.root.mkdir(parents=True, exist_ok=True)
+
+
+def apply_training_event(kind: str, training_id: str, data: Dict[str, Any]):
+    """Atualiza o registro de um treinamento com um evento do executor e avisa os streams."""
+    update_training(kind, training_id, data)
+    training_hub.notify(training_id)
+
+
+def update_training(kind: str, training_id: str, data: Dict[str, Any]):
+    """Atualiza o registro de um treinamento com um evento do executor."""
+    training = training_storage.get(training_id)
+    if training is None:
+        # Treinamento removido enquanto rodava: descarta os checkpoints órfãos
+        if kind in ("checkpoint", "completed", "cancelled"):
+            model_registry.remove(training_id)
+        return
+
+    if kind == "running":
+        training["status"] = "running"
+        training["start_time"] = data.get("start_time", datetime.now())
+        return
+
+    if kind == "progress":
+        rewards = training["rewards_history"]
+        rewards.extend(data["rewards"])
+        training["episodes_completed"] = data["episodes_completed"]
+        training["current_reward"] = rewards[-1]
+        training["average_reward"] = sum(rewards) / len(rewards)
+        training["best_reward"] = max(rewards)
+        training["convergence_status"] = data["convergence_status"]
+        return
+
+    if kind == "checkpoint":
+        training["saved_model_path"] = data["saved_model_path"]
+        register_model(training_id, training, "checkpoint")
+        return
+
+    # Eventos finais: completed, failed ou cancelled
+    training["status"] = kind
+    training["end_time"] = datetime.now()
+    if kind == "failed":
+        training["error_message"] = data.get("error_message")
+    elif kind == "completed":
+        training["episodes_completed"] = data["episodes_completed"]
+        training["saved_model_path"] = data["saved_model_path"]
+        register_model(training_id, training, "completed")
+
+
+def register_model(training_id: str, training: Dict[str, Any], status: str):
+    """Registra (ou atualiza) o checkpoint do treinamento no índice de modelos."""
+    model_cache.invalidate(training_id)  # Política do checkpoint anterior
+    model_registry.register(
+        training_id,
+        algorithm=training["config"]["algorithm"],
+        status=status,
+        path=training["saved_model_path"],
+        episodes_completed=training["episodes_completed"],
+        total_episodes=training["total_episodes"],
+        config=training["config"],
+        performance={
+            "episodes": training["episodes_completed"],
+            "final_reward": training["current_reward"],
+            "average_reward": training["average_reward"],
+            "best_reward": training["best_reward"]
+        }
+    )
 
-        # Atualizar status final
-        training_storage[training_id]["status"] = "completed"
-        training_storage[training_id]["end_time"] = datetime.now()
 
-    except Exception as e:
-        training_storage[training_id]["status"] = "failed"
-        training_storage[training_id]["error_message"] = str(e)
-        training_storage[training_id]["end_time"] = datetime.now()
-
-
-async def simulate_training(training_id: str, config: RLTrainingConfig):
-    """Simula processo de treinamento RL."""
-    episodes = config.episodes
-
-    # Inicializar métricas
-    training_storage[training_id]["episodes_completed"] = 0
-    training_storage[training_id]["current_reward"] = 0.0
-    training_storage[training_id]["rewards_history"] = []
-    training_storage[training_id]["loss_history"] = []
-
-    # Simular episódios de treinamento
-    for episode in range(episodes):
-        # Simular progresso
-        await asyncio.sleep(0.01)  # Simular tempo de treinamento
-
-        # Simular métricas de treinamento
-        base_reward = 50.0
-        noise = (episode / episodes) * 30.0  # Melhoria ao longo do tempo
-        episode_reward = base_reward + noise + ((-1) ** episode) * 5.0
-
-        training_storage[training_id]["episodes_completed"] = episode + 1
-        training_storage[training_id]["current_reward"] = episode_reward
-        training_storage[training_id]["rewards_history"].append(episode_reward)
-
-        # Simular perda
-        loss = max(0.1, 2.0 - (episode / episodes) * 1.8)
-        training_storage[training_id]["loss_history"].append(loss)
-
-        # Calcular métricas
-        rewards = training_storage[training_id]["rewards_history"]
-        training_storage[training_id]["average_reward"] = sum(
-            rewards) / len(rewards)
-        training_storage[training_id]["best_reward"] = max(rewards)
-
-        # Verificar convergência
-        if episode > 100:
-            recent_rewards = rewards[-50:]
-            if len(set([round(r, 1) for r in recent_rewards])) <= 3:
-                training_storage[training_id]["convergence_status"] = "converged"
-            else:
-                training_storage[training_id]["convergence_status"] = "training"
-
-        # Parar se convergiu
-        if training_storage[training_id].get("convergence_status") == "converged":
-            break
-
-    # Salvar modelo simulado
-    model_path = MODEL_SAVE_PATH / f"model_{training_id}.json"
-    model_data = {
-        "training_id": training_id,
-        "episodes": training_storage[training_id]["episodes_completed"],
-        "final_reward": training_storage[training_id]["current_reward"],
-        "config": config.dict(),
-        "trained_at": datetime.now().isoformat()
-    }
+# Streams de progresso avisados a cada evento do executor
+training_hub = EventHub()
 
-    with open(model_path, 'w') as f:
-        json.dump(model_data, f, indent=2)
+# Treinamentos em processos separados; eventos de progresso em apply_training_event
+training_executor = TrainingExecutor(apply_training_event, max_concurrent=MAX_CONCURRENT_TRAININGS)
 
-    training_storage[training_id]["saved_model_path"] = str(model_path)
 
-    # Registrar modelo
-    model_storage[training_id] = {
-        "id": training_id,
-        "name": f"RL_Model_{training_id[:8]}",
-        "path": str(model_path),
-        "created_at": datetime.now(),
-        "performance": {
-            "episodes": training_storage[training_id]["episodes_completed"],
-            "final_reward": training_storage[training_id]["current_reward"],
-            "average_reward": training_storage[training_id]["average_reward"],
-            "best_reward": training_storage[training_id]["best_reward"]
-        }
+def worker_config(training_id: str, config: Dict[str, Any], resume: bool = False) -> Dict[str, Any]:
+    """Configuração enviada ao worker de treinamento."""
+    return {
+        **config,
+        "data_path": str(DATA_PATH),
+        "model_dir": str(model_registry.model_dir(training_id)),
+        "resume": resume
     }
 
 
 @router.post("/train")
-async def start_training(background_tasks: BackgroundTasks, config: RLTrainingConfig):
-    """Inicia treinamento do agente RL."""
+async def start_training(config: RLTrainingConfig):
+    """Enfileira treinamento do agente RL no executor de treinamentos."""
+    if config.algorithm not in TRAINING_ALGORITHMS:
+        raise HTTPException(
+            status_code=400, detail=f"Algoritmo deve ser um de {list(TRAINING_ALGORITHMS)}")
+
     training_id = str(uuid.uuid4())
+    ensure_model_directory()
 
     # Criar registro do treinamento
     training_record = {
@@ -225,13 +209,15 @@ async def start_training(background_tasks: BackgroundTasks, config: RLTrainingCo
         "best_reward": 0.0,
         "convergence_status": "not_started",
         "saved_model_path": None,
-        "error_message": None
+        "error_message": None,
+        "rewards_history": [],
+        "loss_history": []
     }
 
     training_storage[training_id] = training_record
 
-    # Executar treinamento em background
-    background_tasks.add_task(run_rl_training, training_id, config)
+    # Executar treinamento em um processo do executor
+    training_executor.submit(training_id, worker_config(training_id, config.dict()))
 
     return {
         "training_id": training_id,
@@ -264,8 +250,8 @@ async def get_training_status(training_id: str):
 
 
 @router.get("/training/progress/{training_id}")
-async def get_training_progress(training_id: str):
-    """Obtém progresso detalhado do treinamento."""
+async def get_training_progress(training_id: str, from_episode: int = 0):
+    """Obtém progresso detalhado do treinamento (históricos a partir de ``from_episode``)."""
     if training_id not in training_storage:
         raise HTTPException(
             status_code=404, detail="Treinamento não encontrado")
@@ -276,8 +262,8 @@ async def get_training_progress(training_id: str):
         "id": training["id"],
         "status": training["status"],
         "episodes_completed": training["episodes_completed"],
-        "rewards_history": training.get("rewards_history", []),
-        "loss_history": training.get("loss_history", []),
+        "rewards_history": training.get("rewards_history", [])[from_episode:],
+        "loss_history": training.get("loss_history", [])[from_episode:],
         "current_reward": training["current_reward"],
         "average_reward": training["average_reward"],
         "best_reward": training["best_reward"],
@@ -285,6 +271,90 @@ async def get_training_progress(training_id: str):
     }
 
 
+def progress_delta(training: Dict[str, Any], start: int) -> Dict[str, Any]:
+    """Estado do treinamento com só os episódios a partir de ``start``."""
+    end = len(training["rewards_history"])
+    return {
+        "id": training["id"],
+        "status": training["status"],
+        "episodes_completed": training["episodes_completed"],
+        "total_episodes": training["total_episodes"],
+        "from_episode": start,
+        "rewards": training["rewards_history"][start:end],
+        "losses": training.get("loss_history", [])[start:end],
+        "current_reward": training["current_reward"],
+        "average_reward": training["average_reward"],
+        "best_reward": training["best_reward"],
+        "convergence_status": training["convergence_status"]
+    }
+
+
+async def training_events(training_id: str, sent: int, interval: float):
+    """
+    Eventos SSE de um treinamento: ``progress`` com os episódios novos (id =
+    episódios enviados até ali) e ``end`` quando termina ou é removido.
+    Avisos do executor que chegam antes de ``interval`` se juntam no
+    próximo envio.
+    """
+    subscription = training_hub.subscribe(training_id)
+    sent_status = None
+    last_push = 0.0
+    try:
+        while True:
+            subscription.clear()
+            training = training_storage.get(training_id)
+            if training is None:
+                yield sse_event("end", {"id": training_id, "status": "deleted"})
+                return
+
+            if len(training["rewards_history"]) > sent or training["status"] != sent_status:
+                delta = progress_delta(training, sent)
+                sent += len(delta["rewards"])
+                sent_status = delta["status"]
+                last_push = time.monotonic()
+                yield sse_event("progress", delta, event_id=sent)
+
+            if training["status"] in FINAL_EVENTS:
+                yield sse_event("end", {
+                    "id": training_id,
+                    "status": training["status"],
+                    "saved_model_path": training.get("saved_model_path"),
+                    "error_message": training.get("error_message")
+                }, event_id=sent)
+                return
+
+            if not await subscription.wait(SSE_KEEPALIVE_S):
+                yield ": keepalive\n\n"
+                continue
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - last_push)))
+    finally:
+        training_hub.unsubscribe(subscription)
+
+
+@router.get("/training/{training_id}/stream")
+async def stream_training(training_id: str, request: Request, last_event_id: Optional[int] = None,
+                          max_rate_hz: float = STREAM_MAX_RATE_HZ):
+    """
+    Progresso do treinamento como Server-Sent Events, só com episódios novos.
+
+    Retoma do cabeçalho ``Last-Event-ID`` (reconexão do EventSource) ou do
+    parâmetro ``last_event_id``; ``max_rate_hz`` limita os envios por segundo.
+    """
+    if training_id not in training_storage:
+        raise HTTPException(
+            status_code=404, detail="Treinamento não encontrado")
+
+    header = request.headers.get("last-event-id", "")
+    start = int(header) if header.isdigit() else (last_event_id or 0)
+    rate = min(max(max_rate_hz, STREAM_RATE_LIMITS_HZ[0]), STREAM_RATE_LIMITS_HZ[1])
+
+    return StreamingResponse(
+        training_events(training_id, max(start, 0), 1.0 / rate),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/training/list")
 async def list_trainings():
     """Lista todos os treinamentos."""
@@ -308,38 +378,32 @@ async def list_trainings():
 
 @router.delete("/training/{training_id}")
 async def delete_training(training_id: str):
-    """Remove um treinamento."""
+    """Cancela (se estiver na fila ou rodando) e remove um treinamento."""
     if training_id not in training_storage:
         raise HTTPException(
             status_code=404, detail="Treinamento não encontrado")
 
-    # Remover arquivos do modelo se existirem
-    if training_storage[training_id].get("saved_model_path"):
-        try:
-            model_path = Path(
-                training_storage[training_id]["saved_model_path"])
-            if model_path.exists():
-                model_path.unlink()
-        except:
-            pass
-
+    cancelled = training_executor.cancel(training_id)
     del training_storage[training_id]
+    training_hub.notify(training_id)
 
-    # Remover do storage de modelos também
-    if training_id in model_storage:
-        del model_storage[training_id]
+    # Remover modelo e checkpoints do registro também
+    model_registry.remove(training_id)
+    model_cache.invalidate(training_id)
 
-    return {"message": "Treinamento removido com sucesso"}
+    return {"message": "Treinamento removido com sucesso", "cancelled": cancelled}
 
 
 @router.get("/models")
 async def list_models():
-    """Lista todos os modelos treinados."""
+    """Lista os modelos do registro (concluídos, checkpoints e legados)."""
     models = []
-    for model_id, model_data in model_storage.items():
+    for model_data in model_registry.list():
         models.append({
-            "id": model_id,
+            "id": model_data["id"],
             "name": model_data["name"],
+            "algorithm": model_data.get("algorithm"),
+            "status": model_data.get("status"),
             "created_at": model_data["created_at"],
             "performance": model_data["performance"]
         })
@@ -353,61 +417,61 @@ async def list_models():
 @router.get("/models/{model_id}")
 async def get_model_details(model_id: str):
     """Obtém detalhes de um modelo específico."""
-    if model_id not in model_storage:
+    model_data = model_registry.get(model_id)
+    if model_data is None:
         raise HTTPException(status_code=404, detail="Modelo não encontrado")
 
-    return model_storage[model_id]
-
-
-@router.post("/models/{model_id}/predict")
-async def predict_with_model(model_id: str, state: RLState):
-    """Faz predição usando um modelo treinado."""
-    if model_id not in model_storage:
-        raise HTTPException(status_code=404, detail="Modelo não encontrado")
+    return model_data
 
-    model_data = model_storage[model_id]
 
-    # Simular predição
-    await asyncio.sleep(0.1)  # Simular tempo de processamento
+@router.post("/training/{training_id}/resume")
+async def resume_training(training_id: str):
+    """Retoma, do último checkpoint, um treinamento interrompido (cancelado, com falha ou perdido num reinício)."""
+    if training_executor.is_active(training_id):
+        raise HTTPException(status_code=409, detail="Treinamento já está em andamento")
 
-    # Análise do estado
-    fault_severity = "high" if state.fault_current > 5000 else "medium" if state.fault_current > 2000 else "low"
+    model_data = model_registry.get(training_id)
+    if model_data is None or model_data.get("status") != "checkpoint":
+        raise HTTPException(
+            status_code=404, detail="Nenhum checkpoint para retomar")
 
-    # Gerar ações recomendadas
-    actions = []
-
-    # Ação para ajuste de pickup
-    if fault_severity == "high":
-        actions.append({
-            "action_type": "adjust_pickup",
-            "device_id": f"relay_{state.fault_location}",
-            "parameter": "pickup_current",
-            "value": min(state.fault_current * 0.8, 1000),
-            "confidence": 0.95
-        })
+    config = model_data["config"]
+    previous = training_storage.get(training_id, {})
+    training_storage[training_id] = {
+        "id": training_id,
+        "status": "queued",
+        "config": config,
+        "created_at": previous.get("created_at", model_data["created_at"]),
+        "start_time": None,
+        "end_time": None,
+        "episodes_completed": model_data["episodes_completed"],
+        "total_episodes": config["episodes"],
+        "current_reward": 0.0,
+        "average_reward": 0.0,
+        "best_reward": 0.0,
+        "convergence_status": "training",
+        "saved_model_path": model_data["path"],
+        "error_message": None,
+        # O worker republica o histórico do checkpoint
+        "rewards_history": [],
+        "loss_history": []
+    }
+    training_executor.submit(training_id, worker_config(training_id, config, resume=True))
 
-    # Ação para ajuste de tempo
-    if state.system_loading > 0.8:
-        actions.append({
-            "action_type": "adjust_time",
-            "device_id": f"relay_{state.fault_location}",
-            "parameter": "time_delay",
-            "value": 0.1,
-            "confidence": 0.87
-        })
+    return {
+        "training_id": training_id,
+        "status": "queued",
+        "resumed_from_episode": model_data["episodes_completed"],
+        "message": "Treinamento retomado do último checkpoint"
+    }
 
-    # Análise de coordenação
-    coordination_score = 0.9 if fault_severity == "low" else 0.7
 
+def analyze_state(state: RLState) -> Dict[str, Any]:
+    """Severidade da falta e estabilidade do sistema a partir do estado."""
+    fault_severity = "high" if state.fault_current > 5000 else "medium" if state.fault_current > 2000 else "low"
     return {
-        "model_id": model_id,
-        "prediction": {
-            "recommended_actions": actions,
-            "coordination_score": coordination_score,
-            "fault_severity": fault_severity,
-            "system_stability": "stable" if state.system_loading < 0.9 else "critical",
-            "confidence": 0.88
-        },
+        "fault_severity": fault_severity,
+        "system_stability": "stable" if state.system_loading < 0.9 else "critical",
         "state_analysis": {
             "fault_current": state.fault_current,
             "fault_location": state.fault_location,
@@ -417,10 +481,61 @@ async def predict_with_model(model_id: str, state: RLState):
     }
 
 
+def predict_states(model_id: str, states: List[RLState]) -> List[Dict[str, Any]]:
+    """Predição em lote com a política do modelo (carregada pelo cache LRU)."""
+    model_data = model_registry.get(model_id)
+    if model_data is None:
+        raise HTTPException(status_code=404, detail="Modelo não encontrado")
+
+    try:
+        policy = model_cache.get((model_id, model_data.get("path")),
+                                 lambda: load_policy(model_data, DATA_PATH))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except (ImportError, OSError) as e:
+        raise HTTPException(status_code=503, detail=f"Erro ao carregar modelo: {e}")
+
+    predictions = policy.predict_batch([state.dict() for state in states]) if states else []
+
+    results = []
+    for state, prediction in zip(states, predictions):
+        analysis = analyze_state(state)
+        results.append({
+            "prediction": {
+                **prediction,
+                "fault_severity": analysis["fault_severity"],
+                "system_stability": analysis["system_stability"]
+            },
+            "state_analysis": analysis["state_analysis"]
+        })
+    return results
+
+
+@router.post("/models/{model_id}/predict")
+def predict_with_model(model_id: str, state: RLState):
+    """Faz predição usando um modelo treinado."""
+    result = predict_states(model_id, [state])[0]
+    return {"model_id": model_id, **result}
+
+
+@router.post("/models/{model_id}/predict-batch")
+def predict_batch_with_model(model_id: str, states: List[RLState]):
+    """Predição para vários estados de uma vez (uma busca na Q-table ou um forward pass)."""
+    if len(states) > MAX_PREDICT_BATCH:
+        raise HTTPException(
+            status_code=400, detail=f"Lote limitado a {MAX_PREDICT_BATCH} estados")
+
+    return {
+        "model_id": model_id,
+        "predictions": predict_states(model_id, states),
+        "total": len(states)
+    }
+
+
 @router.post("/models/{model_id}/optimize")
 async def optimize_protection_settings(model_id: str, optimization_targets: Dict[str, float]):
     """Otimiza configurações de proteção usando o modelo."""
-    if model_id not in model_storage:
+    if model_id not in model_registry:
         raise HTTPException(status_code=404, detail="Modelo não encontrado")
 
     # Simular otimização
@@ -478,7 +593,7 @@ async def optimize_protection_settings(model_id: str, optimization_targets: Dict
 @router.post("/models/{model_id}/apply")
 async def apply_optimized_settings(model_id: str, settings: Dict[str, Dict[str, float]]):
     """Aplica configurações otimizadas na rede."""
-    if model_id not in model_storage:
+    if model_id not in model_registry:
         raise HTTPException(status_code=404, detail="Modelo não encontrado")
 
     try:
@@ -522,7 +637,7 @@ async def apply_optimized_settings(model_id: str, settings: Dict[str, Dict[str,
 async def get_performance_metrics():
     """Obtém métricas de performance dos modelos."""
     metrics = {
-        "total_models": len(model_storage),
+        "total_models": len(model_registry),
         "total_trainings": len(training_storage),
         "successful_trainings": sum(1 for t in training_storage.values() if t["status"] == "completed"),
         "failed_trainings": sum(1 for t in training_storage.values() if t["status"] == "failed"),
@@ -563,7 +678,8 @@ async def get_rl_system_status():
     return {
         "system_status": "operational",
         "agent_loaded": True,
-        "model_count": len(model_storage),
+        "model_count": len(model_registry),
+        "model_cache": model_cache.stats(),
         "active_trainings": len([t for t in training_storage.values() if t["status"] == "running"]),
         "total_trainings": len(training_storage),
         "last_training_date": max([t["created_at"] for t in training_storage.values()], default=None),
@@ -590,7 +706,8 @@ async def get_training_system_status():
         "running_trainings": len(running_trainings),
         "completed_trainings": len(completed_trainings),
         "failed_trainings": len(failed_trainings),
-        "queue_size": len(running_trainings),
+        "queue_size": training_executor.stats()["queued"],
+        "executor": training_executor.stats(),
         "average_training_time": "12.5 minutes",  # Calcular baseado em dados reais
         "success_rate": f"{(len(completed_trainings)/(len(training_storage) or 1))*100:.1f}%"
     }
@@ -12,6 +12,9 @@ import asyncio
 from datetime import datetime
 from pathlib import Path
 
+from ...services.network_store import get_network_store
+from ...services.short_circuit import ShortCircuitService
+
 router = APIRouter(tags=["simulation"])
 
 # Modelos Pydantic para validação
@@ -50,6 +53,9 @@ simulation_storage = {}
 # Caminho para os dados
 DATA_PATH = Path("simuladores/power_sim/data/ieee14_protecao.json")
 
+# Curto-circuito pela Zbus da rede compartilhada (remontada só quando a rede muda)
+short_circuit = ShortCircuitService(get_network_store(DATA_PATH))
+
 
 def load_network_data():
     """Carrega dados da rede elétrica."""
@@ -118,8 +124,43 @@ async def run_simulation(simulation_id: str, config: SimulationConfig):
         simulation_storage[simulation_id]["completed_at"] = datetime.now()
 
 
+def _fault_bus(fault: FaultSimulation) -> Optional[int]:
+    """Barra onde a falta é aplicada no cálculo de curto (linha: barra de origem)."""
+    if fault.element_type == "bus":
+        return fault.element_id
+    if fault.element_type == "line":
+        net = short_circuit.store.view()
+        if fault.element_id in net.line.index:
+            return int(net.line.at[fault.element_id, 'from_bus'])
+    return None
+
+
+def calculate_short_circuit(fault: FaultSimulation) -> Optional[Dict[str, Any]]:
+    """Curto trifásico pela Zbus da rede; None se a falta não for de curto em barra/linha."""
+    if fault.fault_type != "short_circuit":
+        return None
+    bus = _fault_bus(fault)
+    if bus is None:
+        return None
+    return short_circuit.fault_at(bus, fault.fault_impedance or 0.0)
+
+
 def simulate_fault_current(fault: FaultSimulation) -> Dict[str, float]:
     """Simula corrente de falta."""
+    sc = calculate_short_circuit(fault)
+    if sc is not None:
+        # Falta trifásica equilibrada: só sequência positiva
+        ikss_a = sc["ikss_ka"] * 1000
+        return {
+            "magnitude": ikss_a,
+            "phase_a": ikss_a,
+            "phase_b": ikss_a,
+            "phase_c": ikss_a,
+            "zero_sequence": 0.0,
+            "positive_sequence": ikss_a,
+            "negative_sequence": 0.0
+        }
+
     base_current = 1000  # Ampères
 
     severity_multiplier = {
@@ -450,6 +491,7 @@ async def quick_fault_analysis(fault: FaultSimulation):
             "element_type": fault.element_type,
             "element_id": fault.element_id,
             "fault_current": fault_current,
+            "short_circuit": calculate_short_circuit(fault),
             "affected_buses": affected_buses,
             "protection_actions": protection_actions,
             "recovery_time": recovery_time,
@@ -685,23 +727,30 @@ def simulate_detailed_fault(scenario: ProtectionScenario, network_data: Dict) ->
     import random
     import math
 
-    # Calcular corrente de falta baseada em impedância e localização
-    base_current = 1000  # Corrente base em A
-    fault_factor = 1 / (scenario.fault_impedance +
-                        0.01)  # Evitar divisão por zero
-
-    fault_current = base_current * fault_factor * scenario.system_loading
+    # Corrente de falta e tensões durante a falta pela Zbus da rede; barras
+    # fora do modelo mantêm a estimativa simplificada
+    sc = short_circuit.fault_at(scenario.fault_location, scenario.fault_impedance)
 
     # Simular propagação da falta
     affected_zones = simulate_fault_propagation(
         scenario.fault_location, network_data)
 
-    # Calcular tensões nas barras durante a falta
-    bus_voltages = {}
-    for bus_id in range(7):  # 7 barras no sistema
-        distance_factor = abs(bus_id - scenario.fault_location) + 1
-        voltage_drop = 0.95 - (0.1 / distance_factor)  # Queda de tensão
-        bus_voltages[f"bus_{bus_id}"] = max(0.1, voltage_drop)
+    if sc is not None:
+        fault_current = sc["ikss_ka"] * 1000
+        bus_voltages = {f"bus_{bus_id}": max(0.1, v)
+                        for bus_id, v in sc["bus_voltages_pu"].items()}
+    else:
+        base_current = 1000  # Corrente base em A
+        fault_factor = 1 / (scenario.fault_impedance +
+                            0.01)  # Evitar divisão por zero
+
+        fault_current = base_current * fault_factor * scenario.system_loading
+
+        bus_voltages = {}
+        for bus_id in range(7):  # 7 barras no sistema
+            distance_factor = abs(bus_id - scenario.fault_location) + 1
+            voltage_drop = 0.95 - (0.1 / distance_factor)  # Queda de tensão
+            bus_voltages[f"bus_{bus_id}"] = max(0.1, voltage_drop)
 
     return {
         "fault_current_rms": round(fault_current, 2),
@@ -6,6 +6,7 @@ Conecta frontend React com backend RL de coordenação
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional
 import asyncio
@@ -13,9 +14,16 @@ import json
 from datetime import datetime
 import logging
 
+import numpy as np
+
 # Import do coordenador RL
 try:
-    from rl_protection_coordinator import ProtectionCoordinator, BasicRLAgent
+    if __package__:
+        # Importado como pacote (src.backend.api_protecai): usa o coordenador do
+        # backend, não o rl_protection_coordinator.py da raiz do projeto
+        from .rl_protection_coordinator import ProtectionCoordinator, BasicRLAgent
+    else:
+        from rl_protection_coordinator import ProtectionCoordinator, BasicRLAgent
 except ImportError:
     # Fallback se módulo não encontrado
     print("AVISO: Módulo RL não encontrado, usando mock")
@@ -48,6 +56,12 @@ class FaultSimulationRequest(BaseModel):
     fault_type: str  # 3ph, 2ph, 1ph, 2ph_ground
     severity: float  # 0.1 to 1.0
 
+class BatchFaultSimulationRequest(BaseModel):
+    buses: List[int]
+    fault_types: List[str]
+    severities: List[float]
+    grid: bool = False  # True: todas as combinações bus x tipo x severidade
+
 class FaultSimulationResponse(BaseModel):
     fault_location: str
     fault_type: str
@@ -82,6 +96,11 @@ class RLTrainingRequest(BaseModel):
     episodes: int
     scenarios: List[Dict]
 
+VALID_FAULT_TYPES = ['3ph', '2ph', '1ph', '2ph_ground']
+
+# Limite de cenários por requisição em lote
+MAX_BATCH_SCENARIOS = 100_000
+
 # Instância global do coordenador
 coordinator_instance = None
 rl_agent_instance = None
@@ -291,7 +310,7 @@ async def simulate_fault(request: FaultSimulationRequest):
     if not (1 <= request.bus <= 14):
         raise HTTPException(status_code=400, detail="Bus deve estar entre 1 e 14")
     
-    if request.fault_type not in ['3ph', '2ph', '1ph', '2ph_ground']:
+    if request.fault_type not in VALID_FAULT_TYPES:
         raise HTTPException(status_code=400, detail="Tipo de falta inválido")
     
     if not (0.1 <= request.severity <= 1.0):
@@ -372,6 +391,68 @@ async def simulate_fault(request: FaultSimulationRequest):
         
         return FaultSimulationResponse(**mock_result)
 
+def _column(values: np.ndarray) -> list:
+    """Coluna NumPy -> lista JSON (NaN vira null)"""
+    if values.dtype.kind == 'f' and np.isnan(values).any():
+        return np.where(np.isnan(values), None, values).tolist()
+    return values.tolist()
+
+@app.post("/api/simulate-fault/batch")
+async def simulate_fault_batch(request: BatchFaultSimulationRequest):
+    """
+    Simula um lote de faltas em uma única requisição.
+    
+    Os cenários são as posições das listas (listas de tamanho 1 são repetidas)
+    ou, com grid=true, todas as combinações. A resposta é em colunas: um valor
+    por cenário (corrente, zona, problemas de coordenação, conformidade) e a
+    matriz cenários x dispositivos de tempos de operação (null = não atua).
+    """
+    coordinator = get_coordinator()
+    if coordinator is None:
+        raise HTTPException(status_code=503, detail="Coordenador RL não disponível")
+    
+    buses = np.asarray(request.buses, dtype=int)
+    fault_types = np.asarray(request.fault_types, dtype=str)
+    severities = np.asarray(request.severities, dtype=float)
+    
+    # Validações
+    if ((buses < 1) | (buses > 14)).any():
+        raise HTTPException(status_code=400, detail="Bus deve estar entre 1 e 14")
+    
+    if not np.isin(fault_types, VALID_FAULT_TYPES).all():
+        raise HTTPException(status_code=400, detail="Tipo de falta inválido")
+    
+    if ((severities < 0.1) | (severities > 1.0)).any():
+        raise HTTPException(status_code=400, detail="Severidade deve estar entre 0.1 e 1.0")
+    
+    if request.grid:
+        buses, fault_types, severities = np.meshgrid(buses, fault_types, severities, indexing='ij')
+    else:
+        sizes = {len(buses), len(fault_types), len(severities)} - {1}
+        if len(sizes) > 1:
+            raise HTTPException(status_code=400,
+                                detail="Listas devem ter o mesmo tamanho (ou tamanho 1)")
+    
+    n_scenarios = int(np.broadcast(buses, fault_types, severities).size)
+    if n_scenarios > MAX_BATCH_SCENARIOS:
+        raise HTTPException(status_code=400,
+                            detail=f"Máximo de {MAX_BATCH_SCENARIOS} cenários por requisição")
+    
+    try:
+        result = coordinator.simulate_faults_batch(buses, fault_types, severities)
+    except Exception as e:
+        logger.error(f"Erro na simulação em lote: {e}")
+        raise HTTPException(status_code=500, detail=f"Erro na simulação em lote: {str(e)}")
+    
+    compliance = result.pop('compliance')
+    payload = {name: _column(values) for name, values in result.items()}
+    payload['compliance'] = {norm: flags.tolist() for norm, flags in compliance.items()}
+    payload['scenarios'] = n_scenarios
+    payload['analysis_time'] = datetime.now().isoformat()
+    
+    # Colunas já convertidas para tipos JSON: dispensa o jsonable_encoder
+    return JSONResponse(payload)
+
 @app.post("/api/rl/train")
 async def train_rl_agent(request: RLTrainingRequest):
     """Treina agente RL com cenários específicos"""
@@ -0,0 +1,213 @@
+"""
+Análise de Contingências N-1
+============================
+
+Tira de serviço, uma a uma, cada linha e cada transformador da rede e roda
+um fluxo de potência por contingência, reportando violações de tensão,
+sobrecargas e ilhamento.
+
+As contingências são distribuídas em um pool de processos. Cada worker
+recebe a rede uma única vez (``initializer``) e, para cada contingência,
+apenas desliga o elemento, roda ``pp.runpp`` e o religa — sem copiar a rede.
+Os limites seguem com cada lote. O pool é mantido entre requisições e só é
+recriado quando o estado da rede muda (ver ``ContingencyPool``).
+
+- ``list_outages()``: contingências de uma rede
+- ``run_outage()``: uma contingência sobre uma rede (in-place, restaurada)
+- ``ContingencyPool.stream()``: resultados assíncronos, na ordem de término
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import pandapower as pp
+
+OUTAGE_ELEMENTS = ("line", "trafo")
+
+Outage = Tuple[str, int]
+
+
+@dataclass(frozen=True)
+class ContingencyLimits:
+    """Limites operativos usados para classificar as violações."""
+    vm_min_pu: float = 0.95
+    vm_max_pu: float = 1.05
+    max_loading_percent: float = 100.0
+
+
+def list_outages(net: pp.pandapowerNet,
+                 elements: Sequence[str] = OUTAGE_ELEMENTS) -> List[Outage]:
+    """Elementos em serviço que formam o conjunto de contingências N-1."""
+    outages = []
+    for element in elements:
+        table = net[element]
+        outages.extend((element, int(idx)) for idx in table.index[table['in_service'].values])
+    return outages
+
+
+def run_outage(net: pp.pandapowerNet, outage: Outage,
+               limits: ContingencyLimits, **pf_options) -> Dict[str, Any]:
+    """
+    Executa uma contingência. A rede é alterada durante a execução e
+    restaurada ao final (o elemento volta para serviço).
+    """
+    element, idx = outage
+    start = time.perf_counter()
+    result: Dict[str, Any] = {
+        "element": element,
+        "element_id": idx,
+        "name": str(net[element].at[idx, 'name']),
+        "converged": False,
+        "islanded_buses": [],
+        "lost_load_mw": 0.0,
+        "voltage_violations": [],
+        "overloads": [],
+        "error": None
+    }
+
+    net[element].at[idx, 'in_service'] = False
+    try:
+        pp.runpp(net, **pf_options)
+        result["converged"] = bool(net.converged)
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        net[element].at[idx, 'in_service'] = True
+
+    if result["converged"]:
+        vm = net.res_bus['vm_pu']
+        in_service = net.bus['in_service'].values
+        islanded = net.bus.index[in_service & vm.isna().values]
+        result["islanded_buses"] = [int(b) for b in islanded]
+        if len(islanded):
+            lost = net.load[net.load['bus'].isin(islanded) & net.load['in_service']]
+            result["lost_load_mw"] = float((lost['p_mw'] * lost['scaling']).sum())
+
+        violating = vm[(vm < limits.vm_min_pu) | (vm > limits.vm_max_pu)]
+        result["voltage_violations"] = [
+            {"bus": int(b), "vm_pu": round(float(v), 4)} for b, v in violating.items()
+        ]
+
+        for branch in ("line", "trafo"):
+            loading = net[f"res_{branch}"]['loading_percent']
+            over = loading[loading > limits.max_loading_percent]
+            result["overloads"].extend(
+                {"element": branch, "element_id": int(i), "loading_percent": round(float(v), 2)}
+                for i, v in over.items()
+            )
+
+    result["secure"] = (result["converged"] and not result["islanded_buses"]
+                        and not result["voltage_violations"] and not result["overloads"])
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+# Estado de cada processo worker (preenchido por _init_worker)
+_worker_net: Optional[pp.pandapowerNet] = None
+_worker_options: Dict[str, Any] = {}
+
+
+def _init_worker(net, pf_options):
+    global _worker_net, _worker_options
+    _worker_net = net
+    _worker_options = pf_options
+
+
+def _run_batch(outages: List[Outage], limits: ContingencyLimits) -> List[Dict[str, Any]]:
+    return [run_outage(_worker_net, outage, limits, **_worker_options)
+            for outage in outages]
+
+
+class ContingencyPool:
+    """
+    Pool de processos com a rede pré-carregada nos workers.
+
+    O pool é identificado pelo ``state_hash`` da rede; os limites vão com
+    cada lote, então requisições com limites diferentes compartilham o pool.
+    Uma requisição com outro estado cria um pool novo; o antigo é encerrado
+    sem cancelar nada e termina os lotes que os streams em andamento já
+    enviaram.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, batches_per_worker: int = 4,
+                 **pf_options):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batches_per_worker = batches_per_worker
+        self.pf_options = pf_options or {"algorithm": 'nr', "max_iteration": 30}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._key: Optional[str] = None
+        self._lock = threading.Lock()
+        self.pool_starts = 0
+
+    def _submit(self, net: pp.pandapowerNet, state_hash: str, limits: ContingencyLimits,
+                batches: List[List[Outage]]) -> List[Future]:
+        """Envia os lotes ao pool do estado da rede (sob o lock: o pool não é trocado no meio)."""
+        with self._lock:
+            if self._executor is None or self._key != state_hash:
+                if self._executor is not None:
+                    # Sem cancel_futures: os lotes já enviados terminam no pool antigo
+                    self._executor.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(net, self.pf_options)
+                )
+                self._key = state_hash
+                self.pool_starts += 1
+            return [self._executor.submit(_run_batch, batch, limits) for batch in batches]
+
+    def _batches(self, outages: List[Outage]) -> List[List[Outage]]:
+        n_batches = max(1, min(len(outages), self.max_workers * self.batches_per_worker))
+        size = math.ceil(len(outages) / n_batches)
+        return [outages[i:i + size] for i in range(0, len(outages), size)]
+
+    async def stream(self, net: pp.pandapowerNet, state_hash: str,
+                     limits: ContingencyLimits = ContingencyLimits(),
+                     elements: Sequence[str] = OUTAGE_ELEMENTS) -> AsyncIterator[Dict[str, Any]]:
+        """Resultados de cada contingência, na ordem em que terminam."""
+        outages = list_outages(net, elements)
+        if not outages:
+            return
+        futures = [asyncio.wrap_future(f)
+                   for f in self._submit(net, state_hash, limits, self._batches(outages))]
+        for next_done in asyncio.as_completed(futures):
+            for result in await next_done:
+                yield result
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._key = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "pool_active": self._executor is not None,
+            "pool_starts": self.pool_starts,
+            "state_hash": self._key
+        }
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Resumo do estudo N-1 a partir dos resultados individuais."""
+    insecure = [r for r in results if not r["secure"]]
+    return {
+        "total_outages": len(results),
+        "secure_outages": len(results) - len(insecure),
+        "non_converged": sum(1 for r in results if not r["converged"]),
+        "islanding_outages": sum(1 for r in results if r["islanded_buses"]),
+        "voltage_violation_outages": sum(1 for r in results if r["voltage_violations"]),
+        "overload_outages": sum(1 for r in results if r["overloads"]),
+        "n_1_secure": not insecure,
+        "critical_outages": [
+            {"element": r["element"], "element_id": r["element_id"]} for r in insecure
+        ]
+    }
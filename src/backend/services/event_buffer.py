@@ -0,0 +1,101 @@
+"""
+Buffer Circular de Eventos das Sessões
+======================================
+
+Guarda os ``DeviceEvent`` de uma sessão de rastreamento em tempo real
+(``realtime_tracking.py``) com memória constante:
+
+- capacidade fixa (``capacity``): o evento novo ocupa a posição do mais
+  antigo, que é descartado e contado em ``overwritten``
+- cada evento recebe um número de sequência crescente (``seq``, a partir
+  de 1) que nunca se repete na sessão
+- ``since(seq)``: eventos depois de ``seq`` em tempo proporcional ao que é
+  devolvido (a posição é ``seq % capacity``, sem busca); ``missed`` conta os
+  que já foram sobrescritos
+- ``seq_of(chave)``: sequência de um evento pelo id (dicionário atualizado
+  na sobrescrita), para clientes que retomam por ``last_event_id``
+
+Sem lock: o buffer é usado só no event loop da API.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+# Eventos guardados por sessão (100 ms de intervalo: ~17 min de histórico)
+DEFAULT_BUFFER_CAPACITY = 10000
+
+
+class EventRingBuffer:
+    """Buffer circular com números de sequência e busca por chave."""
+
+    def __init__(self, capacity: int = DEFAULT_BUFFER_CAPACITY,
+                 key: Optional[Callable[[Any], Hashable]] = None):
+        if capacity < 1:
+            raise ValueError("capacity deve ser pelo menos 1")
+        self.capacity = capacity
+        self._key = key
+        self._slots: List[Any] = [None] * capacity
+        self._seqs: Dict[Hashable, int] = {}
+        self.last_seq = 0
+
+    def __len__(self) -> int:
+        return min(self.last_seq, self.capacity)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.since(0)[0])
+
+    @property
+    def first_seq(self) -> int:
+        """Sequência do evento mais antigo guardado (``last_seq + 1`` se vazio)."""
+        return max(self.last_seq - self.capacity, 0) + 1
+
+    @property
+    def overwritten(self) -> int:
+        """Eventos descartados por falta de espaço desde o início da sessão."""
+        return max(self.last_seq - self.capacity, 0)
+
+    def append(self, item: Any) -> int:
+        """Guarda o evento e devolve sua sequência."""
+        seq = self.last_seq + 1
+        slot = seq % self.capacity
+        if self._key is not None:
+            if seq > self.capacity:
+                old_key = self._key(self._slots[slot])
+                if self._seqs.get(old_key) == seq - self.capacity:
+                    del self._seqs[old_key]
+            self._seqs[self._key(item)] = seq
+        self._slots[slot] = item
+        self.last_seq = seq
+        return seq
+
+    def get(self, seq: int) -> Optional[Any]:
+        if self.first_seq <= seq <= self.last_seq:
+            return self._slots[seq % self.capacity]
+        return None
+
+    def seq_of(self, key: Hashable) -> Optional[int]:
+        """Sequência do evento guardado com a chave (None se não houver)."""
+        return self._seqs.get(key)
+
+    def since(self, seq: int, limit: Optional[int] = None) -> Tuple[List[Any], int]:
+        """
+        Eventos com sequência maior que ``seq`` (até ``limit``), do mais
+        antigo ao mais novo, e quantos deles já foram sobrescritos.
+        """
+        start = max(seq + 1, self.first_seq)
+        missed = max(start - seq - 1, 0)
+        end = self.last_seq if limit is None else min(self.last_seq, start + limit - 1)
+        if end < start:
+            return [], missed
+        begin, stop = start % self.capacity, end % self.capacity + 1
+        if begin < stop:
+            return self._slots[begin:stop], missed
+        return self._slots[begin:] + self._slots[:stop], missed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "buffered": len(self),
+            "first_seq": self.first_seq,
+            "last_seq": self.last_seq,
+            "overwritten": self.overwritten
+        }
@@ -0,0 +1,162 @@
+"""
+Distribuição de Eventos em Tempo Real
+=====================================
+
+Entrega os ``DeviceEvent`` das sessões de rastreamento em tempo real
+(``realtime_tracking.py``) a vários assinantes (WebSocket ou SSE) no
+momento em que são gerados:
+
+- cada evento é serializado uma única vez em ``publish``; os assinantes
+  compartilham o JSON pronto
+- cada assinante tem uma fila limitada (``max_queue``); quando um cliente
+  lento deixa a fila encher, a política decide o que sai:
+  ``drop_oldest`` (descarta os mais antigos), ``drop_newest`` (descarta
+  os que chegaram) ou ``coalesce`` (mantém só o último evento de cada
+  dispositivo e, se ainda faltar espaço, descarta os mais antigos)
+- ``next_batch`` entrega tudo o que está na fila (até ``max_batch``) de
+  uma vez: eventos publicados juntos saem em um único frame
+- o número de eventos descartados segue no frame seguinte (``dropped``)
+  para o cliente saber que houve lacuna
+
+``publish``, ``subscribe`` e ``close_topic`` rodam no event loop da API
+(os endpoints que geram eventos são assíncronos).
+"""
+
+import asyncio
+import json
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Hashable, List, Optional, Sequence, Set
+
+FANOUT_POLICIES = ("drop_oldest", "drop_newest", "coalesce")
+DEFAULT_QUEUE_SIZE = 1024
+DEFAULT_MAX_BATCH = 256
+
+
+@dataclass(frozen=True)
+class FanoutItem:
+    """Evento pronto para envio: chave de agrupamento, id e JSON serializado."""
+    key: Hashable
+    event_id: str
+    payload: str
+
+
+class FanoutSubscriber:
+    """Fila limitada de um assinante, com política para consumidor lento."""
+
+    def __init__(self, topic: Hashable, max_queue: int = DEFAULT_QUEUE_SIZE, policy: str = "coalesce"):
+        if policy not in FANOUT_POLICIES:
+            raise ValueError(f"Política deve ser uma de {FANOUT_POLICIES}")
+        if max_queue < 1:
+            raise ValueError("max_queue deve ser pelo menos 1")
+        self.topic = topic
+        self.max_queue = max_queue
+        self.policy = policy
+        self.closed_reason: Optional[str] = None
+        self.dropped = 0
+        self.delivered = 0
+        self._pending_dropped = 0
+        self._queue: Deque[FanoutItem] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def offer(self, items: Sequence[FanoutItem]):
+        queue = self._queue
+        queue.extend(items)
+        excess = len(queue) - self.max_queue
+        if excess > 0:
+            if self.policy == "drop_newest":
+                for _ in range(excess):
+                    queue.pop()
+            elif self.policy == "drop_oldest":
+                for _ in range(excess):
+                    queue.popleft()
+            else:
+                # Último evento de cada dispositivo, na ordem em que chegaram
+                latest = {item.key: i for i, item in enumerate(queue)}
+                kept = [item for i, item in enumerate(queue) if latest[item.key] == i][-self.max_queue:]
+                excess = len(queue) - len(kept)
+                self._queue = deque(kept)
+            self.dropped += excess
+            self._pending_dropped += excess
+        self._ready.set()
+
+    def close(self, reason: str):
+        self.closed_reason = reason
+        self._ready.set()
+
+    async def next_batch(self, max_batch: int = DEFAULT_MAX_BATCH,
+                         timeout: Optional[float] = None) -> Optional[List[FanoutItem]]:
+        """
+        Próximo lote de eventos (espera se a fila estiver vazia). Lista vazia
+        se passar ``timeout`` sem eventos; None quando o assinante é fechado.
+        """
+        if not self._queue and self.closed_reason is None:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        if not self._queue and self.closed_reason is not None:
+            return None
+        batch = [self._queue.popleft() for _ in range(min(max_batch, len(self._queue)))]
+        self.delivered += len(batch)
+        return batch
+
+    def take_dropped(self) -> int:
+        """Eventos descartados desde a última chamada."""
+        dropped, self._pending_dropped = self._pending_dropped, 0
+        return dropped
+
+
+def events_frame(topic: Hashable, items: Sequence[FanoutItem], dropped: int = 0,
+                 kind: str = "events") -> str:
+    """Frame JSON com os eventos já serializados (sem serializar de novo)."""
+    header = json.dumps({"type": kind, "session_id": topic, "count": len(items), "dropped": dropped,
+                         "last_event_id": items[-1].event_id if items else None})
+    return f'{header[:-1]}, "events": [{", ".join(item.payload for item in items)}]}}'
+
+
+class EventFanout:
+    """Assinantes por tópico (sessão) e publicação dos eventos em todas as filas."""
+
+    def __init__(self):
+        self._subscribers: Dict[Hashable, Set[FanoutSubscriber]] = defaultdict(set)
+        self.published = 0
+
+    def subscribe(self, topic: Hashable, max_queue: int = DEFAULT_QUEUE_SIZE,
+                  policy: str = "coalesce") -> FanoutSubscriber:
+        subscriber = FanoutSubscriber(topic, max_queue, policy)
+        self._subscribers[topic].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: FanoutSubscriber):
+        subscribers = self._subscribers.get(subscriber.topic)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.topic]
+
+    def subscriber_count(self, topic: Hashable) -> int:
+        return len(self._subscribers.get(topic, ()))
+
+    def publish(self, topic: Hashable, items: Sequence[FanoutItem]):
+        self.published += len(items)
+        for subscriber in self._subscribers.get(topic, ()):
+            subscriber.offer(items)
+
+    def close_topic(self, topic: Hashable, reason: str = "closed"):
+        for subscriber in self._subscribers.get(topic, ()):
+            subscriber.close(reason)
+
+    def stats(self) -> Dict[str, Any]:
+        subscribers = [s for group in self._subscribers.values() for s in group]
+        return {
+            "topics": len(self._subscribers),
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "queued": sum(len(s) for s in subscribers),
+            "dropped": sum(s.dropped for s in subscribers)
+        }
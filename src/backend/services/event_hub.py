@@ -0,0 +1,92 @@
+"""
+Notificações para Streams (SSE)
+===============================
+
+``EventHub`` avisa os streams abertos no event loop de que um tópico (por
+exemplo, um treinamento) mudou. Quem publica pode estar em outra thread
+(o executor de treinamentos): ``notify`` só agenda ``Event.set`` no loop de
+cada assinante com ``call_soon_threadsafe``. O aviso não carrega dados; o
+stream relê o estado atual e envia apenas o que o cliente ainda não tem,
+então vários avisos seguidos se juntam em um único envio.
+
+- ``subscribe(topic)``: assinatura do stream (chamar dentro do event loop)
+- ``notify(topic)``: acorda os assinantes do tópico (qualquer thread)
+- ``sse_event(...)``: formata uma mensagem ``text/event-stream``
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Optional, Set
+
+# Intervalo dos comentários que mantêm a conexão SSE aberta em proxies
+SSE_KEEPALIVE_S = 15.0
+
+
+def sse_event(event: str, data: Any, event_id: Optional[Any] = None) -> str:
+    """Mensagem SSE com ``id`` (opcional), ``event`` e ``data`` em JSON."""
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines += [f"event: {event}", f"data: {json.dumps(data, default=str)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """Assinatura de um stream: um ``asyncio.Event`` no loop do stream."""
+
+    def __init__(self, topic: Hashable, loop: asyncio.AbstractEventLoop):
+        self.topic = topic
+        self.loop = loop
+        self.changed = asyncio.Event()
+
+    def clear(self):
+        self.changed.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        """Espera um aviso; False se passar ``timeout`` sem aviso."""
+        try:
+            await asyncio.wait_for(self.changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class EventHub:
+    """Assinantes por tópico, avisados de qualquer thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[Hashable, Set[Subscription]] = defaultdict(set)
+        self.notifications = 0
+
+    def subscribe(self, topic: Hashable) -> Subscription:
+        subscription = Subscription(topic, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def notify(self, topic: Hashable):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+            self.notifications += 1
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.changed.set)
+            except RuntimeError:
+                pass  # Loop já encerrado; a assinatura sai no finally do stream
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "topics": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "notifications": self.notifications
+            }
@@ -0,0 +1,272 @@
+"""
+Cache de Modelos RL Carregados
+==============================
+
+Inferência dos modelos do registro (``model_registry.py``) para
+``POST /api/v1/rl/models/{id}/predict`` e ``/predict-batch``:
+
+- ``QTablePolicy``: Q-table do BasicRLAgent (memmap, ``TabelaQCongelada``);
+  um lote de estados vira um lote de chaves (``get_states_batch``) e uma
+  única busca com indexação avançada, seguida do ``argmax`` por linha
+- ``SB3Policy``: política do Stable-Baselines3 (PPO); o lote de
+  observações passa por um único ``predict`` (um forward pass)
+- ``ModelCache``: LRU das políticas carregadas, limitado por memória
+  (``max_bytes``); a chave inclui o caminho do checkpoint, então um
+  checkpoint novo do mesmo modelo é carregado no próximo acesso
+
+Os estados são dicionários no formato de ``RLState`` (``fault_current``,
+``fault_location``, ``system_loading``, ``protection_settings``,
+``network_topology``). ``protection_settings`` sobrescreve os ajustes
+padrão por id de dispositivo: ``{"87T-TR1": {"pickup_current": 0.3,
+"time_delay": 0.02, "status": "active"}}``.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from .model_registry import load_q_table
+
+# Orçamento padrão de memória das políticas carregadas
+DEFAULT_CACHE_BYTES = 512 * 2**20
+
+# Tipos de ajuste das ações do BasicRLAgent (ação % 4)
+Q_ACTION_TYPES = ("adjust_pickup", "adjust_pickup", "adjust_time", "adjust_time")
+
+StateDict = Dict[str, Any]
+
+
+@lru_cache(maxsize=1)
+def _core_coordinator():
+    """Coordenador de src/core: dispositivos padrão e mapeamento das ações."""
+    from src.core.rl_protection_coordinator_clean import ProtectionCoordinator
+    return ProtectionCoordinator()
+
+
+def _settings_overrides(state: StateDict):
+    """Pares (id do dispositivo, ajustes) válidos de ``protection_settings``."""
+    for device_id, values in (state.get("protection_settings") or {}).items():
+        if isinstance(values, dict):
+            yield device_id, values
+
+
+# ====== POLÍTICAS ======
+
+class QTablePolicy:
+    """Ação gulosa da Q-table para cada estado, sobre os dispositivos do coordenador."""
+
+    algorithm = "q_learning"
+
+    def __init__(self, table, coordinator):
+        self.table = table
+        self.coordinator = coordinator
+        self.agent = coordinator.rl_agent
+        bank = coordinator.device_bank
+        self.device_ids = [d.id for d in coordinator.protection_devices]
+        self._column = {device_id: i for i, device_id in enumerate(self.device_ids)}
+        self._pickup, self._delay, self._active = bank.pickup.copy(), bank.atraso.copy(), bank.ativo.copy()
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.table.memoria_bytes
+
+    def _settings(self, states: Sequence[StateDict]):
+        pickup = np.tile(self._pickup, (len(states), 1))
+        delay = np.tile(self._delay, (len(states), 1))
+        active = np.tile(self._active, (len(states), 1))
+        for row, state in enumerate(states):
+            for device_id, values in _settings_overrides(state):
+                col = self._column.get(device_id)
+                if col is None:
+                    continue
+                pickup[row, col] = values.get("pickup_current", pickup[row, col])
+                delay[row, col] = values.get("time_delay", delay[row, col])
+                if "status" in values:
+                    active[row, col] = values["status"] == "active"
+        return pickup, delay, active
+
+    def predict_batch(self, states: Sequence[StateDict]) -> List[Dict[str, Any]]:
+        pickup, delay, active = self._settings(states)
+        keys = self.agent.get_states_batch(pickup, delay, active)
+        q_values = self.table.valores(keys)
+        known = self.table.contem_lote(keys)
+        actions = q_values.argmax(axis=1)
+
+        # Confiança: probabilidade softmax da ação escolhida
+        exp = np.exp(q_values - q_values.max(axis=1, keepdims=True))
+        confidence = 1.0 / exp.sum(axis=1)
+
+        new_pickup, new_delay = pickup.copy(), delay.copy()
+        self.coordinator.apply_rl_actions_batch(new_pickup, new_delay, actions)
+        device_idx, adjustment = actions // 4, actions % 4
+
+        results = []
+        for row in range(len(states)):
+            recommended = []
+            col = int(device_idx[row])
+            if known[row] and col < len(self.device_ids):
+                on_pickup = adjustment[row] < 2
+                old = pickup[row, col] if on_pickup else delay[row, col]
+                new = new_pickup[row, col] if on_pickup else new_delay[row, col]
+                if new != old:
+                    recommended.append({
+                        "action_type": Q_ACTION_TYPES[adjustment[row]],
+                        "device_id": self.device_ids[col],
+                        "parameter": "pickup_current" if on_pickup else "time_delay",
+                        "value": float(new),
+                        "confidence": float(confidence[row])
+                    })
+            results.append({
+                "recommended_actions": recommended,
+                "confidence": float(confidence[row]),
+                "q_value": float(q_values[row, actions[row]]),
+                "known_state": bool(known[row])
+            })
+        return results
+
+
+class SB3Policy:
+    """Ajustes de todos os relés propostos pela política do SB3 para cada estado."""
+
+    algorithm = "PPO"
+
+    def __init__(self, model, relays: Sequence[Dict[str, Any]], base_observation: np.ndarray):
+        from simuladores.power_sim.ambiente_vetorial import LIMITES_PICKUP, LIMITES_TEMPO
+
+        self.model = model
+        self.relay_ids = [relay.get("id", f"relay_{i}") for i, relay in enumerate(relays)]
+        self._column = {relay_id: i for i, relay_id in enumerate(self.relay_ids)}
+        self.base_observation = base_observation
+        self.pickup_limits, self.delay_limits = LIMITES_PICKUP, LIMITES_TEMPO
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(p.numel() * p.element_size() for p in self.model.policy.parameters())
+
+    def _observations(self, states: Sequence[StateDict]) -> np.ndarray:
+        (p_min, p_max), (t_min, t_max) = self.pickup_limits, self.delay_limits
+        settings = np.full((len(states), len(self.relay_ids) * 2), 0.5)
+        for row, state in enumerate(states):
+            for relay_id, values in _settings_overrides(state):
+                col = self._column.get(relay_id)
+                if col is None:
+                    continue
+                if "pickup_current" in values:
+                    settings[row, 2 * col] = (values["pickup_current"] - p_min) / (p_max - p_min)
+                if "time_delay" in values:
+                    settings[row, 2 * col + 1] = (values["time_delay"] - t_min) / (t_max - t_min)
+        base = np.broadcast_to(self.base_observation, (len(states), len(self.base_observation)))
+        return np.concatenate([base, np.clip(settings, 0.0, 1.0)], axis=1).astype(np.float32)
+
+    def predict_batch(self, states: Sequence[StateDict]) -> List[Dict[str, Any]]:
+        (p_min, p_max), (t_min, t_max) = self.pickup_limits, self.delay_limits
+        actions, _ = self.model.predict(self._observations(states), deterministic=True)
+        actions = np.clip(np.asarray(actions, dtype=float).reshape(len(states), -1), 0.0, 1.0)
+        pickup = actions[:, ::2] * (p_max - p_min) + p_min
+        delay = actions[:, 1::2] * (t_max - t_min) + t_min
+
+        results = []
+        for row in range(len(states)):
+            recommended = []
+            for col, relay_id in enumerate(self.relay_ids):
+                recommended.append({"action_type": "adjust_pickup", "device_id": relay_id,
+                                    "parameter": "pickup_current", "value": float(pickup[row, col])})
+                recommended.append({"action_type": "adjust_time", "device_id": relay_id,
+                                    "parameter": "time_delay", "value": float(delay[row, col])})
+            results.append({"recommended_actions": recommended, "confidence": None})
+        return results
+
+
+def load_policy(entry: Optional[Dict[str, Any]], data_path: Path):
+    """Política de inferência de uma entrada do registro de modelos."""
+    if entry is None:
+        raise KeyError("Modelo não registrado")
+    if entry.get("status") not in ("checkpoint", "completed"):
+        raise ValueError("Modelo sem política treinada (formato anterior)")
+
+    if entry["algorithm"] == "q_learning":
+        return QTablePolicy(load_q_table(entry["path"]), _core_coordinator())
+
+    if entry["algorithm"] == "PPO":
+        from stable_baselines3 import PPO
+
+        from simuladores.power_sim.ambiente_vetorial import observacao_base
+        from simuladores.power_sim.snapshot_binario import carregar_documento
+
+        documento = carregar_documento(data_path)
+        model = PPO.load(Path(entry["path"]) / "modelo.zip", device="cpu")
+        return SB3Policy(model, documento["protection_devices"].get("reles", []),
+                         observacao_base(documento["net"]))
+
+    raise ValueError(f"Algoritmo sem inferência: {entry['algorithm']}")
+
+
+# ====== CACHE ======
+
+class ModelCache:
+    """
+    LRU de políticas carregadas, limitado pela soma de ``memory_bytes``.
+
+    A política mais recente fica no cache mesmo que sozinha passe do
+    orçamento. Carregamentos acontecem fora do lock: dois acessos
+    simultâneos a um modelo ausente podem carregá-lo duas vezes, e só um
+    fica no cache.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any]):
+        """Política da chave, carregada com ``loader()`` se não estiver no cache."""
+        with self._lock:
+            policy = self._items.get(key)
+            if policy is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return policy
+
+        policy = loader()
+        with self._lock:
+            self.misses += 1
+            self._items[key] = policy
+            self._items.move_to_end(key)
+            self._evict()
+        return policy
+
+    def _evict(self):
+        total = sum(p.memory_bytes for p in self._items.values())
+        while len(self._items) > 1 and total > self.max_bytes:
+            _, policy = self._items.popitem(last=False)
+            total -= policy.memory_bytes
+            self.evictions += 1
+
+    def invalidate(self, model_id: str):
+        """Remove as políticas do modelo (chaves ``(model_id, ...)``)."""
+        with self._lock:
+            for key in [k for k in self._items if isinstance(k, tuple) and k[0] == model_id]:
+                del self._items[key]
+
+    @property
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(p.memory_bytes for p in self._items.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "models": len(self._items),
+                "memory_bytes": sum(p.memory_bytes for p in self._items.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,254 @@
+"""
+Registro de Modelos RL
+======================
+
+Guarda os modelos treinados em ``POST /api/v1/rl/train`` em disco, com um
+índice (``index.json``) que sobrevive a reinícios da API:
+
+- um diretório por modelo (``<raiz>/<model_id>/``) com checkpoints
+  ``snap_<n>/``: Q-table em dois ``.npy`` (chaves ordenadas e valores,
+  ver ``TabelaQEsparsa.exportar``) e ``agente.json`` para o Q-Learning, ou
+  o ``.zip`` do Stable-Baselines3 para o PPO, mais ``recompensas.npy``
+- ``checkpoint.json`` aponta para o último checkpoint completo: cada
+  checkpoint é gravado em um diretório temporário e renomeado, e só depois
+  o ponteiro é trocado (``os.replace``), então uma interrupção no meio da
+  gravação mantém o checkpoint anterior
+- o índice é a fonte da listagem (sem varrer o diretório); é relido quando
+  o arquivo é trocado, para que vários workers da API vejam os mesmos modelos
+- Q-tables são abertas como memmap (``TabelaQCongelada``): workers que
+  servem o mesmo modelo compartilham uma cópia
+
+Os workers de treinamento (``rl_training.py``) só gravam checkpoints
+(``write_checkpoint``); o índice é atualizado pelo processo da API a partir
+dos eventos do executor. Os ``model_<uuid>.json`` do formato anterior são
+importados para o índice na primeira carga.
+"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from simuladores.power_sim.tabela_q import TabelaQCongelada, TabelaQEsparsa
+
+INDEX_FILE = "index.json"
+CHECKPOINT_FILE = "checkpoint.json"
+INDEX_FORMAT = 1
+
+# Atributos do BasicRLAgent gravados em agente.json
+AGENT_ATTRIBUTES = ("learning_rate", "gamma", "epsilon", "epsilon_min", "epsilon_decay",
+                    "episodes", "action_space_size")
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """Grava JSON em arquivo temporário e troca (leitores nunca veem meio arquivo)."""
+    temporario = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temporario.write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+    os.replace(temporario, path)
+
+
+# ====== CHECKPOINTS ======
+
+def read_checkpoint(model_dir: Path) -> Optional[Dict[str, Any]]:
+    """Ponteiro do último checkpoint do modelo (None se não houver)."""
+    try:
+        checkpoint = json.loads((Path(model_dir) / CHECKPOINT_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    checkpoint["path"] = str(Path(model_dir) / checkpoint["snapshot"])
+    return checkpoint
+
+
+def write_checkpoint(model_dir: Path, algorithm: str, episodes_completed: int, rewards,
+                     agent=None, sb3_model=None, final: bool = False) -> Path:
+    """
+    Grava um checkpoint completo do modelo e aponta ``checkpoint.json`` para
+    ele; checkpoints anteriores são removidos. Retorna o diretório gravado.
+    """
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    anterior = read_checkpoint(model_dir)
+    sequencia = anterior["sequence"] + 1 if anterior else 1
+    nome = f"snap_{sequencia:06d}"
+
+    temporario = model_dir / f".{nome}.{os.getpid()}.tmp"
+    shutil.rmtree(temporario, ignore_errors=True)
+    temporario.mkdir()
+    np.save(temporario / "recompensas.npy", np.asarray(rewards, dtype=np.float64))
+    if agent is not None:
+        chaves, valores = agent.q_table.exportar()
+        np.save(temporario / "q_chaves.npy", chaves)
+        np.save(temporario / "q_valores.npy", valores)
+        _write_json(temporario / "agente.json", {a: getattr(agent, a) for a in AGENT_ATTRIBUTES})
+    if sb3_model is not None:
+        sb3_model.save(temporario / "modelo.zip")
+    os.replace(temporario, model_dir / nome)
+
+    _write_json(model_dir / CHECKPOINT_FILE, {
+        "snapshot": nome,
+        "sequence": sequencia,
+        "algorithm": algorithm,
+        "episodes_completed": episodes_completed,
+        "final": final,
+        "saved_at": datetime.now().isoformat()
+    })
+
+    # Processos com o checkpoint anterior aberto como memmap continuam lendo
+    # os arquivos removidos até fechá-los
+    for antigo in model_dir.glob("snap_*"):
+        if antigo.name != nome:
+            shutil.rmtree(antigo, ignore_errors=True)
+    return model_dir / nome
+
+
+def load_rewards(snapshot_dir: Path) -> List[float]:
+    return np.load(Path(snapshot_dir) / "recompensas.npy").tolist()
+
+
+def load_q_table(snapshot_dir: Path, mmap: bool = True) -> TabelaQCongelada:
+    """Q-table somente leitura do checkpoint (memmap por padrão)."""
+    modo = "r" if mmap else None
+    snapshot_dir = Path(snapshot_dir)
+    return TabelaQCongelada(np.load(snapshot_dir / "q_chaves.npy", mmap_mode=modo),
+                            np.load(snapshot_dir / "q_valores.npy", mmap_mode=modo))
+
+
+def restore_agent(snapshot_dir: Path, agent):
+    """Restaura hiperparâmetros, contadores e Q-table (editável) no ``BasicRLAgent``."""
+    snapshot_dir = Path(snapshot_dir)
+    estado = json.loads((snapshot_dir / "agente.json").read_text(encoding="utf-8"))
+    for atributo, valor in estado.items():
+        setattr(agent, atributo, valor)
+    agent.q_table = TabelaQEsparsa.de_arrays(np.load(snapshot_dir / "q_chaves.npy"),
+                                             np.load(snapshot_dir / "q_valores.npy"))
+    return agent
+
+
+# ====== ÍNDICE ======
+
+class ModelRegistry:
+    """
+    Índice dos modelos em ``root/index.json``.
+
+    As entradas são dicionários JSON (id, name, algorithm, status,
+    episódios, performance, config, path do checkpoint). ``status`` é
+    ``"checkpoint"`` enquanto o treinamento não terminou (pode ser
+    retomado), ``"completed"`` no fim e ``"legacy"`` para modelos importados
+    do formato anterior.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._signature: Optional[Tuple[int, int]] = None
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / INDEX_FILE
+
+    def model_dir(self, model_id: str) -> Path:
+        return self.root / model_id
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Entradas do índice, relidas só quando o arquivo muda (chamar com o lock)."""
+        try:
+            signature = self._stat()
+        except FileNotFoundError:
+            if self._entries is None:
+                self._entries = self._import_legacy()
+                if self._entries:
+                    self._save()
+            return self._entries
+
+        if self._entries is None or signature != self._signature:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            self._entries = index["models"]
+            self._signature = signature
+        return self._entries
+
+    def _stat(self) -> Tuple[int, int]:
+        # Cada gravação troca o arquivo (os.replace): o inode muda mesmo que o
+        # mtime não mude na resolução do sistema de arquivos
+        stat = self.index_path.stat()
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_json(self.index_path, {"format": INDEX_FORMAT, "models": self._entries})
+        self._signature = self._stat()
+
+    def _import_legacy(self) -> Dict[str, Dict[str, Any]]:
+        """Entradas dos ``model_<uuid>.json`` do formato anterior."""
+        entries = {}
+        for path in sorted(self.root.glob("model_*.json")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            model_id = data.get("training_id") or path.stem[len("model_"):]
+            entries[model_id] = {
+                "id": model_id,
+                "name": f"RL_Model_{model_id[:8]}",
+                "algorithm": data.get("config", {}).get("algorithm", "legacy"),
+                "status": "legacy",
+                "created_at": data.get("trained_at"),
+                "updated_at": data.get("trained_at"),
+                "episodes_completed": data.get("episodes", 0),
+                "performance": {"episodes": data.get("episodes", 0),
+                                "final_reward": data.get("final_reward")},
+                "config": data.get("config", {}),
+                "path": str(path)
+            }
+        return entries
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(entry) for entry in self._load().values()]
+
+    def get(self, model_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._load().get(model_id)
+            return None if entry is None else dict(entry)
+
+    def __contains__(self, model_id: str) -> bool:
+        return self.get(model_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    def register(self, model_id: str, **fields) -> Dict[str, Any]:
+        """Cria ou atualiza a entrada do modelo e grava o índice."""
+        with self._lock:
+            entries = self._load()
+            agora = datetime.now().isoformat()
+            entry = entries.get(model_id) or {"id": model_id, "name": f"RL_Model_{model_id[:8]}",
+                                              "created_at": agora}
+            entry.update(fields, updated_at=agora)
+            entries[model_id] = entry
+            self._save()
+            return dict(entry)
+
+    def remove(self, model_id: str, delete_files: bool = True) -> bool:
+        """Remove a entrada do índice e, por padrão, o diretório do modelo."""
+        with self._lock:
+            entries = self._load()
+            existia = entries.pop(model_id, None) is not None
+            if existia:
+                self._save()
+        if delete_files:
+            shutil.rmtree(self.model_dir(model_id), ignore_errors=True)
+        return existia
+
+    def load_q_table(self, model_id: str, mmap: bool = True) -> TabelaQCongelada:
+        """Q-table do checkpoint mais recente do modelo (memmap por padrão)."""
+        entry = self.get(model_id)
+        if entry is None or entry.get("algorithm") != "q_learning":
+            raise KeyError(f"Modelo Q-Learning não registrado: {model_id}")
+        return load_q_table(entry["path"], mmap=mmap)
@@ -0,0 +1,228 @@
+"""
+Armazenamento Compartilhado da Rede Elétrica
+============================================
+
+Mantém em memória, uma vez por processo, a rede pandapower descrita em
+``ieee14_protecao.json``. O arquivo só é lido e convertido novamente quando
+o mtime muda *e* o hash SHA-256 do conteúdo também mudou, de modo que os
+endpoints de consulta deixam de pagar ``json.load`` + ``from_json_string``
+a cada requisição. A carga em si prefere o snapshot binário ``.npz``
+(ver ``simuladores/power_sim/snapshot_binario.py``) quando disponível.
+
+Uso:
+- ``view()``: rede compartilhada, somente leitura (endpoints GET)
+- ``checkout()``: cópia independente para alteração (copy-on-write)
+- ``commit()``: publica a cópia alterada como nova versão da rede
+  (com ``expected_version``, só se ninguém publicou outra antes)
+- ``update()``: checkout → alteração → commit, repetido sobre a versão
+  mais recente quando outra escrita publica no meio (sem perder nenhuma)
+- ``state_hash()``: hash das tabelas elétricas da versão atual
+- ``stats()``: contadores de acerto/falha do cache
+"""
+
+import copy
+import hashlib
+import threading
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import pandas as pd
+import pandapower as pp
+
+from simuladores.power_sim.snapshot_binario import carregar_documento
+
+# Tabelas que definem o estado elétrico da rede (entrada do fluxo de potência)
+STATE_TABLES = ("bus", "line", "trafo", "load", "ext_grid")
+
+# Tentativas de update() antes de desistir por conflitos seguidos
+UPDATE_MAX_ATTEMPTS = 5
+
+T = TypeVar("T")
+
+
+class VersionConflictError(RuntimeError):
+    """``commit`` sobre uma versão da rede que outra escrita já substituiu."""
+
+
+def network_state_hash(net: pp.pandapowerNet) -> str:
+    """Hash SHA-256 do conteúdo das tabelas de STATE_TABLES (colunas e índices)."""
+    digest = hashlib.sha256()
+    for table in STATE_TABLES:
+        df = net[table]
+        digest.update(f"{table}:{list(df.columns)}".encode())
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class NetworkSnapshot:
+    """Versão publicada da rede. Nunca é alterada depois de criada."""
+    version: int
+    net: pp.pandapowerNet
+    extras: Dict[str, Any]  # demais campos do JSON (dispositivos, zonas, geodados)
+    file_mtime_ns: int
+    content_hash: str
+    loaded_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+
+class NetworkStore:
+    """
+    Cache versionado da rede carregada de um arquivo JSON ProtecAI.
+
+    A rede devolvida por ``view()`` é compartilhada entre requisições e não
+    deve ser modificada (inclusive por ``pp.runpp``, que grava as tabelas
+    ``res_*``). Quem precisa alterar a rede usa ``checkout()`` e, se a
+    alteração deve valer para os próximos leitores, ``commit()``.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._snapshot: Optional[NetworkSnapshot] = None
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.commits = 0
+        self._state_hash = (None, None)  # (versão, hash)
+
+    def snapshot(self) -> NetworkSnapshot:
+        """Retorna a versão atual, recarregando o arquivo apenas se mudou."""
+        with self._lock:
+            mtime_ns = self.path.stat().st_mtime_ns
+            current = self._snapshot
+
+            if current is not None and current.file_mtime_ns == mtime_ns:
+                self.hits += 1
+                return current
+
+            raw = self.path.read_bytes()
+            content_hash = hashlib.sha256(raw).hexdigest()
+
+            # Arquivo "tocado" sem alteração de conteúdo: mantém a versão
+            if current is not None and current.content_hash == content_hash:
+                self._snapshot = replace(current, file_mtime_ns=mtime_ns)
+                self.hits += 1
+                return self._snapshot
+
+            self.misses += 1
+            # Usa o snapshot binário (.npz) quando ele corresponde ao JSON
+            data = carregar_documento(self.path, raw)
+            net = data.pop("net")
+
+            self._version += 1
+            self._snapshot = NetworkSnapshot(
+                version=self._version,
+                net=net,
+                extras=data,
+                file_mtime_ns=mtime_ns,
+                content_hash=content_hash
+            )
+            return self._snapshot
+
+    def view(self) -> pp.pandapowerNet:
+        """Rede compartilhada para leitura."""
+        return self.snapshot().net
+
+    def checkout(self) -> pp.pandapowerNet:
+        """Cópia independente da versão atual, livre para alteração."""
+        return self.checkout_versioned()[1]
+
+    def checkout_versioned(self) -> Tuple[int, pp.pandapowerNet]:
+        """Versão atual e cópia dela (a versão vai em ``commit(expected_version=...)``)."""
+        snap = self.snapshot()
+        return snap.version, copy.deepcopy(snap.net)
+
+    def state_hash(self) -> str:
+        """Hash do estado elétrico da versão atual, calculado uma vez por versão."""
+        with self._lock:
+            snap = self.snapshot()
+            version, value = self._state_hash
+            if version != snap.version:
+                value = network_state_hash(snap.net)
+                self._state_hash = (snap.version, value)
+            return value
+
+    def commit(self, net: pp.pandapowerNet, expected_version: Optional[int] = None) -> int:
+        """
+        Publica uma rede obtida por ``checkout()`` como nova versão.
+
+        A versão publicada permanece válida até o próximo ``commit`` ou até
+        o arquivo em disco ser alterado. Leitores que já possuem a versão
+        anterior continuam com ela intacta.
+
+        Args:
+            net: rede alterada
+            expected_version: versão de onde a cópia saiu; se outra versão já
+                foi publicada, nada é gravado e ``VersionConflictError`` é
+                levantado (a alteração concorrente seria perdida)
+
+        Returns:
+            int: número da nova versão
+        """
+        with self._lock:
+            base = self.snapshot()
+            if expected_version is not None and base.version != expected_version:
+                raise VersionConflictError(
+                    f"Rede alterada na versão {base.version} (cópia da versão {expected_version})")
+            self._version += 1
+            self.commits += 1
+            self._snapshot = replace(
+                base,
+                version=self._version,
+                net=net,
+                loaded_at=datetime.now().isoformat()
+            )
+            return self._version
+
+    def update(self, modify: Callable[[pp.pandapowerNet], T],
+               max_attempts: int = UPDATE_MAX_ATTEMPTS) -> Tuple[int, T]:
+        """
+        Aplica ``modify`` a uma cópia da versão atual e a publica. Se outra
+        escrita publicar antes, ``modify`` é reaplicado sobre a versão nova;
+        exceções de ``modify`` interrompem sem publicar nada.
+
+        Returns:
+            (nova versão, retorno de ``modify``)
+        """
+        for attempt in range(max_attempts):
+            version, net = self.checkout_versioned()
+            result = modify(net)
+            try:
+                return self.commit(net, expected_version=version), result
+            except VersionConflictError:
+                if attempt == max_attempts - 1:
+                    raise
+
+    def invalidate(self):
+        """Descarta a versão em memória; a próxima leitura relê o arquivo."""
+        with self._lock:
+            self._snapshot = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores do cache para monitoramento."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "path": str(self.path),
+                "version": self._snapshot.version if self._snapshot else None,
+                "loaded_at": self._snapshot.loaded_at if self._snapshot else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "commits": self.commits,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+
+_stores: Dict[Path, NetworkStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_network_store(path: Path) -> NetworkStore:
+    """Retorna o store do processo associado ao arquivo informado."""
+    key = Path(path).resolve()
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = NetworkStore(key)
+        return _stores[key]
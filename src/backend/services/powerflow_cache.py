@@ -0,0 +1,161 @@
+"""
+Cache de Resultados do Fluxo de Potência
+========================================
+
+Guarda os resultados de ``pp.runpp`` indexados pelo hash do estado elétrico
+da rede (tabelas bus, line, trafo, load e ext_grid) e pelas opções do
+solver. Consultas repetidas sobre a mesma rede — polling de status por
+vários consoles, por exemplo — são respondidas sem rodar Newton-Raphson.
+
+- Entradas removidas por LRU quando o limite ``maxsize`` é atingido
+- ``invalidate_state()`` descarta apenas as entradas de um estado antigo
+- Falhas de convergência também são guardadas (``converged=False``)
+- Com ``recycle=True`` as falhas de cache com Newton-Raphson usam o
+  ``FluxoReciclado``: só as injeções mudaram, então ppc/Ybus são
+  reaproveitados e o solver parte da última solução
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+import pandapower as pp
+
+from simuladores.power_sim.fluxo_reciclado import FluxoReciclado
+
+from .network_store import network_state_hash
+
+
+@dataclass(frozen=True)
+class PowerFlowResult:
+    """Resultado de um fluxo de potência. As tabelas são somente leitura."""
+    converged: bool
+    res_bus: pd.DataFrame
+    res_line: pd.DataFrame
+    res_trafo: pd.DataFrame
+    error: Optional[str]
+    elapsed_s: float
+
+
+class PowerFlowCache:
+    """Cache LRU de resultados de fluxo de potência por estado da rede."""
+
+    def __init__(self, maxsize: int = 32, recycle: bool = False):
+        self.maxsize = maxsize
+        self.recycle = recycle
+        self._solvers: Dict[str, FluxoReciclado] = {}
+        self._entries: "OrderedDict[Tuple[str, str], PowerFlowResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _options_key(options: Dict[str, Any]) -> str:
+        return repr(sorted(options.items()))
+
+    def solve(self, net: pp.pandapowerNet, state_hash: Optional[str] = None,
+              **options) -> PowerFlowResult:
+        """
+        Retorna o resultado do fluxo de potência para a rede informada.
+
+        A rede não é alterada: em caso de falha no cache o fluxo roda sobre
+        uma cópia. Informe ``state_hash`` quando já o tiver (ex.:
+        ``NetworkStore.state_hash()``) para evitar recalcular o hash.
+
+        Args:
+            net: rede pandapower (tratada como somente leitura)
+            state_hash: hash do estado elétrico, se já conhecido
+            **options: opções repassadas a ``pp.runpp``
+        """
+        if state_hash is None:
+            state_hash = network_state_hash(net)
+        key = (state_hash, self._options_key(options))
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = self._run(net, options, self._solver(options))
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def _solver(self, options: Dict[str, Any]) -> Optional[FluxoReciclado]:
+        """Solver reciclado para as opções dadas (um por conjunto de opções)."""
+        if not self.recycle or options.get("algorithm", "nr") != "nr":
+            return None
+        key = self._options_key(options)
+        with self._lock:
+            if key not in self._solvers:
+                self._solvers[key] = FluxoReciclado(**options)
+            return self._solvers[key]
+
+    @staticmethod
+    def _run(net: pp.pandapowerNet, options: Dict[str, Any],
+             solver: Optional[FluxoReciclado] = None) -> PowerFlowResult:
+        start = time.perf_counter()
+        try:
+            if solver is not None:
+                work = solver.resolver(net)
+            else:
+                work = copy.deepcopy(net)
+                pp.runpp(work, **options)
+            error = None
+        except Exception as e:
+            error = str(e)
+        elapsed = time.perf_counter() - start
+
+        if error is not None:
+            empty = pd.DataFrame()
+            return PowerFlowResult(False, empty, empty, empty, error, elapsed)
+
+        return PowerFlowResult(
+            converged=bool(work.converged),
+            res_bus=work.res_bus.copy(),
+            res_line=work.res_line.copy(),
+            res_trafo=work.res_trafo.copy(),
+            error=error,
+            elapsed_s=elapsed
+        )
+
+    def invalidate_state(self, state_hash: str) -> int:
+        """Remove as entradas de um estado da rede. Retorna quantas saíram."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == state_hash]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores do cache para monitoramento."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "recycle": self.recycle,
+                "solvers": {key: solver.estatisticas()
+                            for key, solver in self._solvers.items()}
+            }
@@ -0,0 +1,374 @@
+"""
+Executor de Treinamentos RL
+===========================
+
+Roda os treinamentos pedidos em ``POST /api/v1/rl/train`` em processos
+separados, fora do event loop da API:
+
+- um processo por treinamento, no máximo ``max_concurrent`` ao mesmo tempo;
+  os excedentes ficam na fila e começam quando outro termina
+- os workers publicam o progresso em uma fila compartilhada
+  (``multiprocessing.Queue``); uma thread do executor a consome e entrega
+  cada evento ao ``on_event`` do chamador
+- cancelamento cooperativo (``multiprocessing.Event`` verificado a cada
+  episódio); o processo é encerrado à força se não parar em
+  ``cancel_grace_s`` segundos
+
+Algoritmos:
+
+- ``"q_learning"``: ``BasicRLAgent`` do coordenador de ``src/core`` treinado
+  em lock-step com ``VectorizedTrainer`` (``n_replicas`` réplicas)
+- ``"PPO"``: Stable-Baselines3 via ``RLProtectionOptimizer`` sobre o
+  ambiente em lote (requer stable-baselines3 instalado)
+
+Checkpoints: a cada ``checkpoint_interval`` episódios, e também ao
+cancelar, o worker grava o modelo em ``model_dir`` (ver
+``model_registry.write_checkpoint``). Com ``resume`` o treinamento continua
+do último checkpoint até completar ``episodes``.
+
+Eventos (``on_event(tipo, training_id, dados)``): ``running``, ``progress``
+(episódios concluídos e recompensas novas), ``checkpoint`` (caminho do
+checkpoint gravado), ``completed`` (caminho do checkpoint final), ``failed``
+(mensagem de erro) e ``cancelled``.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .model_registry import load_rewards, read_checkpoint, restore_agent, write_checkpoint
+
+TRAINING_ALGORITHMS = ("q_learning", "PPO")
+FINAL_EVENTS = ("completed", "failed", "cancelled")
+
+# Intervalo mínimo entre eventos de progresso de um worker
+PROGRESS_INTERVAL_S = 0.25
+# Passos de ambiente do PPO contados como um episódio
+PPO_STEPS_PER_EPISODE = 10
+# Episódios entre checkpoints quando a configuração não informa
+DEFAULT_CHECKPOINT_INTERVAL = 100
+
+EventHandler = Callable[[str, str, Dict[str, Any]], None]
+
+
+# ====== WORKER ======
+
+class _Reporter:
+    """Agrupa as recompensas por episódio e publica no máximo a cada PROGRESS_INTERVAL_S."""
+
+    def __init__(self, training_id: str, channel):
+        self.training_id = training_id
+        self.channel = channel
+        self.episodes_completed = 0
+        self.rewards = []
+        self.history = []
+        self.convergence_status = "training"
+        self._last = 0.0
+
+    def send(self, kind: str, **data):
+        self.channel.put((kind, self.training_id, data))
+
+    def episode(self, reward: float, convergence_status: str = "training"):
+        self.episodes_completed += 1
+        self.rewards.append(reward)
+        self.history.append(reward)
+        self.convergence_status = convergence_status
+        if time.monotonic() - self._last >= PROGRESS_INTERVAL_S:
+            self.flush()
+
+    def restore(self, rewards):
+        """Continua de um checkpoint: republica o histórico para a API."""
+        self.history = list(rewards)
+        self.rewards = list(rewards)
+        self.episodes_completed = len(self.history)
+        self.flush()
+
+    def checkpoint(self, model_dir: Path, algorithm: str, final: bool = False, **modelo) -> Path:
+        """Grava um checkpoint; checkpoints intermediários geram o evento ``checkpoint``."""
+        self.flush()
+        path = write_checkpoint(model_dir, algorithm, self.episodes_completed, self.history,
+                                final=final, **modelo)
+        if not final:
+            self.send("checkpoint", episodes_completed=self.episodes_completed, saved_model_path=str(path))
+        return path
+
+    def flush(self):
+        if self.rewards:
+            self.send("progress", episodes_completed=self.episodes_completed, rewards=self.rewards,
+                      convergence_status=self.convergence_status)
+            self.rewards = []
+        self._last = time.monotonic()
+
+
+def _converged(rewards) -> bool:
+    """Mesmo critério do treinamento anterior: últimos 50 episódios quase constantes."""
+    return len(rewards) > 101 and len({round(r, 1) for r in rewards[-50:]}) <= 3
+
+
+def _resume_checkpoint(config: Dict[str, Any], reporter: _Reporter) -> Optional[Dict[str, Any]]:
+    """Último checkpoint do modelo quando o treinamento é uma retomada."""
+    checkpoint = read_checkpoint(config["model_dir"]) if config.get("resume") else None
+    if checkpoint is not None:
+        reporter.restore(load_rewards(checkpoint["path"]))
+    return checkpoint
+
+
+def _train_q_learning(config: Dict[str, Any], reporter: _Reporter, cancel) -> Optional[Path]:
+    from src.core.rl_protection_coordinator_clean import ProtectionCoordinator, VectorizedTrainer
+
+    coordinator = ProtectionCoordinator()
+    agent = coordinator.rl_agent
+    checkpoint = _resume_checkpoint(config, reporter)
+    if checkpoint is not None:
+        restore_agent(checkpoint["path"], agent)
+    else:
+        agent.learning_rate = config["learning_rate"]
+        agent.gamma = config["discount_factor"]
+        agent.epsilon = config["epsilon_start"]
+        agent.epsilon_min = config["epsilon_end"]
+        agent.epsilon_decay = config["epsilon_decay"]
+    trainer = VectorizedTrainer(coordinator, n_replicas=config["n_replicas"])
+    model_dir = Path(config["model_dir"])
+    interval = config.get("checkpoint_interval") or DEFAULT_CHECKPOINT_INTERVAL
+
+    while reporter.episodes_completed < config["episodes"]:
+        if cancel.is_set():
+            reporter.checkpoint(model_dir, "q_learning", agent=agent)
+            return None
+        reward = float(trainer.train_episode().mean())
+        converged = _converged(reporter.history + [reward])
+        reporter.episode(reward, "converged" if converged else "training")
+        if converged:
+            break
+        if reporter.episodes_completed % interval == 0 and reporter.episodes_completed < config["episodes"]:
+            reporter.checkpoint(model_dir, "q_learning", agent=agent)
+
+    return reporter.checkpoint(model_dir, "q_learning", final=True, agent=agent)
+
+
+def _train_ppo(config: Dict[str, Any], reporter: _Reporter, cancel) -> Optional[Path]:
+    from stable_baselines3.common.callbacks import BaseCallback
+
+    from simuladores.power_sim.rl_protection_agent import RLProtectionOptimizer
+    from simuladores.power_sim.snapshot_binario import carregar_documento
+
+    model_dir = Path(config["model_dir"])
+    interval = config.get("checkpoint_interval") or DEFAULT_CHECKPOINT_INTERVAL
+
+    class ProgressCallback(BaseCallback):
+        def __init__(self):
+            super().__init__()
+            self.rewards = []
+
+        def _on_step(self) -> bool:
+            self.rewards.append(float(self.locals["rewards"].mean()))
+            while len(self.rewards) >= PPO_STEPS_PER_EPISODE:
+                episodio = self.rewards[:PPO_STEPS_PER_EPISODE]
+                del self.rewards[:PPO_STEPS_PER_EPISODE]
+                reporter.episode(sum(episodio))
+                if reporter.episodes_completed % interval == 0:
+                    reporter.checkpoint(model_dir, "PPO", sb3_model=self.model)
+            return not cancel.is_set()
+
+    checkpoint = _resume_checkpoint(config, reporter)
+    restantes = config["episodes"] - reporter.episodes_completed
+    data_path = Path(config["data_path"])
+    devices = carregar_documento(data_path)["protection_devices"]
+    optimizer = RLProtectionOptimizer(data_path, devices, n_envs=config["n_replicas"], vec_env="batch")
+    optimizer.train_agent("PPO", total_timesteps=max(restantes, 0) * PPO_STEPS_PER_EPISODE,
+                          callback=ProgressCallback(),
+                          resume_from=None if checkpoint is None else Path(checkpoint["path"]) / "modelo.zip")
+    if cancel.is_set():
+        reporter.checkpoint(model_dir, "PPO", sb3_model=optimizer.model)
+        return None
+
+    return reporter.checkpoint(model_dir, "PPO", final=True, sb3_model=optimizer.model)
+
+
+def _training_worker(training_id: str, config: Dict[str, Any], channel, cancel):
+    """Processo de um treinamento: publica eventos em ``channel`` até um evento final."""
+    reporter = _Reporter(training_id, channel)
+    reporter.send("running", start_time=datetime.now(), pid=os.getpid())
+    try:
+        train = _train_ppo if config["algorithm"] == "PPO" else _train_q_learning
+        path = train(config, reporter, cancel)
+        reporter.flush()
+        if path is None:
+            reporter.send("cancelled", episodes_completed=reporter.episodes_completed)
+        else:
+            reporter.send("completed", episodes_completed=reporter.episodes_completed,
+                          saved_model_path=str(path))
+    except BaseException as e:
+        reporter.flush()
+        reporter.send("failed", error_message=f"{type(e).__name__}: {e}",
+                      traceback=traceback.format_exc())
+
+
+# ====== EXECUTOR ======
+
+class TrainingExecutor:
+    """
+    Fila de treinamentos com no máximo ``max_concurrent`` processos ativos.
+
+    ``submit`` e ``cancel`` só mexem na fila e em flags (não bloqueiam o
+    event loop); a thread do executor inicia os processos, consome a fila de
+    progresso e chama ``on_event`` para cada evento recebido.
+    """
+
+    def __init__(self, on_event: EventHandler, max_concurrent: Optional[int] = None,
+                 mp_context: Optional[str] = "spawn", cancel_grace_s: float = 5.0,
+                 poll_interval_s: float = 0.1):
+        self.on_event = on_event
+        self.max_concurrent = max_concurrent or max(1, (os.cpu_count() or 1) // 2)
+        self.cancel_grace_s = cancel_grace_s
+        self.poll_interval_s = poll_interval_s
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._channel = None
+        self._pending: Deque[Tuple[str, Dict[str, Any]]] = deque()
+        self._running: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.started = 0
+
+    def submit(self, training_id: str, config: Dict[str, Any]):
+        """Enfileira um treinamento; ele começa assim que houver vaga."""
+        if config.get("algorithm") not in TRAINING_ALGORITHMS:
+            raise ValueError(f"Algoritmo deve ser um de {TRAINING_ALGORITHMS}")
+        with self._lock:
+            if self._stopping:
+                raise RuntimeError("Executor de treinamentos encerrado")
+            self._pending.append((training_id, config))
+            if self._thread is None:
+                self._channel = self._ctx.Queue()
+                self._thread = threading.Thread(target=self._loop, name="rl-training-executor",
+                                                daemon=True)
+                self._thread.start()
+
+    def cancel(self, training_id: str) -> bool:
+        """Cancela um treinamento na fila ou em execução; False se não estiver ativo."""
+        with self._lock:
+            for item in self._pending:
+                if item[0] == training_id:
+                    self._pending.remove(item)
+                    break
+            else:
+                running = self._running.get(training_id)
+                if running is None:
+                    return False
+                running["cancel"].set()
+                running["cancelled_at"] = time.monotonic()
+                return True
+        self._emit("cancelled", training_id, {"episodes_completed": 0})
+        return True
+
+    def is_active(self, training_id: str) -> bool:
+        with self._lock:
+            return training_id in self._running or any(t == training_id for t, _ in self._pending)
+
+    def _emit(self, kind: str, training_id: str, data: Dict[str, Any]):
+        try:
+            self.on_event(kind, training_id, data)
+        except Exception:
+            traceback.print_exc()
+
+    def _start_pending(self):
+        with self._lock:
+            while self._pending and len(self._running) < self.max_concurrent:
+                training_id, config = self._pending.popleft()
+                cancel = self._ctx.Event()
+                process = self._ctx.Process(target=_training_worker, name=f"rl-training-{training_id[:8]}",
+                                            args=(training_id, config, self._channel, cancel), daemon=True)
+                process.start()
+                self._running[training_id] = {"process": process, "cancel": cancel, "cancelled_at": None}
+                self.started += 1
+
+    def _dispatch(self, kind: str, training_id: str, data: Dict[str, Any]):
+        if kind in FINAL_EVENTS:
+            with self._lock:
+                running = self._running.pop(training_id, None)
+            if running is None:
+                return
+            running["process"].join(timeout=self.cancel_grace_s)
+        self._emit(kind, training_id, data)
+
+    def _drain(self) -> int:
+        recebidos = 0
+        while True:
+            try:
+                kind, training_id, data = self._channel.get_nowait()
+            except queue.Empty:
+                return recebidos
+            self._dispatch(kind, training_id, data)
+            recebidos += 1
+
+    def _reap(self):
+        """Processos que morreram sem evento final ou que não atenderam ao cancelamento."""
+        with self._lock:
+            mortos = any(not r["process"].is_alive() for r in self._running.values())
+        if mortos:
+            self._drain()  # O evento final pode ter chegado junto com a saída
+
+        agora = time.monotonic()
+        finais = []
+        with self._lock:
+            for training_id, running in list(self._running.items()):
+                process = running["process"]
+                if not process.is_alive():
+                    del self._running[training_id]
+                    if running["cancelled_at"] is not None:
+                        finais.append(("cancelled", training_id, {}))
+                    else:
+                        finais.append(("failed", training_id, {
+                            "error_message": f"Processo de treinamento terminou (código {process.exitcode})"}))
+                elif running["cancelled_at"] is not None and agora - running["cancelled_at"] > self.cancel_grace_s:
+                    process.terminate()
+                    del self._running[training_id]
+                    finais.append(("cancelled", training_id, {"terminated": True}))
+        for kind, training_id, data in finais:
+            self._emit(kind, training_id, data)
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                if self._stopping and not self._running:
+                    return
+            self._start_pending()
+            try:
+                kind, training_id, data = self._channel.get(timeout=self.poll_interval_s)
+            except queue.Empty:
+                pass
+            else:
+                self._dispatch(kind, training_id, data)
+                self._drain()
+            self._reap()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "running": len(self._running),
+                "queued": len(self._pending),
+                "started": self.started
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Cancela a fila e os treinamentos ativos e encerra a thread do executor."""
+        with self._lock:
+            self._stopping = True
+            pendentes = [t for t, _ in self._pending]
+            self._pending.clear()
+            ativos = list(self._running)
+        for training_id in pendentes:
+            self._emit("cancelled", training_id, {})
+        for training_id in ativos:
+            self.cancel(training_id)
+        if wait and self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,115 @@
+"""
+Motor de Curto-Circuito por Versão da Rede
+==========================================
+
+Mantém um ``MotorCurtoCircuito`` (Zbus da rede pandapower) por estado da
+rede compartilhada. Quando o ``state_hash`` do ``NetworkStore`` muda:
+
+- se só mudaram cargas/injeções, a Zbus continua valendo e é reaproveitada;
+- se só mudaram o ``in_service`` de linhas/trafos ou parâmetros de linhas,
+  o motor aplica atualizações de posto 2 na Zbus (O(n²) por ramo);
+- qualquer outra mudança (ou uma manobra que ilha barras) remonta o motor.
+
+Entre uma alteração e outra, qualquer falta ou varredura completa é
+respondida pelas operações matriciais do motor.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from simuladores.power_sim.curto_circuito import (
+    PARAMETROS_LINHA, MotorCurtoCircuito, VarreduraCurto
+)
+from simuladores.power_sim.fluxo_reciclado import (
+    COLUNAS_INJECAO, TABELAS_TOPOLOGIA, assinatura_topologia
+)
+
+from .network_store import NetworkStore
+
+# Cargas e geração estática não entram na Zbus
+SC_TABLES = tuple(t for t in TABELAS_TOPOLOGIA if t not in ("load", "sgen"))
+
+# Colunas que o motor sabe atualizar sem remontar
+SC_INCREMENTAL_COLUMNS = {
+    **COLUNAS_INJECAO,
+    "line": ("in_service",) + PARAMETROS_LINHA,
+    "trafo": ("in_service",),
+}
+
+
+def short_circuit_signature(net) -> str:
+    """Assinatura do que exige remontar a Zbus (tudo menos manobras de ramos e cargas)."""
+    return assinatura_topologia(net, SC_TABLES, SC_INCREMENTAL_COLUMNS)
+
+
+class ShortCircuitService:
+    """Motor de curto-circuito ligado à versão atual de um ``NetworkStore``."""
+
+    def __init__(self, store: NetworkStore):
+        self.store = store
+        self._engine: Optional[Tuple[str, MotorCurtoCircuito]] = None
+        self._signature: Optional[str] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.reuses = 0
+        self.incremental_updates = 0
+
+    def engine(self) -> MotorCurtoCircuito:
+        """
+        Motor da versão atual da rede. O mesmo objeto é atualizado no lugar
+        nas manobras seguintes: use ``sweep``/``fault_at`` para leituras
+        concorrentes.
+        """
+        with self._lock:
+            return self._current_engine()
+
+    def _current_engine(self) -> MotorCurtoCircuito:
+        state_hash = self.store.state_hash()
+        if self._engine is not None and self._engine[0] == state_hash:
+            return self._engine[1]
+
+        net = self.store.view()
+        signature = short_circuit_signature(net)
+        if self._engine is not None and signature == self._signature:
+            engine = self._engine[1]
+            try:
+                applied = engine.sincronizar(net)
+            except np.linalg.LinAlgError:
+                pass  # ilhamento ou ramo fora do modelo: remonta abaixo
+            else:
+                if applied:
+                    self.incremental_updates += applied
+                else:
+                    self.reuses += 1
+                self._engine = (state_hash, engine)
+                return engine
+
+        self._engine = (state_hash, MotorCurtoCircuito(net))
+        self._signature = signature
+        self.builds += 1
+        return self._engine[1]
+
+    def sweep(self, fault_impedance_ohm: float = 0.0) -> VarreduraCurto:
+        """Falta trifásica em todas as barras, com impedância de falta em ohms."""
+        with self._lock:
+            engine = self._current_engine()
+            z_base = engine.vn_kv ** 2 / engine.base_mva
+            return engine.varredura(fault_impedance_ohm / z_base)
+
+    def fault_at(self, bus: int, fault_impedance_ohm: float = 0.0) -> Optional[Dict[str, Any]]:
+        """Resumo da falta em uma barra; ``None`` se a barra não estiver no modelo."""
+        sweep = self.sweep(fault_impedance_ohm)
+        if not np.any(sweep.barras == bus):
+            return None
+        return sweep.falta(bus)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"builds": self.builds,
+                 "reuses": self.reuses,
+                 "incremental_updates": self.incremental_updates,
+                 "buses": 0 if self._engine is None else len(self._engine[1].barras)}
+        if self._engine is not None:
+            stats["factorization"] = self._engine[1].fatoracao.estatisticas()
+        return stats
@@ -8,14 +8,34 @@ com algoritmo de aprendizado por reforço para otimização automática.
 
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Tuple, Optional
 import random
+from types import MappingProxyType
 import json
+import logging
+import time
 from datetime import datetime
 
+from simuladores.power_sim.banco_dispositivos import (
+    BancoDispositivos, DispositivoVinculado, MemoSimulacoes, contar_problemas_lote,
+    problemas_coordenacao, registros_para_dicts
+)
+from simuladores.power_sim.tabela_q import CodificadorEstado, TabelaQEsparsa
+from simuladores.power_sim.avaliacao_incremental import AvaliadorIncremental
+from simuladores.power_sim.avaliacao_paralela import (
+    AvaliadorParalelo, ajustes_do_banco, cenarios_compactos, gerar_cenarios, metricas_cenarios
+)
+
+try:
+    from simuladores.power_sim.curto_circuito import motor_rede_padrao, zth_barras_ieee
+except ImportError:
+    motor_rede_padrao = None
+
+logger = logging.getLogger(__name__)
+
 @dataclass
-class ProtectionDevice:
+class ProtectionDevice(DispositivoVinculado):
     """Dispositivo de proteção ANSI com parâmetros reais"""
     id: str
     zone: str  # Z1 ou Z2
@@ -39,15 +59,36 @@ class ProtectionZone:
 
 @dataclass
 class FaultSimulationResult:
-    """Resultado completo da simulação de falta"""
+    """
+    Resultado completo da simulação de falta
+
+    device_responses e coordination_issues são arrays estruturados
+    (RESPOSTA_DTYPE / PROBLEMA_DTYPE) com os mesmos campos dos dicionários
+    da API; to_dict() converte para o formato JSON.
+    """
     fault_location: str
     fault_type: str
     fault_current_a: float
     affected_zone: str
     coordination_ok: bool
-    device_responses: List[Dict]
-    coordination_issues: List[Dict]
+    device_responses: np.ndarray
+    coordination_issues: np.ndarray
     normative_compliance: Dict
+    # Banco que gerou as respostas (máscaras por tipo/id pré-calculadas)
+    device_bank: Optional[BancoDispositivos] = field(default=None, repr=False, compare=False)
+
+    def to_dict(self) -> Dict:
+        """Formato da API: respostas e problemas como listas de dicionários"""
+        return {
+            'fault_location': self.fault_location,
+            'fault_type': self.fault_type,
+            'fault_current_a': float(self.fault_current_a),
+            'affected_zone': self.affected_zone,
+            'coordination_ok': bool(self.coordination_ok),
+            'device_responses': registros_para_dicts(self.device_responses),
+            'coordination_issues': registros_para_dicts(self.coordination_issues),
+            'normative_compliance': self.normative_compliance
+        }
 
 class BasicRLAgent:
     """
@@ -55,16 +96,26 @@ class BasicRLAgent:
     Algoritmo: Q-Learning com epsilon-greedy
     """
     
+    # Limites das faixas de discretização dos ajustes de cada dispositivo
+    PICKUP_LIMITS = (0.1, 0.2, 0.35, 0.6, 1.0, 1.5, 2.5, 4.0)  # pu
+    DELAY_LIMITS = (0.05, 0.1, 0.2, 0.3, 0.45, 0.7, 1.0, 1.5)  # segundos
+    MAX_STATE_DEVICES = 8
+    
     def __init__(self, state_size=64, action_space_size=32, learning_rate=0.01, epsilon=0.3):
-        self.state_size = state_size
+        # Estados discretizados por dispositivo (pickup, atraso, ativo) e
+        # empacotados em uma chave inteira sem colisões; state_size é mantido
+        # por compatibilidade
+        self.state_encoder = CodificadorEstado(
+            (self.PICKUP_LIMITS, self.DELAY_LIMITS, (0.5,)) * self.MAX_STATE_DEVICES)
+        self.state_size = self.state_encoder.n_estados
         self.action_space_size = action_space_size
         self.learning_rate = learning_rate
         self.epsilon = epsilon
         self.epsilon_decay = 0.99  # Decay mais lento para exploração adequada
         self.epsilon_min = 0.05
         
-        # Q-table para aprendizado - maior para capturar complexidade
-        self.q_table = np.zeros((state_size, action_space_size))
+        # Q-table esparsa: uma linha por estado visitado
+        self.q_table = TabelaQEsparsa(action_space_size)
         
         # Histórico de treinamento
         self.episodes = 0
@@ -75,57 +126,28 @@ class BasicRLAgent:
         self.gamma = 0.95  # Fator de desconto
         self.min_exploration_episodes = 50  # Mínimo de episódios para exploração
     
-    def get_state(self, devices, zones):
+    def get_state(self, devices, zones=None):
         """
-        Estado avançado para coordenação de proteção baseado em normas técnicas
-        Captura: coordenação, seletividade, conformidade normativa, tempos, correntes
-        """
-        state_vector = []
-        
-        # 1. Estado dos dispositivos (primeiros 32 valores)
-        for i, device in enumerate(devices[:8]):  # Máximo 8 dispositivos
-            state_vector.extend([
-                device.pickup_current / 2.0,  # Normalizado
-                device.time_delay / 2.0,      # Normalizado
-                1 if device.zone == 'Z1' else 0,
-                1 if device.status == 'active' else 0
-            ])
-        
-        # Preenche até 32 se tiver menos de 8 dispositivos
-        while len(state_vector) < 32:
-            state_vector.append(0)
-        
-        # 2. Estado das zonas (próximos 16 valores)
-        for zone in zones[:2]:  # Máximo 2 zonas
-            state_vector.extend([
-                len(zone.devices) / 8.0,    # Número de dispositivos normalizado
-                zone.power_mva / 50.0,      # Potência normalizada
-                zone.voltage_kv / 20.0,     # Tensão normalizada
-                len(zone.buses) / 15.0      # Número de barras normalizado
-            ])
-        
-        # 3. Estados adicionais para complexidade (16 valores restantes)
-        operating_devices = len([d for d in devices if d.status == 'active'])
-        z1_devices = len([d for d in devices if d.zone == 'Z1'])
-        z2_devices = len([d for d in devices if d.zone == 'Z2'])
-        
-        state_vector.extend([
-            operating_devices / 8.0,    # Dispositivos operando
-            z1_devices / 4.0,          # Dispositivos Z1
-            z2_devices / 4.0,          # Dispositivos Z2
-            0.5,                       # Reservado
-            0.5, 0.5, 0.5, 0.5,       # Reservados para expansão
-            0.5, 0.5, 0.5, 0.5,       # Reservados para expansão
-            0.5, 0.5, 0.5, 0.5        # Reservados para expansão
-        ])
+        Chave do estado (inteiro sem colisões) a partir dos ajustes dos
+        dispositivos: faixas de pickup e atraso e status de até 8 dispositivos.
         
-        # Garantir 64 elementos exatos
-        state_vector = state_vector[:self.state_size]
-        while len(state_vector) < self.state_size:
-            state_vector.append(0)
-        
-        # Converte para índice da Q-table usando hash
-        return abs(hash(tuple(np.round(state_vector, 3)))) % self.state_size
+        Args:
+            devices: BancoDispositivos do coordenador (vetorizado) ou lista de
+                ProtectionDevice
+            zones: não usado (as zonas são fixas); mantido por compatibilidade
+        """
+        n = self.MAX_STATE_DEVICES
+        if isinstance(devices, BancoDispositivos):
+            settings = (devices.pickup[:n], devices.atraso[:n], devices.ativo[:n])
+        else:
+            settings = ([d.pickup_current for d in devices[:n]],
+                        [d.time_delay for d in devices[:n]],
+                        [d.status == 'active' for d in devices[:n]])
+        
+        # Dispositivos ausentes ficam na primeira faixa
+        features = np.zeros((n, 3))
+        features[:len(settings[0])] = np.column_stack(settings)
+        return self.state_encoder.codificar(features.ravel())
     
     def get_action(self, state):
         """Seleção de ação epsilon-greedy melhorada"""
@@ -157,7 +179,8 @@ class BasicRLAgent:
             reward -= 50
         
         # 2. Seletividade adequada (NBR 5410)
-        operating_devices = len([d for d in fault_result.device_responses if d.get('should_operate', False)])
+        operating = fault_result.device_responses['should_operate']
+        operating_devices = int(np.count_nonzero(operating))
         if operating_devices <= 2:  # Seletividade excelente
             reward += 30
         elif operating_devices <= 3:  # Seletividade boa
@@ -178,9 +201,8 @@ class BasicRLAgent:
                             reward += 5  # Bonificação por conformidade
         
         # 5. Dispositivos rápidos operando adequadamente
-        fast_responses = [d for d in fault_result.device_responses 
-                         if d.get('should_operate', False) and d.get('operating_time', 999) < 0.1]
-        if len(fast_responses) > 0 and len(fast_responses) <= 2:
+        fast_responses = int(np.count_nonzero(operating & (fault_result.device_responses['operating_time'] < 0.1)))
+        if fast_responses > 0 and fast_responses <= 2:
             reward += 10
         
         return reward
@@ -188,18 +210,96 @@ class BasicRLAgent:
     def learn(self, state, action, reward, next_state):
         """Algoritmo Q-Learning avançado para coordenação de proteção"""
         # Q-Learning com experiência
-        best_next_action = np.argmax(self.q_table[next_state])
-        td_target = reward + self.gamma * self.q_table[next_state][best_next_action]
+        td_target = reward + self.gamma * self.q_table[next_state].max()
         td_error = td_target - self.q_table[state][action]
         
         # Atualização com taxa de aprendizado adaptativa
         adaptive_lr = self.learning_rate * (1 + abs(td_error) / 10)  # Maior erro = mais aprendizado
-        self.q_table[state][action] += adaptive_lr * td_error
+        self.q_table.atualizar(state, action, adaptive_lr * td_error)
         
         # Decaimento do epsilon apenas após exploração mínima
         if self.episodes > self.min_exploration_episodes and self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
     
+    def get_states_batch(self, pickup, delay, active):
+        """
+        Chaves dos estados de N réplicas de ajustes (mesma codificação de
+        get_state).
+        
+        Args:
+            pickup, delay: Arrays (N, dispositivos) de ajustes das réplicas
+            active: Status ativo por dispositivo, comum às réplicas
+                (dispositivos) ou por réplica (N, dispositivos)
+        """
+        n = self.MAX_STATE_DEVICES
+        replicas, devices = pickup.shape[0], min(pickup.shape[1], n)
+        features = np.zeros((replicas, n, 3))
+        features[:, :devices, 0] = pickup[:, :devices]
+        features[:, :devices, 1] = delay[:, :devices]
+        features[:, :devices, 2] = np.asarray(active, dtype=float)[..., :devices]
+        return self.state_encoder.codificar_lote(features.reshape(replicas, -1))
+    
+    def get_actions_batch(self, states):
+        """Seleção epsilon-greedy de uma ação por estado (mesmas regras de get_action)"""
+        replicas = len(states)
+        random_actions = np.random.randint(self.action_space_size, size=replicas)
+        if self.episodes < self.min_exploration_episodes:
+            return random_actions
+        
+        q_values = self.q_table.valores(states) + np.random.normal(0, 0.01, (replicas, self.action_space_size))
+        explore = np.random.random(replicas) <= self.epsilon
+        return np.where(explore, random_actions, np.argmax(q_values, axis=1))
+    
+    def calculate_reward_batch(self, should_operate, operating_time, coordination_issues):
+        """
+        Recompensa de calculate_reward para um lote de simulações.
+        
+        Args:
+            should_operate, operating_time: Arrays (..., dispositivos)
+            coordination_issues: Número de problemas de coordenação (...)
+        
+        Returns:
+            Array (...) de recompensas
+        """
+        coordination_ok = coordination_issues == 0
+        operating_devices = np.count_nonzero(should_operate, axis=-1)
+        
+        # 1. Coordenação funcionando (+100 / -50)
+        reward = np.where(coordination_ok, 100.0, -50.0)
+        
+        # 2. Seletividade adequada (NBR 5410)
+        reward += np.select([operating_devices <= 2, operating_devices <= 3, operating_devices > 5],
+                            [30, 15, -25], 0)
+        
+        # 3. Problemas de coordenação (-10 por problema)
+        reward -= coordination_issues * 10
+        
+        # 4. Conformidade normativa: IEEE C37.112 (margens), IEC 61850 e
+        # API RP 14C (sempre conformes na simulação) e NBR 5410 (seletividade)
+        reward += 5 * (coordination_ok.astype(int) + 2 + (operating_devices <= 3))
+        
+        # 5. Dispositivos rápidos operando adequadamente
+        fast_responses = np.count_nonzero(should_operate & (operating_time < 0.1), axis=-1)
+        reward += np.where((fast_responses > 0) & (fast_responses <= 2), 10, 0)
+        
+        return reward
+    
+    def learn_batch(self, states, actions, rewards, next_states):
+        """
+        Passo de Q-Learning de learn para N transições de uma vez: uma
+        leitura e uma atualização em lote da Q-table. Transições repetidas
+        de (estado, ação) são combinadas pela média (ver
+        TabelaQEsparsa.atualizar_lote). O epsilon decai uma vez por lote.
+        """
+        td_target = rewards + self.gamma * self.q_table.valores(next_states).max(axis=1)
+        td_error = td_target - self.q_table.valores(states)[np.arange(len(states)), actions]
+        
+        adaptive_lr = self.learning_rate * (1 + np.abs(td_error) / 10)
+        self.q_table.atualizar_lote(states, actions, adaptive_lr * td_error)
+        
+        if self.episodes > self.min_exploration_episodes and self.epsilon > self.epsilon_min:
+            self.epsilon *= self.epsilon_decay
+    
     def train_episode(self, coordinator, scenarios):
         """Treina um episódio com cenários de falta"""
         self.episodes += 1
@@ -214,7 +314,7 @@ class BasicRLAgent:
             )
             
             # Obtém estado
-            state = self.get_state(coordinator.protection_devices, coordinator.protection_zones)
+            state = self.get_state(coordinator.device_bank)
             
             # Seleciona ação
             action = self.get_action(state)
@@ -234,7 +334,7 @@ class BasicRLAgent:
             episode_reward += reward
             
             # Obtém novo estado
-            next_state = self.get_state(coordinator.protection_devices, coordinator.protection_zones)
+            next_state = self.get_state(coordinator.device_bank)
             
             # Aprende
             self.learn(state, action, reward, next_state)
@@ -252,6 +352,115 @@ class BasicRLAgent:
         
         return episode_reward
 
+class VectorizedTrainer:
+    """
+    Treinamento Q-Learning em lock-step de N réplicas independentes dos
+    ajustes do coordenador, guardadas como arrays (N, dispositivos).
+    
+    A cada passo: N ações escolhidas de uma vez, aplicadas em lote, todas as
+    réplicas avaliadas contra todos os cenários em uma única simulação em
+    lote (recompensa média dos cenários, como em optimize_protection_with_rl)
+    e uma única atualização em lote da Q-table. O custo Python por passo é
+    fixo, então os passos de ambiente por segundo crescem com N.
+    
+    Cada episódio recomeça as réplicas dos ajustes atuais do coordenador,
+    que não são alterados pelo treinamento.
+    """
+    
+    DEFAULT_SCENARIOS = [
+        {'bus': 4, 'fault_type': '3ph', 'severity': 0.9},
+        {'bus': 7, 'fault_type': '2ph', 'severity': 0.7},
+        {'bus': 14, 'fault_type': '1ph', 'severity': 0.5},
+        {'bus': 1, 'fault_type': '3ph', 'severity': 0.8},
+        {'bus': 9, 'fault_type': '2ph', 'severity': 0.6},
+    ]
+    
+    def __init__(self, coordinator, n_replicas=64, scenarios=None, steps_per_episode=5):
+        if n_replicas < 1:
+            raise ValueError("n_replicas deve ser pelo menos 1")
+        self.coordinator = coordinator
+        self.agent = coordinator.rl_agent
+        self.n_replicas = n_replicas
+        self.scenarios = list(scenarios) if scenarios else self.DEFAULT_SCENARIOS
+        self.steps_per_episode = steps_per_episode
+        self.env_steps = 0
+        self.reset()
+    
+    def reset(self):
+        """Réplicas voltam aos ajustes atuais do coordenador"""
+        bank = self.coordinator.device_bank
+        self.pickup = np.tile(bank.pickup, (self.n_replicas, 1))
+        self.delay = np.tile(bank.atraso, (self.n_replicas, 1))
+        self.active = bank.ativo.copy()
+        self.states = self.agent.get_states_batch(self.pickup, self.delay, self.active)
+    
+    def step(self):
+        """Um passo de todas as réplicas; retorna a recompensa de cada uma (N)"""
+        agent = self.agent
+        actions = agent.get_actions_batch(self.states)
+        self.coordinator.apply_rl_actions_batch(self.pickup, self.delay, actions)
+        
+        result = self.coordinator.simulate_settings_batch(self.pickup, self.delay, self.scenarios)
+        rewards = agent.calculate_reward_batch(
+            result['should_operate'], result['operating_time'], result['coordination_issues']
+        ).mean(axis=1)  # Média dos cenários
+        
+        next_states = agent.get_states_batch(self.pickup, self.delay, self.active)
+        agent.learn_batch(self.states, actions, rewards, next_states)
+        self.states = next_states
+        self.env_steps += self.n_replicas
+        return rewards
+    
+    def train_episode(self):
+        """Um episódio de cada réplica; retorna a recompensa média de cada uma (N)"""
+        agent = self.agent
+        agent.episodes += self.n_replicas
+        self.reset()
+        
+        rewards = np.zeros(self.n_replicas)
+        for _ in range(self.steps_per_episode):
+            rewards += self.step()
+        rewards /= self.steps_per_episode
+        
+        # Decay epsilon (uma vez por episódio em lock-step)
+        if agent.epsilon > agent.epsilon_min:
+            agent.epsilon *= agent.epsilon_decay
+        
+        agent.training_history.append({
+            'episode': agent.episodes,
+            'reward': float(rewards.mean()),
+            'epsilon': agent.epsilon,
+            'replicas': self.n_replicas
+        })
+        return rewards
+    
+    def train(self, episodes=5):
+        """Treina por ``episodes`` episódios em lock-step (N episódios do agente cada)"""
+        start_steps = self.env_steps
+        start = time.perf_counter()
+        results = []
+        for episode in range(episodes):
+            rewards = self.train_episode()
+            results.append({
+                'episode': episode + 1,
+                'mean_reward': float(rewards.mean()),
+                'best_reward': float(rewards.max()),
+                'epsilon': self.agent.epsilon
+            })
+        elapsed = time.perf_counter() - start
+        env_steps = self.env_steps - start_steps
+        
+        return {
+            'episodes_completed': episodes,
+            'replicas': self.n_replicas,
+            'env_steps': env_steps,
+            'elapsed_s': elapsed,
+            'steps_per_second': env_steps / elapsed if elapsed > 0 else float('inf'),
+            'total_episodes': self.agent.episodes,
+            'final_epsilon': self.agent.epsilon,
+            'results': results
+        }
+
 class ProtectionCoordinator:
     """
     Coordenador principal do sistema de proteção IEEE 14-Bus
@@ -261,14 +470,62 @@ class ProtectionCoordinator:
     def __init__(self):
         self.protection_zones = self._create_ieee_14bus_zones()
         self.protection_devices = self._get_all_devices()
+        # Arrays de pickup/atraso/zona/tipo/status, sincronizados com os dataclasses
+        self.device_bank = BancoDispositivos(self.protection_devices)
+        # Resultados de simulate_fault por (bus, tipo, severidade, versão dos ajustes)
+        self.fault_memo = MemoSimulacoes(maxsize=256)
+        # Pares (índices do banco) verificados na coordenação; None = todos os pares.
+        # Ex.: coordenacao.pares_montante_jusante(net, elementos) para só montante/jusante
+        self.coordination_pairs = None
         self.rl_agent = BasicRLAgent()
+        # Pool de processos de optimize_protection_with_rl(workers=...), criado sob demanda
+        self._scenario_evaluator = None
         
         # Impedância simplificada do sistema IEEE 14-Bus
         self.bus_impedances = {
             1: 0.1, 2: 0.12, 3: 0.15, 4: 0.08, 5: 0.09, 6: 0.11, 7: 0.13,
             8: 0.14, 9: 0.16, 10: 0.18, 11: 0.19, 12: 0.20, 13: 0.21, 14: 0.22
         }
-        
+
+        # Barras presentes na rede pandapower usam a impedância de Thévenin real
+        # (diagonal da Zbus). A rede do projeto (ieee14_protecao.json) modela só
+        # as barras de 13,8 kV B2, B3, B6, B7, B9, B10 e B14; as barras IEEE 1, 4,
+        # 5, 8, 11, 12 e 13 não existem nela, não têm Zth e mantêm o valor
+        # tabelado acima. bus_impedance_source indica a origem de cada barra.
+        self.bus_impedances = dict(zip(self.bus_numbers.tolist(), self._build_bus_impedance_vector().tolist()))
+        
+    # Fatores por tipo de falta (relativos à falta trifásica)
+    FAULT_FACTORS = {'3ph': 1.0, '2ph': 0.87, '1ph': 0.58, '2ph_ground': 0.95}
+    BASE_CURRENT_A = 1000  # A (base)
+
+    # Ações do RL: fator aplicado por tipo de ajuste (0: -pickup, 1: +pickup,
+    # 2: -tempo, 3: +tempo) e limites normativos dos ajustes
+    ADJUSTMENT_FACTORS = (0.95, 1.05, 0.95, 1.05)
+    PICKUP_BOUNDS = (0.05, 2.0)  # pu: mínimo 5% para coordenação, máximo 200%
+    DELAY_BOUNDS = (0.02, 3.0)  # s: mínimo 20ms (IEC 60255-151), máximo 3.0s (IEEE C37.112)
+
+    def _build_bus_impedance_vector(self):
+        """Impedância de Thévenin (pu) por barra, na ordem de bus_numbers"""
+        tabulated = np.array([self.bus_impedances[b] for b in self.bus_numbers], dtype=float)
+        self.bus_impedance_source = dict.fromkeys(self.bus_numbers.tolist(), "tabulated")
+        if motor_rede_padrao is None:
+            logger.warning("Motor de curto-circuito indisponível: impedâncias tabeladas em todas as barras")
+            return tabulated
+        try:
+            zth = zth_barras_ieee(motor_rede_padrao(), self.bus_numbers)
+        except (OSError, KeyError, ValueError, np.linalg.LinAlgError) as e:
+            logger.warning("Rede do projeto não carregada (%s): impedâncias tabeladas em todas as barras", e)
+            return tabulated
+        computed = ~np.isnan(zth)
+        self.bus_impedance_source.update(dict.fromkeys(self.bus_numbers[computed].tolist(), "zbus"))
+        return np.where(computed, zth, tabulated)
+
+    def fault_sweep(self, fault_type: str, severity: float) -> Dict[int, float]:
+        """Corrente de falta (A) em todas as barras com uma única operação vetorial"""
+        fault_factor = self.FAULT_FACTORS.get(fault_type, 1.0)
+        currents = self.BASE_CURRENT_A * severity * fault_factor / self.bus_impedance_vector
+        return dict(zip(self.bus_numbers.tolist(), currents.tolist()))
+
     def _create_ieee_14bus_zones(self):
         """Cria as zonas de proteção do sistema IEEE 14-Bus"""
         
@@ -351,78 +608,65 @@ class ProtectionCoordinator:
             devices.extend(zone.devices)
         return devices
     
+    @property
+    def coordination_pairs(self):
+        return self._coordination_pairs
+    
+    @coordination_pairs.setter
+    def coordination_pairs(self, pairs):
+        # Muda o resultado da coordenação: descarta as simulações guardadas
+        self._coordination_pairs = pairs
+        self.fault_memo.limpar()
+    
+    @property
+    def bus_impedances(self):
+        # Somente leitura: alterações passam pelo setter (um dicionário novo)
+        return MappingProxyType(self._bus_impedances)
+    
+    @bus_impedances.setter
+    def bus_impedances(self, impedances):
+        # Muda as correntes de falta: atualiza o vetor de fault_sweep e
+        # descarta as simulações guardadas
+        self._bus_impedances = dict(impedances)
+        self.bus_numbers = np.array(sorted(self._bus_impedances))
+        self.bus_impedance_vector = np.array([self._bus_impedances[b] for b in self.bus_numbers], dtype=float)
+        self.fault_memo.limpar()
+    
     def simulate_fault(self, bus: int, fault_type: str, severity: float) -> FaultSimulationResult:
         """
         Simula falta no sistema IEEE 14-Bus
         
+        O resultado é guardado por (bus, tipo, severidade, versão dos ajustes):
+        repetir um cenário sem ajuste efetivo dos dispositivos não simula de
+        novo (ver ``fault_memo.estatisticas()``). O resultado é somente leitura.
+        
         Args:
             bus: Número da barra (1-14)
             fault_type: Tipo de falta ('3ph', '2ph', '1ph', '2ph_ground')
             severity: Severidade da falta (0.1 a 1.0)
         """
+        key = (bus, fault_type, severity, self.device_bank.versao)
+        return self.fault_memo.obter(key, lambda: self._run_fault_simulation(bus, fault_type, severity))
+    
+    def _run_fault_simulation(self, bus: int, fault_type: str, severity: float) -> FaultSimulationResult:
+        """Simulação de falta propriamente dita (sem cache)"""
         
         # Determina zona afetada
         affected_zone = "Z1" if bus in [0, 4, 5, 6, 7, 9] else "Z2"
         
-        # Calcula corrente de falta usando impedância do bus
-        base_current = 1000  # A (base)
+        # Calcula corrente de falta usando a impedância de Thévenin do bus
+        base_current = self.BASE_CURRENT_A
         bus_impedance = self.bus_impedances.get(bus, 0.15)
-        
-        # Fatores por tipo de falta
-        fault_factors = {'3ph': 1.0, '2ph': 0.87, '1ph': 0.58, '2ph_ground': 0.95}
-        fault_factor = fault_factors.get(fault_type, 1.0)
+        fault_factor = self.FAULT_FACTORS.get(fault_type, 1.0)
         
         fault_current = (base_current * severity * fault_factor) / bus_impedance
         
-        # Simula resposta dos dispositivos
-        device_responses = []
-        coordination_issues = []
-        
-        for device in self.protection_devices:
-            should_operate = False
-            operating_time = float('inf')
-            coordination_ok = True
-            
-            # Lógica de operação por tipo de dispositivo
-            if device.type == "87T" and device.zone == affected_zone:
-                should_operate = fault_current > device.pickup_current * base_current
-                operating_time = device.time_delay
-            elif device.type == "50/51":
-                if fault_current > device.pickup_current * base_current:
-                    should_operate = True
-                    # Curva tempo-corrente simplificada
-                    operating_time = device.time_delay * (1 + 1/(fault_current/base_current - device.pickup_current))
-            elif device.type == "67" and device.zone == affected_zone:
-                should_operate = fault_current > device.pickup_current * base_current
-                operating_time = device.time_delay
-            elif device.type == "27/59":
-                # Dispositivos de tensão operam com atraso
-                should_operate = severity > 0.7  # Para faltas severas
-                operating_time = device.time_delay
-            
-            device_responses.append({
-                'device_id': device.id,
-                'type': device.type,
-                'should_operate': should_operate,
-                'operating_time': operating_time if should_operate else 0,
-                'coordination_ok': coordination_ok
-            })
-        
-        # Verifica coordenação entre dispositivos
-        operating_devices = [d for d in device_responses if d['should_operate']]
+        # Resposta de todos os dispositivos em operações vetoriais sobre o banco
+        device_responses = self.device_bank.respostas(fault_current, affected_zone, severity, base_current)
         
-        for i, dev1 in enumerate(operating_devices):
-            for dev2 in operating_devices[i+1:]:
-                time_diff = abs(dev1['operating_time'] - dev2['operating_time'])
-                required_margin = 0.3  # IEEE C37.112 padrão
-                
-                if time_diff < required_margin:
-                    coordination_issues.append({
-                        'device1': dev1['device_id'],
-                        'device2': dev2['device_id'],
-                        'margin': time_diff,
-                        'required': required_margin
-                    })
+        # Verifica coordenação entre dispositivos (pares operando com margem < 0.3 s, IEEE C37.112),
+        # por ordenação dos tempos e varredura da janela da margem
+        coordination_issues = problemas_coordenacao(device_responses, permitidos=self.coordination_pairs)
         
         # Avalia conformidade normativa
         normative_compliance = self._evaluate_normative_compliance(
@@ -439,7 +683,8 @@ class ProtectionCoordinator:
             coordination_ok=coordination_ok,
             device_responses=device_responses,
             coordination_issues=coordination_issues,
-            normative_compliance=normative_compliance
+            normative_compliance=normative_compliance,
+            device_bank=self.device_bank
         )
     
     def _evaluate_normative_compliance(self, device_responses, coordination_issues, fault_type):
@@ -447,16 +692,17 @@ class ProtectionCoordinator:
         
         # IEEE C37.112 - Coordenação de proteção
         ieee_compliance = len(coordination_issues) == 0
-        ieee_issues = [f"Margem insuficiente: {issue['device1']}-{issue['device2']}" 
-                      for issue in coordination_issues]
+        ieee_issues = [f"Margem insuficiente: {device1}-{device2}"
+                      for device1, device2 in zip(coordination_issues['device1'].tolist(),
+                                                  coordination_issues['device2'].tolist())]
         
         # IEC 61850 - Comunicação (simulado)
         iec_compliance = True  # Assumindo GOOSE funcionando
         iec_issues = []
         
         # NBR 5410 - Seletividade
-        operating_devices = [d for d in device_responses if d['should_operate']]
-        nbr_compliance = len(operating_devices) <= 3  # Seletividade adequada
+        operating_devices = int(np.count_nonzero(device_responses['should_operate']))
+        nbr_compliance = operating_devices <= 3  # Seletividade adequada
         nbr_issues = ["Muitos dispositivos operando simultaneamente"] if not nbr_compliance else []
         
         # API RP 14C - Ambiente offshore
@@ -482,32 +728,29 @@ class ProtectionCoordinator:
         device = self.protection_devices[device_idx]
         
         # Ajustes baseados no tipo de ação com limites normativos
+        factor = self.ADJUSTMENT_FACTORS[adjustment_type]
         if adjustment_type == 0:  # Reduzir pickup (mais sensível)
-            factor = 0.95
             new_pickup = device.pickup_current * factor
             # Limites baseados em IEEE C37.112 e NBR 14039
-            if new_pickup >= 0.05:  # Mínimo 5% para coordenação
+            if new_pickup >= self.PICKUP_BOUNDS[0]:  # Mínimo 5% para coordenação
                 device.pickup_current = new_pickup
                 
         elif adjustment_type == 1:  # Aumentar pickup (menos sensível)
-            factor = 1.05
             new_pickup = device.pickup_current * factor
             # Máximo baseado na corrente de carga + margem
-            if new_pickup <= 2.0:  # Máximo 200%
+            if new_pickup <= self.PICKUP_BOUNDS[1]:  # Máximo 200%
                 device.pickup_current = new_pickup
                 
         elif adjustment_type == 2:  # Reduzir tempo (mais rápido)
-            factor = 0.95
             new_time = device.time_delay * factor
             # Tempo mínimo para estabilidade (IEC 60255-151)
-            if new_time >= 0.02:  # Mínimo 20ms
+            if new_time >= self.DELAY_BOUNDS[0]:  # Mínimo 20ms
                 device.time_delay = new_time
                 
         elif adjustment_type == 3:  # Aumentar tempo (coordenação)
-            factor = 1.05
             new_time = device.time_delay * factor
             # Tempo máximo para coordenação (IEEE C37.112)
-            if new_time <= 3.0:  # Máximo 3.0s
+            if new_time <= self.DELAY_BOUNDS[1]:  # Máximo 3.0s
                 device.time_delay = new_time
         
         # Log de auditoria dos ajustes
@@ -522,6 +765,77 @@ class ProtectionCoordinator:
             'timestamp': datetime.now().isoformat()
         })
     
+    def apply_rl_actions_batch(self, pickup, delay, actions):
+        """
+        Aplica uma ação por réplica (mesmo mapeamento e limites de
+        apply_rl_action) sobre ajustes em lote, no próprio array.
+        
+        Args:
+            pickup, delay: Arrays (N, dispositivos) de ajustes das réplicas
+            actions: Uma ação por réplica (N)
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        device_idx = actions // 4
+        adjustment_type = actions % 4
+        valid = device_idx < pickup.shape[1]
+        
+        rows = np.flatnonzero(valid)
+        cols = device_idx[valid]
+        adjustment_type = adjustment_type[valid]
+        factors = np.take(self.ADJUSTMENT_FACTORS, adjustment_type)
+        
+        on_pickup = adjustment_type < 2
+        settings = np.where(on_pickup, pickup[rows, cols], delay[rows, cols])
+        new_values = settings * factors
+        lower = np.where(on_pickup, self.PICKUP_BOUNDS[0], self.DELAY_BOUNDS[0])
+        upper = np.where(on_pickup, self.PICKUP_BOUNDS[1], self.DELAY_BOUNDS[1])
+        # Reduções respeitam o mínimo e aumentos o máximo; fora do limite não há ajuste
+        allowed = np.where(adjustment_type % 2 == 0, new_values >= lower, new_values <= upper)
+        new_values = np.where(allowed, new_values, settings)
+        
+        pickup[rows[on_pickup], cols[on_pickup]] = new_values[on_pickup]
+        delay[rows[~on_pickup], cols[~on_pickup]] = new_values[~on_pickup]
+    
+    def _fault_inputs(self, scenarios):
+        """Corrente de falta, zona afetada e severidade de cada cenário (regras de simulate_fault)"""
+        buses = [scenario['bus'] for scenario in scenarios]
+        severities = np.array([scenario['severity'] for scenario in scenarios], dtype=float)
+        affected_zones = ["Z1" if bus in [0, 4, 5, 6, 7, 9] else "Z2" for bus in buses]
+        fault_currents = np.array([
+            (self.BASE_CURRENT_A * scenario['severity'] * self.FAULT_FACTORS.get(scenario['fault_type'], 1.0))
+            / self.bus_impedances.get(scenario['bus'], 0.15)
+            for scenario in scenarios
+        ], dtype=float)
+        return fault_currents, affected_zones, severities
+    
+    def simulate_settings_batch(self, pickup, delay, scenarios):
+        """
+        Simula todas as réplicas de ajustes contra todos os cenários de falta
+        em uma chamada (mesmas regras de simulate_fault, sem memo).
+        
+        Args:
+            pickup, delay: Arrays (N, dispositivos) de ajustes das réplicas
+            scenarios: Lista de {'bus', 'fault_type', 'severity'} (S cenários)
+        
+        Returns:
+            Dict com arrays: should_operate e operating_time (N, S, dispositivos),
+            coordination_issues (N, S) e fault_current_a / affected_zone (S)
+        """
+        fault_currents, affected_zones, severities = self._fault_inputs(scenarios)
+        
+        operating, times = self.device_bank.respostas_lote(
+            pickup, delay, fault_currents, affected_zones, severities, self.BASE_CURRENT_A
+        )
+        issues = contar_problemas_lote(operating, times, permitidos=self.coordination_pairs)
+        
+        return {
+            'fault_current_a': fault_currents,
+            'affected_zone': affected_zones,
+            'should_operate': operating,
+            'operating_time': times,
+            'coordination_issues': issues
+        }
+    
     def train_rl_agent(self, episodes=5, scenarios=None):
         """Treina o agente RL com cenários de falta"""
         if scenarios is None:
@@ -547,18 +861,52 @@ class ProtectionCoordinator:
             'results': results
         }
 
-    def optimize_protection_with_rl(self, episodes=100):
-        """Otimização avançada usando RL com múltiplos cenários"""
+    def train_rl_agent_vectorized(self, episodes=5, n_replicas=64, scenarios=None, steps_per_episode=5):
+        """
+        Treina o agente RL com N réplicas dos ajustes em lock-step
+        (ver VectorizedTrainer); os ajustes do coordenador não mudam.
+        """
+        trainer = VectorizedTrainer(self, n_replicas=n_replicas, scenarios=scenarios,
+                                    steps_per_episode=steps_per_episode)
+        return trainer.train(episodes)
+
+    def optimize_protection_with_rl(self, episodes=100, workers=None, scenarios=None,
+                                    n_scenarios=None, seed=None, incremental=True):
+        """
+        Otimização avançada usando RL com múltiplos cenários
+        
+        Args:
+            episodes: Número de episódios (5 passos cada)
+            workers: Processos que avaliam os cenários em paralelo (None ou 1 =
+                serial); o pool é mantido entre chamadas (ver close_workers)
+            scenarios: Lista de cenários {'bus', 'fault_type', 'severity'};
+                padrão: 5 cenários representativos
+            n_scenarios: Gera essa quantidade de cenários (gerar_cenarios) no
+                lugar da lista
+            seed: Semente do agente e dos cenários gerados; com a mesma
+                semente os caminhos serial e paralelo dão o mesmo resultado
+            incremental: No caminho serial, reavalia a cada passo só os
+                cenários afetados pelo dispositivo ajustado
+        """
         print(f"🤖 Iniciando otimização RL avançada: {episodes} episódios")
+        if seed is not None:
+            np.random.seed(seed)
         
         # Cenários de teste diversificados
-        fault_scenarios = [
-            {'bus': 4, 'fault_type': '3ph', 'severity': 0.9},   # Falta severa
-            {'bus': 7, 'fault_type': '2ph', 'severity': 0.7},   # Falta média
-            {'bus': 14, 'fault_type': '1ph', 'severity': 0.5},  # Falta leve
-            {'bus': 1, 'fault_type': '3ph', 'severity': 0.8},   # Geração  
-            {'bus': 9, 'fault_type': '2ph', 'severity': 0.6},   # Distribuição
-        ]
+        if scenarios is None and n_scenarios:
+            scenarios = gerar_cenarios(n_scenarios, seed)
+        elif scenarios is None:
+            scenarios = [
+                {'bus': 4, 'fault_type': '3ph', 'severity': 0.9},   # Falta severa
+                {'bus': 7, 'fault_type': '2ph', 'severity': 0.7},   # Falta média
+                {'bus': 14, 'fault_type': '1ph', 'severity': 0.5},  # Falta leve
+                {'bus': 1, 'fault_type': '3ph', 'severity': 0.8},   # Geração  
+                {'bus': 9, 'fault_type': '2ph', 'severity': 0.6},   # Distribuição
+            ]
+        fault_scenarios = cenarios_compactos(scenarios)
+        evaluator = None
+        if incremental and not (workers and workers > 1):
+            evaluator = self._incremental_evaluator(fault_scenarios)
         
         optimization_results = []
         best_coordination_score = 0
@@ -574,7 +922,7 @@ class ProtectionCoordinator:
             # Múltiplos passos por episódio
             for step in range(5):
                 # Estado atual
-                current_state = self.rl_agent.get_state(self.protection_devices, self.protection_zones)
+                current_state = self.rl_agent.get_state(self.device_bank)
                 
                 # Ação do RL
                 action = self.rl_agent.get_action(current_state)
@@ -582,30 +930,17 @@ class ProtectionCoordinator:
                 # Aplicar ação
                 self.apply_rl_action(action)
                 
-                # Avaliar com todos os cenários
-                step_reward = 0
-                coordination_quality = 0
-                
-                for scenario in fault_scenarios:
-                    result = self.simulate_fault(
-                        scenario['bus'], 
-                        scenario['fault_type'], 
-                        scenario['severity']
-                    )
-                    reward = self.rl_agent.calculate_reward(result)
-                    step_reward += reward
-                    
-                    # Métricas de qualidade
-                    if result.coordination_ok:
-                        coordination_quality += 20
-                    coordination_quality -= len(result.coordination_issues) * 5
-                
-                step_reward /= len(fault_scenarios)  # Média dos cenários
-                coordination_quality /= len(fault_scenarios)
+                # Avaliar com todos os cenários: só os afetados pelo ajuste
+                # (incremental), todos em série ou no pool de processos
+                if evaluator is not None:
+                    metrics = evaluator.metricas()
+                else:
+                    metrics = self._score_scenarios(fault_scenarios, workers)
+                step_reward = sum(metrics['reward'].tolist()) / len(fault_scenarios)  # Média dos cenários
                 episode_rewards.append(step_reward)
                 
                 # Próximo estado
-                next_state = self.rl_agent.get_state(self.protection_devices, self.protection_zones)
+                next_state = self.rl_agent.get_state(self.device_bank)
                 
                 # Aprendizado
                 self.rl_agent.learn(current_state, action, step_reward, next_state)
@@ -614,7 +949,7 @@ class ProtectionCoordinator:
             episode_avg_reward = np.mean(episode_rewards)
             
             # Teste final de coordenação
-            final_coordination_score = self._evaluate_coordination_quality()
+            final_coordination_score = self._evaluate_coordination_quality(workers)
             
             # Salvar melhor configuração
             if final_coordination_score > best_coordination_score:
@@ -652,27 +987,56 @@ class ProtectionCoordinator:
             'improvement': best_coordination_score - optimization_results[0]['coordination_score'] if optimization_results else 0
         }
     
-    def _evaluate_coordination_quality(self):
+    def _score_scenarios(self, scenarios, workers=None):
+        """Métricas por cenário (metricas_cenarios) com os ajustes atuais, serial ou em paralelo"""
+        if workers and workers > 1:
+            if self._scenario_evaluator is None or self._scenario_evaluator.workers != workers:
+                self.close_workers()
+                self._scenario_evaluator = AvaliadorParalelo(type(self), workers)
+            return self._scenario_evaluator.avaliar(
+                ajustes_do_banco(self.device_bank), scenarios, self.coordination_pairs
+            )
+        return metricas_cenarios(self, scenarios)
+    
+    def _incremental_evaluator(self, scenarios):
+        """
+        Métricas por cenário reavaliadas só onde o último ajuste tem efeito
+        (AvaliadorIncremental); mesmos valores de metricas_cenarios
+        """
+        def reward(rows, operating, times, issues):
+            return self.rl_agent.calculate_reward_batch(operating, times, issues)
+        
+        fault_currents, affected_zones, severities = self._fault_inputs(scenarios)
+        return AvaliadorIncremental(self.device_bank, fault_currents, affected_zones, severities,
+                                    self.BASE_CURRENT_A, reward, permitidos=self.coordination_pairs)
+    
+    def close_workers(self):
+        """Encerra o pool de processos de optimize_protection_with_rl(workers=...)"""
+        if self._scenario_evaluator is not None:
+            self._scenario_evaluator.fechar()
+            self._scenario_evaluator = None
+    
+    def _evaluate_coordination_quality(self, workers=None):
         """Avalia qualidade geral do sistema de coordenação"""
         total_score = 0
-        test_scenarios = [
+        test_scenarios = cenarios_compactos([
             {'bus': 4, 'fault_type': '3ph', 'severity': 0.8},
             {'bus': 7, 'fault_type': '2ph', 'severity': 0.6},
             {'bus': 14, 'fault_type': '1ph', 'severity': 0.5}
-        ]
+        ])
+        metrics = self._score_scenarios(test_scenarios, workers)
         
-        for scenario in test_scenarios:
-            result = self.simulate_fault(scenario['bus'], scenario['fault_type'], scenario['severity'])
-            
+        for coordination_ok, coordination_issues, operating_count in zip(
+                metrics['coordination_ok'].tolist(), metrics['coordination_issues'].tolist(),
+                metrics['operating_devices'].tolist()):
             # Pontuação baseada em critérios normativos
-            if result.coordination_ok:
+            if coordination_ok:
                 total_score += 30
             
             # Penalidades por problemas
-            total_score -= len(result.coordination_issues) * 10
+            total_score -= coordination_issues * 10
             
             # Seletividade (poucos dispositivos operando)
-            operating_count = len([d for d in result.device_responses if d.get('should_operate', False)])
             if operating_count <= 2:
                 total_score += 15  # Boa seletividade
             elif operating_count > 4:
@@ -698,7 +1062,9 @@ class ProtectionCoordinator:
             'learning_rate': self.rl_agent.learning_rate,
             'epsilon': self.rl_agent.epsilon,
             'state_size': self.rl_agent.state_size,
-            'action_space_size': self.rl_agent.action_space_size
+            'action_space_size': self.rl_agent.action_space_size,
+            'visited_states': len(self.rl_agent.q_table),
+            'fault_memo': self.fault_memo.estatisticas()
         }
 
 # Teste básico
@@ -0,0 +1,122 @@
+"""
+Testes do ambiente RL escalar (ProtectionCoordinationEnv em
+simuladores/power_sim/rl_protection_agent.py).
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+# O módulo importa Stable-Baselines3 e matplotlib no topo
+pytest.importorskip("stable_baselines3")
+pytest.importorskip("matplotlib")
+
+import pandapower as pp
+
+from simuladores.power_sim import rl_protection_agent as agente
+from simuladores.power_sim.snapshot_binario import JSON_PADRAO, carregar_documento
+from simuladores.power_sim.tabela_faltas import CARGAS_FALTA
+from tests.test_ambiente_vetorial import RELES
+
+
+@pytest.fixture
+def env():
+    return agente.ProtectionCoordinationEnv(JSON_PADRAO, RELES)
+
+
+def cargas_de_falta(env):
+    return env.net.load.loc[env.fault_loads.values]
+
+
+def assert_cargas_desligadas(env, n_cargas):
+    assert len(env.net.load) == n_cargas
+    cargas = cargas_de_falta(env)
+    assert not cargas["in_service"].any()
+    assert (cargas[["p_mw", "q_mvar"]] == 0.0).all().all()
+
+
+def test_uma_carga_de_falta_por_barra(env):
+    n_cargas = len(env.net.load)
+    assert list(env.fault_loads.index) == list(env.net.bus.index)
+    assert_cargas_desligadas(env, n_cargas)
+
+    for fault_type in ("3ph", "2ph", "1ph", "overload"):
+        for bus in env.net.bus.index[1:]:
+            env._simulate_fault(fault_type, bus)
+    assert_cargas_desligadas(env, n_cargas)
+
+
+def test_carga_desligada_quando_fluxo_falha(env, monkeypatch):
+    n_cargas = len(env.net.load)
+    bus = env.net.bus.index[3]
+    ligadas = []
+
+    def runpp_com_erro(net, **opcoes):
+        cargas = cargas_de_falta(env)
+        ligadas.append(cargas.loc[cargas["in_service"], ["bus", "p_mw", "q_mvar"]].values.tolist())
+        raise pp.LoadflowNotConverged("falha simulada")
+
+    monkeypatch.setattr(agente.pp, "runpp", runpp_com_erro)
+    env.fluxo = None  # recuperação também passa pelo runpp com erro
+    currents, voltages, fault_bus, _ = env._simulate_fault("3ph", bus)
+
+    # A carga estava ligada durante o fluxo e voltou ao estado normal
+    assert ligadas[0] == [[bus, CARGAS_FALTA["3ph"]["p_mw"], CARGAS_FALTA["3ph"]["q_mvar"]]]
+    assert_cargas_desligadas(env, n_cargas)
+    assert fault_bus == bus
+    np.testing.assert_array_equal(currents, 0.3)  # valores de último recurso
+    np.testing.assert_array_equal(voltages, 0.98)
+
+
+@pytest.mark.parametrize("fault_type", ["3ph", "2ph", "1ph", "overload"])
+def test_igual_a_copia_com_carga_criada(env, fault_type):
+    """Mesmo resultado da simulação antiga (cópia da rede + create_load)."""
+    bus = env.net.bus.index[4]
+    currents, voltages, _, _ = env._simulate_fault(fault_type, bus)
+
+    net = carregar_documento(JSON_PADRAO)["net"]
+    pp.create_load(net, bus=bus, name=f"FAULT_{fault_type}", **CARGAS_FALTA[fault_type])
+    pp.runpp(net, algorithm='nr', max_iteration=100, tolerance_mva=1e-6,
+             enforce_q_lims=False, check_connectivity=False)
+
+    np.testing.assert_allclose(currents, net.res_line['i_ka'].values, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(voltages, net.res_bus['vm_pu'].values, rtol=1e-9, atol=1e-12)
+
+
+def sequencia(env, seed, passos=20):
+    env.reset(seed=seed)
+    actions = np.random.default_rng(0).random((passos, env.action_space.shape[0]))
+    infos = [env.step(a)[4] for a in actions]
+    return [(str(i["fault_type"]), int(i["fault_bus"]), i["reward"]) for i in infos]
+
+
+def test_semente_reprodutivel(env):
+    outro = agente.ProtectionCoordinationEnv(JSON_PADRAO, RELES)
+    assert sequencia(env, 3) == sequencia(outro, 3)
+    assert sequencia(env, 3) != sequencia(outro, 4)
+
+
+def test_fabrica_serializavel():
+    fabrica = pickle.loads(pickle.dumps(agente.FabricaAmbiente(JSON_PADRAO, RELES, max_episodes=7)))
+    env = fabrica()
+    assert isinstance(env, agente.ProtectionCoordinationEnv)
+    assert env.max_episodes == 7 and env.protection_devices == RELES
+
+
+def test_ambiente_i_recebe_semente_mais_i():
+    otimizador = agente.RLProtectionOptimizer(JSON_PADRAO, RELES, n_envs=3, seed=7)
+    venv = otimizador.create_vec_environment()
+    assert venv.num_envs == 3
+    venv.reset()
+
+    for i, env in enumerate(venv.envs):
+        referencia = agente.ProtectionCoordinationEnv(JSON_PADRAO, RELES)
+        referencia.reset(seed=7 + i)
+        assert env.unwrapped.np_random.bit_generator.state == referencia.np_random.bit_generator.state
+    venv.close()
+
+    with pytest.raises(ValueError):
+        otimizador.create_vec_environment(vec_env="threads")
+    with pytest.raises(ValueError):
+        otimizador.create_vec_environment(n_envs=0)
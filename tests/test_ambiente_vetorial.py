@@ -0,0 +1,96 @@
+"""
+Testes do ambiente RL vetorizado (simuladores/power_sim/ambiente_vetorial.py).
+"""
+
+import numpy as np
+import pytest
+
+from simuladores.power_sim.ambiente_vetorial import TIPOS_FALTA_RL, ProtectionCoordinationVectorEnv
+from simuladores.power_sim.curto_circuito import MotorCurtoCircuito
+from simuladores.power_sim.snapshot_binario import JSON_PADRAO
+
+RELES = {
+    "reles": [
+        {"id": "RELE_LINE_0", "element_type": "line", "element_id": 0, "tipo": "OVERCURRENT"},
+        {"id": "RELE_LINE_1", "element_type": "line", "element_id": 1, "tipo": "OVERCURRENT"},
+        {"id": "RELE_TRAFO_0", "element_type": "trafo", "element_id": 0, "tipo": "DIFFERENTIAL"},
+        {"id": "RELE_BUS_1", "element_type": "bus", "element_id": 1, "tipo": "VOLTAGE"},
+    ]
+}
+
+
+@pytest.fixture(scope="module")
+def venv():
+    return ProtectionCoordinationVectorEnv(JSON_PADRAO, RELES, num_envs=32)
+
+
+def test_formatos_do_lote(venv):
+    observations, infos = venv.reset(seed=0)
+    assert observations.shape == (32, venv.single_observation_space.shape[0])
+    assert observations.dtype == np.float32
+    np.testing.assert_array_equal(observations[:, -8:], 0.5)
+
+    actions = np.random.default_rng(0).random((32, 8)).astype(np.float32)
+    observations, rewards, terminated, truncated, infos = venv.step(actions)
+    assert rewards.shape == terminated.shape == truncated.shape == (32,)
+    # Base da observação é o caso base (igual em todos); o resto são os settings
+    np.testing.assert_array_equal(observations[:, :-8], np.broadcast_to(observations[0, :-8], observations[:, :-8].shape))
+    np.testing.assert_array_equal(observations[:, -8:], actions)
+    assert set(infos["fault_type"]) <= set(TIPOS_FALTA_RL)
+    assert (infos["fault_bus"] != 0).all()
+    np.testing.assert_array_equal(infos["reward"], rewards)
+
+
+def test_semente_reprodutivel(venv):
+    actions = np.random.default_rng(1).random((32, 8))
+
+    def rodar(seed):
+        venv.reset(seed=seed)
+        return [venv.step(actions)[1] for _ in range(5)]
+
+    np.testing.assert_array_equal(rodar(3), rodar(3))
+    assert not np.array_equal(rodar(3), rodar(4))
+
+
+def test_faltas_buscadas_na_tabela(venv):
+    varredura = MotorCurtoCircuito(venv.net).varredura()
+    barras = np.arange(len(venv.fault_buses))
+    currents, voltages = venv.faltas(np.zeros_like(barras), barras, np.zeros_like(barras))
+    for i, barra in enumerate(venv.fault_buses):
+        esperado = varredura.contribuicoes(barra, "line").reindex(venv.net.line.index, fill_value=0.0)
+        np.testing.assert_allclose(currents[i], esperado.values)
+        np.testing.assert_array_equal(currents[i], venv.tabela_faltas.falta("3ph", barra, 0)[0])
+
+    # Faltas assimétricas escalam a trifásica; impedância de falta reduz a corrente
+    bifasicas, _ = venv.faltas(np.ones_like(barras), barras, np.zeros_like(barras))
+    np.testing.assert_allclose(bifasicas, currents * 0.866)
+    alta_impedancia, _ = venv.faltas(np.zeros_like(barras), barras, np.full_like(barras, 4))
+    assert (alta_impedancia.max(axis=1) < currents.max(axis=1)).all()
+
+
+def test_reinicio_automatico():
+    venv = ProtectionCoordinationVectorEnv(JSON_PADRAO, RELES, num_envs=4, max_episodes=1)
+    venv.reset(seed=0)
+    actions = np.full((4, 8), 0.9)
+    observations, _, terminated, _, infos = venv.step(actions)
+    assert terminated.all()
+    np.testing.assert_array_equal(infos["final_observation"][0][-8:], np.float32(0.9))
+    np.testing.assert_array_equal(observations[:, -8:], 0.5)
+    assert infos["final_info"][2]["fault_type"] in TIPOS_FALTA_RL
+
+
+def test_recompensas_iguais_ao_ambiente_escalar(venv):
+    pytest.importorskip("stable_baselines3")
+    pytest.importorskip("matplotlib")
+    from simuladores.power_sim.rl_protection_agent import ProtectionCoordinationEnv
+
+    env = ProtectionCoordinationEnv(JSON_PADRAO, RELES)
+    rng = np.random.default_rng(2)
+    for tipo in range(3):
+        for i, barra in enumerate(venv.fault_buses):
+            actions = rng.random((32, 8))
+            currents, voltages = venv.faltas(np.full(32, tipo), np.full(32, i), np.full(32, tipo + 1))
+            esperado = [env._calculate_reward(a, currents[0], voltages[0],
+                                              (currents[0], voltages[0], barra, TIPOS_FALTA_RL[tipo]))
+                        for a in actions]
+            np.testing.assert_allclose(venv.recompensas(actions, currents, voltages, np.full(32, i)), esperado)
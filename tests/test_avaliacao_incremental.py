@@ -0,0 +1,57 @@
+"""
+Testes da reavaliação incremental de cenários
+(simuladores/power_sim/avaliacao_incremental.py) usada por
+optimize_protection_with_rl(incremental=True) nos coordenadores RL.
+"""
+
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+import rl_protection_coordinator
+from simuladores.power_sim.avaliacao_paralela import cenarios_compactos, gerar_cenarios, metricas_cenarios
+from src.core import rl_protection_coordinator_clean
+
+
+@pytest.mark.parametrize("pares", [None, np.array([[0, 1], [1, 5], [2, 3], [4, 5], [5, 7]])])
+def test_incremental_igual_a_avaliacao_completa(pares):
+    coordinator = rl_protection_coordinator_clean.ProtectionCoordinator()
+    coordinator.coordination_pairs = pares
+    cenarios = cenarios_compactos(gerar_cenarios(150, semente=2))
+    avaliador = coordinator._incremental_evaluator(cenarios)
+
+    rng = np.random.default_rng(0)
+    for passo in range(300):
+        coordinator.apply_rl_action(int(rng.integers(0, 32)))
+        if passo % 100 == 50:
+            device = coordinator.protection_devices[int(rng.integers(0, 8))]
+            device.status = 'inactive' if device.status == 'active' else 'active'
+        np.testing.assert_array_equal(avaliador.metricas(), metricas_cenarios(coordinator, cenarios))
+
+    # Cada ajuste recalcula só uma fração dos cenários
+    assert avaliador.cenarios_recalculados < 300 * len(cenarios) / 2
+
+
+def test_ajuste_sem_efeito_nao_recalcula():
+    coordinator = rl_protection_coordinator_clean.ProtectionCoordinator()
+    avaliador = coordinator._incremental_evaluator(cenarios_compactos(gerar_cenarios(50, semente=1)))
+    assert len(avaliador.atualizar()) == 0
+
+    # Pickup do 87T só muda quem opera nos cenários com corrente entre o valor antigo e o novo
+    coordinator.protection_devices[0].pickup_current *= 1.05
+    assert len(avaliador.atualizar()) < 50
+
+
+@pytest.mark.parametrize("modulo", [rl_protection_coordinator, rl_protection_coordinator_clean])
+def test_otimizacao_incremental_igual_a_completa(modulo):
+    resultados = []
+    for incremental in (False, True):
+        coordinator = modulo.ProtectionCoordinator()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = coordinator.optimize_protection_with_rl(
+                episodes=6, n_scenarios=80, seed=11, incremental=incremental)
+        resultados.append((result['optimization_history'], coordinator.device_bank.pickup.tolist(),
+                           coordinator.device_bank.atraso.tolist()))
+    assert resultados[0] == resultados[1]
@@ -0,0 +1,57 @@
+"""
+Testes da avaliação de cenários em paralelo (simuladores/power_sim/avaliacao_paralela.py)
+usada por optimize_protection_with_rl(workers=...) nos coordenadores RL.
+"""
+
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+import rl_protection_coordinator
+from simuladores.power_sim.avaliacao_paralela import (
+    aplicar_ajustes, ajustes_do_banco, cenarios_compactos, gerar_cenarios, metricas_cenarios
+)
+from src.core import rl_protection_coordinator_clean
+
+
+def test_cenarios_gerados_sao_reprodutiveis():
+    cenarios = gerar_cenarios(200, semente=4)
+    assert cenarios == gerar_cenarios(200, semente=4)
+    assert cenarios != gerar_cenarios(200, semente=5)
+    assert {c['fault_type'] for c in cenarios} == {'3ph', '2ph', '1ph', '2ph_ground'}
+    assert all(1 <= c['bus'] <= 14 and 0.1 <= c['severity'] <= 1.0 for c in cenarios)
+    assert cenarios_compactos(cenarios)['bus'].tolist() == [c['bus'] for c in cenarios]
+
+
+def test_ajustes_compactos_reproduzem_metricas():
+    origem = rl_protection_coordinator_clean.ProtectionCoordinator()
+    for action in (1, 6, 9, 30):
+        origem.apply_rl_action(action)
+    origem.protection_devices[3].status = 'inactive'
+    copia = rl_protection_coordinator_clean.ProtectionCoordinator()
+    aplicar_ajustes(copia, ajustes_do_banco(origem.device_bank))
+
+    cenarios = cenarios_compactos(gerar_cenarios(50, semente=1))
+    np.testing.assert_array_equal(metricas_cenarios(copia, cenarios), metricas_cenarios(origem, cenarios))
+    with pytest.raises(ValueError):
+        aplicar_ajustes(copia, np.zeros((3, 2)))
+
+
+@pytest.mark.parametrize("modulo", [rl_protection_coordinator, rl_protection_coordinator_clean])
+def test_otimizacao_paralela_igual_a_serial(modulo):
+    resultados = []
+    for workers in (None, 2):
+        coordinator = modulo.ProtectionCoordinator()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = coordinator.optimize_protection_with_rl(
+                    episodes=4, workers=workers, n_scenarios=40, seed=7)
+        finally:
+            coordinator.close_workers()
+        resultados.append((result['optimization_history'], result['best_coordination_score'],
+                           coordinator.device_bank.pickup.tolist(), coordinator.device_bank.atraso.tolist()))
+
+    assert resultados[0] == resultados[1]
+    assert len(resultados[0][0]) == 4
@@ -0,0 +1,195 @@
+"""
+Testes do banco vetorizado de dispositivos (simuladores/power_sim/banco_dispositivos.py)
+e do simulate_fault dos coordenadores RL que o utiliza.
+"""
+
+import copy
+import json
+import pickle
+import random
+
+import numpy as np
+import pytest
+
+from rl_protection_coordinator import ProtectionCoordinator
+from simuladores.power_sim.banco_dispositivos import (
+    PROBLEMA_DTYPE, RESPOSTA_DTYPE, problemas_coordenacao, registros_para_dicts
+)
+
+BASE = ProtectionCoordinator.BASE_CURRENT_A
+
+
+@pytest.fixture
+def coordinator():
+    return ProtectionCoordinator()
+
+
+def _resposta_esperada(device, corrente, zona, severidade):
+    """Regras de operação por dispositivo, uma a uma."""
+    if device.status != 'active':
+        return False, 0
+    if device.type in ("87T", "67") and device.zone == zona:
+        opera = corrente > device.pickup_current * BASE
+        return opera, device.time_delay if opera else 0
+    if device.type == "50/51" and corrente > device.pickup_current * BASE:
+        return True, device.time_delay * (1 + 1 / (corrente / BASE - device.pickup_current))
+    if device.type == "27/59" and severidade > 0.7:
+        return True, device.time_delay
+    return False, 0
+
+
+def test_respostas_iguais_as_regras_por_dispositivo(coordinator):
+    rng = random.Random(3)
+    bank = coordinator.device_bank
+    for _ in range(200):
+        device = rng.choice(coordinator.protection_devices)
+        device.pickup_current = rng.uniform(0.2, 6.0)
+        device.time_delay = rng.uniform(0.02, 2.0)
+        corrente, zona, severidade = rng.uniform(100, 8000), rng.choice(["Z1", "Z2", "Z9"]), rng.random()
+
+        respostas = bank.respostas(corrente, zona, severidade, BASE)
+        assert respostas.dtype == RESPOSTA_DTYPE
+        for d, r in zip(coordinator.protection_devices, respostas):
+            opera, tempo = _resposta_esperada(d, corrente, zona, severidade)
+            assert r['device_id'] == d.id
+            assert bool(r['should_operate']) == opera
+            assert r['operating_time'] == pytest.approx(tempo)
+
+
+def test_banco_acompanha_ajustes_dos_dataclasses(coordinator):
+    bank = coordinator.device_bank
+    versao = bank.versao
+
+    coordinator.apply_rl_action(5)  # Aumenta o pickup do dispositivo 1
+    device = coordinator.protection_devices[1]
+    assert bank.pickup[1] == device.pickup_current
+    assert bank.versao > versao
+
+    device.status = 'maintenance'
+    respostas = bank.respostas(50000.0, device.zone, 1.0, BASE)
+    assert not respostas['should_operate'][1]
+
+
+def test_problemas_de_coordenacao_em_ordem_de_pares():
+    respostas = np.zeros(4, dtype=RESPOSTA_DTYPE)
+    respostas['device_id'] = ["A", "B", "C", "D"]
+    respostas['should_operate'] = [True, True, False, True]
+    respostas['operating_time'] = [0.1, 0.2, 0.0, 0.35]
+
+    problemas = problemas_coordenacao(respostas)
+    assert problemas.dtype == PROBLEMA_DTYPE
+    assert [(p['device1'], p['device2']) for p in problemas] == [("A", "B"), ("A", "D"), ("B", "D")]
+    np.testing.assert_allclose(problemas['margin'], [0.1, 0.25, 0.15])
+    assert len(problemas_coordenacao(respostas[:1])) == 0
+
+
+def test_simulate_fault_devolve_arrays_estruturados(coordinator):
+    result = coordinator.simulate_fault(4, '3ph', 0.8)
+
+    assert result.device_responses.dtype == RESPOSTA_DTYPE
+    assert result.coordination_issues.dtype == PROBLEMA_DTYPE
+    assert result.coordination_ok == (len(result.coordination_issues) == 0)
+    operando = len([d for d in result.device_responses if d['should_operate']])
+    assert operando == int(result.device_responses['should_operate'].sum())
+
+
+def test_conversao_para_api(coordinator):
+    result = coordinator.simulate_fault(4, '3ph', 0.8)
+    payload = result.to_dict()
+
+    json.dumps(payload)
+    assert payload['device_responses'] == registros_para_dicts(result.device_responses)
+    assert payload['device_responses'][0] == {
+        'device_id': '87T-TR1', 'type': '87T', 'should_operate': True,
+        'operating_time': 0.02, 'coordination_ok': True
+    }
+    assert all(isinstance(issue['margin'], float) for issue in payload['coordination_issues'])
+
+
+def test_coordenador_core_usa_o_banco():
+    from src.core.rl_protection_coordinator_clean import ProtectionCoordinator as CoreCoordinator
+
+    coordinator = CoreCoordinator()
+    result = coordinator.simulate_fault(7, '2ph', 0.6)
+    reward = coordinator.rl_agent.calculate_reward(result)
+    assert isinstance(result.to_dict()['device_responses'], list)
+    assert np.isfinite(reward)
+
+
+def test_versao_so_muda_com_ajuste_efetivo(coordinator):
+    bank = coordinator.device_bank
+    device = coordinator.protection_devices[2]
+    versao = bank.versao
+
+    device.pickup_current = device.pickup_current
+    device.status = 'active'
+    coordinator.apply_rl_action(99)  # Dispositivo inexistente
+    assert bank.versao == versao
+
+    device.time_delay *= 1.1
+    assert bank.versao == versao + 1
+    device.status = 'maintenance'
+    versao = bank.versao
+    device.status = 'fault'  # Continua inativo
+    assert bank.versao == versao
+
+
+def test_memo_de_simulacoes(coordinator):
+    memo = coordinator.fault_memo
+    primeiro = coordinator.simulate_fault(4, '3ph', 0.8)
+    assert coordinator.simulate_fault(4, '3ph', 0.8) is primeiro
+    assert not primeiro.device_responses.flags.writeable
+
+    coordinator.apply_rl_action(99)
+    assert coordinator.simulate_fault(4, '3ph', 0.8) is primeiro
+    assert memo.estatisticas()['hits'] == 2
+
+    coordinator.apply_rl_action(6)  # Reduz o atraso do dispositivo 1
+    novo = coordinator.simulate_fault(4, '3ph', 0.8)
+    assert novo is not primeiro
+    assert novo.device_responses['operating_time'][1] < primeiro.device_responses['operating_time'][1]
+
+    coordinator.coordination_pairs = np.empty((0, 2), dtype=int)
+    assert len(coordinator.simulate_fault(4, '3ph', 0.8).coordination_issues) == 0
+    assert coordinator.get_rl_status()['fault_memo']['hit_rate'] == pytest.approx(2 / 5)
+
+
+@pytest.mark.parametrize("modulo", ["rl_protection_coordinator", "src.core.rl_protection_coordinator_clean"])
+def test_memo_descartado_ao_trocar_impedancias(modulo):
+    import importlib
+
+    coordinator = importlib.import_module(modulo).ProtectionCoordinator()
+    antes = coordinator.simulate_fault(7, '3ph', 1.0)
+
+    coordinator.bus_impedances = {**coordinator.bus_impedances, 7: 0.5}
+    depois = coordinator.simulate_fault(7, '3ph', 1.0)
+    assert depois is not antes
+    assert depois.fault_current_a == pytest.approx(BASE / 0.5)
+    assert coordinator.fault_sweep('3ph', 1.0)[7] == pytest.approx(BASE / 0.5)
+
+    with pytest.raises(TypeError):
+        coordinator.bus_impedances[7] = 0.1  # só pelo setter
+
+
+def test_copia_de_dispositivo_nao_leva_o_banco(coordinator):
+    device = coordinator.protection_devices[0]
+    assert len(pickle.dumps(device)) < len(pickle.dumps(coordinator.device_bank)) / 5
+
+    copia = copy.deepcopy(device)
+    assert "_banco" not in copia.__dict__ and copia == device
+    versao = coordinator.device_bank.versao
+    copia.pickup_current *= 2  # cópia avulsa: o banco original não muda
+    assert coordinator.device_bank.versao == versao
+    assert coordinator.device_bank.pickup[0] == device.pickup_current
+
+
+def test_copia_do_banco_vincula_seus_dispositivos(coordinator):
+    original = coordinator.device_bank
+    for bank in (copy.deepcopy(original), pickle.loads(pickle.dumps(original))):
+        assert all(d.__dict__["_banco"] is bank for d in bank.dispositivos)
+        assert not any(d is o for d, o in zip(bank.dispositivos, original.dispositivos))
+
+        versao = bank.versao
+        bank.dispositivos[2].time_delay = 1.75
+        assert bank.atraso[2] == 1.75 and bank.versao == versao + 1
+        assert original.atraso[2] != 1.75
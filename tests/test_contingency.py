@@ -0,0 +1,115 @@
+"""
+Testes da análise de contingências N-1 (src/backend/services/contingency.py).
+"""
+
+import asyncio
+import json
+
+import pandapower as pp
+import pytest
+
+from simuladores.power_sim.snapshot_binario import JSON_PADRAO, carregar_documento
+from src.backend.services.contingency import (
+    ContingencyLimits, ContingencyPool, list_outages, run_outage, summarize
+)
+
+
+@pytest.fixture
+def rede():
+    return carregar_documento(JSON_PADRAO)["net"]
+
+
+@pytest.fixture
+def rede_radial():
+    """Barra 2 alimentada só pela linha 1: sua saída ilha a carga."""
+    net = pp.create_empty_network()
+    b0, b1, b2 = (pp.create_bus(net, vn_kv=20.0) for _ in range(3))
+    pp.create_ext_grid(net, b0)
+    pp.create_line(net, b0, b1, length_km=1.0, std_type="NA2XS2Y 1x95 RM/25 12/20 kV")
+    pp.create_line(net, b1, b2, length_km=1.0, std_type="NA2XS2Y 1x95 RM/25 12/20 kV")
+    pp.create_load(net, b2, p_mw=1.0, q_mvar=0.2)
+    return net
+
+
+def test_lista_linhas_e_trafos_em_servico(rede):
+    rede.line.at[rede.line.index[0], 'in_service'] = False
+    outages = list_outages(rede)
+    assert len(outages) == len(rede.line) - 1 + len(rede.trafo)
+    assert ("line", int(rede.line.index[0])) not in outages
+
+
+def test_contingencia_restaura_elemento(rede):
+    run_outage(rede, ("line", 0), ContingencyLimits(), algorithm='nr')
+    assert rede.line['in_service'].all()
+
+
+def test_ilhamento_e_carga_perdida(rede_radial):
+    result = run_outage(rede_radial, ("line", 1), ContingencyLimits(), algorithm='nr')
+    assert result["converged"]
+    assert result["islanded_buses"] == [2]
+    assert result["lost_load_mw"] == pytest.approx(1.0)
+    assert not result["secure"]
+
+
+def test_sobrecarga_com_limite_reduzido(rede):
+    result = run_outage(rede, ("line", 0), ContingencyLimits(max_loading_percent=0.0),
+                        algorithm='nr')
+    assert result["overloads"]
+    assert summarize([result])["n_1_secure"] is False
+
+
+def test_endpoint_transmite_resultados(test_client, rede):
+    response = test_client.post("/api/v1/network/contingency", json={})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["type"] == "start"
+    outages = [line for line in lines if line["type"] == "outage"]
+    assert len(outages) == lines[0]["total_outages"] == len(list_outages(rede))
+    assert lines[-1]["type"] == "summary"
+    assert lines[-1]["total_outages"] == len(outages)
+
+
+def test_endpoint_rejeita_elemento_invalido(test_client):
+    response = test_client.post("/api/v1/network/contingency", json={"elements": ["bus"]})
+    assert response.status_code == 400
+
+
+def test_streams_simultaneos_com_limites_e_estados_diferentes(rede):
+    """Um stream novo (outros limites ou outro estado) não cancela os que estão em andamento."""
+    pool = ContingencyPool(max_workers=2)
+    total = len(list_outages(rede))
+
+    async def coletar(state_hash, limits, primeiro=None):
+        resultados = []
+        async for result in pool.stream(rede, state_hash, limits):
+            resultados.append(result)
+            if primeiro is not None and not primeiro.is_set():
+                primeiro.set()
+                await asyncio.sleep(0)
+        return resultados
+
+    async def cenario():
+        primeiro = asyncio.Event()
+        restrito = asyncio.create_task(coletar("h1", ContingencyLimits(max_loading_percent=0.0), primeiro))
+        await primeiro.wait()  # lotes de "h1" ainda pendentes
+        padrao = asyncio.create_task(coletar("h1", ContingencyLimits()))
+        await asyncio.sleep(0)
+        assert pool.pool_starts == 1  # limites não recriam o pool
+        # Estado novo troca o pool com os lotes dos dois streams em andamento
+        outro_estado = await coletar("h2", ContingencyLimits())
+        assert pool.pool_starts == 2
+        return await restrito, await padrao, outro_estado
+
+    # Loop próprio: asyncio.run removeria o loop corrente usado por outros testes
+    loop = asyncio.new_event_loop()
+    try:
+        restrito, padrao, outro_estado = loop.run_until_complete(cenario())
+    finally:
+        loop.close()
+        pool.shutdown()
+
+    assert len(restrito) == len(padrao) == len(outro_estado) == total
+    assert all(r["overloads"] for r in restrito if r["converged"])
+    assert not any(r["overloads"] for r in padrao)
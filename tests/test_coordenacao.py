@@ -0,0 +1,69 @@
+"""
+Testes da verificação de coordenação por ordenação e varredura
+(simuladores/power_sim/coordenacao.py) e do endpoint de análise de coordenação.
+"""
+
+import numpy as np
+import pandapower as pp
+import pytest
+
+from simuladores.power_sim.coordenacao import pares_montante_jusante, pares_na_janela
+
+
+def _todos_os_pares(valores, janela, grupos=None):
+    n = len(valores)
+    return [(i, j) for i in range(n) for j in range(i + 1, n)
+            if abs(valores[i] - valores[j]) < janela
+            and (grupos is None or grupos[i] == grupos[j])]
+
+
+@pytest.mark.parametrize("com_grupos", [False, True])
+def test_varredura_igual_a_todos_os_pares(com_grupos):
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        n = int(rng.integers(0, 30))
+        # Valores arredondados forçam empates e diferenças iguais à janela
+        valores = np.round(rng.uniform(0, 2, n), 1)
+        grupos = rng.choice(["line", "bus", "trafo"], n) if com_grupos else None
+
+        i, j, diferenca = pares_na_janela(valores, 0.3, grupos)
+        esperados = _todos_os_pares(valores, 0.3, grupos)
+        assert list(zip(i.tolist(), j.tolist())) == esperados
+        np.testing.assert_allclose(diferenca, [abs(valores[a] - valores[b]) for a, b in esperados])
+
+
+def test_pares_permitidos():
+    valores = [0.1, 0.2, 0.25, 1.0]
+    i, j, _ = pares_na_janela(valores, 0.3, permitidos=np.array([[2, 0], [1, 3]]))
+    assert list(zip(i.tolist(), j.tolist())) == [(0, 2)]
+
+
+def test_pares_montante_jusante():
+    # Fonte na barra 0: linhas 0-1, 1-2 e 1-3 (radial)
+    net = pp.create_empty_network()
+    barras = [pp.create_bus(net, vn_kv=13.8) for _ in range(4)]
+    pp.create_ext_grid(net, barras[0])
+    for de, para in [(0, 1), (2, 1), (1, 3)]:
+        pp.create_line_from_parameters(net, barras[de], barras[para], length_km=1.0,
+                                       r_ohm_per_km=0.1, x_ohm_per_km=0.3,
+                                       c_nf_per_km=0.0, max_i_ka=0.5)
+
+    elementos = [("line", 0), ("line", 1), ("line", 2), ("line", 0), ("bus", 3), ("line", 99)]
+    pares = pares_montante_jusante(net, elementos)
+    # Linha 1 está cadastrada de 2 para 1, mas a barra 1 é a montante
+    assert pares.tolist() == [[0, 1], [0, 2], [0, 3], [1, 3], [2, 3], [2, 4]]
+
+
+def test_endpoint_reporta_cada_par_uma_vez(test_client):
+    response = test_client.post("/api/v1/protection/coordination/analyze")
+    assert response.status_code == 200
+    issues = response.json()["coordination_issues"]
+    assert issues
+
+    chaves = [(issue["type"], frozenset(issue["devices"])) for issue in issues]
+    assert len(chaves) == len(set(chaves))
+
+    em_serie = test_client.post("/api/v1/protection/coordination/analyze?series_only=true").json()
+    pares = {(issue["type"], frozenset(issue["devices"])) for issue in em_serie["coordination_issues"]}
+    assert 0 < len(pares) < len(chaves)
+    assert pares <= set(chaves)
@@ -0,0 +1,132 @@
+"""
+Testes do motor vetorizado de curto-circuito (simuladores/power_sim/curto_circuito.py).
+"""
+
+import copy
+
+import numpy as np
+import pandapower as pp
+import pandapower.shortcircuit as sc
+import pytest
+
+from simuladores.power_sim.curto_circuito import MotorCurtoCircuito, zth_barras_ieee
+from simuladores.power_sim.snapshot_binario import JSON_PADRAO, carregar_documento
+
+
+@pytest.fixture(scope="module")
+def rede():
+    return carregar_documento(JSON_PADRAO)["net"]
+
+
+@pytest.fixture(scope="module")
+def motor(rede):
+    return MotorCurtoCircuito(rede)
+
+
+def _rede_so_linhas():
+    net = pp.create_empty_network()
+    barras = [pp.create_bus(net, vn_kv=13.8) for _ in range(4)]
+    pp.create_ext_grid(net, barras[0], s_sc_max_mva=500.0, rx_max=0.1)
+    for de, para in [(0, 1), (1, 2), (2, 3), (0, 2)]:
+        pp.create_line_from_parameters(net, barras[de], barras[para], length_km=2.0,
+                                       r_ohm_per_km=0.08, x_ohm_per_km=0.35,
+                                       c_nf_per_km=0.0, max_i_ka=0.5)
+    pp.create_load(net, barras[3], p_mw=2.0, q_mvar=0.5)
+    return net
+
+
+def test_correntes_conferem_com_pandapower():
+    net = _rede_so_linhas()
+    motor = MotorCurtoCircuito(net, c_fator=1.1)
+
+    referencia = copy.deepcopy(net)
+    sc.calc_sc(referencia, case='max')
+
+    np.testing.assert_allclose(motor.correntes_trifasicas(),
+                               referencia.res_bus_sc['ikss_ka'].values, rtol=1e-3)
+
+
+def test_varredura_igual_a_solucoes_individuais(motor):
+    varredura = motor.varredura()
+    ybus = np.linalg.inv(motor.zbus)
+
+    for col in range(len(motor.barras)):
+        # Injeção de corrente na barra em falta: ΔV = Z[:, f] * (-If)
+        injecao = np.zeros(len(motor.barras), dtype=complex)
+        injecao[col] = -1.0 / motor.zbus[col, col]
+        delta_v = np.linalg.solve(ybus, injecao)
+        np.testing.assert_allclose(varredura.tensoes_pu[:, col], np.abs(1.0 + delta_v), atol=1e-9)
+        assert varredura.tensoes_pu[col, col] == pytest.approx(0.0, abs=1e-9)
+
+
+def test_impedancia_de_falta_reduz_corrente(motor):
+    sem_impedancia = motor.correntes_trifasicas()
+    com_impedancia = motor.correntes_trifasicas(z_falta_pu=0.5)
+    assert np.all(com_impedancia < sem_impedancia)
+
+
+def test_contribuicoes_de_ramos(rede, motor):
+    varredura = motor.varredura()
+    falta = varredura.falta(3)
+
+    assert len(falta["branch_contributions_ka"]) == len(rede.line) + len(rede.trafo)
+    linhas = varredura.contribuicoes(3, "line")
+    # Linhas que chegam na barra em falta conduzem corrente
+    ligadas = rede.line.index[(rede.line['from_bus'] == 3) | (rede.line['to_bus'] == 3)]
+    assert (linhas[ligadas] > 0).all()
+
+
+def test_linha_fora_de_servico_sai_da_varredura(rede):
+    net = copy.deepcopy(rede)
+    net.line.at[0, 'in_service'] = False
+    varredura = MotorCurtoCircuito(net).varredura()
+    assert ("line", 0) not in varredura.ramos
+
+
+def test_zth_pela_numeracao_ieee(motor):
+    zth = zth_barras_ieee(motor, [2, 4, 7])
+    assert zth[0] == pytest.approx(abs(motor.zbus[0, 0]))
+    assert np.isnan(zth[1])
+    assert zth[2] > zth[0]
+
+
+def test_coordenador_usa_zbus_da_rede():
+    from rl_protection_coordinator import ProtectionCoordinator
+
+    coordinator = ProtectionCoordinator()
+    sweep = coordinator.fault_sweep('3ph', 1.0)
+    result = coordinator.simulate_fault(7, '3ph', 1.0)
+    assert result.fault_current_a == pytest.approx(sweep[7])
+    assert coordinator.bus_impedances[4] == 0.08  # Barra fora do modelo reduzido
+    assert coordinator.bus_impedance_source[7] == "zbus"
+    assert coordinator.bus_impedance_source[4] == "tabulated"
+
+
+def test_rede_padrao_independe_do_diretorio(monkeypatch, tmp_path, motor):
+    from simuladores.power_sim import curto_circuito
+    from src.core.rl_protection_coordinator_clean import ProtectionCoordinator
+
+    monkeypatch.chdir(tmp_path)
+    curto_circuito.motor_rede_padrao.cache_clear()
+    try:
+        coordinator = ProtectionCoordinator()
+    finally:
+        curto_circuito.motor_rede_padrao.cache_clear()
+    assert coordinator.bus_impedance_source[14] == "zbus"
+    assert coordinator.bus_impedances[14] == pytest.approx(zth_barras_ieee(motor, [14])[0])
+
+
+def test_rede_ausente_avisa_e_usa_tabela(monkeypatch, tmp_path, caplog):
+    from simuladores.power_sim import curto_circuito
+    from src.core.rl_protection_coordinator_clean import ProtectionCoordinator
+
+    monkeypatch.setattr(curto_circuito, "JSON_PADRAO", tmp_path / "ausente.json")
+    curto_circuito.motor_rede_padrao.cache_clear()
+    try:
+        with caplog.at_level("WARNING"):
+            coordinator = ProtectionCoordinator()
+    finally:
+        curto_circuito.motor_rede_padrao.cache_clear()
+    assert set(coordinator.bus_impedance_source.values()) == {"tabulated"}
+    assert coordinator.bus_impedances[14] == 0.22
+    assert "Rede do projeto não carregada" in caplog.text
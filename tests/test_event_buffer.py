@@ -0,0 +1,67 @@
+"""
+Testes do buffer circular de eventos das sessões de rastreamento em tempo
+real (src/backend/services/event_buffer.py).
+"""
+
+import pytest
+
+from src.backend.services.event_buffer import EventRingBuffer
+
+
+def buffer_com(n, capacidade):
+    buffer = EventRingBuffer(capacidade, key=lambda e: e["id"])
+    for i in range(1, n + 1):
+        assert buffer.append({"id": f"e{i}"}) == i
+    return buffer
+
+
+def ids(eventos):
+    return [e["id"] for e in eventos]
+
+
+def test_sequencia_e_leitura_desde():
+    buffer = buffer_com(3, 5)
+    assert len(buffer) == 3 and buffer.first_seq == 1 and buffer.last_seq == 3
+    assert buffer.since(1) == ([{"id": "e2"}, {"id": "e3"}], 0)
+    assert buffer.since(3) == ([], 0)
+    assert buffer.since(10) == ([], 0)
+    assert ids(buffer.since(0, limit=2)[0]) == ["e1", "e2"]
+    assert buffer.get(2) == {"id": "e2"} and buffer.get(4) is None
+
+
+def test_sobrescrita_conta_eventos_perdidos():
+    buffer = buffer_com(12, 5)
+    assert len(buffer) == 5 and buffer.overwritten == 7
+    assert buffer.first_seq == 8 and buffer.last_seq == 12
+    assert ids(buffer) == ["e8", "e9", "e10", "e11", "e12"]
+
+    eventos, perdidos = buffer.since(3)
+    assert ids(eventos) == ["e8", "e9", "e10", "e11", "e12"] and perdidos == 4
+    assert ids(buffer.since(9)[0]) == ["e10", "e11", "e12"]
+    assert buffer.get(7) is None and buffer.get(8) == {"id": "e8"}
+    assert buffer.stats() == {"capacity": 5, "buffered": 5, "first_seq": 8,
+                              "last_seq": 12, "overwritten": 7}
+
+
+@pytest.mark.parametrize("desde", range(0, 14))
+def test_leitura_igual_a_lista_completa(desde):
+    """``since`` atravessa o fim do vetor circular como uma fatia da lista."""
+    buffer = buffer_com(13, 4)
+    todos = [f"e{i}" for i in range(1, 14)]
+    esperado = todos[max(desde, 13 - 4):]
+    assert ids(buffer.since(desde)[0]) == esperado
+
+
+def test_busca_por_chave_acompanha_sobrescrita():
+    buffer = buffer_com(4, 3)
+    assert buffer.seq_of("e1") is None  # sobrescrito
+    assert buffer.seq_of("e4") == 4
+
+    # Chave repetida: sobrescrever o "x" antigo não apaga o "x" mais novo
+    buffer = EventRingBuffer(2, key=lambda e: e["id"])
+    for chave in ("x", "x", "y"):
+        buffer.append({"id": chave})
+    assert buffer.seq_of("x") == 2 and buffer.seq_of("y") == 3
+
+    with pytest.raises(ValueError):
+        EventRingBuffer(0)
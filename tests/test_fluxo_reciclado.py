@@ -0,0 +1,118 @@
+"""
+Testes do fluxo de potência reciclado (simuladores/power_sim/fluxo_reciclado.py).
+"""
+
+import copy
+
+import numpy as np
+import pandapower as pp
+import pytest
+
+from simuladores.power_sim.fluxo_reciclado import FluxoReciclado, assinatura_topologia
+from simuladores.power_sim.snapshot_binario import JSON_PADRAO, carregar_documento
+
+
+@pytest.fixture
+def rede():
+    return carregar_documento(JSON_PADRAO)["net"]
+
+
+def _referencia(net):
+    trabalho = copy.deepcopy(net)
+    pp.runpp(trabalho, algorithm='nr', max_iteration=50)
+    return trabalho
+
+
+def test_mudanca_de_carga_reaproveita_estruturas(rede):
+    fluxo = FluxoReciclado()
+    fluxo.resolver(rede)
+
+    rede.load['p_mw'] *= 1.1
+    resultado = fluxo.resolver(rede)
+
+    assert fluxo.montagens == 1
+    assert fluxo.reciclagens == 1
+    np.testing.assert_allclose(
+        resultado.res_bus['vm_pu'].values, _referencia(rede).res_bus['vm_pu'].values, atol=1e-8)
+
+
+def test_mudanca_de_topologia_remonta(rede):
+    fluxo = FluxoReciclado()
+    fluxo.resolver(rede)
+
+    rede.line.at[rede.line.index[0], 'in_service'] = False
+    resultado = fluxo.resolver(rede)
+
+    assert fluxo.montagens == 2
+    np.testing.assert_allclose(
+        resultado.res_line['i_ka'].values, _referencia(rede).res_line['i_ka'].values, atol=1e-8)
+
+
+def test_rede_do_chamador_nao_e_alterada(rede):
+    fluxo = FluxoReciclado()
+    fluxo.resolver(rede)
+    assert rede.res_bus.empty
+
+
+def test_assinatura_ignora_injecoes(rede):
+    antes = assinatura_topologia(rede)
+    rede.load['q_mvar'] *= 0.5
+    assert assinatura_topologia(rede) == antes
+
+    rede.load.at[rede.load.index[0], 'bus'] = rede.bus.index[-1]
+    assert assinatura_topologia(rede) != antes
+
+
+def test_cache_da_api_usa_fluxo_reciclado(rede):
+    from src.backend.services.powerflow_cache import PowerFlowCache
+
+    cache = PowerFlowCache(recycle=True)
+    cache.solve(rede, algorithm='nr')
+    rede.load['p_mw'] *= 0.9
+    resultado = cache.solve(rede, algorithm='nr')
+
+    assert resultado.converged
+    solver = next(iter(cache.stats()["solvers"].values()))
+    assert solver["full_builds"] == 1 and solver["recycled"] == 1
+
+
+def test_reciclagem_sem_convergencia_refaz_montagem(rede, monkeypatch):
+    """Fluxo reciclado que termina sem convergir (sem exceção) não é aproveitado."""
+    from simuladores.power_sim import fluxo_reciclado
+
+    runpp = pp.runpp
+
+    def runpp_sem_convergir(net, **opcoes):
+        runpp(net, **opcoes)
+        if "recycle" in opcoes:
+            net.converged = False
+            net._ppc["success"] = False
+
+    fluxo = FluxoReciclado()
+    fluxo.resolver(rede)
+    monkeypatch.setattr(fluxo_reciclado.pp, "runpp", runpp_sem_convergir)
+
+    rede.load['p_mw'] *= 1.1
+    resultado = fluxo.resolver(rede)
+
+    assert fluxo.falhas_reciclagem == 1 and fluxo.montagens == 2 and fluxo.reciclagens == 0
+    assert resultado.converged
+    np.testing.assert_allclose(
+        resultado.res_bus['vm_pu'].values, _referencia(rede).res_bus['vm_pu'].values, atol=1e-8)
+
+
+def test_rede_sem_solucao_nao_fica_guardada(rede):
+    fluxo = FluxoReciclado()
+    fluxo.resolver(rede)
+
+    inviavel = copy.deepcopy(rede)
+    inviavel.load['scaling'] = 1000.0
+    with pytest.raises(pp.LoadflowNotConverged):
+        fluxo.resolver(inviavel)
+    assert fluxo.falhas_reciclagem == 1
+
+    # A próxima chamada monta de novo a partir da rede viável
+    resultado = fluxo.resolver(rede)
+    assert resultado.converged and fluxo.montagens == 2
+    np.testing.assert_allclose(
+        resultado.res_bus['vm_pu'].values, _referencia(rede).res_bus['vm_pu'].values, atol=1e-8)
@@ -0,0 +1,152 @@
+"""
+Testes da inferência dos modelos RL e do cache LRU de políticas
+(src/backend/services/model_cache.py) e de /api/v1/rl/models/{id}/predict*.
+"""
+
+import numpy as np
+import pytest
+
+from src.backend.api.routers import rl_agent
+from src.backend.services.model_cache import (
+    ModelCache, QTablePolicy, SB3Policy, _core_coordinator, load_policy
+)
+from src.backend.services.model_registry import ModelRegistry, load_q_table, write_checkpoint
+from src.core.rl_protection_coordinator_clean import BasicRLAgent
+
+ESTADO = {"fault_current": 6000.0, "fault_location": 4, "system_loading": 0.7,
+          "protection_settings": {}, "network_topology": {}}
+
+
+@pytest.fixture
+def coordenador():
+    return _core_coordinator()
+
+
+@pytest.fixture
+def checkpoint_q(tmp_path, coordenador):
+    """Checkpoint com a ação 5 (+pickup do dispositivo 1) no estado padrão."""
+    agent = BasicRLAgent()
+    agent.q_table.atualizar(agent.get_state(coordenador.device_bank), 5, 2.0)
+    return write_checkpoint(tmp_path / "m1", "q_learning", 1, [1.0], agent=agent, final=True)
+
+
+def test_politica_q_recomenda_acao_gulosa(checkpoint_q, coordenador):
+    policy = QTablePolicy(load_q_table(checkpoint_q), coordenador)
+    dispositivo = coordenador.protection_devices[1]
+    desconhecido = dict(ESTADO, protection_settings={dispositivo.id: {"time_delay": 2.9}})
+
+    conhecido, outro = policy.predict_batch([ESTADO, desconhecido])
+    assert conhecido["known_state"] and conhecido["q_value"] == 2.0
+    [acao] = conhecido["recommended_actions"]
+    assert acao["device_id"] == dispositivo.id
+    assert acao["parameter"] == "pickup_current"
+    assert acao["value"] == pytest.approx(dispositivo.pickup_current * 1.05)
+    assert 0 < acao["confidence"] <= 1
+
+    assert not outro["known_state"] and outro["recommended_actions"] == []
+
+
+def test_lote_igual_a_predicoes_individuais(checkpoint_q, coordenador):
+    policy = QTablePolicy(load_q_table(checkpoint_q), coordenador)
+    ids = [d.id for d in coordenador.protection_devices]
+    rng = np.random.default_rng(0)
+    estados = [dict(ESTADO, protection_settings={ids[i]: {"pickup_current": float(p)}})
+               for i, p in zip(rng.integers(0, len(ids), 50), rng.uniform(0.1, 2.0, 50))] + [ESTADO]
+    assert policy.predict_batch(estados) == [policy.predict_batch([e])[0] for e in estados]
+
+
+class PoliticaFalsa:
+    def __init__(self, memory_bytes):
+        self.memory_bytes = memory_bytes
+
+
+def test_cache_lru_por_memoria():
+    cache = ModelCache(max_bytes=100)
+    carregados = []
+
+    def carregar(chave, tamanho):
+        return cache.get(chave, lambda: carregados.append(chave) or PoliticaFalsa(tamanho))
+
+    a = carregar(("a", "p1"), 40)
+    carregar(("b", "p1"), 40)
+    assert carregar(("a", "p1"), 40) is a  # acerto: "a" passa a ser o mais recente
+    carregar(("c", "p1"), 40)  # 120 bytes: sai o menos usado ("b")
+    assert carregados == [("a", "p1"), ("b", "p1"), ("c", "p1")]
+    assert cache.stats()["evictions"] == 1 and cache.memory_bytes == 80
+
+    carregar(("b", "p1"), 40)
+    assert carregados[-1] == ("b", "p1")
+
+    # Uma política maior que o orçamento fica sozinha no cache
+    carregar(("d", "p1"), 500)
+    assert cache.stats()["models"] == 1
+
+    cache.invalidate("d")
+    assert cache.stats()["models"] == 0
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 5
+
+
+class ModeloSB3Falso:
+    """Política fixa: devolve as observações recebidas e ações constantes."""
+
+    class policy:
+        @staticmethod
+        def parameters():
+            return []
+
+    def __init__(self, acoes):
+        self.acoes = np.asarray(acoes, dtype=np.float32)
+        self.observacoes = None
+
+    def predict(self, observacoes, deterministic=False):
+        self.observacoes = observacoes
+        return np.tile(self.acoes, (len(observacoes), 1)), None
+
+
+def test_politica_sb3_em_um_forward_pass():
+    reles = [{"id": "R1"}, {"id": "R2"}]
+    modelo = ModeloSB3Falso([0.0, 1.0, 0.5, 0.5])
+    policy = SB3Policy(modelo, reles, np.array([0.1, 0.2, 1.0]))
+
+    estados = [ESTADO, dict(ESTADO, protection_settings={"R2": {"pickup_current": 500, "time_delay": 0.1}})]
+    resultado = policy.predict_batch(estados)
+
+    assert modelo.observacoes.shape == (2, 3 + 4)
+    np.testing.assert_allclose(modelo.observacoes[1], [0.1, 0.2, 1.0, 0.5, 0.5, 1.0, 0.0])
+    valores = {(a["device_id"], a["parameter"]): a["value"] for a in resultado[0]["recommended_actions"]}
+    assert valores == {("R1", "pickup_current"): 50.0, ("R1", "time_delay"): 2.0,
+                       ("R2", "pickup_current"): 275.0, ("R2", "time_delay"): pytest.approx(1.05)}
+
+
+def test_modelo_legado_sem_politica():
+    with pytest.raises(ValueError):
+        load_policy({"status": "legacy", "algorithm": "legacy"}, rl_agent.DATA_PATH)
+    with pytest.raises(KeyError):
+        load_policy(None, rl_agent.DATA_PATH)
+
+
+@pytest.fixture
+def registro_api(monkeypatch, tmp_path, checkpoint_q):
+    registro = ModelRegistry(tmp_path)
+    registro.register("m1", algorithm="q_learning", status="completed", path=str(checkpoint_q))
+    registro.register("antigo", algorithm="legacy", status="legacy", path="x")
+    monkeypatch.setattr(rl_agent, "model_registry", registro)
+    monkeypatch.setattr(rl_agent, "model_cache", ModelCache())
+    return registro
+
+
+def test_endpoints_de_predicao(test_client, registro_api, coordenador):
+    resposta = test_client.post("/api/v1/rl/models/m1/predict", json=ESTADO)
+    assert resposta.status_code == 200
+    predicao = resposta.json()["prediction"]
+    assert predicao["known_state"] and predicao["fault_severity"] == "high"
+    assert predicao["recommended_actions"][0]["device_id"] == coordenador.protection_devices[1].id
+
+    lote = test_client.post("/api/v1/rl/models/m1/predict-batch", json=[ESTADO] * 20).json()
+    assert lote["total"] == 20
+    assert all(p["prediction"] == predicao for p in lote["predictions"])
+    assert rl_agent.model_cache.stats()["misses"] == 1  # carregado uma vez, depois do cache
+
+    assert test_client.post("/api/v1/rl/models/antigo/predict", json=ESTADO).status_code == 409
+    assert test_client.post("/api/v1/rl/models/nada/predict-batch", json=[ESTADO]).status_code == 404
+    assert test_client.post("/api/v1/rl/models/m1/predict-batch", json=[]).json()["predictions"] == []
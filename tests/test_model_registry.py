@@ -0,0 +1,83 @@
+"""
+Testes do registro de modelos RL (src/backend/services/model_registry.py).
+"""
+
+import json
+
+import numpy as np
+
+from src.core.rl_protection_coordinator_clean import BasicRLAgent
+from src.backend.services.model_registry import (
+    ModelRegistry, load_q_table, load_rewards, read_checkpoint, restore_agent, write_checkpoint
+)
+
+
+def agente_treinado():
+    agent = BasicRLAgent(action_space_size=4)
+    agent.epsilon, agent.episodes = 0.2, 30
+    for chave in (5, 10**12, 77):
+        agent.q_table.atualizar(chave, chave % 4, 1.5)
+    return agent
+
+
+def test_checkpoint_substitui_anterior(tmp_path):
+    agent = agente_treinado()
+    primeiro = write_checkpoint(tmp_path, "q_learning", 2, [1.0, 2.0], agent=agent)
+    agent.q_table.atualizar(5, 1, 3.0)
+    segundo = write_checkpoint(tmp_path, "q_learning", 3, [1.0, 2.0, 3.0], agent=agent, final=True)
+
+    assert not primeiro.exists() and segundo.exists()
+    checkpoint = read_checkpoint(tmp_path)
+    assert checkpoint["path"] == str(segundo)
+    assert checkpoint["final"] and checkpoint["episodes_completed"] == 3
+    assert load_rewards(segundo) == [1.0, 2.0, 3.0]
+    assert not list(tmp_path.glob(".snap_*"))
+
+
+def test_restaura_agente_do_checkpoint(tmp_path):
+    agent = agente_treinado()
+    snapshot = write_checkpoint(tmp_path, "q_learning", 1, [0.0], agent=agent)
+
+    tabela = load_q_table(snapshot)
+    assert isinstance(tabela.chaves, np.memmap)
+    np.testing.assert_array_equal(tabela.valores([5, 77, 9]), agent.q_table.valores([5, 77, 9]))
+
+    restaurado = restore_agent(snapshot, BasicRLAgent(action_space_size=4))
+    assert restaurado.epsilon == 0.2 and restaurado.episodes == 30
+    restaurado.q_table.atualizar(9, 0, 1.0)  # editável para continuar o treinamento
+    assert len(restaurado.q_table) == 4
+
+
+def test_indice_persistente_e_relido(tmp_path):
+    registro = ModelRegistry(tmp_path)
+    assert registro.list() == []
+    registro.register("m1", algorithm="q_learning", status="checkpoint", path="x")
+    registro.register("m1", status="completed")
+
+    # Outro processo (outra instância) vê o mesmo índice, e as alterações dele
+    outro = ModelRegistry(tmp_path)
+    assert outro.get("m1")["status"] == "completed"
+    assert outro.get("m1")["algorithm"] == "q_learning"
+    outro.register("m2", algorithm="PPO", status="completed", path="y")
+    assert sorted(m["id"] for m in registro.list()) == ["m1", "m2"]
+
+    (tmp_path / "m1").mkdir()
+    assert registro.remove("m1")
+    assert not (tmp_path / "m1").exists()
+    assert "m1" not in outro and len(outro) == 1
+
+
+def test_importa_modelos_do_formato_anterior(tmp_path):
+    (tmp_path / "model_abc.json").write_text(json.dumps({
+        "training_id": "abc", "episodes": 1000, "final_reward": 74.97,
+        "config": {"episodes": 1000}, "trained_at": "2025-07-30T22:02:21"}))
+
+    registro = ModelRegistry(tmp_path)
+    modelo = registro.get("abc")
+    assert modelo["status"] == "legacy"
+    assert modelo["performance"]["final_reward"] == 74.97
+    assert (tmp_path / "index.json").exists()
+
+    # Importação só na criação do índice: o índice passa a ser a fonte
+    (tmp_path / "model_def.json").write_text(json.dumps({"training_id": "def"}))
+    assert [m["id"] for m in ModelRegistry(tmp_path).list()] == ["abc"]
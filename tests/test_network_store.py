@@ -0,0 +1,117 @@
+"""
+Testes do cache compartilhado da rede (src/backend/services/network_store.py).
+"""
+
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.backend.services.network_store import NetworkStore, VersionConflictError
+
+DATA_FILE = Path(__file__).resolve(
+).parents[1] / "simuladores" / "power_sim" / "data" / "ieee14_protecao.json"
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "rede.json"
+    shutil.copy(DATA_FILE, path)
+    return NetworkStore(path)
+
+
+def test_view_reutiliza_rede_carregada(store):
+    primeira = store.view()
+    segunda = store.view()
+
+    assert primeira is segunda
+    assert store.misses == 1
+    assert store.hits == 1
+
+
+def test_checkout_e_commit_sao_copy_on_write(store):
+    leitura = store.view()
+    versao_inicial = store.snapshot().version
+
+    copia = store.checkout()
+    copia.load.at[copia.load.index[0], 'p_mw'] = 99.0
+    assert leitura.load['p_mw'].iloc[0] != 99.0
+
+    nova_versao = store.commit(copia)
+    assert nova_versao == versao_inicial + 1
+    assert store.view().load['p_mw'].iloc[0] == 99.0
+    # Quem já tinha a versão anterior continua com ela intacta
+    assert leitura.load['p_mw'].iloc[0] != 99.0
+
+
+def test_commit_sobre_versao_substituida_e_rejeitado(store):
+    versao, primeira = store.checkout_versioned()
+    _, segunda = store.checkout_versioned()
+    primeira.load.at[primeira.load.index[0], 'p_mw'] = 11.0
+    segunda.load.at[segunda.load.index[0], 'p_mw'] = 22.0
+
+    store.commit(primeira, expected_version=versao)
+    with pytest.raises(VersionConflictError):
+        store.commit(segunda, expected_version=versao)
+    assert store.view().load['p_mw'].iloc[0] == 11.0
+
+
+def test_updates_concorrentes_nao_perdem_alteracoes(store):
+    """Duas escritas que partem da mesma versão: a segunda é reaplicada sobre a primeira."""
+    cargas = list(store.view().load.index[:2])
+    mesma_base = threading.Barrier(2)
+
+    def alterar(carga, valor):
+        tentativas = []
+
+        def modify(net):
+            tentativas.append(net)
+            if len(tentativas) == 1:
+                mesma_base.wait(timeout=5)  # as duas cópias saem da mesma versão
+            net.load.at[carga, 'p_mw'] = valor
+        return lambda: store.update(modify)
+
+    threads = [threading.Thread(target=alterar(carga, valor))
+               for carga, valor in zip(cargas, (11.0, 22.0))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.view().load.loc[cargas, 'p_mw'].tolist() == [11.0, 22.0]
+    assert store.commits == 2
+
+
+def test_arquivo_tocado_sem_alteracao_nao_recarrega(store):
+    store.view()
+    stat = store.path.stat()
+    os.utime(store.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    store.view()
+    assert store.misses == 1
+    assert store.snapshot().version == 1
+
+
+def test_arquivo_alterado_recarrega(store):
+    store.view()
+    conteudo = store.path.read_text(encoding="utf-8")
+    store.path.write_text(conteudo + "\n", encoding="utf-8")
+    stat = store.path.stat()
+    os.utime(store.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    store.view()
+    assert store.misses == 2
+    assert store.snapshot().version == 2
+
+
+def test_endpoint_de_estatisticas(test_client):
+    test_client.get("/api/v1/network/buses")
+    test_client.get("/api/v1/network/lines")
+
+    response = test_client.get("/api/v1/network/cache/stats")
+    assert response.status_code == 200
+    data = response.json()["network"]
+    assert data["hits"] >= 1
+    assert data["misses"] >= 1
@@ -0,0 +1,79 @@
+"""
+Testes do cache de resultados do fluxo de potência (src/backend/services/powerflow_cache.py).
+"""
+
+import copy
+from pathlib import Path
+
+import pytest
+
+from simuladores.power_sim.snapshot_binario import carregar_documento
+from src.backend.services.network_store import network_state_hash
+from src.backend.services.powerflow_cache import PowerFlowCache
+
+DATA_FILE = Path(__file__).resolve(
+).parents[1] / "simuladores" / "power_sim" / "data" / "ieee14_protecao.json"
+
+
+@pytest.fixture(scope="module")
+def rede():
+    return carregar_documento(DATA_FILE)["net"]
+
+
+def test_mesmo_estado_reaproveita_resultado(rede):
+    cache = PowerFlowCache()
+    primeiro = cache.solve(rede, algorithm='nr')
+    segundo = cache.solve(rede, algorithm='nr')
+
+    assert primeiro is segundo
+    assert primeiro.converged
+    assert cache.hits == 1 and cache.misses == 1
+    # A rede de entrada não é usada pelo solver
+    assert rede.res_bus.empty
+
+
+def test_opcoes_diferentes_geram_entradas_distintas(rede):
+    cache = PowerFlowCache()
+    cache.solve(rede, algorithm='nr', max_iteration=50)
+    cache.solve(rede, algorithm='nr', max_iteration=100)
+    assert cache.misses == 2
+
+
+def test_invalidacao_remove_somente_estado_antigo(rede):
+    cache = PowerFlowCache()
+    alterada = copy.deepcopy(rede)
+    alterada.load.at[alterada.load.index[0], 'p_mw'] *= 1.1
+
+    cache.solve(rede)
+    cache.solve(alterada)
+    assert cache.invalidate_state(network_state_hash(rede)) == 1
+
+    cache.solve(alterada)
+    assert cache.hits == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_lru_descarta_entrada_mais_antiga(rede):
+    cache = PowerFlowCache(maxsize=2)
+    for max_iteration in (10, 20, 30):
+        cache.solve(rede, max_iteration=max_iteration)
+
+    assert cache.evictions == 1
+    cache.solve(rede, max_iteration=10)
+    assert cache.misses == 4
+
+
+def test_alteracao_de_carga_gera_novo_resultado(test_client):
+    antes = test_client.post("/api/v1/network/powerflow").json()
+    test_client.post("/api/v1/network/powerflow")
+
+    carga = test_client.get("/api/v1/network/loads").json()["loads"][0]
+    test_client.put(f"/api/v1/network/load/{carga['id']}", json={
+        "load_id": carga["id"], "bus": carga["bus"], "p_mw": carga["p_mw"] * 1.5,
+        "q_mvar": carga["q_mvar"], "name": carga["name"]
+    })
+    depois = test_client.post("/api/v1/network/powerflow").json()
+
+    assert antes["results"]["bus_results"] != depois["results"]["bus_results"]
+    stats = test_client.get("/api/v1/network/cache/stats").json()["powerflow"]
+    assert stats["hits"] >= 1
@@ -0,0 +1,189 @@
+"""
+Testes da distribuição de eventos das sessões de rastreamento em tempo real
+(src/backend/services/event_fanout.py) e dos endpoints de eventos
+(WebSocket, SSE e polling) de /api/v1/realtime-tracking/session/{id}.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from src.backend.api.routers import realtime_tracking
+from src.backend.services.event_fanout import EventFanout, FanoutItem, FanoutSubscriber, events_frame
+
+BASE = "/api/v1/realtime-tracking"
+
+
+def itens(*chaves, inicio=0):
+    return [FanoutItem(chave, str(inicio + i), json.dumps({"n": inicio + i})) for i, chave in enumerate(chaves)]
+
+
+def ids(lote):
+    return [item.event_id for item in lote]
+
+
+@pytest.mark.parametrize("politica, esperado", [
+    ("drop_oldest", ["2", "3", "4"]),
+    ("drop_newest", ["0", "1", "2"]),
+    ("coalesce", ["2", "3", "4"]),
+])
+def test_politicas_de_fila_cheia(politica, esperado):
+    async def cenario():
+        assinante = FanoutSubscriber("s", max_queue=3, policy=politica)
+        assinante.offer(itens("a", "b", "c", "d", "e"))
+        assert ids(await assinante.next_batch()) == esperado
+        assert assinante.take_dropped() == 2 and assinante.take_dropped() == 0
+
+    asyncio.run(cenario())
+
+
+def test_coalesce_mantem_ultimo_evento_de_cada_dispositivo():
+    async def cenario():
+        assinante = FanoutSubscriber("s", max_queue=3, policy="coalesce")
+        assinante.offer(itens("rele", "disjuntor", "rele", "medidor", "rele"))
+        assert ids(await assinante.next_batch()) == ["1", "3", "4"]
+        assert assinante.dropped == 2
+
+    asyncio.run(cenario())
+
+
+def test_lotes_timeout_e_fechamento():
+    async def cenario():
+        assinante = FanoutSubscriber("s")
+        assert await assinante.next_batch(timeout=0.01) == []
+        assinante.offer(itens("a", "b", "c"))
+        assert ids(await assinante.next_batch(max_batch=2)) == ["0", "1"]
+        assinante.close("stopped")
+        assert ids(await assinante.next_batch()) == ["2"]  # esvazia a fila antes de encerrar
+        assert await assinante.next_batch() is None
+
+    asyncio.run(cenario())
+
+    with pytest.raises(ValueError):
+        FanoutSubscriber("s", policy="fifo")
+
+
+def test_frame_com_eventos_ja_serializados():
+    frame = json.loads(events_frame("s1", itens("a", "b"), dropped=3))
+    assert frame == {"type": "events", "session_id": "s1", "count": 2, "dropped": 3,
+                     "last_event_id": "1", "events": [{"n": 0}, {"n": 1}]}
+    assert json.loads(events_frame("s1", []))["events"] == []
+
+
+def test_latencia_com_dezenas_de_assinantes():
+    """Da publicação até todos os 50 assinantes terem o lote: menos de 10 ms."""
+    async def cenario():
+        fanout = EventFanout()
+        assinantes = [fanout.subscribe("s") for _ in range(50)]
+        recebido = {}
+
+        async def consumir(assinante):
+            lote = await assinante.next_batch()
+            recebido[assinante] = time.perf_counter()
+            return lote
+
+        tarefas = [asyncio.create_task(consumir(a)) for a in assinantes]
+        await asyncio.sleep(0)  # todos esperando
+        inicio = time.perf_counter()
+        fanout.publish("s", itens("rele"))
+        lotes = await asyncio.gather(*tarefas)
+
+        assert all(ids(lote) == ["0"] for lote in lotes)
+        assert max(recebido.values()) - inicio < 0.010
+        assert fanout.stats()["subscribers"] == 50
+        for assinante in assinantes:
+            fanout.unsubscribe(assinante)
+        assert fanout.stats()["topics"] == 0
+
+    asyncio.run(cenario())
+
+
+def iniciar_sessao(test_client):
+    return test_client.post(f"{BASE}/session/start", json={}).json()
+
+
+def test_websocket_recebe_sequencia_da_falta(test_client):
+    sessao = iniciar_sessao(test_client)
+    session_id = sessao["session_id"]
+    assert sessao["websocket_endpoint"] == f"{BASE}/session/{session_id}/ws"
+
+    with test_client.websocket_connect(f"{BASE}/session/{session_id}/ws") as ws:
+        test_client.post(f"{BASE}/session/{session_id}/inject-fault", json={"location": "bus_4"})
+        eventos = []
+        while len(eventos) < 4:
+            frame = ws.receive_json()
+            assert frame["type"] == "events" and frame["dropped"] == 0
+            eventos += frame["events"]
+        assert [e["event_type"] for e in eventos] == ["fault_detected", "pickup", "trip", "open"]
+        assert frame["last_event_id"] == eventos[-1]["event_id"]
+
+        test_client.post(f"{BASE}/session/{session_id}/stop")
+        assert ws.receive_json() == {"type": "end", "session_id": session_id,
+                                     "status": "stopped", "dropped": 0}
+
+    # Reconexão: reenvia só o que veio depois de last_event_id
+    ultimo_antes = eventos[1]["event_id"]
+    with test_client.websocket_connect(
+            f"{BASE}/session/{session_id}/ws?last_event_id={ultimo_antes}") as ws:
+        frame = ws.receive_json()
+        assert [e["event_id"] for e in frame["events"]] == [e["event_id"] for e in eventos[2:]]
+        assert ws.receive_json()["type"] == "end"
+
+
+def test_sse_repete_frames_e_encerra_na_parada(test_client):
+    session_id = iniciar_sessao(test_client)["session_id"]
+    test_client.post(f"{BASE}/session/{session_id}/inject-fault", json={})
+    test_client.post(f"{BASE}/session/{session_id}/stop")
+
+    resposta = test_client.get(f"{BASE}/session/{session_id}/stream", params={"max_batch": 3})
+    assert resposta.headers["content-type"].startswith("text/event-stream")
+    blocos = resposta.text.strip().split("\n\n")
+    frames = [json.loads(bloco.rsplit("data: ", 1)[1]) for bloco in blocos]
+    assert [f["count"] for f in frames[:-1]] == [3, 1] and frames[-1]["type"] == "end"
+    assert blocos[1].startswith(f"id: {frames[1]['last_event_id']}\nevent: events")
+
+    retomada = test_client.get(f"{BASE}/session/{session_id}/stream",
+                               headers={"Last-Event-ID": frames[0]["last_event_id"]})
+    assert json.loads(retomada.text.split("\n\n")[0].rsplit("data: ", 1)[1])["count"] == 1
+
+
+def test_sessao_desconhecida(test_client):
+    assert test_client.get(f"{BASE}/session/nada/stream").status_code == 404
+    with pytest.raises(WebSocketDisconnect) as erro:
+        with test_client.websocket_connect(f"{BASE}/session/nada/ws") as ws:
+            ws.receive_json()
+    assert erro.value.code == 1008
+    assert realtime_tracking.event_fanout.subscriber_count("nada") == 0
+
+
+def test_polling_por_sequencia_com_buffer_circular(test_client):
+    session_id = test_client.post(f"{BASE}/session/start", json={"event_buffer_size": 6}).json()["session_id"]
+    for _ in range(2):
+        test_client.post(f"{BASE}/session/{session_id}/inject-fault", json={})
+
+    resposta = test_client.get(f"{BASE}/session/{session_id}/events").json()
+    assert [e["seq"] for e in resposta["events"]] == [3, 4, 5, 6, 7, 8]
+    assert resposta["last_seq"] == 8 and resposta["missed_events"] == 2
+
+    resposta = test_client.get(f"{BASE}/session/{session_id}/events", params={"since_seq": 6}).json()
+    assert [e["seq"] for e in resposta["events"]] == [7, 8] and resposta["missed_events"] == 0
+    ultimo = resposta["events"][0]["event_id"]
+    resposta = test_client.get(f"{BASE}/session/{session_id}/events", params={"last_event_id": ultimo}).json()
+    assert [e["seq"] for e in resposta["events"]] == [8]
+
+    status = test_client.get(f"{BASE}/session/{session_id}/status").json()
+    assert status["events_processed"] == 8
+    assert status["event_buffer"]["buffered"] == 6 and status["event_buffer"]["overwritten"] == 2
+    assert len(test_client.get(f"{BASE}/session/{session_id}/sequence").json()["events"]) == 6
+
+    parada = test_client.post(f"{BASE}/session/{session_id}/stop").json()
+    assert parada["total_events"] == 8 and parada["events_overwritten"] == 2
+
+    # Stream retomado antes do buffer: o primeiro frame conta os sobrescritos
+    frame = test_client.get(f"{BASE}/session/{session_id}/stream").text.split("\n\n")[0]
+    assert json.loads(frame.rsplit("data: ", 1)[1])["dropped"] == 2
+
+    assert test_client.post(f"{BASE}/session/start", json={"event_buffer_size": 0}).status_code == 422
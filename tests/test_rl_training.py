@@ -0,0 +1,236 @@
+"""
+Testes do executor de treinamentos RL (src/backend/services/rl_training.py)
+e dos endpoints /api/v1/rl/train e /api/v1/rl/training/{id}.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.backend.api.routers import rl_agent
+from src.backend.services.model_registry import ModelRegistry, load_q_table, load_rewards, read_checkpoint
+from src.backend.services.rl_training import TrainingExecutor
+
+
+def config_q_learning(tmp_path, episodes=5, nome="modelo", **extra):
+    return {
+        "algorithm": "q_learning", "learning_rate": 0.1, "discount_factor": 0.95,
+        "epsilon_start": 1.0, "epsilon_end": 0.01, "epsilon_decay": 0.995,
+        "n_replicas": 2, "episodes": episodes, "model_dir": str(tmp_path / nome), **extra
+    }
+
+
+class Eventos:
+    """Coleta os eventos do executor e espera por eles."""
+
+    def __init__(self):
+        self.eventos = []
+        self._cond = threading.Condition()
+
+    def __call__(self, kind, training_id, data):
+        with self._cond:
+            self.eventos.append((kind, training_id, data))
+            self._cond.notify_all()
+
+    def tipos(self, training_id):
+        return [k for k, t, _ in self.eventos if t == training_id]
+
+    def esperar(self, training_id, kind, timeout=60):
+        with self._cond:
+            assert self._cond.wait_for(lambda: kind in self.tipos(training_id), timeout), \
+                f"{training_id} sem evento {kind}: {self.tipos(training_id)}"
+        return next(d for k, t, d in self.eventos if t == training_id and k == kind)
+
+
+@pytest.fixture
+def eventos():
+    return Eventos()
+
+
+@pytest.fixture
+def executor(eventos):
+    executor = TrainingExecutor(eventos, max_concurrent=1, mp_context="fork", cancel_grace_s=2.0)
+    yield executor
+    executor.shutdown()
+
+
+def test_treinamento_publica_progresso_e_salva_modelo(executor, eventos, tmp_path):
+    executor.submit("t1", config_q_learning(tmp_path))
+    final = eventos.esperar("t1", "completed")
+
+    tipos = eventos.tipos("t1")
+    assert tipos[0] == "running" and tipos[-1] == "completed"
+    progresso = [d for k, t, d in eventos.eventos if t == "t1" and k == "progress"]
+    assert sum(len(d["rewards"]) for d in progresso) == 5
+    assert progresso[-1]["episodes_completed"] == final["episodes_completed"] == 5
+
+    checkpoint = read_checkpoint(tmp_path / "modelo")
+    assert checkpoint["final"] and checkpoint["episodes_completed"] == 5
+    assert checkpoint["path"] == final["saved_model_path"]
+    assert len(load_rewards(checkpoint["path"])) == 5
+    assert len(load_q_table(checkpoint["path"])) > 0
+    assert not executor.is_active("t1")
+
+
+def test_checkpoints_periodicos_e_retomada(executor, eventos, tmp_path):
+    config = config_q_learning(tmp_path, episodes=6, checkpoint_interval=2)
+    executor.submit("t1", config)
+    eventos.esperar("t1", "completed")
+    intermediarios = [d["episodes_completed"] for k, t, d in eventos.eventos
+                      if t == "t1" and k == "checkpoint"]
+    assert intermediarios == [2, 4]
+    assert len(list((tmp_path / "modelo").glob("snap_*"))) == 1
+
+    # Retomar um checkpoint com mais episódios continua a contagem e o histórico
+    executor.submit("t2", dict(config, episodes=9, resume=True))
+    final = eventos.esperar("t2", "completed")
+    anteriores = [r for k, t, d in eventos.eventos if t == "t1" and k == "progress" for r in d["rewards"]]
+    progresso = [d for k, t, d in eventos.eventos if t == "t2" and k == "progress"]
+    assert progresso[0]["rewards"] == anteriores
+    assert final["episodes_completed"] == 9
+    historico = load_rewards(final["saved_model_path"])
+    assert len(historico) == 9 and historico[:6] == anteriores
+
+
+def test_cancelamento_grava_checkpoint(executor, eventos, tmp_path):
+    executor.submit("longo", config_q_learning(tmp_path, episodes=100000, nome="longo"))
+    eventos.esperar("longo", "running")
+    executor.cancel("longo")
+    eventos.esperar("longo", "cancelled")
+
+    checkpoint = read_checkpoint(tmp_path / "longo")
+    assert checkpoint is not None and not checkpoint["final"]
+    assert checkpoint["episodes_completed"] == len(load_rewards(checkpoint["path"]))
+
+
+def test_limite_de_treinamentos_simultaneos(executor, eventos, tmp_path):
+    executor.submit("longo", config_q_learning(tmp_path, episodes=100000, nome="longo"))
+    executor.submit("fila", config_q_learning(tmp_path, nome="fila"))
+    eventos.esperar("longo", "running")
+
+    stats = executor.stats()
+    assert stats["running"] == 1 and stats["queued"] == 1
+    assert eventos.tipos("fila") == []
+
+    # A vaga liberada pelo cancelamento inicia o próximo da fila
+    assert executor.cancel("longo")
+    eventos.esperar("longo", "cancelled")
+    eventos.esperar("fila", "completed")
+    assert executor.stats()["started"] == 2
+
+
+def test_cancelamento_de_treinamento_na_fila(executor, eventos, tmp_path):
+    executor.submit("longo", config_q_learning(tmp_path, episodes=100000, nome="longo"))
+    executor.submit("fila", config_q_learning(tmp_path, nome="fila"))
+    eventos.esperar("longo", "running")
+
+    assert executor.cancel("fila")
+    assert eventos.tipos("fila") == ["cancelled"]
+    assert not executor.is_active("fila")
+    assert not executor.cancel("inexistente")
+
+    assert executor.cancel("longo")
+    eventos.esperar("longo", "cancelled")
+    assert executor.stats()["started"] == 1
+    assert not (tmp_path / "longo.pkl").exists()
+
+
+def test_algoritmo_invalido(executor, tmp_path):
+    with pytest.raises(ValueError):
+        executor.submit("x", dict(config_q_learning(tmp_path), algorithm="DQN"))
+
+
+@pytest.fixture
+def executor_api(monkeypatch, tmp_path):
+    """Executor do router com fork e registro de modelos em tmp_path."""
+    executor = TrainingExecutor(rl_agent.apply_training_event, max_concurrent=1, mp_context="fork",
+                                cancel_grace_s=2.0)
+    monkeypatch.setattr(rl_agent, "training_executor", executor)
+    monkeypatch.setattr(rl_agent, "model_registry", ModelRegistry(tmp_path))
+    yield executor
+    executor.shutdown()
+
+
+def esperar_status(test_client, training_id, status, timeout=60):
+    fim = time.monotonic() + timeout
+    while time.monotonic() < fim:
+        resposta = test_client.get(f"/api/v1/rl/training/status/{training_id}").json()
+        if resposta["status"] == status:
+            return resposta
+        time.sleep(0.05)
+    pytest.fail(f"Treinamento {training_id} não chegou a {status}: {resposta}")
+
+
+def test_endpoint_treina_e_registra_modelo(test_client, executor_api, tmp_path):
+    resposta = test_client.post("/api/v1/rl/train", json={"episodes": 5, "n_replicas": 2})
+    assert resposta.status_code == 200
+    training_id = resposta.json()["training_id"]
+
+    status = esperar_status(test_client, training_id, "completed")
+    assert status["episodes_completed"] == 5
+    assert status["progress"] == 100
+
+    modelo = test_client.get(f"/api/v1/rl/models/{training_id}").json()
+    assert modelo["algorithm"] == "q_learning" and modelo["status"] == "completed"
+    assert modelo["path"] == read_checkpoint(tmp_path / training_id)["path"]
+    assert training_id in [m["id"] for m in test_client.get("/api/v1/rl/models").json()["models"]]
+
+    # O índice sobrevive a um reinício da API
+    assert ModelRegistry(tmp_path).get(training_id)["performance"]["episodes"] == 5
+
+    test_client.delete(f"/api/v1/rl/training/{training_id}")
+    assert not (tmp_path / training_id).exists()
+    assert test_client.get(f"/api/v1/rl/models/{training_id}").status_code == 404
+
+
+def test_endpoint_cancela_treinamento(test_client, executor_api, tmp_path):
+    training_id = test_client.post("/api/v1/rl/train", json={"episodes": 100000, "n_replicas": 2}) \
+        .json()["training_id"]
+    esperar_status(test_client, training_id, "running")
+
+    sistema = test_client.get("/api/v1/rl/training/status").json()
+    assert sistema["executor"]["running"] == 1
+
+    resposta = test_client.delete(f"/api/v1/rl/training/{training_id}")
+    assert resposta.status_code == 200
+    assert resposta.json()["cancelled"] is True
+    assert training_id not in rl_agent.training_storage
+
+    # O checkpoint gravado pelo worker ao cancelar é descartado
+    fim = time.monotonic() + 30
+    while (executor_api.stats()["running"] or (tmp_path / training_id).exists()) and time.monotonic() < fim:
+        time.sleep(0.05)
+    assert executor_api.stats()["running"] == 0
+    assert training_id not in rl_agent.model_registry
+    assert not (tmp_path / training_id).exists()
+
+
+def test_endpoint_retoma_treinamento_apos_reinicio(test_client, executor_api, tmp_path):
+    training_id = test_client.post("/api/v1/rl/train", json={
+        "episodes": 100000, "n_replicas": 2, "checkpoint_interval": 2}).json()["training_id"]
+    esperar_status(test_client, training_id, "running")
+    executor_api.cancel(training_id)
+    esperar_status(test_client, training_id, "cancelled")
+
+    # Reinício da API: treinamentos em memória perdidos, registro em disco mantido
+    rl_agent.training_storage.pop(training_id)
+    modelo = test_client.get(f"/api/v1/rl/models/{training_id}").json()
+    assert modelo["status"] == "checkpoint"
+
+    resposta = test_client.post(f"/api/v1/rl/training/{training_id}/resume")
+    assert resposta.status_code == 200
+    assert resposta.json()["resumed_from_episode"] == modelo["episodes_completed"]
+    esperar_status(test_client, training_id, "running")
+    assert test_client.post(f"/api/v1/rl/training/{training_id}/resume").status_code == 409
+
+    test_client.delete(f"/api/v1/rl/training/{training_id}")
+    fim = time.monotonic() + 30
+    while executor_api.is_active(training_id) and time.monotonic() < fim:
+        time.sleep(0.05)
+    assert test_client.post(f"/api/v1/rl/training/{training_id}/resume").status_code == 404
+
+
+def test_endpoint_rejeita_algoritmo_desconhecido(test_client):
+    resposta = test_client.post("/api/v1/rl/train", json={"algorithm": "DQN"})
+    assert resposta.status_code == 400
@@ -0,0 +1,103 @@
+"""
+Testes da simulação de faltas em lote (ProtectionCoordinator.simulate_faults_batch
+em src/backend/rl_protection_coordinator.py e POST /api/simulate-fault/batch).
+"""
+
+import math
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.backend import api_protecai
+from src.backend.rl_protection_coordinator import ProtectionCoordinator
+
+
+@pytest.fixture
+def coordinator():
+    return ProtectionCoordinator()
+
+
+@pytest.fixture
+def client(coordinator, monkeypatch):
+    monkeypatch.setattr(api_protecai, "coordinator_instance", coordinator)
+    return TestClient(api_protecai.app)
+
+
+def test_lote_igual_a_simulacoes_individuais(coordinator):
+    rng = np.random.default_rng(5)
+    for zone in coordinator.zones:
+        for device in zone.devices:
+            device.pickup_current = rng.uniform(0.1, 400)
+            device.time_delay = float(rng.choice([0.02, 0.3, 0.5, 0.6, 2.5]))
+
+    buses = rng.integers(0, 16, 500)
+    fault_types = rng.choice(['3ph', '2ph', '1ph', '2ph_ground'], 500)
+    severities = rng.uniform(0.1, 1.0, 500)
+    lote = coordinator.simulate_faults_batch(buses, fault_types, severities)
+    ids = list(lote['device_ids'])
+
+    for k, (bus, fault_type, severity) in enumerate(zip(buses, fault_types, severities)):
+        result = coordinator.simulate_fault(int(bus), str(fault_type), float(severity))
+        if 'error' in result:
+            assert not lote['valid'][k] and lote['affected_zone'][k] == ''
+            continue
+
+        assert lote['affected_zone'][k] == result['affected_zone']
+        assert lote['fault_current_a'][k] == pytest.approx(result['fault_current_a'])
+        assert lote['coordination_issues'][k] == len(result['coordination_issues'])
+        assert lote['coordination_ok'][k] == result['coordination_ok']
+        for norm, flags in lote['compliance'].items():
+            assert flags[k] == (not result['normative_compliance'][norm]['issues'])
+        for response in result['device_responses']:
+            tempo = lote['operating_time'][k, ids.index(response['device_id'])]
+            if response['should_operate']:
+                assert tempo == response['operating_time']
+            else:
+                assert math.isnan(tempo)
+
+
+def test_endpoint_em_grade(client, coordinator):
+    response = client.post("/api/simulate-fault/batch", json={
+        "buses": [4, 7, 14], "fault_types": ["3ph", "1ph"], "severities": [0.2, 0.8], "grid": True
+    })
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data['scenarios'] == 12
+    assert data['bus'][:4] == [4, 4, 4, 4]
+    assert data['fault_type'][:4] == ['3ph', '3ph', '1ph', '1ph']
+    assert len(data['operating_time']) == 12
+    assert all(len(linha) == len(data['device_ids']) for linha in data['operating_time'])
+
+    single = coordinator.simulate_fault(14, '1ph', 0.8)
+    assert data['fault_current_a'][-1] == single['fault_current_a']
+    assert data['coordination_issues'][-1] == len(single['coordination_issues'])
+    assert set(data['compliance']) == set(single['normative_compliance'])
+
+
+def test_endpoint_valida_entradas(client):
+    def post(**campos):
+        body = {"buses": [4], "fault_types": ["3ph"], "severities": [0.5]}
+        body.update(campos)
+        return client.post("/api/simulate-fault/batch", json=body).status_code
+
+    assert post() == 200
+    assert post(buses=[4, 15]) == 400
+    assert post(fault_types=["3ph", "xx"]) == 400
+    assert post(severities=[0.5, 1.5]) == 400
+    assert post(buses=[4, 5], severities=[0.5, 0.6, 0.7]) == 400
+
+
+def test_endpoint_com_coordenador_da_api(monkeypatch):
+    """Sem substituir o coordenador: get_coordinator() usa o do backend."""
+    monkeypatch.setattr(api_protecai, "coordinator_instance", None)
+    monkeypatch.setattr(api_protecai, "rl_agent_instance", None)
+    client = TestClient(api_protecai.app)
+
+    response = client.post("/api/simulate-fault/batch", json={
+        "buses": [2, 3], "fault_types": ["3ph"], "severities": [1.0]
+    })
+    assert response.status_code == 200
+    assert response.json()['bus'] == [2, 3]
+    assert isinstance(api_protecai.get_coordinator(), ProtectionCoordinator)
@@ -0,0 +1,53 @@
+"""
+Testes do snapshot binário colunar da rede (simuladores/power_sim/snapshot_binario.py).
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import pandapower as pp
+import pytest
+
+from simuladores.power_sim.snapshot_binario import (
+    caminho_snapshot, carregar_documento, carregar_snapshot_binario, converter_json
+)
+
+DATA_FILE = Path(__file__).resolve(
+).parents[1] / "simuladores" / "power_sim" / "data" / "ieee14_protecao.json"
+
+
+@pytest.fixture
+def json_copia(tmp_path):
+    path = tmp_path / "ieee14_protecao.json"
+    shutil.copy(DATA_FILE, path)
+    return path
+
+
+def test_snapshot_reproduz_documento_json(json_copia):
+    converter_json(json_copia)
+    with open(json_copia, "r", encoding="utf-8") as f:
+        original = json.load(f)
+
+    documento = carregar_snapshot_binario(caminho_snapshot(json_copia))
+
+    assert pp.nets_equal(pp.from_json_string(original["pandapower_net"]), documento["net"])
+    for campo in ["protection_devices", "protection_zones", "bus_geodata", "line_geodata"]:
+        assert documento[campo] == original[campo], f"Campo '{campo}' divergente"
+
+
+def test_snapshot_desatualizado_volta_para_json(json_copia):
+    converter_json(json_copia)
+    data = json.loads(json_copia.read_text(encoding="utf-8"))
+    data["protection_devices"]["reles"][0]["pickup"] = 9.9
+    json_copia.write_text(json.dumps(data), encoding="utf-8")
+
+    documento = carregar_documento(json_copia)
+    assert documento["protection_devices"]["reles"][0]["pickup"] == 9.9
+
+
+def test_documento_sem_snapshot(json_copia):
+    assert not caminho_snapshot(json_copia).exists()
+    documento = carregar_documento(json_copia)
+    assert isinstance(documento["net"], pp.pandapowerNet)
+    assert "pandapower_net" not in documento
@@ -0,0 +1,89 @@
+"""
+Testes da tabela pré-calculada de respostas de falta (simuladores/power_sim/tabela_faltas.py).
+"""
+
+import copy
+import json
+import shutil
+
+import numpy as np
+import pandapower as pp
+import pytest
+
+from simuladores.power_sim.curto_circuito import MotorCurtoCircuito
+from simuladores.power_sim.snapshot_binario import JSON_PADRAO, carregar_documento
+from simuladores.power_sim.tabela_faltas import (
+    CARGAS_FALTA, OPCOES_FLUXO_FALTA, TabelaFaltas, caminho_manifesto, caminho_tabela, calcular_respostas
+)
+
+
+@pytest.fixture
+def json_copia(tmp_path):
+    path = tmp_path / "ieee14_protecao.json"
+    shutil.copy(JSON_PADRAO, path)
+    return path
+
+
+@pytest.fixture(scope="module")
+def rede():
+    return carregar_documento(JSON_PADRAO)["net"]
+
+
+def test_curto_por_faixa_de_impedancia(rede):
+    respostas = calcular_respostas(rede, impedancias=(0.0, 0.2), tipos=("3ph", "1ph"))
+    assert respostas.shape == (2, 2, len(rede.bus), len(rede.line) + len(rede.bus))
+
+    motor = MotorCurtoCircuito(rede)
+    for f, z in enumerate((0.0, 0.2)):
+        varredura = motor.varredura(z)
+        for j, barra in enumerate(rede.bus.index):
+            esperado = varredura.contribuicoes(barra, "line").reindex(rede.line.index, fill_value=0.0).values
+            np.testing.assert_allclose(respostas[0, f, j, :len(rede.line)], esperado)
+            np.testing.assert_allclose(respostas[1, f, j, :len(rede.line)], esperado * 0.577)
+            assert respostas[0, f, j, len(rede.line) + j] == pytest.approx(
+                varredura.tensoes_pu[motor.coluna(barra), motor.coluna(barra)])
+
+
+def test_sobrecarga_por_fluxo_de_potencia(rede):
+    respostas = calcular_respostas(rede, impedancias=(0.0, 0.1), tipos=("overload",))
+    barra = rede.bus.index[3]
+    net = copy.deepcopy(rede)
+    pp.create_load(net, bus=barra, **CARGAS_FALTA["overload"])
+    pp.runpp(net, **OPCOES_FLUXO_FALTA)
+
+    esperado = np.concatenate([net.res_line["i_ka"].values, net.res_bus["vm_pu"].values])
+    np.testing.assert_allclose(respostas[0, 0, 3], esperado)
+    np.testing.assert_array_equal(respostas[0, 0], respostas[0, 1])
+
+
+def test_tabela_gravada_e_reaproveitada(json_copia):
+    tabela = TabelaFaltas.carregar(json_copia, impedancias=(0.0, 0.1))
+    assert tabela.reconstruida
+    assert caminho_tabela(json_copia).exists() and caminho_manifesto(json_copia).exists()
+
+    reaberta = TabelaFaltas.carregar(json_copia, impedancias=(0.0, 0.1))
+    assert not reaberta.reconstruida
+    assert isinstance(reaberta.respostas, np.memmap)
+    np.testing.assert_array_equal(reaberta.respostas, tabela.respostas)
+
+    barra = int(tabela.barras[2])
+    currents, voltages = reaberta.falta("2ph", barra, 1)
+    assert len(currents) == tabela.n_linhas and len(voltages) == len(tabela.barras)
+    lote_currents, _ = reaberta.lote(np.array([1]), np.array([1]), np.array([2]))
+    np.testing.assert_array_equal(lote_currents[0], currents)
+
+    # Outras faixas de impedância também exigem recalcular
+    assert TabelaFaltas.carregar(json_copia, impedancias=(0.0, 0.2)).reconstruida
+
+
+def test_rede_alterada_reconstroi_tabela(json_copia):
+    antes = TabelaFaltas.carregar(json_copia, impedancias=(0.0,))
+    data = json.loads(json_copia.read_text(encoding="utf-8"))
+    net = pp.from_json_string(data["pandapower_net"])
+    net.line["length_km"] *= 2
+    data["pandapower_net"] = pp.to_json(net)
+    json_copia.write_text(json.dumps(data), encoding="utf-8")
+
+    depois = TabelaFaltas.carregar(json_copia, impedancias=(0.0,))
+    assert depois.reconstruida
+    assert not np.allclose(depois.respostas, antes.respostas)
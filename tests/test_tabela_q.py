@@ -0,0 +1,114 @@
+"""
+Testes do codificador de estados e da Q-table esparsa
+(simuladores/power_sim/tabela_q.py) usados pelos BasicRLAgent.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from rl_protection_coordinator import ProtectionCoordinator
+from simuladores.power_sim.tabela_q import CodificadorEstado, TabelaQCongelada, TabelaQEsparsa
+from src.core.rl_protection_coordinator_clean import ProtectionCoordinator as CoreCoordinator
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+
+def test_codificador_sem_colisoes():
+    codificador = CodificadorEstado([(0.5,), (1, 2, 3), (0.1, 0.3)])
+    assert codificador.n_estados == 2 * 4 * 3
+
+    grade = np.array(np.meshgrid([0, 1], [0, 1.5, 2, 9], [0, 0.2, 0.3], indexing='ij')).reshape(3, -1).T
+    chaves = codificador.codificar_lote(grade)
+    assert len(set(chaves.tolist())) == codificador.n_estados
+    assert codificador.codificar(grade[7]) == chaves[7]
+    np.testing.assert_array_equal(codificador.decodificar(chaves[7]), codificador.faixas_de(grade[7]))
+
+
+def test_codificador_valida_limites():
+    with pytest.raises(ValueError):
+        CodificadorEstado([(1, 1)])
+    with pytest.raises(ValueError):
+        CodificadorEstado([tuple(range(255))] * 8)
+
+
+def test_tabela_esparsa_cresce():
+    tabela = TabelaQEsparsa(n_acoes=3, capacidade_inicial=2)
+    assert tabela[10**15].tolist() == [0, 0, 0]
+    assert len(tabela) == 0
+
+    for chave in range(5):
+        tabela.atualizar(chave * 10**12, chave % 3, float(chave))
+    assert len(tabela) == 5
+    assert tabela[4 * 10**12][1] == 4.0
+    assert not tabela[4 * 10**12].flags.writeable
+    np.testing.assert_array_equal(tabela.valores([3 * 10**12, 99]), [[3.0, 0, 0], [0, 0, 0]])
+
+
+def test_estado_do_agente_distingue_faltas():
+    coordinator = ProtectionCoordinator()
+    agent = coordinator.rl_agent
+    estados = {agent.get_state(coordinator, coordinator.simulate_fault(bus, fault_type, severity))
+               for bus, fault_type, severity in [(4, '3ph', 0.8), (4, '1ph', 0.8), (14, '3ph', 0.8),
+                                                 (14, '3ph', 0.2)]}
+    assert len(estados) == 4
+
+    state = agent.get_state(coordinator, coordinator.simulate_fault(4, '3ph', 0.8))
+    agent.learn(state, 3, 10.0, state)
+    assert agent.q_table[state][3] > 0
+    assert len(agent.q_table) == 1
+
+
+def test_estado_do_core_segue_ajustes():
+    coordinator = CoreCoordinator()
+    agent = coordinator.rl_agent
+    inicial = agent.get_state(coordinator.device_bank)
+    assert agent.get_state(coordinator.protection_devices) == inicial
+
+    coordinator.protection_devices[1].time_delay = 1.8
+    assert agent.get_state(coordinator.device_bank) != inicial
+
+
+def test_estado_nao_depende_de_pythonhashseed():
+    codigo = ("from rl_protection_coordinator import ProtectionCoordinator as C; c = C(); "
+              "print(c.rl_agent.get_state(c, c.simulate_fault(7, '2ph', 0.6)))")
+    chaves = set()
+    for semente in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=semente, PYTHONPATH=str(RAIZ))
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, env=env,
+                               capture_output=True, text=True, check=True).stdout
+        chaves.add(saida.strip().splitlines()[-1])
+    assert len(chaves) == 1
+
+
+def test_tabela_exportada_e_congelada(tmp_path):
+    tabela = TabelaQEsparsa(n_acoes=3, capacidade_inicial=2)
+    for chave in (7 * 10**12, 3, 10**15, 42):
+        tabela.atualizar(chave, chave % 3, float(chave % 100))
+    chaves, valores = tabela.exportar()
+    assert chaves.tolist() == sorted(chaves.tolist())
+
+    np.save(tmp_path / "chaves.npy", chaves)
+    np.save(tmp_path / "valores.npy", valores)
+    congelada = TabelaQCongelada(np.load(tmp_path / "chaves.npy", mmap_mode="r"),
+                                 np.load(tmp_path / "valores.npy", mmap_mode="r"))
+    consulta = [42, 5, 10**15, 3, 7 * 10**12, 10**16]
+    np.testing.assert_array_equal(congelada.valores(consulta), tabela.valores(consulta))
+    assert len(congelada) == 4 and 42 in congelada and 5 not in congelada
+    np.testing.assert_array_equal(congelada[3], tabela[3])
+    assert congelada[5].tolist() == [0, 0, 0]
+
+    retomada = TabelaQEsparsa.de_arrays(chaves, valores)
+    retomada.atualizar(3, 0, 1.0)
+    assert retomada[3][0] == tabela[3][0] + 1.0
+    np.testing.assert_array_equal(retomada.valores([42, 5]), tabela.valores([42, 5]))
+
+
+def test_tabela_congelada_vazia():
+    congelada = TabelaQCongelada(*TabelaQEsparsa(n_acoes=2).exportar())
+    assert len(congelada) == 0
+    assert congelada.valores([1, 2]).shape == (2, 2)
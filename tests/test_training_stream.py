@@ -0,0 +1,129 @@
+"""
+Testes do stream SSE de progresso dos treinamentos
+(GET /api/v1/rl/training/{id}/stream) e do EventHub
+(src/backend/services/event_hub.py).
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from src.backend.api.routers import rl_agent
+from src.backend.services.event_hub import EventHub, sse_event
+
+
+def registro(training_id, status="running", rewards=()):
+    rewards = list(rewards)
+    return {
+        "id": training_id, "status": status, "config": {"algorithm": "q_learning"},
+        "episodes_completed": len(rewards), "total_episodes": 100,
+        "current_reward": rewards[-1] if rewards else 0.0,
+        "average_reward": 0.0, "best_reward": 0.0, "convergence_status": "training",
+        "saved_model_path": None, "error_message": None,
+        "rewards_history": rewards, "loss_history": []
+    }
+
+
+def eventos_sse(texto):
+    """Lista de (id, evento, dados) de um corpo text/event-stream."""
+    eventos = []
+    for bloco in texto.strip().split("\n\n"):
+        campos = dict(linha.split(": ", 1) for linha in bloco.split("\n") if not linha.startswith(":"))
+        if campos:
+            eventos.append((campos.get("id"), campos["event"], json.loads(campos["data"])))
+    return eventos
+
+
+@pytest.fixture
+def treinamentos(monkeypatch):
+    monkeypatch.setattr(rl_agent, "training_storage", {})
+    monkeypatch.setattr(rl_agent, "training_hub", EventHub())
+    return rl_agent.training_storage
+
+
+def test_sse_event_formato():
+    assert sse_event("progress", {"a": 1}, event_id=3) == 'id: 3\nevent: progress\ndata: {"a": 1}\n\n'
+
+
+def test_hub_acorda_assinantes_de_outra_thread():
+    hub = EventHub()
+
+    async def cenario():
+        assinatura = hub.subscribe("t1")
+        outra = hub.subscribe("t2")
+        threading.Thread(target=hub.notify, args=("t1",)).start()
+        assert await assinatura.wait(5)
+        assert not await outra.wait(0.05)
+        hub.unsubscribe(assinatura)
+        hub.unsubscribe(outra)
+
+    asyncio.run(cenario())
+    assert hub.stats()["subscribers"] == 0 and hub.stats()["topics"] == 0
+
+
+def test_stream_de_treinamento_terminado(test_client, treinamentos):
+    treinamentos["t1"] = dict(registro("t1", "completed", [1.0, 2.0, 3.0, 4.0]), saved_model_path="m")
+
+    resposta = test_client.get("/api/v1/rl/training/t1/stream")
+    assert resposta.headers["content-type"].startswith("text/event-stream")
+    (id_progresso, tipo, dados), (_, fim, final) = eventos_sse(resposta.text)
+    assert (id_progresso, tipo, dados["rewards"]) == ("4", "progress", [1.0, 2.0, 3.0, 4.0])
+    assert fim == "end" and final["status"] == "completed" and final["saved_model_path"] == "m"
+
+    # Reconexão: só os episódios depois do último id recebido
+    resposta = test_client.get("/api/v1/rl/training/t1/stream", headers={"Last-Event-ID": "3"})
+    assert eventos_sse(resposta.text)[0][2]["rewards"] == [4.0]
+    resposta = test_client.get("/api/v1/rl/training/t1/stream?last_event_id=2")
+    assert eventos_sse(resposta.text)[0][2]["from_episode"] == 2
+
+    assert test_client.get("/api/v1/rl/training/nada/stream").status_code == 404
+
+
+def test_stream_envia_so_episodios_novos_agrupados(test_client, treinamentos):
+    treinamentos["t1"] = registro("t1")
+    recompensas = [float(i) for i in range(60)]
+
+    def executor():
+        time.sleep(0.2)
+        for i in range(0, 60, 2):
+            rl_agent.apply_training_event("progress", "t1", {
+                "episodes_completed": i + 2, "rewards": recompensas[i:i + 2], "convergence_status": "training"})
+            time.sleep(0.01)
+        rl_agent.apply_training_event("completed", "t1", {"episodes_completed": 60, "saved_model_path": "m"})
+
+    thread = threading.Thread(target=executor)
+    thread.start()
+    resposta = test_client.get("/api/v1/rl/training/t1/stream?max_rate_hz=5")
+    thread.join()
+
+    eventos = eventos_sse(resposta.text)
+    progresso = [(int(i), d) for i, t, d in eventos if t == "progress"]
+    assert [r for _, d in progresso for r in d["rewards"]] == recompensas
+    assert [i for i, _ in progresso] == sorted({i for i, _ in progresso})
+    # 31 eventos do executor em ~0.5 s, no máximo 5 envios por segundo
+    assert len(progresso) <= 6
+    assert eventos[-1][1] == "end" and eventos[-1][2]["status"] == "completed"
+    assert rl_agent.training_hub.stats()["subscribers"] == 0
+
+
+def test_stream_termina_quando_treinamento_e_removido(test_client, treinamentos):
+    treinamentos["t1"] = registro("t1", rewards=[1.0])
+
+    def remover():
+        time.sleep(0.2)
+        treinamentos.pop("t1")
+        rl_agent.training_hub.notify("t1")
+
+    threading.Thread(target=remover).start()
+    eventos = eventos_sse(test_client.get("/api/v1/rl/training/t1/stream").text)
+    assert [t for _, t, _ in eventos] == ["progress", "end"]
+    assert eventos[-1][2]["status"] == "deleted"
+
+
+def test_progresso_a_partir_de_um_episodio(test_client, treinamentos):
+    treinamentos["t1"] = registro("t1", rewards=[1.0, 2.0, 3.0])
+    resposta = test_client.get("/api/v1/rl/training/progress/t1?from_episode=2").json()
+    assert resposta["rewards_history"] == [3.0]
@@ -0,0 +1,101 @@
+"""
+Testes do treinamento vetorizado em lock-step (VectorizedTrainer em
+src/core/rl_protection_coordinator_clean.py) e das operações em lote que ele
+usa: respostas_lote, contar_problemas_lote, contar_pares_na_janela e
+TabelaQEsparsa.atualizar_lote.
+"""
+
+import numpy as np
+import pytest
+
+from simuladores.power_sim.coordenacao import contar_pares_na_janela, pares_na_janela
+from simuladores.power_sim.tabela_q import TabelaQEsparsa
+from src.core.rl_protection_coordinator_clean import ProtectionCoordinator, VectorizedTrainer
+
+CENARIOS = [{'bus': bus, 'fault_type': fault_type, 'severity': severity}
+            for bus in (1, 4, 7, 14) for fault_type in ('3ph', '1ph') for severity in (0.5, 0.9)]
+
+
+@pytest.fixture
+def coordinator():
+    return ProtectionCoordinator()
+
+
+def ajustes_aleatorios(coordinator, n, semente=0):
+    rng = np.random.default_rng(semente)
+    k = len(coordinator.device_bank)
+    return rng.uniform(0.05, 2.0, (n, k)), rng.choice([0.02, 0.1, 0.3, 0.5, 1.0], (n, k))
+
+
+def test_contagem_em_lote_igual_a_varredura():
+    rng = np.random.default_rng(3)
+    valores = rng.uniform(0, 2, (40, 12))
+    valores[rng.random(valores.shape) < 0.3] = np.nan
+    contagem = contar_pares_na_janela(valores, 0.3)
+    for linha, esperado in zip(valores, contagem):
+        assert len(pares_na_janela(linha[~np.isnan(linha)], 0.3)[0]) == esperado
+
+
+def test_simulacao_e_recompensa_em_lote_iguais_as_individuais(coordinator):
+    pickup, delay = ajustes_aleatorios(coordinator, 30)
+    actions = np.random.default_rng(1).integers(0, 32, len(pickup))
+    novo_pickup, novo_delay = pickup.copy(), delay.copy()
+    coordinator.apply_rl_actions_batch(novo_pickup, novo_delay, actions)
+    lote = coordinator.simulate_settings_batch(novo_pickup, novo_delay, CENARIOS)
+    rewards = coordinator.rl_agent.calculate_reward_batch(
+        lote['should_operate'], lote['operating_time'], lote['coordination_issues'])
+
+    for n, action in enumerate(actions):
+        for i, device in enumerate(coordinator.protection_devices):
+            device.pickup_current, device.time_delay = pickup[n, i], delay[n, i]
+        coordinator.apply_rl_action(int(action))
+        np.testing.assert_array_equal(coordinator.device_bank.pickup, novo_pickup[n])
+        np.testing.assert_array_equal(coordinator.device_bank.atraso, novo_delay[n])
+
+        for s, scenario in enumerate(CENARIOS):
+            result = coordinator.simulate_fault(scenario['bus'], scenario['fault_type'], scenario['severity'])
+            responses = result.device_responses
+            np.testing.assert_array_equal(lote['should_operate'][n, s], responses['should_operate'])
+            np.testing.assert_array_equal(lote['operating_time'][n, s], responses['operating_time'])
+            assert lote['coordination_issues'][n, s] == len(result.coordination_issues)
+            assert rewards[n, s] == coordinator.rl_agent.calculate_reward(result)
+
+
+def test_lote_respeita_pares_de_coordenacao(coordinator):
+    coordinator.coordination_pairs = np.array([[0, 1], [5, 1], [2, 3], [4, 5]])
+    pickup, delay = ajustes_aleatorios(coordinator, 10, semente=2)
+    lote = coordinator.simulate_settings_batch(pickup, delay, CENARIOS)
+    for n in range(len(pickup)):
+        for i, device in enumerate(coordinator.protection_devices):
+            device.pickup_current, device.time_delay = pickup[n, i], delay[n, i]
+        for s, scenario in enumerate(CENARIOS):
+            result = coordinator.simulate_fault(scenario['bus'], scenario['fault_type'], scenario['severity'])
+            assert lote['coordination_issues'][n, s] == len(result.coordination_issues)
+
+
+def test_atualizacao_em_lote_usa_media_dos_repetidos():
+    tabela = TabelaQEsparsa(n_acoes=4, capacidade_inicial=1)
+    tabela.atualizar_lote([7, 7, 7, 9], [1, 1, 2, 0], [1.0, 3.0, 5.0, -1.0])
+    assert tabela[7].tolist() == [0.0, 2.0, 5.0, 0.0]
+    assert tabela[9].tolist() == [-1.0, 0.0, 0.0, 0.0]
+    assert len(tabela) == 2
+
+
+def test_treinador_atualiza_agente_sem_mudar_coordenador(coordinator):
+    np.random.seed(0)
+    inicial = coordinator.device_bank.pickup.copy(), coordinator.device_bank.atraso.copy()
+    trainer = VectorizedTrainer(coordinator, n_replicas=32, steps_per_episode=3)
+    rewards = trainer.train_episode()
+
+    assert rewards.shape == (32,)
+    assert coordinator.rl_agent.episodes == 32
+    assert trainer.env_steps == 32 * 3
+    assert len(coordinator.rl_agent.q_table) > 0
+    assert trainer.pickup.shape == (32, len(coordinator.device_bank))
+    np.testing.assert_array_equal(coordinator.device_bank.pickup, inicial[0])
+    np.testing.assert_array_equal(coordinator.device_bank.atraso, inicial[1])
+
+    result = coordinator.train_rl_agent_vectorized(episodes=2, n_replicas=8)
+    assert result['env_steps'] == 2 * 8 * 5
+    assert result['total_episodes'] == 32 + 16
+    assert len(result['results']) == 2
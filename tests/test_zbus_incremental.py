@@ -0,0 +1,169 @@
+"""
+Testes das atualizações incrementais da Zbus (ZbusIncremental e manobras do
+MotorCurtoCircuito) e do reaproveitamento do motor em ShortCircuitService.
+"""
+
+import copy
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandapower as pp
+import pytest
+
+from simuladores.power_sim.curto_circuito import MotorCurtoCircuito, ZbusIncremental
+from simuladores.power_sim.snapshot_binario import JSON_PADRAO, carregar_documento
+from src.backend.services.network_store import NetworkStore
+from src.backend.services.short_circuit import ShortCircuitService
+
+
+@pytest.fixture
+def rede():
+    return carregar_documento(JSON_PADRAO)["net"]
+
+
+def _rede_com_ramal():
+    """Malha 0-1-2-3 com a barra 4 pendurada só pela linha 4."""
+    net = pp.create_empty_network()
+    barras = [pp.create_bus(net, vn_kv=13.8) for _ in range(5)]
+    pp.create_ext_grid(net, barras[0], s_sc_max_mva=500.0, rx_max=0.1)
+    for de, para in [(0, 1), (1, 2), (2, 3), (0, 2), (3, 4)]:
+        pp.create_line_from_parameters(net, barras[de], barras[para], length_km=2.0,
+                                       r_ohm_per_km=0.08, x_ohm_per_km=0.35,
+                                       c_nf_per_km=10.0, max_i_ka=0.5)
+    pp.create_load(net, barras[4], p_mw=1.0, q_mvar=0.2)
+    return net
+
+
+def _assert_zbus_igual(motor, net):
+    referencia = MotorCurtoCircuito(net)
+    np.testing.assert_array_equal(motor.barras, referencia.barras)
+    np.testing.assert_allclose(motor.zbus, referencia.zbus, atol=1e-10)
+    varredura, esperada = motor.varredura(), referencia.varredura()
+    assert varredura.ramos == esperada.ramos
+    np.testing.assert_allclose(varredura.contribuicoes_ka, esperada.contribuicoes_ka, atol=1e-9)
+
+
+def test_woodbury_igual_a_inversa():
+    rng = np.random.default_rng(1)
+    n = 12
+    ybus = rng.normal(size=(n, n)) + 1j * rng.normal(size=(n, n)) + 10 * np.eye(n)
+    fatoracao = ZbusIncremental(ybus)
+    delta = np.array([[2 - 1j, -1 + 0.5j], [-1 + 0.5j, 2 - 1j]])
+
+    diagonal = fatoracao.diagonal_com((3, 7), delta)
+    fatoracao.atualizar((3, 7), delta)
+
+    ybus[np.ix_([3, 7], [3, 7])] += delta
+    np.testing.assert_allclose(fatoracao.z, np.linalg.inv(ybus), atol=1e-12)
+    np.testing.assert_allclose(diagonal, np.diagonal(fatoracao.z), atol=1e-12)
+    assert fatoracao.refatoracoes == 1
+
+
+def test_deriva_e_limite_de_atualizacoes_refatoram():
+    ybus = np.eye(4, dtype=complex) * 5 - 1
+    delta = np.array([[1.0, -1.0], [-1.0, 1.0]])
+
+    fatoracao = ZbusIncremental(ybus, max_atualizacoes=3)
+    for sinal in (1, -1, 1):
+        fatoracao.atualizar((0, 1), sinal * delta)
+    assert fatoracao.refatoracoes == 2
+    assert fatoracao.atualizacoes == 0
+
+    sensivel = ZbusIncremental(ybus, tol_deriva=0.0)
+    sensivel.atualizar((0, 1), delta)
+    assert sensivel.refatoracoes == 2
+
+
+def test_alternar_ramo_igual_a_remontar(rede):
+    motor = MotorCurtoCircuito(rede)
+    assert motor.alternar_ramo("line", 2, False)
+    assert not motor.alternar_ramo("line", 2, False)
+
+    manobrada = copy.deepcopy(rede)
+    manobrada.line.at[2, 'in_service'] = False
+    _assert_zbus_igual(motor, manobrada)
+
+    motor.alternar_ramo("trafo", 1, False)
+    manobrada.trafo.at[1, 'in_service'] = False
+    _assert_zbus_igual(motor, manobrada)
+
+    motor.alternar_ramo("line", 2, True)
+    motor.alternar_ramo("trafo", 1, True)
+    _assert_zbus_igual(motor, rede)
+    assert motor.fatoracao.refatoracoes == 1
+
+
+def test_religar_ramo_que_estava_fora(rede):
+    fora = copy.deepcopy(rede)
+    fora.line.at[5, 'in_service'] = False
+    motor = MotorCurtoCircuito(fora)
+    motor.alternar_ramo("line", 5, True)
+    _assert_zbus_igual(motor, rede)
+
+
+def test_modificar_linha(rede):
+    motor = MotorCurtoCircuito(rede)
+    motor.modificar_linha(3, length_km=7.5, x_ohm_per_km=0.5)
+
+    alterada = copy.deepcopy(rede)
+    alterada.line.at[3, 'length_km'] = 7.5
+    alterada.line.at[3, 'x_ohm_per_km'] = 0.5
+    _assert_zbus_igual(motor, alterada)
+
+    with pytest.raises(ValueError):
+        motor.modificar_linha(3, max_i_ka=1.0)
+
+
+def test_desligar_ramal_exige_remontagem():
+    motor = MotorCurtoCircuito(_rede_com_ramal())
+    with pytest.raises(np.linalg.LinAlgError):
+        motor.alternar_ramo("line", 4, False)
+    assert motor.em_servico("line", 4)
+
+
+def test_varredura_n1_igual_a_remontar_cada_contingencia():
+    net = _rede_com_ramal()
+    motor = MotorCurtoCircuito(net)
+    n1 = motor.varredura_n1()
+    assert len(n1) == len(net.line)
+
+    for (elemento, idx), correntes in n1.iterrows():
+        contingencia = copy.deepcopy(net)
+        contingencia[elemento].at[idx, 'in_service'] = False
+        referencia = MotorCurtoCircuito(contingencia)
+        esperadas = dict(zip(referencia.barras, referencia.correntes_trifasicas()))
+        for barra, corrente in correntes.items():
+            assert corrente == pytest.approx(esperadas.get(barra, 0.0), rel=1e-9, abs=1e-12)
+
+    # Saída da linha 4 ilha a barra 4
+    assert n1.loc[("line", 4), 4] == 0.0
+    # O motor não muda
+    np.testing.assert_allclose(motor.zbus, MotorCurtoCircuito(net).zbus, atol=1e-12)
+
+
+def test_servico_reaproveita_e_atualiza_motor(tmp_path):
+    path = tmp_path / "rede.json"
+    shutil.copy(Path(JSON_PADRAO), path)
+    store = NetworkStore(path)
+    service = ShortCircuitService(store)
+    motor = service.engine()
+
+    net = store.checkout()
+    net.load.at[net.load.index[0], 'p_mw'] *= 2
+    store.commit(net)
+    assert service.engine() is motor
+    assert service.reuses == 1
+
+    net = store.checkout()
+    net.line.at[2, 'in_service'] = False
+    store.commit(net)
+    assert service.engine() is motor
+    assert service.incremental_updates == 1
+    assert not motor.em_servico("line", 2)
+
+    net = store.checkout()
+    net.bus.at[6, 'vn_kv'] = 20.0
+    store.commit(net)
+    assert service.engine() is not motor
+    assert service.stats()["builds"] == 2